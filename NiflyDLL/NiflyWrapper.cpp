@@ -7229,6 +7229,76 @@ NIFLY_API int setBSGeometryColors(void* theNif, void* theShape, int whichMesh,
     return 1;
 }
 
+// Add a LOD slot to a BSGeometry: a copy of slot 'fromMesh' that draws only 'tris', which
+// index fromMesh's vertices (a decimated level of it). Vertices none of the triangles use are
+// left out and the rest renumbered in order of first use, carrying every per-vertex array
+// along -- positions, UVs, normals, tangents, colors, skin weights -- so the new slot is a
+// complete .mesh of its own. Call it before fromMesh is saved: meshlets are generated at save
+// time (saveBSGeometryMeshData), and a copy made after that would keep fromMesh's. Leaves
+// fromMesh selected. Returns the new slot's index, or -1 if the shape isn't a BSGeometry,
+// fromMesh doesn't exist, or a triangle indexes past its vertices.
+NIFLY_API int addBSGeometryLODMesh(void* theNif, void* theShape, int fromMesh,
+                                   Triangle* tris, int triCount) {
+    NifFile* nif = static_cast<NifFile*>(theNif);
+    nifly::BSGeometry* geom = asBSGeometry(theShape);
+    if (!geom || fromMesh < 0 || fromMesh >= geom->MeshCount()) return -1;
+
+    // Copy the source before AddMesh, which may move it.
+    nifly::BSGeometryMesh src = *geom->SelectMesh((uint8_t)fromMesh);
+    const BSGeometryMeshData& smd = src.meshData;
+    const size_t nv = smd.vertices.size();
+
+    std::vector<int> remap(nv, -1);
+    std::vector<uint16_t> used;
+    auto renumber = [&](uint16_t v) -> uint16_t {
+        if (remap[v] < 0) {
+            remap[v] = (int)used.size();
+            used.push_back(v);
+        }
+        return (uint16_t)remap[v];
+    };
+    std::vector<Triangle> lodTris;
+    lodTris.reserve(triCount);
+    for (int i = 0; i < triCount; i++) {
+        const Triangle& t = tris[i];
+        if (t.p1 >= nv || t.p2 >= nv || t.p3 >= nv) return -1;
+        uint16_t a = renumber(t.p1), b = renumber(t.p2), c = renumber(t.p3);
+        lodTris.push_back(Triangle(a, b, c));
+    }
+
+    // Per-vertex arrays the source doesn't carry (no skin, no colors) stay empty.
+    auto gather = [&](const auto& from, auto& to) {
+        to.clear();
+        if (from.size() != nv) return;
+        to.reserve(used.size());
+        for (uint16_t v : used) to.push_back(from[v]);
+    };
+    std::vector<Vector3> verts, norms;
+    std::vector<Vector2> uvs;
+    gather(smd.vertices, verts);
+    gather(smd.normals, norms);
+    if (!smd.uvSets.empty()) gather(smd.uvSets[0], uvs);
+
+    nifly::BSGeometryMesh* mesh = geom->AddMesh();
+    *mesh = src;
+    BSGeometryMeshData& md = mesh->meshData;
+    // Create sets the protected vertex count along with the arrays, as PyniflyCreateShape
+    // does; scale, version and nWeightsPerVert come over with the copy.
+    md.Create(nif->GetHeader().GetVersion(), &verts, &lodTris,
+              uvs.empty() ? nullptr : &uvs, norms.empty() ? nullptr : &norms);
+    md.tris = lodTris;
+    md.uvSets.resize(smd.uvSets.size());
+    for (size_t s = 1; s < smd.uvSets.size(); s++) gather(smd.uvSets[s], md.uvSets[s]);
+    gather(smd.tangents, md.tangents);
+    gather(smd.tangentWs, md.tangentWs);
+    gather(smd.vColors, md.vColors);
+    gather(smd.skinWeights, md.skinWeights);
+
+    int slot = geom->MeshCount() - 1;
+    geom->SelectMesh((uint8_t)fromMesh);
+    return slot;
+}
+
 /* ----------------------------------------------------------------------------
    Starfield BSGeometry skinning (write side)
 
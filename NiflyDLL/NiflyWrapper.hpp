@@ -219,6 +219,7 @@ extern "C" NIFLY_API int setBSGeometryMeshName(void* theNif, void* theShape, int
 extern "C" NIFLY_API int setBSGeometryTangents(void* theNif, void* theShape, int whichMesh, nifly::Vector3* tangents, uint8_t* tangentWs, int count);
 extern "C" NIFLY_API int getBSGeometryColors(void* theNif, void* theShape, nifly::Color4* colors, int count);
 extern "C" NIFLY_API int setBSGeometryColors(void* theNif, void* theShape, int whichMesh, nifly::Color4* colors, int count);
+extern "C" NIFLY_API int addBSGeometryLODMesh(void* theNif, void* theShape, int fromMesh, nifly::Triangle* tris, int triCount);
 extern "C" NIFLY_API int skinBSGeometry(void* theNif, void* theShape, const char* boneNamesNL, int nBones, int weightsPerVertex);
 extern "C" NIFLY_API int setBSGeometryBoneBind(void* theNif, void* theShape, int boneIndex, const nifly::MatTransform& xf);
 extern "C" NIFLY_API int setBSGeometryVertWeights(void* theNif, void* theShape, int vertIndex, uint8_t* boneIndices, float* weights, int count);
@@ -11,6 +11,7 @@
 #include <string>
 #include <vector>
 #include <unordered_map>
+#include <set>
 #include <filesystem>
 #include <libloaderapi.h>
 #include <bitset>
@@ -1268,6 +1269,74 @@ namespace NiflyDLLTests
 			delete[] verts2; delete[] tris2;
 		}
 
+		TEST_METHOD(CreateStarfieldLODMesh)
+		{
+			/* UNIT TEST: add a LOD slot to a created BSGeometry from a subset of its triangles.
+			   The slot gets only the vertices those triangles use, renumbered, and saves as a
+			   .mesh of its own. */
+			std::filesystem::path meshfile = testRoot / "SF/body_skinned.mesh";
+			void* srcNif = load((testRoot / "SF/naked_f.nif").u8string().c_str());
+			void* srcShapes[5];
+			getShapes(srcNif, srcShapes, 5, 0);
+			std::ifstream in(meshfile, std::ios::binary);
+			std::string bytes((std::istreambuf_iterator<char>(in)),
+							   std::istreambuf_iterator<char>());
+			Assert::AreEqual(1, loadBSGeometryMeshData(srcNif, srcShapes[0], 0, bytes.data(), (int)bytes.size()));
+
+			Vector3* verts = new Vector3[60000];
+			Triangle* tris = new Triangle[120000];
+			Vector2* uv = new Vector2[60000];
+			Vector3* norms = new Vector3[60000];
+			int vcount = getVertsForShape(srcNif, srcShapes[0], verts, 60000 * 3, 0);
+			int tcount = getTriangles(srcNif, srcShapes[0], tris, 120000 * 3, 0);
+			getUVs(srcNif, srcShapes[0], uv, 60000 * 2, 0);
+			getNormalsForShape(srcNif, srcShapes[0], norms, 60000 * 3, 0);
+
+			void* newNif = createNif("SF", "NiNode", "Scene Root");
+			NiShapeBuf buf{};
+			buf.scale = 1.0f;
+			buf.rotation[0][0] = 1.0f; buf.rotation[1][1] = 1.0f; buf.rotation[2][2] = 1.0f;
+			buf.vertexCount = (uint32_t)vcount;
+			buf.triangleCount = (uint32_t)tcount;
+			buf.shaderPropertyID = NO_SHADER_REF;
+			void* geom = createNifShapeFromData(newNif, "TestBody", &buf,
+				verts, uv, norms, tris, nullptr);
+
+			// The first half of the triangles, as a stand-in for a decimated level.
+			int lodCount = tcount / 2;
+			std::set<uint16_t> lodVerts;
+			for (int i = 0; i < lodCount; i++) {
+				lodVerts.insert(tris[i].p1); lodVerts.insert(tris[i].p2); lodVerts.insert(tris[i].p3);
+			}
+			Assert::AreEqual(1, addBSGeometryLODMesh(newNif, geom, 0, tris, lodCount),
+				L"LOD went into slot 1");
+			Assert::AreEqual(2, getBSGeometryMeshCount(newNif, geom));
+			Triangle bad(0, 0, (uint16_t)vcount);
+			Assert::AreEqual(-1, addBSGeometryLODMesh(newNif, geom, 0, &bad, 1),
+				L"Out-of-range triangle rejected");
+
+			selectBSGeometryMesh(newNif, geom, 1);
+			Vector3* lverts = new Vector3[60000];
+			Triangle* ltris = new Triangle[120000];
+			int lv = getVertsForShape(newNif, geom, lverts, 60000 * 3, 0);
+			int lt = getTriangles(newNif, geom, ltris, 120000 * 3, 0);
+			Assert::AreEqual((int)lodVerts.size(), lv, L"LOD keeps only the vertices it uses");
+			Assert::AreEqual(lodCount, lt, L"LOD has the triangles it was given");
+			for (int i = 0; i < lt; i++) {
+				const Vector3& a = lverts[ltris[i].p1];
+				const Vector3& b = verts[tris[i].p1];
+				Assert::IsTrue(a.x == b.x && a.y == b.y && a.z == b.z,
+					L"Renumbered triangles reach the same positions");
+			}
+
+			Assert::AreEqual(1, setBSGeometryMeshName(newNif, geom, 1, "test\\testbody_l1"));
+			Assert::IsTrue(saveBSGeometryMeshData(newNif, geom, 1, nullptr, 0) > 0,
+				L"LOD slot serializes");
+
+			delete[] verts; delete[] tris; delete[] uv; delete[] norms;
+			delete[] lverts; delete[] ltris;
+		}
+
 		TEST_METHOD(CreateStarfieldSkin)
 		{
 			/* UNIT TEST: CREATE a skinned Starfield BSGeometry, save NIF + .mesh, reload, and
@@ -5,6 +5,7 @@ import os
 from enum import IntFlag
 import re
 import logging
+import numpy as np
 from mathutils import Matrix, Vector, Quaternion, Euler
 import bpy
 from math import pi, radians
@@ -648,17 +649,56 @@ def link_to_collection(coll, obj):
     coll.objects.link(obj)
 
 
+def mesh_from_arrays(name, verts, tris):
+    """Build a triangle mesh straight from vertex and triangle arrays.
+
+    Fills vertices, loops and polygons with foreach_set rather than going through
+    from_pydata's per-face lists. Returns (mesh, clean): clean is True when every
+    triangle has three distinct, in-range vertices and no two triangles share the
+    same three, in which case mesh.validate() has nothing to fix and can be skipped.
+    """
+    verts = np.asarray(verts, dtype=np.float32).reshape(-1, 3)
+    tris = np.asarray(tris, dtype=np.int32).reshape(-1, 3)
+    clean = bool(np.isfinite(verts).all())
+    if len(tris):
+        clean = clean and tris.min() >= 0 and tris.max() < len(verts) \
+            and not ((tris[:, 0] == tris[:, 1]) | (tris[:, 1] == tris[:, 2])
+                     | (tris[:, 0] == tris[:, 2])).any()
+        clean = clean and len(np.unique(np.sort(tris, axis=1), axis=0)) == len(tris)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(tris.size)
+    mesh.loops.foreach_set("vertex_index", tris.ravel())
+    mesh.polygons.add(len(tris))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, tris.size, 3, dtype=np.int32))
+    # Before Blender 4.0 polygon sizes are stored; after, they follow from loop_start.
+    if not bpy.types.MeshPolygon.bl_rna.properties['loop_total'].is_readonly:
+        mesh.polygons.foreach_set("loop_total", np.full(len(tris), 3, dtype=np.int32))
+    mesh.update(calc_edges=True, calc_edges_loose=True)
+    return mesh, clean
+
+
+def mesh_shade_smooth(the_mesh):
+    """Set smooth shading on every face in one call."""
+    if hasattr(the_mesh, "shade_smooth"):
+        # Blender 4.1+: smooth is the absence of the sharp_face attribute.
+        the_mesh.shade_smooth()
+    else:
+        the_mesh.polygons.foreach_set("use_smooth", np.ones(len(the_mesh.polygons), dtype=bool))
+
+
 def mesh_create_uv(the_mesh, uv_points):
     """ Create UV in Blender to match UVpoints from Nif
         uv_points = [(u, v)...] indexed by vertex index
         """
-    flat_uv = [0.0] * (len(the_mesh.loops) * 2)
-    for lp_idx, lp in enumerate(the_mesh.loops):
-        vert_targeted = lp.vertex_index
-        flat_uv[lp_idx * 2] = uv_points[vert_targeted][0]
-        flat_uv[lp_idx * 2 + 1] = 1 - uv_points[vert_targeted][1]
+    loop_verts = np.empty(len(the_mesh.loops), dtype=np.int32)
+    the_mesh.loops.foreach_get("vertex_index", loop_verts)
+    uv = np.asarray(uv_points, dtype=np.float64).reshape(-1, 2)[loop_verts]
+    uv[:, 1] = 1 - uv[:, 1]
     new_uvlayer = the_mesh.uv_layers.new(do_init=False)
-    new_uvlayer.data.foreach_set("uv", flat_uv)
+    new_uvlayer.data.foreach_set("uv", uv.astype(np.float32).ravel())
 
 
 def get_setting_from(name, objlist, default):
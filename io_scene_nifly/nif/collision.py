@@ -4,6 +4,7 @@
 
 import math
 import base64
+import numpy as np
 import bpy
 import bmesh
 from mathutils import Matrix, Vector, Quaternion, Euler, geometry
@@ -263,6 +264,7 @@ class CollisionHandler():
         self.nif = parent_handler.nif
         self.objs_written = None
         self.logger = logging.getLogger("pynifly")
+        self.settings = getattr(parent_handler, 'settings', None)
         # Shared cache so the same bhkPhysicsSystem block is only imported once
         if not hasattr(parent_handler, '_physics_system_cache'):
             parent_handler._physics_system_cache = {}
@@ -273,6 +275,28 @@ class CollisionHandler():
         self.logger.warning(msg)
 
 
+    def simplify_hull(self, name, verts, nfaces, convex_radius):
+        """
+        If the export asks for it, rebuild a convex hull (verts in Havok units) with as
+        few vertices as its convex radius allows. Returns (verts, faces), or None to
+        export the shape as it is.
+        """
+        if not getattr(self.settings, 'simplify_collision', False):
+            return None
+        from ..pyn.convex_hull import simplify_hull, hull_distance
+        try:
+            hv, hf = simplify_hull(verts, convex_radius=convex_radius)
+            if not hf:
+                return None
+            err = float(hull_distance(verts, hv, hf).max())
+        except Exception as e:
+            self.warn(f"Could not simplify collision hull {name}, exporting it as is: {e}")
+            return None
+        self.logger.info(f"Simplified collision hull {name}: {len(verts)} -> {len(hv)} verts, "
+                         f"{nfaces} -> {len(hf)} faces, max error {err:.4g}")
+        return hv, hf
+
+
     # ------- COLLISION IMPORT --------
 
     @property
@@ -574,19 +598,19 @@ class CollisionHandler():
 
         Returns the collision anchor object, or None if data is unavailable.
         """
-        from ..pyn.bhk_autounpack import parse_bytes, constraint_count
-
         ps = c.physics_system
         if ps is None:
             return None
 
-        # Cache parsed shapes so the packfile is only decoded once.
+        # Every collision object on this system shares one parsed packfile
+        # (ps.packfile caches it by content).  Keep its shapes by block id too,
+        # for the bulk-import bookkeeping below.
         if ps.id not in self._physics_system_cache:
-            raw = ps.data
-            if not raw:
+            if not ps.data:
                 return None
             try:
-                parsed = parse_bytes(raw)
+                pf = ps.packfile
+                parsed = pf.shapes
             except RuntimeError as e:
                 self.warn(f"bhkPhysicsSystem decode failed: {e}")
                 return None
@@ -595,7 +619,7 @@ class CollisionHandler():
             # Export gives each collision object a system of its own, so there
             # is nowhere to put one even if we read it -- say so rather than
             # quietly turning a hinged gib into loose parts.
-            nc = constraint_count(raw)
+            nc = pf.constraints
             if nc:
                 self.warn(f"Collision has {nc} physics constraint"
                           f"{'s' if nc > 1 else ''} (joints between bodies); "
@@ -1122,7 +1146,21 @@ class CollisionHandler():
                 Vector((0,0,0)), facevert, face.normal)
             n = Vector((face.normal[0], face.normal[1], face.normal[2], vintersect/sf))
             append_if_new(norms, n, 0.1)
-        
+
+        simple = self.simplify_hull(s.name, [tuple(v) for v in verts], len(bm.faces), p.bhkRadius)
+        if simple:
+            # Fresh planes for the fresh faces, same convention as above: w is the
+            # signed distance from the origin to the face.  Hull faces can have
+            # many corners, so the plane uses all of them.
+            from ..pyn.convex_hull import _polygon_plane
+            hv, hf = simple
+            verts = [Vector(v) for v in hv]
+            hp = np.asarray(hv, dtype=np.float64)
+            norms = []
+            for f in hf:
+                nx, ny, nz, d = _polygon_plane(hp, f)
+                norms.append(Vector((nx, ny, nz, -d)))
+
         cshape = self.nif.add_shape(p, vertices=verts, normals=norms)
 
         return cshape, Vector(), Quaternion()
@@ -1644,6 +1682,14 @@ class CollisionHandler():
                             radius = obj.rigid_body.collision_margin / sf
                         else:
                             radius = pyn_props.get_group(obj, 'pyn_fo4phys').collision_radius / sf
+                        if shape_type == 'polytope':
+                            # Polytopes are written with a fixed convex radius, whatever
+                            # the object asks for; that's the padding the hull really gets.
+                            from ..pyn.bhk_autopack import POLYTOPE_CONVEX_RADIUS
+                            simple = self.simplify_hull(
+                                obj.name, verts, len(faces), POLYTOPE_CONVEX_RADIUS)
+                            if simple:
+                                verts, faces = simple
                         shapes.append(CollisionShape(
                             shape_type=shape_type,
                             name=obj.name,
@@ -1667,13 +1713,22 @@ class CollisionHandler():
 
                 # pack_shapes requires compressed_mesh before polytope.
                 shapes.sort(key=lambda s: 0 if s.shape_type == 'compressed_mesh' else 1)
-                bhkPhysicsSystem.New(self.nif, shapes=shapes, parent=coll_node)
+                share = None
+                if getattr(self.settings, 'watertight_collision', False):
+                    from ..pyn.bhk_autopack import CM_SHARE_SEAMS
+                    share = CM_SHARE_SEAMS
+                bhkPhysicsSystem.New(self.nif, shapes=shapes, parent=coll_node,
+                                     share_min_sections=share)
             else:
                 # Legacy path: no pynCollisionShapeType tag — treat the whole
                 # mesh as a single convex polytope (pre-existing behaviour).
                 local_mat = node_inv @ self.export_xf @ coll.matrix_world
                 verts = [(*(local_mat @ v.co / sf),) for v in coll.data.vertices]
                 faces = [list(p.vertices) for p in coll.data.polygons]
+                from ..pyn.bhk_autopack import POLYTOPE_CONVEX_RADIUS
+                simple = self.simplify_hull(coll.name, verts, len(faces), POLYTOPE_CONVEX_RADIUS)
+                if simple:
+                    verts, faces = simple
                 bhkPhysicsSystem.New(self.nif, verts=verts, faces=faces, parent=coll_node)
 
             self.objs_written.add(ReprObject(coll, targnode))
@@ -5,8 +5,9 @@ Export Blender meshes to NIF files.
 import os
 from functools import lru_cache
 from contextlib import suppress
-from mathutils import Matrix, Vector, Euler, Color
+from mathutils import Matrix, Vector, Euler
 import codecs
+import numpy as np
 import logging
 import json
 from pathlib import Path
@@ -15,7 +16,7 @@ from bpy_extras.io_utils import ExportHelper
 from .. import __package__ as base_package
 from ..tri.trifile import TriFile
 from ..tri.tripfile import TripFile
-from ..pyn.niflytools import (NearEqual, MatNearEqual, mesh_split_by_uv, fo4FaceDict, 
+from ..pyn.niflytools import (NearEqual, MatNearEqual, mesh_split_by_uv, sort_within_rows, fo4FaceDict, 
                               truncate_filename)
 from ..pyn.nifdefs import (BSXFlagsValues, NiAVFlags, VertexFlags, NO_SHADER_REF)
 from .. import blender_defs as BD
@@ -38,7 +39,10 @@ from . import shader_io
 from . import controller 
 from . import collision 
 from . import connectpoint
-from ..pyn.triangulate import triangulate
+from ..pyn.triangulate import triangulate_polygons
+from ..pyn import vertex_cache
+from ..pyn import mesh_lod
+from ..pyn.morph_prune import prune_morphs
 
 log = logging.getLogger("pynifly")
 
@@ -77,18 +81,36 @@ def check_partitions(vi1, vi2, vi3, weights):
     return len(p1.intersection(p2, p3)) > 0
 
 
-def trim_weights(weights, arma, max_weights=4):
-    """ Trim to the `max_weights` heaviest weights in the armature (4 for Skyrim/FO4; Starfield
-        allows more per vertex -- see extract_mesh_data).
-        weights = [(group_name: weight), ...] """
+def trim_weights(nverts, vert_index, group_index, group_weight, group_names, arma,
+                 max_weights=4):
+    """ Build per-vertex weight dicts, keeping only the `max_weights` heaviest weights in
+        the armature (4 for Skyrim/FO4; Starfield allows more per vertex -- see
+        extract_mesh_data). Groups that aren't bones, such as partitions, are all kept.
+        vert_index, group_index, group_weight = one entry per vertex group membership,
+            in the vertex's group order
+        group_names = [group-name, ...] indexed by group_index
+        Returns [{group-name: weight}, ...] 1:1 with verts. Bones come first, heaviest
+        first, then the other groups in their original order.
+        """
+    weights = [{} for _ in range(nverts)]
+    if not vert_index:
+        return weights
+    verts = np.asarray(vert_index, dtype=np.int64)
+    groups = np.asarray(group_index, dtype=np.int64)
+    wts = np.asarray(group_weight, dtype=np.float64)
+    pos = np.arange(len(verts))
+
+    keep = pos
     if arma:
-        lst = filter(lambda p: p[0] in arma.data.bones, weights)
-        notlst = filter(lambda p: p[0] not in arma.data.bones, weights)
-        sd = sorted(lst, reverse=True, key=lambda item: item[1])[0:max_weights]
-        sd.extend(notlst)
-        return dict(sd)
-    else:
-        return dict(weights)
+        is_bone = np.array([n in arma.data.bones for n in group_names], dtype=bool)[groups]
+        # Sort each vertex's bones heaviest first (ties in original order), then its
+        # other groups in original order; keep the first max_weights bones.
+        order, rank = sort_within_rows(verts, ~is_bone, np.where(is_bone, -wts, 0.0))
+        keep = order[~is_bone[order] | (rank < max_weights)]
+
+    for v, g, w in zip(verts[keep].tolist(), groups[keep].tolist(), wts[keep].tolist()):
+        weights[v][group_names[g]] = w
+    return weights
 
 
 def has_uniform_scale(obj):
@@ -96,40 +118,59 @@ def has_uniform_scale(obj):
     return NearEqual(obj.scale[0], obj.scale[1]) and NearEqual(obj.scale[1], obj.scale[2])
 
 
+def foreach_array(collection, attr, width, dtype=np.float32):
+    """Read attr for every element of a bpy collection in one call, as an (n, width) array."""
+    arr = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    return arr.reshape(-1, width) if width > 1 else arr
+
+
+def as_tuples(arr):
+    """Rows of a 2D array as a list of tuples, the form the exporter passes around."""
+    return list(map(tuple, arr.tolist()))
+
+
 def extract_vert_info(obj, mesh, arma, target_key='', scale_factor=1.0, max_weights=4):
     """Returns 3 lists of equal length with one entry each for each vertex
     *   verts = [(x, y, z)... ] - base or as modified by target-key if provided
     *   weights = [{group-name: weight}... ] - 1:1 with verts list
     *   dict = {shape-key: [verts...], ...} - verts list for each shape which is valid for export.
             shape-key is the blender name.
+
+    Locations and shape keys are read in bulk and computed as arrays.
         """
-    weights = []
     morphdict = {}
     msk = mesh.shape_keys
     error_groups = set()
 
-    sf = Vector((1,1,1))
+    sf = np.ones(3, dtype=np.float32)
     if not has_uniform_scale(obj):
         # Apply non-uniform scale to verts directly
-        sf = obj.scale
+        sf = np.array(obj.scale, dtype=np.float32)
 
     if target_key != '' and msk and target_key in msk.key_blocks.keys():
-        verts = [(v.co * sf / scale_factor)[:] for v in msk.key_blocks[target_key].data]
+        co = foreach_array(msk.key_blocks[target_key].data, "co", 3)
     else:
-        verts = [(v.co * sf / scale_factor)[:] for v in mesh.vertices]
+        co = foreach_array(mesh.vertices, "co", 3)
+    verts = as_tuples(co * sf / np.float32(scale_factor))
 
-    for i, v in enumerate(mesh.vertices):
-        vert_weights = []
+    # Vertex group weights have no bulk accessor, so walk the verts, collecting
+    # memberships as flat lists; trim_weights does the rest as arrays.
+    group_names = [vg.name for vg in obj.vertex_groups]
+    vert_index, group_index, group_weight = [], [], []
+    for v in mesh.vertices:
         for vg in v.groups:
-            try:
-                vgn = obj.vertex_groups[vg.group].name
-                vert_weights.append([vgn, vg.weight])
-            except:
+            if vg.group < len(group_names):
+                vert_index.append(v.index)
+                group_index.append(vg.group)
+                group_weight.append(vg.weight)
+            else:
                 if vg.group not in error_groups:
                     log.error(f"Object {obj.name} vertex #{v.index} (and possibly others) references invalid group #{vg.group}")
                 error_groups.add(vg.group)
         
-        weights.append(trim_weights(vert_weights, arma, max_weights))
+    weights = trim_weights(len(mesh.vertices), vert_index, group_index, group_weight,
+                           group_names, arma, max_weights)
     
     if msk: 
         # We return shape key locations for all interesting shape keys.
@@ -138,11 +179,11 @@ def extract_vert_info(obj, mesh, arma, target_key='', scale_factor=1.0, max_weig
         # adjust.
         if target_key == '': target_key = 0
 
+        keyco = {sk.name: foreach_array(sk.data, "co", 3) for sk in msk.key_blocks}
+        targco = keyco[msk.key_blocks[target_key].name]
         for sk in msk.key_blocks:    
-            morphdict[sk.name] = [
-                ((vkey.co + (vtarg.co - vbase.co))*sf)[:] 
-                for vkey, vtarg, vbase 
-                in zip(sk.data, msk.key_blocks[target_key].data, sk.relative_key.data)]
+            morphdict[sk.name] = as_tuples(
+                (keyco[sk.name] + (targco - keyco[sk.relative_key.name])) * sf)
 
     return verts, weights, morphdict
 
@@ -344,6 +385,102 @@ def sort_tris_by_lod(obj, tris, partition_map):
     return tris_sorted, pmap_sorted, lod_sizes
 
 
+LOD_SHAPE_TYPES = ('BSLODTriShape', 'BSMeshLODTriShape')
+
+
+def parse_lod_ratios(text, levels=2):
+    """Parse the lod_ratios setting into `levels` fractions, coarsest first.
+
+    Missing levels repeat the finest ratio given. Returns None, with a warning,
+    if the text isn't a list of numbers.
+    """
+    try:
+        ratios = sorted(min(max(float(r), 0.0), 1.0) for r in text.split(',') if r.strip())
+    except ValueError:
+        log.warning(f"Ignoring LOD ratios, not a list of numbers: '{text}'")
+        return None
+    if not ratios:
+        return None
+    return (ratios + ratios[-1:] * levels)[:levels]
+
+
+def piece_lod_sizes(obj, verts, tris, partition_map, ratios):
+    """Sort triangles into LOD levels by dropping pieces, for a shape without LOD groups.
+
+    LOD levels are nested prefixes of the triangle list, so a coarse level can
+    only leave triangles out, never draw simpler ones instead. Small disconnected
+    pieces go first; the mesh itself is never simplified, and a single connected
+    mesh stays whole at LOD0. Returns (tris, partition_map, lod_sizes) like
+    sort_tris_by_lod.
+    """
+    levels = mesh_lod.nested_lod_levels(verts, tris, ratios, groups=partition_map or None)
+    order = sorted(range(len(tris)), key=lambda i: levels[i])
+    tris = [tris[i] for i in order]
+    if partition_map:
+        partition_map = [partition_map[i] for i in order]
+    lod_sizes = [levels.count(level) for level in range(3)]
+    log.info(f"Generated LODs for {obj.name}: {lod_sizes[0]}/{lod_sizes[1]}/{lod_sizes[2]} triangles")
+    return tris, partition_map, lod_sizes
+
+
+def optimize_vertex_cache(obj, verts, norms, uvs, colors, tris, weights_by_vert,
+                          morphdict, partition_map, lod_sizes):
+    """Reorder tris for the post-transform vertex cache and verts for fetch order.
+
+    Tris are only reordered within their LOD range and partition, so the ranges
+    sort_tris_by_lod made and the partition_map stay valid. Every per-vertex list
+    (and each morph in morphdict) is permuted to the new vertex order.
+
+    Returns (verts, norms, uvs, colors, tris, weights_by_vert, morphdict, partition_map).
+    """
+    groups = [0] * len(tris)
+    if lod_sizes is not None:
+        start = 0
+        for level, size in enumerate(lod_sizes):
+            groups[start:start+size] = [level] * size
+            start += size
+    if partition_map:
+        groups = list(zip(groups, partition_map))
+
+    tri_order, vert_order = vertex_cache.optimize(tris, len(verts), groups)
+    new_index = [0] * len(verts)
+    for new, old in enumerate(vert_order):
+        new_index[old] = new
+    new_tris = [tuple(new_index[v] for v in tris[t]) for t in tri_order]
+    log.info(f"{obj.name}: vertex cache ACMR {vertex_cache.acmr(tris):.3f} "
+             f"-> {vertex_cache.acmr(new_tris):.3f}")
+
+    def permute(values):
+        return [values[v] for v in vert_order]
+
+    return (permute(verts), permute(norms), permute(uvs),
+            permute(colors) if colors else colors,
+            new_tris,
+            permute(weights_by_vert),
+            {k: permute(mv) for k, mv in morphdict.items()},
+            [partition_map[t] for t in tri_order] if partition_map else partition_map)
+
+
+def prune_tri_morphs(label, base, morphdict, names, epsilon, rename=None, keep_empty=False):
+    """Positions to write to one .tri file for the shape keys in names, keyed by tri name.
+
+    Vertex offsets no bigger than epsilon are snapped back to the base, and morphs
+    whose tri name is already taken are dropped. So are morphs left with nothing to
+    move, unless keep_empty.
+    """
+    pruned, stats = prune_morphs(base, {m: morphdict[m] for m in sorted(names) if m in morphdict},
+                                 epsilon, rename=rename, keep_empty=keep_empty)
+    # TRI morphs are dense: a dropped morph saves its name, scale and an int16
+    # offset per vertex; a dropped vertex offset saves nothing but noise.
+    stats.report(label, 0, lambda n: 9 + len(n.encode('utf-8')) + 6 * len(base))
+    morphs = {}
+    for name, (moved, deltas) in pruned.items():
+        positions = base.copy()
+        positions[moved] += deltas
+        morphs[name] = positions
+    return morphs
+
+
 def get_loop_color(mesh, loopindex, cm, am):
     """ Return the color of the vertex-in-loop at given loop index using
         cm = color map to use
@@ -904,7 +1041,8 @@ class NifExporter:
         if obj.type != 'MESH' or obj.data.shape_keys is None:
             return
         from ..sfmorph.export_sfmorph import write_sf_morphs
-        wrote = write_sf_morphs(obj, self.nif.filepath, morphdict=morphdict)
+        wrote = write_sf_morphs(obj, self.nif.filepath, morphdict=morphdict,
+                                epsilon=self.settings.morph_epsilon)
         for w in wrote:
             log.info(f"Wrote Starfield morph: {w}")
 
@@ -943,32 +1081,37 @@ class NifExporter:
             log.warning(f"Found both expression morphs and BS tri morphs in shape {obj.name}. May be an error.")
             result = {'WARNING'}
 
+        # Both tri files share the base mesh; TriFile.write works on arrays.
+        if expression_morphs or chargen_morphs:
+            base_verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+            base_tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+            base_uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+
+        epsilon = self.settings.morph_epsilon
         if len(expression_morphs) > 0:
             tri = TriFile()
-            tri.vertices = verts
-            tri.faces = tris
-            tri.uv_pos = uvs
-            tri.face_uvs = tris # (because 1:1 with verts)
-            for m in expression_morphs:
-                if m in self.nif.dict.morph_dic_game:
-                    triname = self.nif.dict.morph_dic_game[m]
-                else:
-                    triname = m
-                if m in morphdict:
-                    tri.morphs[triname] = morphdict[m]
+            tri.vertices = base_verts
+            tri.faces = base_tris
+            tri.uv_pos = base_uvs
+            tri.face_uvs = base_tris # (because 1:1 with verts)
+            # The game asks for expressions by name, so a still one (a neutral mood)
+            # stays even when it moves nothing.
+            game_names = self.nif.dict.morph_dic_game
+            tri.morphs.update(prune_tri_morphs(
+                fname_tri, base_verts, morphdict, expression_morphs, epsilon,
+                rename=lambda m: game_names.get(m, m), keep_empty=True))
     
             log.info(f"Generating tri file '{fname_tri}'")
             tri.write(fname_tri) # Only expression morphs to write at this point
 
         if len(chargen_morphs) > 0:
             tri = TriFile()
-            tri.vertices = verts
-            tri.faces = tris
-            tri.uv_pos = uvs
-            tri.face_uvs = tris # (because 1:1 with verts)
-            for m in chargen_morphs:
-                if m in morphdict:
-                    tri.morphs[m] = morphdict[m]
+            tri.vertices = base_verts
+            tri.faces = base_tris
+            tri.uv_pos = base_uvs
+            tri.face_uvs = base_tris # (because 1:1 with verts)
+            tri.morphs.update(prune_tri_morphs(
+                fname_chargen, base_verts, morphdict, chargen_morphs, epsilon))
     
             log.info(f"Generating tri file '{fname_chargen}'")
             tri.write(fname_chargen, chargen_morphs)
@@ -1297,21 +1440,11 @@ class NifExporter:
             partition_map = [n, ...] list of partition IDs, 1:1 with tris 
 
         """
-        loops = []
-        uvs = []
-        orig_uvs = []
-        norms = []
-        colors = []
-        partition_map = []
-
         # Calculating normals messes up the passed-in UV, so get the data out of it first.
         # Read the UVs in bulk: a UV layer is a generic mesh attribute, and indexing it
         # per-element is pathologically slow -- on a 127K-loop body that loop cost 122s
-        # against 0.05s for foreach_get. (Per-element access on vertices/loops is fine;
-        # it's the attribute layer that's slow.) orig_uvs is indexed by loop index.
-        uvflat = [0.0] * (len(mesh.loops) * 2)
-        uvlayer.foreach_get("uv", uvflat)
-        orig_uvs = [(uvflat[i*2], uvflat[i*2+1]) for i in range(len(mesh.loops))]
+        # against 0.05s for foreach_get. Everything else here is read in bulk too.
+        orig_uvs = foreach_array(uvlayer, "uv", 2)
 
         # CANNOT figure out how to get the loop normals correctly.  They seem to follow the
         # face normals even on smooth shading.  (TEST_NORMAL_SEAM tests for this.) So use the
@@ -1327,49 +1460,82 @@ class NifExporter:
             # Blender 3.0+ has normals in the vertices, so no need to calculate them
             mesh.calc_normals()
 
-        def write_loop_vert(loopseg):
-            """ Write one vert, given as a MeshLoop 
-            """
-            loops.append(loopseg.vertex_index)
-            uvs.append(orig_uvs[loopseg.index])
-            if loopcolors:
-                colors.append(loopcolors[loopseg.index])
-            if use_loop_normals:
-                norms.append(loopseg.normal[:])
-            else:
-                norms.append(mesh.vertices[loopseg.vertex_index].normal[:])
-
-        # Write out the loops as triangles, and partitions to match
-        have_partitions = True
-        partition_err = False
-        for f in mesh.polygons:
-            if f.loop_total < 3:
-                log.warning(f"Degenerate polygon on {mesh.name} with {f.loop_total} verts")
-            else:
-                if obj_partitions and len(obj_partitions) > 0:
-                    loop_partition = self.get_loop_partitions(f, mesh.loops, weights)
-                    if not loop_partition: partition_err = True
-                face_loops = [mesh.loops[f.loop_start + j] for j in range(f.loop_total)]
-                coords = [mesh.vertices[lp.vertex_index].co[:] for lp in face_loops]
-                for i, j, k in triangulate(coords):
-                    write_loop_vert(face_loops[i])
-                    write_loop_vert(face_loops[j])
-                    write_loop_vert(face_loops[k])
-                    if obj_partitions and len(obj_partitions) > 0:
-                        if loop_partition:
-                            partition_map.append(obj_partitions[loop_partition].id)
-                        else:
-                            have_partitions = False
-                            partition_map.append(next(iter(obj_partitions.values())).id)
-
-        if not have_partitions:
-            log.warning(f"Wrote faces without partitions on {mesh}")
-        if partition_err:
-            log.warning("Some faces are in multiple partitions, or no partition")
+        # Triangulate every polygon in one call. Triangles come back as loop indices,
+        # in polygon order.
+        looptotal = foreach_array(mesh.polygons, "loop_total", 1, np.int32)
+        for fi in np.flatnonzero(looptotal < 3).tolist():
+            log.warning(f"Degenerate polygon on {mesh.name} with {looptotal[fi]} verts")
+        vertco = foreach_array(mesh.vertices, "co", 3)
+        loopverts = foreach_array(mesh.loops, "vertex_index", 1, np.int32)
+        loopstart = foreach_array(mesh.polygons, "loop_start", 1, np.int32)
+        tri_loops, tri_faces = triangulate_polygons(vertco, loopverts, loopstart, looptotal)
+
+        # Gather the per-loop data for every triangle corner at once.
+        corners = tri_loops.ravel()
+        loops = loopverts[corners].tolist()
+        uvs = orig_uvs[corners]
+        if use_loop_normals:
+            norms = foreach_array(mesh.loops, "normal", 3)[corners]
+        else:
+            norms = foreach_array(mesh.vertices, "normal", 3)[loopverts[corners]]
+        colors = []
+        if loopcolors is not None and len(loopcolors) > 0:
+            colors = as_tuples(loopcolors[corners])
+
+        partition_map = []
+        if obj_partitions and len(obj_partitions) > 0:
+            # Check every polygon that isn't degenerate; each warning below has its own test.
+            face_partition = self.face_partitions(
+                mesh, weights, loopverts, loopstart, looptotal, np.flatnonzero(looptotal >= 3))
+            partition_err = not all(face_partition.values())
+            default_id = next(iter(obj_partitions.values())).id
+            have_partitions = True
+            partition_map = []
+            for fi in tri_faces.tolist():
+                if face_partition[fi]:
+                    partition_map.append(obj_partitions[face_partition[fi]].id)
+                else:
+                    have_partitions = False
+                    partition_map.append(default_id)
+            if not have_partitions:
+                log.warning(f"Wrote faces without partitions on {mesh}")
+            if partition_err:
+                log.warning("Some faces are in multiple partitions, or no partition")
 
         return loops, uvs, norms, colors, partition_map
 
 
+    def face_partitions(self, mesh, weights, loopverts, loopstart, looptotal, faces):
+        """Return {face index: partition name, or None} for the given faces.
+
+        Faces whose verts all carry the same single partition are settled as arrays.
+        The rest go through get_loop_partitions, which reports and tags them.
+        """
+        # Number each distinct set of partitions a vert belongs to.
+        set_ids = {}
+        vert_set = np.array(
+            [set_ids.setdefault(frozenset(k for k in w if is_partition(k)), len(set_ids))
+             for w in weights], dtype=np.int64)
+        sets = list(set_ids)
+
+        total = looptotal[faces]
+        face_of_corner = np.repeat(np.arange(len(faces)), total)
+        offsets = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        corner_set = vert_set[loopverts[np.repeat(loopstart[faces], total) + offsets]]
+        lo = np.full(len(faces), len(sets), dtype=np.int64)
+        hi = np.full(len(faces), -1, dtype=np.int64)
+        np.minimum.at(lo, face_of_corner, corner_set)
+        np.maximum.at(hi, face_of_corner, corner_set)
+
+        result = {}
+        for fi, a, b in zip(faces.tolist(), lo.tolist(), hi.tolist()):
+            if a == b and len(sets[a]) == 1:
+                result[fi] = next(iter(sets[a]))
+            else:
+                result[fi] = self.get_loop_partitions(mesh.polygons[fi], mesh.loops, weights)
+        return result
+
+
     def find_colormaps(self, mesh):
         """
         Find the color maps for the given mesh. Use the VERTEX_ALPHA color map for alpha
@@ -1417,33 +1583,27 @@ class NifExporter:
         colormap, alphamap = self.find_colormaps(mesh)
         if colormap == None and alphamap == None: return
 
-        loopcolors = None
-        if colormap:
-            mapping_scheme = BD.color_mapping(colormap)
-
-            loopcolors = [(0.0, 0.0, 0.0, 0.0)] * len(mesh.loops)
+        def loop_colors(cmap):
+            """The map's colors 1:1 with loops, or None for an unknown mapping."""
+            mapping_scheme = BD.color_mapping(cmap)
             if mapping_scheme == "CORNER":
-                for i, c in enumerate(colormap.data):
-                    loopcolors[i] = c.color[:]
-                    
+                return foreach_array(cmap.data, "color", 4)
             elif mapping_scheme == "POINT":
-                for i, loop in enumerate(mesh.loops):
-                    loopcolors[i] = colormap.data[loop.vertex_index].color[:]
+                return foreach_array(cmap.data, "color", 4)[
+                    foreach_array(mesh.loops, "vertex_index", 1, np.int32)]
+            return None
 
-        if alphamap:
-            mapping_scheme = BD.color_mapping(alphamap)
+        loopcolors = np.zeros((len(mesh.loops), 4))
+        if colormap:
+            c = loop_colors(colormap)
+            if c is not None:
+                loopcolors[:] = c
 
-            if loopcolors == None: loopcolors = [(0.0, 0.0, 0.0, 0.0)] * len(mesh.loops)
-            if mapping_scheme == "CORNER":
-                for i, alph in enumerate(alphamap.data):
-                    c = loopcolors[i]
-                    a = alph.color[0:3]
-                    loopcolors[i] = (c[0], c[1], c[2], (a[0] + a[1] + a[2])/3)
-            elif mapping_scheme == 'POINT':
-                for i, loop in enumerate(mesh.loops):
-                    c = loopcolors[i]
-                    a = Color(alphamap.data[loop.vertex_index].color[0:3])
-                    loopcolors[i] = (c[0], c[1], c[2], (a[0] + a[1] + a[2])/3)
+        if alphamap:
+            a = loop_colors(alphamap)
+            if a is not None:
+                a = a.astype(np.float64)
+                loopcolors[:, 3] = (a[:, 0] + a[:, 1] + a[:, 2])/3
 
         return loopcolors
 
@@ -1527,25 +1687,30 @@ class NifExporter:
     
         mesh_split_by_uv(verts, loops, norms, uvs, weights_by_vert, morphdict)
 
-        # Make uv and norm lists 1:1 with verts (rather than with loops)
-        uvmap_new = [(0.0, 0.0)] * len(verts)
-        norms_new = [(0.0, 0.0, 0.0)] * len(verts)
-        for i, vi in enumerate(loops):
-            assert vi < len(verts), f"Error: Invalid vert index in loops: {vi} >= {len(verts)}"
-            uvmap_new[vi] = uvs[i]
-            norms_new[vi] = norms[i]
+        # Make uv and norm lists 1:1 with verts (rather than with loops). Where loops
+        # disagree, the last loop using the vert wins.
+        loop_arr = np.asarray(loops, dtype=np.int64)
+        assert len(loop_arr) == 0 or loop_arr.max() < len(verts), \
+            f"Error: Invalid vert index in loops: {loop_arr.max()} >= {len(verts)}"
+        _, from_end = np.unique(loop_arr[::-1], return_index=True)
+        last_loop = len(loop_arr) - 1 - from_end
+        used = loop_arr[last_loop]
+
+        def per_vert(loopvals, width):
+            arr = np.zeros((len(verts), width))
+            arr[used] = np.asarray(loopvals).reshape(-1, width)[last_loop]
+            return as_tuples(arr)
+
+        uvmap_new = per_vert(uvs, 2)
+        norms_new = per_vert(norms, 3)
     
         ## Our "loops" list matches 1:1 with the mesh's loops. So we can use the polygons
         ## to pull the loops
-        tris = []
-        for i in range(0, len(loops), 3):
-            tris.append((loops[i], loops[i+1], loops[i+2]))
+        tris = list(zip(loops[0::3], loops[1::3], loops[2::3]))
     
         colors_new = None
         if len(loopcolors) > 0:
-            colors_new = [(0.0, 0.0, 0.0, 0.0)] * len(verts)
-            for i, lp in enumerate(loops):
-                colors_new[lp] = loopcolors[i]
+            colors_new = per_vert(loopcolors, 4)
         
         obj.active_shape_key_index = saved_sk
 
@@ -1817,7 +1982,7 @@ class NifExporter:
         new_shape.transform = BD.make_transformbuf(new_xform)
         new_shape.set_global_to_skin(BD.make_transformbuf(skin_xf.inverted()))
     
-        weights_by_bone = pynifly.get_weights_by_bone(weights_by_vert, arma.data.bones.keys())
+        weights_by_bone = pynifly.get_weight_arrays_by_bone(weights_by_vert, arma.data.bones.keys())
 
         for bone_name in  weights_by_bone.keys():
             self.write_bone(new_shape, arma, bone_name, weights_by_bone.keys())
@@ -1845,7 +2010,7 @@ class NifExporter:
                 new_shape.set_skin_to_bone_xform(nifname, tb)
 
             self.writtenbones[bone_name] = nifname
-            new_shape.setShapeWeights(nifname, bone_weights)
+            new_shape.setShapeWeights(nifname, *bone_weights)
 
 
     def apply_shape_key(self, key_name):
@@ -1964,6 +2129,21 @@ class NifExporter:
 
             # Sort triangles by LOD level if LOD vertex groups exist
             tris, partition_map, lod_sizes = sort_tris_by_lod(obj, tris, partition_map)
+            if (lod_sizes is None and self.settings.drop_lod_pieces
+                    and obj.get('pynBlockName') in LOD_SHAPE_TYPES):
+                ratios = parse_lod_ratios(self.settings.lod_ratios)
+                if ratios:
+                    tris, partition_map, lod_sizes = piece_lod_sizes(
+                        obj, verts, tris, partition_map, ratios)
+                    if not any(lod_sizes[1:]):
+                        self.warn(f"{obj.name} has no small pieces to drop; every "
+                                  f"triangle is drawn at every LOD level")
+
+            if self.settings.optimize_vertex_cache:
+                verts, norms_new, uvmap_new, colors_new, tris, weights_by_vert, morphdict, \
+                    partition_map = optimize_vertex_cache(
+                        obj, verts, norms_new, uvmap_new, colors_new, tris, weights_by_vert,
+                        morphdict, partition_map, lod_sizes)
 
             # Compute the shape transform up front so we can optionally recenter
             # FO4 half-precision verts before the shape geometry is created. This
@@ -2068,6 +2248,12 @@ class NifExporter:
                 sf_geometry.export_sf_shape(
                     self, obj, new_shape, verts, uvmap_nif, norms_exp, tris,
                     colors_new, weights_by_vert, arma if is_skinned else None, new_xform)
+                if self.settings.decimate_lods:
+                    ratios = parse_lod_ratios(self.settings.lod_ratios, 3)
+                    if ratios:
+                        sf_geometry.export_sf_lods(
+                            self, obj, new_shape, verts, tris,
+                            weights_by_vert if is_skinned else None, morphdict, ratios)
                 # A skinned BSGeometry keeps an IDENTITY transform: the skin-to-bone binds are
                 # computed relative to new_xform (see _export_sf_skin) and already place every
                 # vertex, so writing new_xform onto the shape too would double-apply it and the
@@ -2514,6 +2700,51 @@ class ExportNIF(bpy.types.Operator, ExportHelper):
                     "clearing removes it. FO4 only",
         default=ExportSettings.__dataclass_fields__["export_full_precision"].default) # type: ignore
 
+    simplify_collision: bpy.props.BoolProperty(
+        name="Simplify collision hulls",
+        description="Rebuild convex collision hulls with as few vertices as their "
+                    "convex radius allows (at most 255)",
+        default=ExportSettings.__dataclass_fields__["simplify_collision"].default) # type: ignore
+
+    watertight_collision: bpy.props.BoolProperty(
+        name="Watertight collision seams",
+        description="Share FO4 collision mesh vertices between the sections that use "
+                    "them so seams close exactly. Makes the collision data larger",
+        default=ExportSettings.__dataclass_fields__["watertight_collision"].default) # type: ignore
+
+    optimize_vertex_cache: bpy.props.BoolProperty(
+        name="Optimize vertex order",
+        description="Reorder triangles and vertices for the GPU vertex cache. "
+                    "Vertex indices will no longer match Blender's",
+        default=ExportSettings.__dataclass_fields__["optimize_vertex_cache"].default) # type: ignore
+
+    drop_lod_pieces: bpy.props.BoolProperty(
+        name="LODs by dropping pieces",
+        description="Fill in LOD levels for LOD shapes that have no LOD0/LOD1 "
+                    "vertex groups by leaving small disconnected pieces out of the "
+                    "coarse levels. Meshes are not simplified, so a single connected "
+                    "mesh gets no coarser levels",
+        default=ExportSettings.__dataclass_fields__["drop_lod_pieces"].default) # type: ignore
+
+    lod_ratios: bpy.props.StringProperty(
+        name="LOD ratios",
+        description="Fraction of triangles kept at each coarser LOD level, comma-separated",
+        default=ExportSettings.__dataclass_fields__["lod_ratios"].default) # type: ignore
+
+    decimate_lods: bpy.props.BoolProperty(
+        name="Generate Starfield LODs",
+        description="Simplify each Starfield shape to the LOD ratios and write the "
+                    "results into its LOD mesh slots. Shapes with hand-made LOD "
+                    "meshes are left alone",
+        default=ExportSettings.__dataclass_fields__["decimate_lods"].default) # type: ignore
+
+    morph_epsilon: bpy.props.FloatProperty(
+        name="Morph threshold",
+        description="Vertex offsets no bigger than this are left out of exported "
+                    "morphs (.tri, morph.dat); morphs left empty are dropped",
+        min=0.0, precision=6,
+        default=ExportSettings.__dataclass_fields__["morph_epsilon"].default) # type: ignore
+
     chargen_ext: bpy.props.StringProperty(
         name="Chargen extension",
         description="Extension to use for chargen files (not including file extension).",
@@ -2663,6 +2894,13 @@ class ExportNIF(bpy.types.Operator, ExportHelper):
         self.export_full_precision = sticky.get('export_full_precision', self.export_full_precision)
         self.write_sf_materials = sticky.get('write_sf_materials', self.write_sf_materials)
         self.write_tris = sticky.get('write_tris', self.write_tris)
+        self.simplify_collision = sticky.get('simplify_collision', self.simplify_collision)
+        self.watertight_collision = sticky.get('watertight_collision', self.watertight_collision)
+        self.optimize_vertex_cache = sticky.get('optimize_vertex_cache', self.optimize_vertex_cache)
+        self.drop_lod_pieces = sticky.get('drop_lod_pieces', self.drop_lod_pieces)
+        self.lod_ratios = sticky.get('lod_ratios', self.lod_ratios)
+        self.decimate_lods = sticky.get('decimate_lods', self.decimate_lods)
+        self.morph_epsilon = sticky.get('morph_epsilon', self.morph_epsilon)
 
 
     def __str__(self):
@@ -2678,6 +2916,13 @@ class ExportNIF(bpy.types.Operator, ExportHelper):
                 f"export_animations={self.export_animations}, "
                 f"export_colors={self.export_colors}, "
                 f"export_full_precision={self.export_full_precision}, "
+                f"simplify_collision={self.simplify_collision}, "
+                f"watertight_collision={self.watertight_collision}, "
+                f"optimize_vertex_cache={self.optimize_vertex_cache}, "
+                f"drop_lod_pieces={self.drop_lod_pieces}, "
+                f"lod_ratios='{self.lod_ratios}', "
+                f"decimate_lods={self.decimate_lods}, "
+                f"morph_epsilon={self.morph_epsilon}, "
                 f"chargen_ext='{self.chargen_ext}', "
                 f"intuit_defaults={self.intuit_defaults})")
     
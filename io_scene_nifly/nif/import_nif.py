@@ -8,8 +8,10 @@ from mathutils import Matrix, Vector, Euler, Color
 from math import pi
 import codecs
 import logging
+import time
 import json
 from pathlib import Path
+import numpy as np
 import bpy
 from bpy.props import CollectionProperty, StringProperty
 from bpy_extras.io_utils import ImportHelper
@@ -154,29 +156,31 @@ def filter_duplicate_tris(tris, shape_name):
     on its own, without a map, which silently shifted partition assignment on
     any shape that had duplicates.
 
-    Returns (kept triangles, tri_map, dropped count). Callers aggregate the
-    counts into one message per import -- vanilla assets hit this often enough
-    that a warning per shape is just noise.
+    Returns (kept triangles as an (n, 3) array, tri_map, dropped count).
+    Callers aggregate the counts into one message per import -- vanilla assets
+    hit this often enough that a warning per shape is just noise.
     """
-    if not tris:
-        return tris, [], 0
-
-    kept = []
-    tri_map = []
-    seen = set()
-    duplicate = 0
-    for i, t in enumerate(tris):
-        key = frozenset(t)
-        if key in seen:
-            duplicate += 1
-            continue
-        seen.add(key)
-        kept.append(t)
-        tri_map.append(i)
+    if len(tris) == 0:
+        return np.zeros((0, 3), dtype=np.int64), [], 0
+
+    # Key each triangle by its set of vertices: sorted, and with a repeated index
+    # (a degenerate triangle) canonicalized so (a,a,b) and (a,b,b) match, as sets do.
+    tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+    key = np.sort(tris, axis=1)
+    repeat = key[:, 0] == key[:, 1]
+    key[repeat, 1] = key[repeat, 2]
+    span = int(key.max()) + 1 if len(key) else 1
+    if span < 2**21:
+        _, first = np.unique((key[:, 0] * span + key[:, 1]) * span + key[:, 2],
+                             return_index=True)
+    else:
+        _, first = np.unique(key, axis=0, return_index=True)
+    tri_map = np.sort(first)
+    duplicate = len(tris) - len(tri_map)
 
     if duplicate:
         log.debug(f"{shape_name}: dropped {duplicate} duplicate triangle(s)")
-    return kept, tri_map, duplicate
+    return tris[tri_map], tri_map.tolist(), duplicate
 
 
 def mesh_create_normals(the_mesh, normals):
@@ -185,12 +189,46 @@ def mesh_create_normals(the_mesh, normals):
         normals = [(x, y, z)... ] 1:1 with mesh verts
     """
     if normals:
-        # Make sure the normals are unit length
+        # Make sure the normals are unit length. Zero-length normals stay zero.
+        n = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+        length = np.linalg.norm(n, axis=1, keepdims=True)
+        n = np.divide(n, length, out=np.zeros_like(n), where=length > 0)
         # Magic incantation to set custom normals
         if hasattr(the_mesh, "use_auto_smooth"):
             the_mesh.use_auto_smooth = True
-        the_mesh.normals_split_custom_set([(0, 0, 0)] * len(the_mesh.loops))
-        the_mesh.normals_split_custom_set_from_vertices([Vector(v).normalized() for v in normals])
+        the_mesh.normals_split_custom_set(np.zeros((len(the_mesh.loops), 3), dtype=np.float32))
+        the_mesh.normals_split_custom_set_from_vertices(n.astype(np.float32))
+
+
+def mesh_corner_verts(mesh):
+    """Return (face-of-corner, vertex-of-corner) arrays for every polygon corner."""
+    npoly = len(mesh.polygons)
+    loop_start = np.empty(npoly, dtype=np.int32)
+    loop_total = np.empty(npoly, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    faces = np.repeat(np.arange(npoly), loop_total)
+    first = np.cumsum(loop_total) - loop_total
+    corners = np.repeat(loop_start - first, loop_total) + np.arange(len(faces))
+    return faces, loop_vert[corners]
+
+
+def vertex_group_add_buckets(group, verts, weights):
+    """Add weighted verts to a vertex group with one call per distinct weight.
+
+    Weights are bucketed at float32, the precision Blender stores them at, so
+    each bucket gets exactly the value a per-vertex add would have written.
+    Returns the number of add() calls made.
+    """
+    w32 = np.asarray(weights, dtype=np.float32)
+    uniq, inverse = np.unique(w32, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(uniq)))[:-1]
+    for w, vs in zip(uniq.tolist(), np.split(np.asarray(verts)[order], bounds)):
+        group.add(vs.tolist(), w, 'ADD')
+    return len(uniq)
 
 
 def mesh_create_partition_groups(the_shape, the_object, tri_map=None):
@@ -199,6 +237,8 @@ def mesh_create_partition_groups(the_shape, the_object, tri_map=None):
     tri_map maps each Blender face back to its source triangle (see
     filter_duplicate_tris); without it, dropped triangles shift every
     partition assignment after them.
+
+    Returns (vertex adds replaced, add() calls made) for the import log.
     """
     mesh = the_object.data
     vg = the_object.vertex_groups
@@ -214,15 +254,25 @@ def mesh_create_partition_groups(the_shape, the_object, tri_map=None):
             for sseg in p.subsegments:
                 new_vg = vg.new(name=sseg.name)
                 partn_groups.append(new_vg)
+    adds = calls = 0
     part_tris = the_shape.partition_tris
-    if tri_map is not None and part_tris is not None:
-        part_tris = [part_tris[i] for i in tri_map if i < len(part_tris)]
-    for part_idx, face in zip(part_tris, mesh.polygons):
-        if part_idx < len(partn_groups):
-            this_vg = vg[partn_groups[part_idx].name]
-            for lp in face.loop_indices:
-                this_loop = mesh.loops[lp]
-                this_vg.add((this_loop.vertex_index,), 1.0, 'ADD')
+    if part_tris is not None and len(part_tris) > 0:
+        face_part = np.asarray(part_tris, dtype=np.int64)
+        if tri_map is not None:
+            src = np.asarray(tri_map, dtype=np.int64)
+            face_part = face_part[src[src < len(face_part)]]
+        faces, corner_verts = mesh_corner_verts(mesh)
+        keep = faces < len(face_part)
+        corner_part = face_part[faces[keep]]
+        corner_verts = corner_verts[keep]
+        keep = corner_part < len(partn_groups)
+        corner_part = corner_part[keep]
+        corner_verts = corner_verts[keep]
+        adds = len(corner_verts)
+        for part_idx in np.unique(corner_part).tolist():
+            verts = np.unique(corner_verts[corner_part == part_idx])
+            partn_groups[part_idx].add(verts.tolist(), 1.0, 'ADD')
+            calls += 1
     if len(the_shape.segment_file) > 0:
         the_object['FO4_SEGMENT_FILE'] = the_shape.segment_file
 
@@ -251,6 +301,8 @@ def mesh_create_partition_groups(the_shape, the_object, tri_map=None):
             f"{the_object.name}: FO4 shape '{the_shape.name}' has dismemberment "
             "segments but no cut offsets — it will not dismember in game.")
 
+    return adds, calls
+
 
 def mesh_create_lod_groups(the_shape, the_object, tri_map=None):
     """Create cumulative vertex groups for BSMeshLODTriShape LOD levels.
@@ -262,14 +314,16 @@ def mesh_create_lod_groups(the_shape, the_object, tri_map=None):
     Groups are cumulative: LOD0 contains LOD0 tris, LOD1 contains LOD0+LOD1
     tris, LOD2 contains all tris. A Mask modifier with no vertex group is
     added so the user can select LOD0 or LOD1 to view coarser levels.
+
+    Returns (vertex adds replaced, add() calls made) for the import log.
     """
     props = the_shape.properties
     if not hasattr(props, 'lodSize0'):
-        return
+        return 0, 0
 
     lod_sizes = [props.lodSize0, props.lodSize1, props.lodSize2]
     if sum(lod_sizes) == 0:
-        return
+        return 0, 0
 
     mesh = the_object.data
     vg = the_object.vertex_groups
@@ -290,17 +344,22 @@ def mesh_create_lod_groups(the_shape, the_object, tri_map=None):
     # slide every later face into the wrong bucket.
     lod0_end = lod_sizes[0]
     lod1_end = lod0_end + lod_sizes[1]
-    for face_idx, face in enumerate(mesh.polygons):
-        src = tri_map[face_idx] if tri_map else face_idx
-        lod_level = 0 if src < lod0_end else (1 if src < lod1_end else 2)
-        for lp in face.loop_indices:
-            vi = mesh.loops[lp].vertex_index
-            for g in range(lod_level, 3):
-                lod_groups[g].add((vi,), 1.0, 'ADD')
+    faces, corner_verts = mesh_corner_verts(mesh)
+    src = np.asarray(tri_map, dtype=np.int64) if tri_map else np.arange(len(mesh.polygons))
+    face_level = np.searchsorted([lod0_end, lod1_end], src, side='right')
+    corner_level = face_level[faces]
+    adds = int((3 - corner_level).sum())
+    calls = 0
+    for g, group in enumerate(lod_groups):
+        verts = np.unique(corner_verts[corner_level <= g])
+        if len(verts):
+            group.add(verts.tolist(), 1.0, 'ADD')
+            calls += 1
 
     # Mask modifier with no vertex group — shows everything (LOD2).
     # User can switch to LOD0 or LOD1 to see coarser levels.
     the_object.modifiers.new(name="LOD", type='MASK')
+    return adds, calls
 
 
 def import_colors(mesh:bpy.types.Mesh, shape:P.NiShape):
@@ -385,6 +444,9 @@ class NifImporter():
         # (shape name, duplicates dropped) for triangles Blender can't hold.
         # Summarized in one message at the end of execute().
         self._dropped_tris = []
+        # (vertex weights, add() calls, seconds) for each shape's vertex groups.
+        # Also summarized once at the end of execute().
+        self._group_timing = []
         self.context = bpy.context
         self.is_facegen = False
         self.is_skinned_tree = False
@@ -1074,12 +1136,19 @@ class NifImporter():
         partition-palette-aligned and repeats bones, which would otherwise
         produce duplicate '.001'/'.002' vertex groups. bone_weights is keyed by
         the same unique names and already aggregates across the repeats.
+
+        Vertices sharing a weight go in with a single add() call. Returns
+        (vertex adds replaced, add() calls made) for the import log.
         """
         vg = the_object.vertex_groups
+        weights = the_shape.bone_weight_arrays
+        adds = calls = 0
         for bone_name in the_shape.unique_bone_names:
             new_vg = vg.new(name=self.blender_name(bone_name))
-            for v, w in the_shape.bone_weights[bone_name]:
-                new_vg.add((v,), w, 'ADD')
+            verts, wts = weights[bone_name]
+            adds += len(verts)
+            calls += vertex_group_add_buckets(new_vg, verts, wts)
+        return adds, calls
 
 
     def import_multibound_obb(self, ninode, node_obj):
@@ -1344,12 +1413,10 @@ class NifImporter():
                 from . import sf_geometry
                 sf_geometry.load_geometry(the_shape, 0)
 
-            v = the_shape.verts
+            v = np.asarray(the_shape.verts, dtype=np.float64).reshape(-1, 3)
             t = the_shape.tris
-            if self.scale == 1.0:
-                v = the_shape.verts
-            else:
-                v = [(n[0]*self.scale, n[1]*self.scale, n[2]*self.scale) for n in the_shape.verts]
+            if self.scale != 1.0:
+                v = v * self.scale
 
             # Nameless shapes (e.g. vanilla skinned-tree BSTriShapes) would default
             # to "Object.NNN"; fall back to the block name. The true nif name
@@ -1358,9 +1425,7 @@ class NifImporter():
             t, tri_map, dup = filter_duplicate_tris(t, shape_name)
             if dup:
                 self._dropped_tris.append((shape_name, dup))
-            new_mesh = bpy.data.meshes.new(shape_name)
-            new_mesh.from_pydata(v, [], t)
-            new_mesh.update(calc_edges=True, calc_edges_loose=True)
+            new_mesh, clean = BD.mesh_from_arrays(shape_name, v, t)
             new_object = bpy.data.objects.new(shape_name, new_mesh)
             new_object['pynBlockName'] = the_shape.blockname
             new_object['pynNodeName'] = the_shape.name
@@ -1396,16 +1461,23 @@ class NifImporter():
                     new_object.parent = parent
 
                 BD.mesh_create_uv(new_object.data, the_shape.uvs)
-                self.mesh_create_bone_groups(the_shape, new_object)
-                mesh_create_partition_groups(the_shape, new_object, tri_map)
+                start = time.perf_counter()
+                group_stats = [
+                    self.mesh_create_bone_groups(the_shape, new_object),
+                    mesh_create_partition_groups(the_shape, new_object, tri_map)]
                 # Queue for end-of-import cut-disk creation (needs the armature).
                 if 'FO4_CUT_OFFSETS' in new_object.keys():
                     self._pending_cut_disks.append((the_shape, new_object))
-                mesh_create_lod_groups(the_shape, new_object, tri_map)
-                for f in new_mesh.polygons:
-                    f.use_smooth = True
+                group_stats.append(mesh_create_lod_groups(the_shape, new_object, tri_map))
+                self._group_timing.append((sum(a for a, _ in group_stats),
+                                           sum(c for _, c in group_stats),
+                                           time.perf_counter() - start))
+                BD.mesh_shade_smooth(new_mesh)
 
-                new_mesh.validate(verbose=True)
+                # Filtered triangles on finite verts leave validate nothing to do, and
+                # on big imports it's one of the slowest steps.
+                if not clean:
+                    new_mesh.validate(verbose=True)
 
                 if the_shape.normals:
                     mesh_create_normals(new_object.data, the_shape.normals)
@@ -2212,10 +2284,10 @@ class NifImporter():
             if osd_path.exists():
                 from ..osd.osdfile import OSDFile
                 from ..osd.import_osd import import_osd
-                osd = OSDFile.from_file(osd_path)
-                if osd.is_valid:
-                    import_osd(osd, imported_meshes)
-                    log.info(f"Imported OSD file: {osd_path.name}")
+                with OSDFile.from_file(osd_path) as osd:
+                    if osd.is_valid:
+                        import_osd(osd, imported_meshes)
+                        log.info(f"Imported OSD file: {osd_path.name}")
 
 
     def merge_shapes(self, filename, obj_list, new_filename, new_obj_list):
@@ -2356,6 +2428,7 @@ class NifImporter():
         self._pending_cut_disks = []
 
         self.report_dropped_tris()
+        self.report_group_timing()
 
 
     def report_dropped_tris(self):
@@ -2380,6 +2453,23 @@ class NifImporter():
         self._dropped_tris = []
 
 
+    def report_group_timing(self):
+        """Report, once for the whole import, the time vertex-group creation took.
+
+        Only what was measured: the time and the add() calls it took against
+        the vertex weights they carried.
+        """
+        if not self._group_timing:
+            return
+        adds = sum(a for a, _, _ in self._group_timing)
+        calls = sum(c for _, c, _ in self._group_timing)
+        elapsed = sum(t for _, _, t in self._group_timing)
+        if calls:
+            log.info(f"Vertex groups for {len(self._group_timing)} shape(s) took "
+                     f"{elapsed:.3f}s: {calls} add calls for {adds} vertex weights")
+        self._group_timing = []
+
+
     @classmethod
     def do_import(cls, filename, settings=None, collection=None, reference_skel=None,
                   context=bpy.context, chargen="chargen", scale=1.0):
@@ -753,7 +753,9 @@ from ..util.settings import (
 # (_discover_game), not a pure sticky preference, so it's not part of this consolidation.
 _EXPORT_ROOT_FIELDS = ['blender_xf', 'write_bodytri', 'write_tris', 'write_sf_materials',
                        'export_modifiers', 'export_animations', 'export_colors',
-                       'export_recenter_half_precision', 'export_full_precision', 'chargen_extension']
+                       'export_recenter_half_precision', 'export_full_precision', 'chargen_extension',
+                       'simplify_collision', 'watertight_collision', 'optimize_vertex_cache',
+                       'drop_lod_pieces', 'lod_ratios', 'decimate_lods', 'morph_epsilon']
 _EXPORT_SKEL_FIELDS = ['rename_bones', 'rename_bones_niftools', 'rotate_bones_pretty',
                        'export_pose', 'preserve_hierarchy']
 
@@ -772,6 +774,8 @@ def _export_prop_for(field):
     dflt = ExportSettings.__dataclass_fields__[field].default
     if isinstance(dflt, bool):
         return bpy.props.BoolProperty(name=field, default=dflt)
+    if isinstance(dflt, float):
+        return bpy.props.FloatProperty(name=field, default=dflt, min=0.0, precision=6)
     return bpy.props.StringProperty(name=field, default=str(dflt))
 
 
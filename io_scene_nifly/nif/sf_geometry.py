@@ -204,6 +204,57 @@ def export_sf_shape(exporter, obj, new_shape, verts, uvs, norms, tris,
     return out_path
 
 
+def export_sf_lods(exporter, obj, new_shape, verts, tris, weights_by_vert, morphdict, ratios):
+    """Fill a BSGeometry's LOD mesh slots by decimating the shape just exported into slot 0.
+
+    `ratios` are fractions of the triangle count, one per slot; the finest goes in slot 1.
+    Each level is a decimation of the one before (mesh_lod.lod_chain), so UV seams,
+    boundaries and skin weights hold, and the error is measured in every morph shape too.
+    Must run after export_sf_shape and before the .mesh files are written. Shapes whose LOD
+    slots were authored by hand (sibling ':LOD<n>' meshes) are left alone. Returns the
+    number of LOD slots written."""
+    from ..pyn import mesh_lod
+    grp = getattr(obj, 'pyn_sf_geometry', None)
+    if grp is not None and grp.lod_slot != 0:
+        return 0
+    if obj.parent is not None and any(
+            c is not obj and c.type == 'MESH'
+            and getattr(c, 'pyn_sf_geometry', None) and c.pyn_sf_geometry.lod_slot > 0
+            for c in obj.parent.children):
+        return 0
+    if not new_shape.can_add_lod_mesh:
+        log.warning(f"{obj.name}: this NiflyDLL cannot add LOD meshes, so none were generated")
+        return 0
+
+    # Slots 1-3; at most one level per ratio, finest first.
+    ratios = sorted(set(ratios), reverse=True)[:3]
+    levels = mesh_lod.lod_chain(verts, tris, ratios, weights=weights_by_vert,
+                                shapes=list(morphdict.values()))
+    base_name = new_shape.mesh_path(0)
+    written = 0
+    prev = len(tris)
+    for level in levels:
+        if not level or len(level) >= prev:
+            break
+        prev = len(level)
+        slot = new_shape.add_lod_mesh(level, 0)
+        if slot < 0:
+            log.warning(f"{obj.name}: could not add a LOD mesh slot")
+            break
+        # '_l<slot>' rather than '_lod<slot>': meshName is capped at ~46 chars.
+        mesh_name = f"{base_name}_l{slot}"
+        new_shape.set_mesh_name(mesh_name, slot)
+        exporter._sf_meshes.append(
+            (resolve_mesh_output_path(exporter.nif.filepath, mesh_name), new_shape, slot))
+        written += 1
+    if written:
+        log.info(f"Generated {written} LOD meshes for {obj.name}: "
+                 f"{len(tris)} -> {' / '.join(str(len(lv)) for lv in levels[:written])} triangles")
+    else:
+        log.warning(f"{obj.name}: nothing could be simplified, so no LOD meshes were generated")
+    return written
+
+
 # Max bone influences kept per vertex. Starfield has no hard limit (vanilla body = 6,
 # hair = 7); the .mesh stores one weightsPerVertex for the whole shape and pads verts with
 # fewer. Capping generously at 8 covers observed vanilla assets while keeping the file bounded.
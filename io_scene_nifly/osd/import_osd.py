@@ -3,11 +3,12 @@
 import re
 import logging
 from pathlib import Path
+import numpy as np
 import bpy
 from bpy_extras.io_utils import ImportHelper
 from .. import blender_defs as BD
 from .. import bl_info
-from .osdfile import OSDFile, is_osd
+from .osdfile import OSDFile, SliderDiffs, is_osd
 
 log = logging.getLogger("pynifly")
 
@@ -23,7 +24,7 @@ def _base_name(name):
 def create_osd_shape_keys(obj, morphs):
     """Add OSD morph data as shape keys on obj.
 
-    morphs: {slider_name: [[vert_index, (dx, dy, dz)], ...], ...}
+    morphs: {slider_name: SliderDiffs or [[vert_index, (dx, dy, dz)], ...], ...}
     """
     mesh = obj.data
     verts = mesh.vertices
@@ -32,17 +33,30 @@ def create_osd_shape_keys(obj, morphs):
         newsk = obj.shape_key_add()
         newsk.name = "Basis"
 
+    n = len(verts)
+    base = np.empty(n * 3, dtype=np.float32)
+    verts.foreach_get('co', base)
+    base = base.astype(np.float64).reshape(-1, 3)
+
     for morph_name, morph_verts in sorted(morphs.items()):
         newsk = obj.shape_key_add()
         newsk.name = ">" + morph_name
         newsk.value = 0
 
         obj.active_shape_key_index = len(mesh.shape_keys.key_blocks) - 1
-        mesh_key_verts = mesh.shape_keys.key_blocks[obj.active_shape_key_index].data
-        for vert_index, offsets in morph_verts:
-            if vert_index < len(mesh_key_verts):
-                for i in range(3):
-                    mesh_key_verts[vert_index].co[i] = verts[vert_index].co[i] + offsets[i]
+        if isinstance(morph_verts, SliderDiffs):
+            indices, offsets = morph_verts.indices, morph_verts.offsets
+        else:
+            indices = np.array([d[0] for d in morph_verts], dtype=np.int64)
+            offsets = np.array([d[1] for d in morph_verts], dtype=np.float64).reshape(-1, 3)
+        inside = indices < n
+        indices, offsets = indices[inside], offsets[inside]
+
+        coords = np.empty(n * 3, dtype=np.float32)
+        newsk.data.foreach_get('co', coords)
+        coords = coords.reshape(-1, 3)
+        coords[indices] = base[indices] + offsets
+        newsk.data.foreach_set('co', coords.ravel())
 
         mesh.update()
 
@@ -103,14 +117,14 @@ class ImportOSD(bpy.types.Operator, ImportHelper):
         self.file_path = Path(self.filepath)
 
         try:
-            osd = OSDFile.from_file(self.file_path)
-            if not osd.is_valid:
-                log.error(f"Not a valid OSD file: {self.filepath}")
-                self.status = {'CANCELLED'}
-            else:
-                import_osd(osd, context.selected_objects)
-                log.info(f"Imported OSD file with {len(osd.entries)} entries"
-                         f" into shapes: {list(osd.shapes.keys())}")
+            with OSDFile.from_file(self.file_path) as osd:
+                if not osd.is_valid:
+                    log.error(f"Not a valid OSD file: {self.filepath}")
+                    self.status = {'CANCELLED'}
+                else:
+                    import_osd(osd, context.selected_objects)
+                    log.info(f"Imported OSD file with {len(osd.entries)} entries"
+                             f" into shapes: {list(osd.shapes.keys())}")
 
             self.log_handler.finish("IMPORT OSD", self.filepath)
 
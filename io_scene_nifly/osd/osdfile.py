@@ -20,15 +20,116 @@ The compound names must be split using known shape names from context (e.g.
 matching against selected Blender objects).
 """
 
+import mmap
 import struct
+from collections.abc import Sequence
 from pathlib import Path
+import numpy as np
+
+OSD_MAGIC = (b'\x00DSO', b'OSD\x00')
+
+# DiffStruct, packed
+OSD_DIFF_DTYPE = np.dtype([('index', '<u2'), ('offset', '<f4', (3,))])
+
+# Offsets this small are dropped as noise.
+MIN_OFFSET = 1e-7
+
+
+class SliderDiffs(Sequence):
+    """One slider's nonzero diffs, as [vert_index, (dx, dy, dz)] pairs.
+
+    The same data is available as arrays: indices (n,) and offsets (n, 3).
+    Diffs read from a file are decoded from the file's buffer the first time
+    they are used.
+    """
+
+    def __init__(self, indices=None, offsets=None, source=None):
+        self._indices = indices
+        self._offsets = offsets
+        self._source = source   # (buffer, byte offset, diff count) until decoded
+
+    @classmethod
+    def from_arrays(cls, indices, offsets):
+        """Keep only the diffs with an offset component above MIN_OFFSET."""
+        indices = np.asarray(indices, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 3)
+        keep = (np.abs(offsets) > MIN_OFFSET).any(axis=1)
+        return cls(indices[keep], offsets[keep])
+
+    def _decode(self):
+        if self._source is not None:
+            data, offset, count = self._source
+            diffs = np.frombuffer(data, dtype=OSD_DIFF_DTYPE, count=count, offset=offset)
+            decoded = SliderDiffs.from_arrays(diffs['index'], diffs['offset'])
+            self._indices, self._offsets = decoded._indices, decoded._offsets
+            self._source = None
+
+    @property
+    def indices(self):
+        self._decode()
+        return self._indices
+
+    @property
+    def offsets(self):
+        self._decode()
+        return self._offsets
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        return [int(self.indices[i]), tuple(self.offsets[i].tolist())]
+
+    def __iter__(self):
+        return (list(d) for d in zip(self.indices.tolist(), map(tuple, self.offsets.tolist())))
+
+    def as_struct(self):
+        """The diffs as an OSD_DIFF_DTYPE array, ready to write."""
+        out = np.empty(len(self.indices), dtype=OSD_DIFF_DTYPE)
+        out['index'] = self.indices
+        out['offset'] = self.offsets
+        return out
+
+
+def _diff_struct(diffs):
+    """OSD_DIFF_DTYPE array for a SliderDiffs or a list of [vert_index, (dx, dy, dz)]."""
+    if not isinstance(diffs, SliderDiffs):
+        diffs = SliderDiffs(np.array([d[0] for d in diffs], dtype=np.int64),
+                            np.array([d[1] for d in diffs], dtype=np.float64).reshape(-1, 3))
+    return diffs.as_struct()
+
+
+def _build_trie(names):
+    """Character trie over names; the key None marks the end of a name."""
+    root = {}
+    for name in names:
+        node = root
+        for c in name:
+            node = node.setdefault(c, {})
+        node[None] = name
+    return root
+
+
+def _longest_prefix(trie, s):
+    """The longest name in trie that s starts with, or None."""
+    node = trie
+    found = node.get(None)
+    for c in s:
+        node = node.get(c)
+        if node is None:
+            break
+        found = node.get(None, found)
+    return found
 
 
 class OSDFile:
     """Reads and stores OSD morph data.
 
-    After reading, self.entries is a list of (compound_name, diffs) tuples.
-    Call split_entries(shape_names) to group them into the shapes dict.
+    After reading, self.entries is a list of (compound_name, diffs) tuples,
+    where diffs is a SliderDiffs that decodes when first used. Call
+    split_entries(shape_names) to group them into the shapes dict.
+
+    Use it as a context manager, or call close(), to release the file mapping.
     """
 
     def __init__(self):
@@ -36,6 +137,7 @@ class OSDFile:
         self.shapes = {}   # {shape_name: {slider_name: diffs, ...}, ...}
         self.is_valid = False
         self.version = 0
+        self._data = None  # File contents: an mmap, or bytes
 
     @classmethod
     def from_file(cls, filepath):
@@ -46,30 +148,57 @@ class OSDFile:
         return osd
 
     def read(self, file):
-        """Parse OSD binary data from an open file handle."""
-        magic = file.read(4)
-        if magic not in (b'\x00DSO', b'OSD\x00'):
+        """Index OSD binary data from an open file handle.
+
+        The file is memory-mapped when possible. Only entry names and the
+        position of each diff block are read here; the diffs themselves are
+        decoded on demand, so the mapping stays open until close().
+        """
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            data = file.read()
+        self._data = data
+        try:
+            self._index(data)
+        except BaseException:
+            self.close()
+            raise
+
+    def _index(self, data):
+        """Fill entries from the file contents. Raises ValueError if they are truncated."""
+        if len(data) < 12 or data[0:4] not in OSD_MAGIC:
             self.is_valid = False
             return
 
-        self.version = struct.unpack('<I', file.read(4))[0]
-        data_count = struct.unpack('<I', file.read(4))[0]
+        self.version, data_count = struct.unpack_from('<II', data, 4)
 
+        pos = 12
         for _ in range(data_count):
-            name_len = struct.unpack('<B', file.read(1))[0]
-            compound_name = file.read(name_len).decode('utf-8', errors='replace')
+            name_len = data[pos]
+            compound_name = data[pos + 1:pos + 1 + name_len].decode('utf-8', errors='replace')
+            pos += 1 + name_len
+            diff_count = struct.unpack_from('<H', data, pos)[0]
+            pos += 2
+            self.entries.append(
+                (compound_name, SliderDiffs(source=(data, pos, diff_count))))
+            pos += diff_count * OSD_DIFF_DTYPE.itemsize
 
-            diff_count = struct.unpack('<H', file.read(2))[0]
+        if pos > len(data):
+            raise ValueError(f"OSD file is truncated: need {pos} bytes, have {len(data)}")
+        self.is_valid = True
 
-            diffs = []
-            for _ in range(diff_count):
-                idx, dx, dy, dz = struct.unpack('<H3f', file.read(14))
-                if abs(dx) > 1e-7 or abs(dy) > 1e-7 or abs(dz) > 1e-7:
-                    diffs.append([idx, (dx, dy, dz)])
+    def close(self):
+        """Release the file mapping. Diffs not yet used can no longer be decoded."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
 
-            self.entries.append((compound_name, diffs))
+    def __enter__(self):
+        return self
 
-        self.is_valid = True
+    def __exit__(self, *exc):
+        self.close()
 
     def split_entries(self, shape_names):
         """Split compound entry names using known shape names.
@@ -80,24 +209,15 @@ class OSDFile:
 
         Populates self.shapes: {shape_name: {slider_name: diffs, ...}, ...}
         """
-        # Sort by length descending so longer names match first
-        sorted_names = sorted(shape_names, key=len, reverse=True)
+        trie = _build_trie(shape_names)
 
         for compound, diffs in self.entries:
-            matched = False
-            for name in sorted_names:
-                if compound.startswith(name):
-                    slider = compound[len(name):]
-                    if name not in self.shapes:
-                        self.shapes[name] = {}
-                    self.shapes[name][slider] = diffs
-                    matched = True
-                    break
-            if not matched:
+            name = _longest_prefix(trie, compound)
+            if name is not None:
+                self.shapes.setdefault(name, {})[compound[len(name):]] = diffs
+            else:
                 # Can't split — store under the full compound name
-                if compound not in self.shapes:
-                    self.shapes[compound] = {}
-                self.shapes[compound][''] = diffs
+                self.shapes.setdefault(compound, {})[''] = diffs
 
 
     def set_morphs(self, shape_name, morphdict, base_verts):
@@ -112,15 +232,12 @@ class OSDFile:
         if shape_name not in self.shapes:
             self.shapes[shape_name] = {}
 
+        base = np.asarray(base_verts, dtype=np.float64).reshape(-1, 3)
         for slider_name, morph_verts in morphdict.items():
-            diffs = []
-            for i, (mv, bv) in enumerate(zip(morph_verts, base_verts)):
-                dx = mv[0] - bv[0]
-                dy = mv[1] - bv[1]
-                dz = mv[2] - bv[2]
-                if abs(dx) > 1e-7 or abs(dy) > 1e-7 or abs(dz) > 1e-7:
-                    diffs.append([i, (dx, dy, dz)])
-            self.shapes[shape_name][slider_name] = diffs
+            morph = np.asarray(morph_verts, dtype=np.float64).reshape(-1, 3)
+            n = min(len(morph), len(base))
+            self.shapes[shape_name][slider_name] = SliderDiffs.from_arrays(
+                np.arange(n), morph[:n] - base[:n])
 
     def write(self, filepath):
         """Write OSD binary data to a file."""
@@ -131,23 +248,21 @@ class OSDFile:
                 compound = shape_name + slider_name
                 entries.append((compound, diffs))
 
-        with open(str(filepath), 'wb') as f:
-            # Header
-            f.write(b'\x00DSO')
-            f.write(struct.pack('<I', 1))  # version
-            f.write(struct.pack('<I', len(entries)))
+        out = [b'\x00DSO', struct.pack('<II', 1, len(entries))]  # version, entry count
+        for compound, diffs in entries:
+            name_bytes = compound.encode('utf-8')
+            diff_data = _diff_struct(diffs)
+            out.append(struct.pack('<B', len(name_bytes)))
+            out.append(name_bytes)
+            out.append(struct.pack('<H', len(diff_data)))
+            out.append(diff_data.tobytes())
 
-            for compound, diffs in entries:
-                name_bytes = compound.encode('utf-8')
-                f.write(struct.pack('<B', len(name_bytes)))
-                f.write(name_bytes)
-                f.write(struct.pack('<H', len(diffs)))
-                for idx, (dx, dy, dz) in diffs:
-                    f.write(struct.pack('<H3f', idx, dx, dy, dz))
+        with open(str(filepath), 'wb') as f:
+            f.write(b''.join(out))
 
 
 def is_osd(filepath):
     """Check if a file is an OSD file by reading the magic bytes."""
     with open(str(filepath), 'rb') as f:
         magic = f.read(4)
-        return magic in (b'\x00DSO', b'OSD\x00')
+        return magic in OSD_MAGIC
@@ -1,7 +1,117 @@
+import os
 import struct
+from collections import OrderedDict
 from ctypes import Structure, c_bool, c_char, c_float, c_uint8, c_uint32
+from types import MappingProxyType
 import logging
 
+
+def _field_format(ftype):
+    """(struct format, value count, is a numeric array) for one ctypes field type."""
+    if '_Array_' in ftype.__name__:
+        if ftype._type_._type_ == 'c':
+            return str(ftype._length_) + 's', 1, False
+        return ftype._type_._type_ * ftype._length_, ftype._length_, True
+    return ftype._type_, 1, False
+
+
+class _Run:
+    """Consecutive fixed-size fields, decoded with one precompiled struct."""
+    __slots__ = ('struct', 'fields')
+
+    def __init__(self, fields):
+        formats = [(name,) + _field_format(ftype) for name, ftype in fields]
+        self.struct = struct.Struct('<' + ''.join(f for _, f, _, _ in formats))
+        self.fields = [(name, n, is_array, struct.Struct('<' + f))
+                       for name, f, n, is_array in formats]
+
+    def read(self, m, buf, pos):
+        """Set the fields on material m from buf at pos; return the position after them.
+        (m is still being read, so this goes straight to Structure's setattr.)"""
+        setfield = Structure.__setattr__
+        if pos + self.struct.size <= len(buf):
+            vals = self.struct.unpack_from(buf, pos)
+            i = 0
+            for name, n, is_array, _ in self.fields:
+                setfield(m, name, vals[i:i + n] if is_array else vals[i])
+                i += n
+            return pos + self.struct.size
+        # The file ends inside the run: fields past the end keep their defaults.
+        for name, _, is_array, s in self.fields:
+            if pos + s.size > len(buf):
+                return len(buf)
+            v = s.unpack_from(buf, pos)
+            setfield(m, name, v if is_array else v[0])
+            pos += s.size
+        return pos
+
+
+class _Layout:
+    """Records the decoding plan for one material class and file version.
+
+    A class's _layout describes its file with read_to/read_if/read_text calls, in file
+    order. Fixed fields read back to back are merged into one _Run; texts and fields that
+    depend on a flag read earlier in the same file split them.
+    """
+    def __init__(self, fields, version):
+        self.version = version
+        self.steps = []           # ('run', _Run) / ('text', name) / ('when', flag, _Run)
+        self._fields = iter(fields)
+        self._pending = []
+
+    def _flush(self):
+        if self._pending:
+            self.steps.append(('run', _Run(self._pending)))
+            self._pending = []
+
+    def read_to(self, lastfield):
+        """Read all fields up to and including 'lastfield'."""
+        for fieldname, ftype in self._fields:
+            self._pending.append((fieldname, ftype))
+            if fieldname == lastfield:
+                break
+
+    def skip_to(self, lastfield):
+        """Skip the fields up to and including 'lastfield'."""
+        for fieldname, _ in self._fields:
+            if fieldname == lastfield:
+                break
+
+    def read_if(self, lastfield, condition):
+        if condition:
+            self.read_to(lastfield)
+        else:
+            self.skip_to(lastfield)
+
+    def read_text(self, fieldname, condition=True):
+        if condition:
+            self._flush()
+            self.steps.append(('text', fieldname))
+
+    def read_when(self, flag, lastfield):
+        """Read the fields up to and including 'lastfield' only if the file's 'flag' is set."""
+        self._flush()
+        self.read_to(lastfield)
+        self.steps.append(('when', flag, _Run(self._pending)))
+        self._pending = []
+
+    def finish(self):
+        self._flush()
+        return self.steps
+
+
+_plans = {}   # (material class, version) -> decoding steps
+
+
+def _plan(cls, version):
+    steps = _plans.get((cls, version))
+    if steps is None:
+        layout = _Layout(cls._fields_, version)
+        cls._layout(layout)
+        steps = _plans[(cls, version)] = layout.finish()
+    return steps
+
+
 class MaterialFile(Structure):
     """
     Common elements and bhavior for all materials files.
@@ -17,6 +127,16 @@ class MaterialFile(Structure):
         self.textures = {}
         if filepath: self.read(filepath)
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(f"Material from the material cache is read-only: {name}")
+        super().__setattr__(name, value)
+
+    def freeze(self):
+        """Make the material read-only, so it can be shared."""
+        self.textures = MappingProxyType(self.textures)
+        self._frozen = True
+
     @classmethod
     def logError(cls, msg):
         if MaterialFile.log:
@@ -26,78 +146,51 @@ class MaterialFile(Structure):
     def logWarning(cls, msg):
         if MaterialFile.log:
             MaterialFile.log.warning(msg)
-    
-    def read_field(self, fieldname, ftype):
-        """Read a single field from the file."""
-        try:
-            if '_Array_' in ftype.__name__:
-                if ftype._type_._type_ == 'c':
-                    pat = "<" + str(ftype._length_) + 's'
-                    s = struct.Struct(pat)
-                    buf = self.sourcefile.read(s.size)
-                    v = s.unpack(buf)
-                    self.__setattr__(fieldname, v[0])
-                else:
-                    pat = "<" + str(ftype._type_._type_ *  ftype._length_)
-                    s = struct.Struct(pat)
-                    buf = self.sourcefile.read(s.size)
-                    v = s.unpack(buf)
-                    self.__setattr__(fieldname, v)
-            else:
-                pat = ("<" + ftype._type_)
-                s = struct.Struct(pat)
-                buf = self.sourcefile.read(s.size)
-                v = s.unpack(buf)
-                self.__setattr__(fieldname, v[0])
-        except:
-            # Maybe hit EOF
-            pass
-
-    def read_to(self, lastfield):
-        """Read all fields up to and including 'lastfield'."""
-        for fieldname, ftype in self.flditer:
-            self.read_field(fieldname, ftype)
-            if fieldname == lastfield:
-                break
 
-    def skip_to(self, lastfield):
-        """Skip the iterator over fields up to and including 'lastfield'."""
-        for fieldname, ftype in self.flditer:
-            if fieldname == lastfield:
-                break
+    @classmethod
+    def _layout(cls, L):
+        """Describe the fields common to all materials files, in file order."""
+        L.read_to('refractionPower')
+        L.read_if('environmentMappingMaskScale', L.version < 10)
+        L.read_if('depthBias', L.version >= 10)
+        L.read_to('grayscaleToPaletteColor')
+        L.read_if('maskWrites', L.version > 6)
 
-    def read_if(self, lastfield, condition):
-        if condition:
-            self.read_to(lastfield)
-        else:
-            self.skip_to(lastfield)
+    def _decode(self, buf):
+        """Read the fields and textures from the file contents, using the precompiled
+        plan for this class and the file's version."""
+        version = struct.unpack_from('<I', buf, 4)[0] if len(buf) >= 8 else self.version
+        pos = 0
+        for step in _plan(type(self), version):
+            if step[0] == 'run':
+                pos = step[1].read(self, buf, pos)
+            elif step[0] == 'text':
+                n = struct.unpack_from('<I', buf, pos)[0]
+                t = buf[pos + 4:pos + 4 + n].decode().rstrip('\x00')
+                pos = min(pos + 4 + n, len(buf))
+                if t:
+                    self.textures[step[1]] = t
+            elif getattr(self, step[1]):
+                pos = step[2].read(self, buf, pos)
 
-    def read_text(self, fieldname, condition=True):
-        if condition:
-            n = struct.unpack('<I', self.sourcefile.read(4))[0]
-            t = self.sourcefile.read(n).decode().rstrip('\x00')
-            if t:
-                self.textures[fieldname] = t
-
-    def _read(self, f):
-        """Read common fields from the given file."""
-        self.sourcefile = f
-        self.flditer = (fld for fld in self._fields_)
-        self.read_to('refractionPower')
-        self.read_if('environmentMappingMaskScale', self.version < 10)
-        self.read_if('depthBias', self.version >= 10)
-        self.read_to('grayscaleToPaletteColor')
-        self.read_if('maskWrites', self.version > 6)
+    def decode(self, data, filename=''):
+        """Read the material from the contents of its file."""
+        try:
+            self._decode(data)
+        except:
+            MaterialFile.logWarning(f"Cannot read materials file '{filename}'")
 
     def read(self, filename):
         """
-        Read the initial fields common to all subclasses.
+        Read the materials file.
         """
         try:
             with open(filename, 'rb') as f:
-                self._read(f)
+                data = f.read()
         except:
             MaterialFile.logWarning(f"Cannot read materials file '{filename}'")
+            return
+        self.decode(data, filename)
 
     def extract(self, d):
         for fn, t in self._fields_:
@@ -120,21 +213,56 @@ class MaterialFile(Structure):
         if logger: cls.log = logger
         m = None
         try:
-            sig = ''
             with open(filepath, 'rb') as f:
-                sig = struct.unpack('<4s', f.read(4))[0]
-                f.close()
+                data = f.read()
+            sig = struct.unpack('<4s', data[:4])[0]
             if sig == b'BGSM':
-                m = BGSMaterial(filepath)
+                m = BGSMaterial()
             elif sig == b'BGEM':
-                m = BGEMaterial(filepath)
+                m = BGEMaterial()
             else:
                 cls.logError(f"Not a known materials file: {filepath}")
         except:
             cls.logWarning(f"Cannot read materials file '{filepath}'")
+        if m is not None:
+            m.decode(data, filepath)
         return m
 
 
+# Parsed materials by resolved path, most recently used last, with the mtime and size they
+# were read at. Shapes share a handful of materials -- a settlement kit's 200 shapes might use
+# 15 -- so each file is parsed once for every nif and import in this process.
+MATERIAL_CACHE_SIZE = 64
+_material_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def load_material(filepath, logger=None):
+    """The materials file at filepath, as MaterialFile.Open reads it, or None.
+
+    Comes from the cache unless the file changed since it was read. The material is shared
+    with every other caller and frozen: don't modify it."""
+    key = os.path.normcase(os.path.realpath(filepath))
+    try:
+        st = os.stat(key)
+    except OSError:
+        MaterialFile.logWarning(f"Cannot read materials file '{filepath}'")
+        return None
+    hit = _material_cache.get(key)
+    if hit is not None and hit[:2] == (st.st_mtime_ns, st.st_size):
+        _material_cache.move_to_end(key)
+        return hit[2]
+    m = MaterialFile.Open(filepath, logger)
+    if m is None:
+        _material_cache.pop(key, None)
+        return None
+    m.freeze()
+    _material_cache[key] = (st.st_mtime_ns, st.st_size, m)
+    _material_cache.move_to_end(key)
+    while len(_material_cache) > MATERIAL_CACHE_SIZE:
+        _material_cache.popitem(last=False)
+    return m
+
+
 class BGSMaterial(MaterialFile):
     _fields_ = [
         ('signature', c_char*4),
@@ -258,67 +386,69 @@ class BGSMaterial(MaterialFile):
         'grayscaleToPaletteScale': 1.0,
         }        
     
-    def _read(self, f):
-        super()._read(f)
-        self.read_text('Diffuse')
-        self.read_text('Normal')
-        self.read_text('Specular')
-        self.read_text('Greyscale')
-        self.read_text('Glow', condition=(self.version > 2))
-        self.read_text('Wrinkles', condition=(self.version > 2))
-        self.read_text('Specular', condition=(self.version > 2))
-        self.read_text('Lighting', condition=(self.version > 2))
-        self.read_text('Flow', condition=(self.version > 2))
-        self.read_text('DistanceFieldAlpha', condition=(self.version > 17))
-        self.read_text('EnvMap', condition=(self.version <= 2))
-        self.read_text('Glow', condition=(self.version <= 2))
-        self.read_text('InnerLayer', condition=(self.version <= 2))
-        self.read_text('Wrinkles', condition=(self.version <= 2))
-        self.read_text('Height', condition=(self.version <= 2))
-        self.read_to('enableEditorAlphaRef')
-        self.read_if('translucency', self.version >= 8)
-        self.read_if('translucencyThickObject', self.version >= 8)
-        self.read_if('translucencyMixAlbedoWithSubsurfaceColor', self.version >= 8)
-        self.read_if('translucencySubsurfaceColor', self.version >= 8)
-        self.read_if('translucencyTransmissiveScale', self.version >= 8)
-        self.read_if('translucencyTurbulence', self.version >= 8)
-        self.read_if('rimLighting', self.version < 8)
-        self.read_if('rimPower', self.version < 8)
-        self.read_if('backlightPower', self.version < 8)
-        self.read_if('subsurfaceLighting', self.version < 8)
-        self.read_if('subsurfaceRolloff', self.version < 8)
-        self.read_to('wetnessMinVar')
-        self.read_if('wetnessEnvmapScale', self.version < 10)
-        self.read_to('wetnessMetalness')
-        self.read_if('pbr', self.version > 2)
-        self.read_if('customPorosity', self.version >= 9)
-        self.read_if('porosityValue', self.version >= 9)
-        self.read_text('RootMaterialPath')
-        self.read_to('emitEnabled')
-        self.read_if('emittanceColor', self.emitEnabled)
-        self.read_to('externalEmittance')
-        self.read_if('lumEmittance', self.version >= 12)
-        self.read_if('useAdaptativeEmissive', self.version >= 13)
-        self.read_if('adaptativeEmissive_ExposureOffset', self.version >= 13)
-        self.read_if('adaptativeEmissive_FinalExposureMin', self.version >= 13)
-        self.read_if('adaptativeEmissive_FinalExposureMax', self.version >= 13)
-        self.read_if('backLighting', self.version < 8)
-        self.read_to('glowmap')
-        self.read_if('environmentMappingWindow', self.version < 7)
-        self.read_if('environmentMappingEye', self.version < 7)
-        self.read_to('tessellate')
-        self.read_if('displacementTextureBias', self.version < 3)
-        self.read_if('displacementTextureScale', self.version < 3)
-        self.read_if('tessellationPnScale', self.version < 3)
-        self.read_if('tessellationBaseFactor', self.version < 3)
-        self.read_if('tessellationFadeDistance', self.version < 3)
-        self.read_to('grayscaleToPaletteScale')
-        self.read_if('skewSpecularAlpha', self.version >= 1)
-        self.read_if('terrain', self.version >= 3)
-        if self.version >= 3:
-            if self.terrain:
-                self.read_if('unkInt1', self.version == 3)
-            self.read_to('terrainRotationAngle')
+    @classmethod
+    def _layout(cls, L):
+        super()._layout(L)
+        L.read_text('Diffuse')
+        L.read_text('Normal')
+        L.read_text('Specular')
+        L.read_text('Greyscale')
+        L.read_text('Glow', condition=(L.version > 2))
+        L.read_text('Wrinkles', condition=(L.version > 2))
+        L.read_text('Specular', condition=(L.version > 2))
+        L.read_text('Lighting', condition=(L.version > 2))
+        L.read_text('Flow', condition=(L.version > 2))
+        L.read_text('DistanceFieldAlpha', condition=(L.version > 17))
+        L.read_text('EnvMap', condition=(L.version <= 2))
+        L.read_text('Glow', condition=(L.version <= 2))
+        L.read_text('InnerLayer', condition=(L.version <= 2))
+        L.read_text('Wrinkles', condition=(L.version <= 2))
+        L.read_text('Height', condition=(L.version <= 2))
+        L.read_to('enableEditorAlphaRef')
+        L.read_if('translucency', L.version >= 8)
+        L.read_if('translucencyThickObject', L.version >= 8)
+        L.read_if('translucencyMixAlbedoWithSubsurfaceColor', L.version >= 8)
+        L.read_if('translucencySubsurfaceColor', L.version >= 8)
+        L.read_if('translucencyTransmissiveScale', L.version >= 8)
+        L.read_if('translucencyTurbulence', L.version >= 8)
+        L.read_if('rimLighting', L.version < 8)
+        L.read_if('rimPower', L.version < 8)
+        L.read_if('backlightPower', L.version < 8)
+        L.read_if('subsurfaceLighting', L.version < 8)
+        L.read_if('subsurfaceRolloff', L.version < 8)
+        L.read_to('wetnessMinVar')
+        L.read_if('wetnessEnvmapScale', L.version < 10)
+        L.read_to('wetnessMetalness')
+        L.read_if('pbr', L.version > 2)
+        L.read_if('customPorosity', L.version >= 9)
+        L.read_if('porosityValue', L.version >= 9)
+        L.read_text('RootMaterialPath')
+        L.read_to('emitEnabled')
+        L.read_when('emitEnabled', 'emittanceColor')
+        L.read_to('externalEmittance')
+        L.read_if('lumEmittance', L.version >= 12)
+        L.read_if('useAdaptativeEmissive', L.version >= 13)
+        L.read_if('adaptativeEmissive_ExposureOffset', L.version >= 13)
+        L.read_if('adaptativeEmissive_FinalExposureMin', L.version >= 13)
+        L.read_if('adaptativeEmissive_FinalExposureMax', L.version >= 13)
+        L.read_if('backLighting', L.version < 8)
+        L.read_to('glowmap')
+        L.read_if('environmentMappingWindow', L.version < 7)
+        L.read_if('environmentMappingEye', L.version < 7)
+        L.read_to('tessellate')
+        L.read_if('displacementTextureBias', L.version < 3)
+        L.read_if('displacementTextureScale', L.version < 3)
+        L.read_if('tessellationPnScale', L.version < 3)
+        L.read_if('tessellationBaseFactor', L.version < 3)
+        L.read_if('tessellationFadeDistance', L.version < 3)
+        L.read_to('grayscaleToPaletteScale')
+        L.read_if('skewSpecularAlpha', L.version >= 1)
+        L.read_if('terrain', L.version >= 3)
+        if L.version >= 3:
+            # The terrain settings are only there for terrain materials; unkInt1 only in v3.
+            if L.version > 3:
+                L.skip_to('unkInt1')
+            L.read_when('terrain', 'terrainRotationAngle')
 
 
 class BGEMaterial(MaterialFile):
@@ -403,28 +533,29 @@ class BGEMaterial(MaterialFile):
         'baseColorScale': 1.0
         }        
     
-    def _read(self, f):
-        super()._read(f)
-        self.read_text('Diffuse')
-        self.read_text('Greyscale')
-        self.read_text('EnvMap')
-        self.read_text('Normal')
-        self.read_text('EnvMapMask')
-        if self.version >= 11:
-            self.read_text('Specular')
-            self.read_text('Lighting')
-            self.read_text('Glow')
-        if self.version >= 10:
-            self.read_to('environmentMappingMaskScale')
-        self.read_to('softDepth')
-        if self.version >= 11:
-            self.read_to('emittanceColor')
-        if self.version >= 15:
-            self.read_to('adaptativeEmissive_ExposureOffset')
-        if self.version >= 16:
-            self.read_to('glowmap')
-        if self.version >= 20:
-            self.read_to('effectPbrSpecular')
+    @classmethod
+    def _layout(cls, L):
+        super()._layout(L)
+        L.read_text('Diffuse')
+        L.read_text('Greyscale')
+        L.read_text('EnvMap')
+        L.read_text('Normal')
+        L.read_text('EnvMapMask')
+        if L.version >= 11:
+            L.read_text('Specular')
+            L.read_text('Lighting')
+            L.read_text('Glow')
+        if L.version >= 10:
+            L.read_to('environmentMappingMaskScale')
+        L.read_to('softDepth')
+        if L.version >= 11:
+            L.read_to('emittanceColor')
+        if L.version >= 15:
+            L.read_to('adaptativeEmissive_ExposureOffset')
+        if L.version >= 16:
+            L.read_to('glowmap')
+        if L.version >= 20:
+            L.read_to('effectPbrSpecular')
 
 
 class TestModule:
@@ -497,4 +628,26 @@ class TestModule:
         m.extract(mdict)
         print(mdict)
 
+    def TEST_MATERIAL_CACHE():
+        import shutil
+        import tempfile
+        srcfile = r"tests\FO4\Materials\actors\Character\BaseHumanMale\test.bgsm"
+        testfile = os.path.join(tempfile.mkdtemp(), "test.bgsm")
+        shutil.copyfile(srcfile, testfile)
+
+        m = load_material(testfile)
+        assert m is load_material(testfile), "Second load comes from the cache"
+        assert m.textures == MaterialFile.Open(srcfile).textures, "Cached material has the textures"
+        assert m.specularColor[:] == [1.0, 0.0, 0.0], f"Have correct specular color: {m.specularColor[:]}"
+        try:
+            m.Alpha = 0.5
+            assert False, "Cached material is read-only"
+        except AttributeError:
+            pass
+
+        st = os.stat(testfile)
+        os.utime(testfile, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert load_material(testfile) is not m, "Changed file is read again"
+        assert load_material(testfile + "x") is None, "Missing file gives no material"
+
     # ----------------------------------------------------------------------
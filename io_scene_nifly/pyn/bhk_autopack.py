@@ -37,6 +37,11 @@ import struct
 import math
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from .convex_hull import _polygon_plane
+from .mesh_segment import segment_mesh
+
 # ── Type aliases ──────────────────────────────────────────────────────────────
 Vert3 = Tuple[float, float, float]
 Face  = List[int]
@@ -708,6 +713,10 @@ _CONVEX_HDR = bytes([
 ])
 assert len(_CONVEX_HDR) == 0x30
 
+# Every polytope we write carries this convex radius (+0x14 above), so it's
+# the padding a simplified hull can lean on.
+POLYTOPE_CONVEX_RADIUS = struct.unpack_from('<f', _CONVEX_HDR, 0x14)[0]
+
 # hknpCompressedMeshShape header (0xC0 bytes).
 #
 # Class layout (hk2014 SDK, via Grimrukh/soulstruct-havok):
@@ -798,6 +807,7 @@ def _w_u16(v: int) -> bytes: return struct.pack('<H', v & 0xFFFF)
 def _w_u32(v: int) -> bytes: return struct.pack('<I', v & 0xFFFFFFFF)
 def _w_u64(v: int) -> bytes: return struct.pack('<Q', v & 0xFFFFFFFFFFFFFFFF)
 def _w_f32(v: float) -> bytes: return struct.pack('<f', v)
+def _round_f32(v: float) -> float: return struct.unpack('<f', struct.pack('<f', v))[0]
 def _w_vec3(x: float, y: float, z: float) -> bytes: return struct.pack('<fff', x, y, z)
 def _w_vec4(x: float, y: float, z: float, w: float) -> bytes:
     return struct.pack('<ffff', x, y, z, w)
@@ -830,22 +840,14 @@ def _face_plane(verts: List[Vert3], face: Face) -> Tuple[float, float, float, fl
 
     Winding is CCW when viewed from outside → normal points outward.
     The plane equation satisfies: nx*x + ny*y + nz*z + d = 0 for a surface point.
-    d = -dot(n, v0).
+    Faces may have any number of corners (merged coplanar hull faces), so the
+    normal comes from all of them (Newell's method), not just the first three.
     """
-    v0 = verts[face[0]]
-    v1 = verts[face[1]]
-    v2 = verts[face[2]]
-    ax, ay, az = v1[0]-v0[0], v1[1]-v0[1], v1[2]-v0[2]
-    bx, by, bz = v2[0]-v0[0], v2[1]-v0[1], v2[2]-v0[2]
-    nx = ay*bz - az*by
-    ny = az*bx - ax*bz
-    nz = ax*by - ay*bx
-    n_len = math.sqrt(nx*nx + ny*ny + nz*nz)
-    if n_len < 1e-10:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nx, ny, nz, d = _polygon_plane(np.asarray(verts, dtype=np.float64), list(face))
+    if not np.isfinite(nz):
         return (0.0, 0.0, 1.0, 0.0)
-    nx, ny, nz = nx/n_len, ny/n_len, nz/n_len
-    d = -(nx*v0[0] + ny*v0[1] + nz*v0[2])
-    return (nx, ny, nz, d)
+    return (float(nx), float(ny), float(nz), -float(d))
 
 
 # ── Convex polytope shape builder ────────────────────────────────────────────
@@ -1078,6 +1080,11 @@ def _build_data_section(verts: List[Vert3], faces: List[Face],
 _CM_MAX_SECTION_VERTS = 255
 _CM_MAX_SECTION_QUADS = 127
 
+# How triangles are grouped into sections: "bisect" (spatial median split) or
+# "grow" (region growing over the face adjacency; fewer sections, fewer
+# vertices duplicated across seams).  See mesh_segment.
+CM_SEGMENT_METHOD = "bisect"
+
 # ── hkcdStaticTree node codecs ───────────────────────────────────────────────
 #
 # Both tree levels quantize a node's AABB against its PARENT's decoded AABB,
@@ -1257,31 +1264,21 @@ def _emit_axis5_tree(root: '_BVNode', dmn, dmx) -> List[bytes]:
     return [bytes(n) for n in out]
 
 
-def _split_cm_sections(verts: List[Vert3],
-                       tris: List[Face]) -> List[Tuple[List[Vert3], List[Face]]]:
-    """Partition a triangle mesh into sections that fit the per-section limits.
+def _cm_tri_groups(verts: List[Vert3], tri_idx: List[List[int]],
+                   method: Optional[str] = None) -> List[List[int]]:
+    """Group triangle indices into runs that each fit one section.
 
-    Returns a list of (section_verts, section_tris) where every section has at
-    most 255 verts and 255 triangles, and section_tris index section_verts.
-    Vertices shared between sections are duplicated into each — cheaper than
-    the shared-vertex (shidx) indirection vanilla uses, and the decoder treats
-    both the same way.
-
-    Triangles are grouped by recursive spatial bisection (split the longest
+    "bisect" groups triangles by recursive spatial bisection (split the longest
     axis of the centroid bounds at the median) so each section stays compact,
-    which keeps its quantization fine.
-
-    A mesh that already fits in one section is returned unchanged, vertex order
-    and triangle order intact, so small collisions pack exactly as before.
-    That fast path also keeps vertices no triangle references; the split path
-    drops them, since sections are built up from the triangles.  Vanilla pads
-    its vertex arrays with unused slots (often at the origin), so dropping them
-    tightens the shape's bounds onto its actual geometry.
+    which keeps its quantization fine.  "grow" hands the job to
+    mesh_segment's region grower, which follows connectivity and needs fewer
+    sections.  method defaults to CM_SEGMENT_METHOD.
     """
-    if len(verts) <= _CM_MAX_SECTION_VERTS and len(tris) <= _CM_MAX_SECTION_QUADS:
-        return [(list(verts), [tuple(int(i) for i in t[:3]) for t in tris])]
+    if (method or CM_SEGMENT_METHOD) == "grow":
+        return segment_mesh(verts, [tuple(t) for t in tri_idx],
+                            max_verts=_CM_MAX_SECTION_VERTS,
+                            max_tris=_CM_MAX_SECTION_QUADS, method="grow")
 
-    tri_idx = [[int(i) for i in t[:3]] for t in tris]
     centroids = [tuple(sum(verts[i][a] for i in t) / 3.0 for a in range(3))
                  for t in tri_idx]
 
@@ -1307,6 +1304,32 @@ def _split_cm_sections(verts: List[Vert3],
         bisect(ordered[half:])
 
     bisect(list(range(len(tri_idx))))
+    return groups
+
+
+def _split_cm_sections(verts: List[Vert3], tris: List[Face],
+                       method: Optional[str] = None
+                       ) -> List[Tuple[List[Vert3], List[Face]]]:
+    """Partition a triangle mesh into sections that fit the per-section limits.
+
+    Returns a list of (section_verts, section_tris) where every section has at
+    most 255 verts and 127 triangles, and section_tris index section_verts.
+    Vertices shared between sections are duplicated into each.  This is the
+    layout with no shared-vertex (shidx) indirection; _plan_cm_sections decides
+    per vertex whether sharing pays.
+
+    A mesh that already fits in one section is returned unchanged, vertex order
+    and triangle order intact, so small collisions pack exactly as before.
+    That fast path also keeps vertices no triangle references; the split path
+    drops them, since sections are built up from the triangles.  Vanilla pads
+    its vertex arrays with unused slots (often at the origin), so dropping them
+    tightens the shape's bounds onto its actual geometry.
+    """
+    if len(verts) <= _CM_MAX_SECTION_VERTS and len(tris) <= _CM_MAX_SECTION_QUADS:
+        return [(list(verts), [tuple(int(i) for i in t[:3]) for t in tris])]
+
+    tri_idx = [[int(i) for i in t[:3]] for t in tris]
+    groups = _cm_tri_groups(verts, tri_idx, method)
 
     sections: List[Tuple[List[Vert3], List[Face]]] = []
     for group in groups:
@@ -1327,6 +1350,176 @@ def _split_cm_sections(verts: List[Vert3],
     return sections
 
 
+# ── Shared vertices ──────────────────────────────────────────────────────────
+#
+# A vertex used by k sections costs 4k bytes duplicated (one packed u32 in each
+# section) or 8 + 2k bytes shared (one 21-21-22 u64 in sharedVertices plus a u16
+# shidx entry in each section).  Sharing only breaks even at k = 4 and pays from
+# k = 5, but a vertex of a grid or terrain mesh touches at most four sections,
+# so on the meshes that get split the most, sharing never makes the packfile
+# smaller; at k = 2 it makes it bigger.  What it buys is watertight seams: both
+# sides of a seam decode to the identical position instead of two separately
+# quantized copies.  So it is opt-in, the export's watertight_collision setting:
+# 0 (the default) duplicates every vertex, the layout _split_cm_sections
+# produces; CM_SHARE_SEAMS (2) shares every seam vertex.
+CM_SHARE_MIN_SECTIONS = 0
+CM_SHARE_SEAMS = 2
+
+# sharedVertices is indexed by the u16 shidx entries.
+_CM_MAX_SHARED_VERTS = 0xFFFF
+
+# Large (shared) vertices quantize against the shape's domain, 21-21-22 bits.
+_CM_LARGE_MAX_Q = ((1 << 21) - 1, (1 << 21) - 1, (1 << 22) - 1)
+
+
+def _plan_cm_sections(verts: List[Vert3], tris: List[Face],
+                      share_min_sections: int):
+    """Partition a mesh into sections, sharing vertices where that is smaller.
+
+    Returns (sections, shared) where shared is the list of global vertex indices
+    stored once in sharedVertices, and each section is (local_gids, shidx,
+    sec_tris): local_gids are the global indices of the vertices packed into
+    the section, shidx indexes `shared`, and sec_tris index the section's
+    vertex list — locals first, then its shared vertices, which is the order
+    the decoder concatenates them in.
+
+    A vertex is shared when at least share_min_sections sections use it.  Every
+    section keeps at least one local vertex: vanilla never writes a section
+    with numPackedVertices 0.  Only called for meshes that need splitting.
+    """
+    tri_idx = [[int(i) for i in t[:3]] for t in tris]
+    groups = _cm_tri_groups(verts, tri_idx)
+    uses: Dict[int, int] = {}
+    for group in groups:
+        for g in {i for ti in group for i in tri_idx[ti]}:
+            uses[g] = uses.get(g, 0) + 1
+
+    candidates = sorted((g for g, k in uses.items() if k >= share_min_sections),
+                        key=lambda g: -uses[g])[:_CM_MAX_SHARED_VERTS]
+    shared_set = set(candidates)
+
+    shared: List[int] = []
+    shared_slot: Dict[int, int] = {}
+    sections = []
+    for group in groups:
+        order: List[int] = []
+        seen = set()
+        for ti in group:
+            for g in tri_idx[ti]:
+                if g not in seen:
+                    seen.add(g)
+                    order.append(g)
+        local_gids = [g for g in order if g not in shared_set]
+        sh_gids = [g for g in order if g in shared_set]
+        if not local_gids:
+            local_gids.append(sh_gids.pop(0))
+        assert len(local_gids) + len(sh_gids) <= _CM_MAX_SECTION_VERTS
+
+        vmap = {g: i for i, g in enumerate(local_gids + sh_gids)}
+        shidx = []
+        for g in sh_gids:
+            if g not in shared_slot:
+                shared_slot[g] = len(shared)
+                shared.append(g)
+            shidx.append(shared_slot[g])
+        sec_tris = [tuple(vmap[g] for g in tri_idx[ti]) for ti in group]
+        sections.append((local_gids, shidx, sec_tris))
+    return sections, shared
+
+
+def _encode_large_vertex(v: Vert3, dmn: Vert3, dmx: Vert3) -> Tuple[int, Vert3]:
+    """Pack one shared vertex as 21-21-22 bits against the shape's domain.
+
+    Returns (packed_u64, decoded_position) — the decoded position is what the
+    engine sees, so trees are built against it.
+    """
+    q = [0, 0, 0]
+    dec = [0.0, 0.0, 0.0]
+    for a in range(3):
+        span = dmx[a] - dmn[a]
+        if span > 0.0:
+            q[a] = min(_CM_LARGE_MAX_Q[a],
+                       max(0, round((v[a] - dmn[a]) / span * _CM_LARGE_MAX_Q[a])))
+            dec[a] = dmn[a] + q[a] * (span / _CM_LARGE_MAX_Q[a])
+        else:
+            dec[a] = dmn[a]
+    return q[0] | (q[1] << 21) | (q[2] << 42), tuple(dec)
+
+
+class _CMSection:
+    """One encoded compressed-mesh section, ready to write.
+
+    mn/mx bound everything the section's quads touch, shared vertices included;
+    base/scale are the codec parameters of its packed (local) vertices only.
+    """
+    __slots__ = ('tris', 'mn', 'mx', 'base', 'scale', 'packed', 'shidx', 'positions')
+
+    def __init__(self, tris, mn, mx, base, scale, packed, shidx, positions):
+        self.tris = tris
+        self.mn, self.mx = mn, mx
+        self.base, self.scale = base, scale
+        self.packed = packed          # u32 11-11-10 per local vertex
+        self.shidx = shidx            # sharedVertices index per shared vertex
+        self.positions = positions    # decoded positions, locals then shared
+
+
+def _encode_cm_sections(verts: List[Vert3], tris: List[Face],
+                        share_min_sections: int):
+    """Split and quantize a mesh for _write_cm_shape.
+
+    Returns (sections, shared_packed, dmn, dmx): a list of _CMSection, the u64
+    sharedVertices payload, and the shape's domain.  With sharing off this is
+    exactly the _split_cm_sections layout.
+    """
+    def dequantize(base, scale, packed):
+        return [(base[0] + (p & 0x7FF) * scale[0],
+                 base[1] + ((p >> 11) & 0x7FF) * scale[1],
+                 base[2] + ((p >> 22) & 0x3FF) * scale[2]) for p in packed]
+
+    if share_min_sections < 2:
+        out = []
+        for s_verts, s_tris in _split_cm_sections(verts, tris):
+            mn, mx, scale, packed = _quantize_section(s_verts)
+            out.append(_CMSection(s_tris, mn, mx, mn, scale, packed, [],
+                                  dequantize(mn, scale, packed)))
+        dmn = tuple(min(s.mn[a] for s in out) for a in range(3))
+        dmx = tuple(max(s.mx[a] for s in out) for a in range(3))
+        return out, [], dmn, dmx
+
+    if len(verts) <= _CM_MAX_SECTION_VERTS and len(tris) <= _CM_MAX_SECTION_QUADS:
+        # Fits one section: nothing to share, and keep the single-section fast
+        # path's vertex order (unreferenced vertices included).
+        return _encode_cm_sections(verts, tris, 0)
+
+    plan, shared = _plan_cm_sections(verts, tris, share_min_sections)
+
+    # The domain must be fixed before the shared vertices are encoded against
+    # it, so take it from the source positions rather than from the sections.
+    # It is written as float32 and the engine decodes against that, so encode
+    # against the rounded values too.
+    used = {g for local_gids, _, _ in plan for g in local_gids} | set(shared)
+    dmn = tuple(_round_f32(min(verts[g][a] for g in used)) for a in range(3))
+    dmx = tuple(_round_f32(max(verts[g][a] for g in used)) for a in range(3))
+
+    shared_packed: List[int] = []
+    shared_pos: List[Vert3] = []
+    for g in shared:
+        pk, pos = _encode_large_vertex(verts[g], dmn, dmx)
+        shared_packed.append(pk)
+        shared_pos.append(pos)
+
+    out = []
+    for local_gids, shidx, s_tris in plan:
+        base, lmx, scale, packed = _quantize_section([verts[g] for g in local_gids])
+        positions = dequantize(base, scale, packed) + [shared_pos[k] for k in shidx]
+        mn = tuple(min([base[a]] + [p[a] for p in positions[len(packed):]])
+                   for a in range(3))
+        mx = tuple(max([lmx[a]] + [p[a] for p in positions[len(packed):]])
+                   for a in range(3))
+        out.append(_CMSection(s_tris, mn, mx, base, scale, packed, shidx, positions))
+    return out, shared_packed, dmn, dmx
+
+
 def _quantize_section(verts: List[Vert3]):
     """Return (aabb_min, aabb_max, scale, packed) for one section's vertices.
 
@@ -1355,13 +1548,14 @@ def _quantize_section(verts: List[Vert3]):
 def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
                     name_offs: Dict[str, int],
                     verts: List[Vert3], tris: List[Face],
-                    body_cinfo_rel: int, shape_entry_rel: int) -> None:
+                    body_cinfo_rel: int, shape_entry_rel: int,
+                    share_min_sections: Optional[int] = None) -> None:
     """Append one hknpCompressedMeshShape body to a __data__ section.
 
     Writes the shape header, its hkRefCountedProperties/hknpBSMaterialProperties,
     and an hknpCompressedMeshShapeData split into as many sections as the
     geometry needs.  body_cinfo_rel/shape_entry_rel are THIS body's entries in
-    the PSD prefix.
+    the PSD prefix.  share_min_sections overrides CM_SHARE_MIN_SECTIONS.
     """
     assert len(verts) > 0 and len(tris) > 0
 
@@ -1406,39 +1600,36 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
         data.append(0)
 
     # ── Split into sections and encode each one ────────────────────────────
-    sections = _split_cm_sections(verts, tris)
-    encoded = [(s_tris,) + _quantize_section(s_verts) for s_verts, s_tris in sections]
-
-    total_quads = sum(len(t) for t, _, _, _, _ in encoded)
-    total_verts = sum(len(p) for _, _, _, _, p in encoded)
+    if share_min_sections is None:
+        share_min_sections = CM_SHARE_MIN_SECTIONS
+    encoded, shared_packed, dmn, dmx = _encode_cm_sections(
+        verts, tris, share_min_sections)
+
+    total_quads = sum(len(s.tris) for s in encoded)
+    total_verts = sum(len(s.packed) for s in encoded)
+    total_shidx = sum(len(s.shidx) for s in encoded)
+    total_shared = len(shared_packed)
     n_sec = len(encoded)
 
-    # Whole-shape AABB spans every section.
-    dmn = tuple(min(mn[a] for _, mn, _, _, _ in encoded) for a in range(3))
-    dmx = tuple(max(mx[a] for _, _, mx, _, _ in encoded) for a in range(3))
-
     # ── Per-section BVHs (Codec3Axis4) ─────────────────────────────────────
     # The engine walks these at load; leaving them empty is a null-pointer
     # crash inside hkcdStaticMeshTree, not merely a slow query.
     sec_trees: List[List[bytes]] = []
-    for s_tris, mn, mx, scale, packed in encoded:
+    for sec in encoded:
         # Build against the DEQUANTIZED positions — what the engine actually
         # sees.  Using the pre-quantization positions yields node boxes that are
         # a fraction too tight, so a decoded vertex can sit outside its own leaf.
-        s_verts = [(mn[0] + (p & 0x7FF) * scale[0],
-                    mn[1] + ((p >> 11) & 0x7FF) * scale[1],
-                    mn[2] + ((p >> 22) & 0x3FF) * scale[2]) for p in packed]
         boxes = []
-        for qi, tri in enumerate(s_tris):
-            pts = [s_verts[i] for i in tri]
+        for qi, tri in enumerate(sec.tris):
+            pts = [sec.positions[i] for i in tri]
             boxes.append((qi,
                           tuple(min(p[a] for p in pts) for a in range(3)),
                           tuple(max(p[a] for p in pts) for a in range(3))))
-        sec_trees.append(_emit_axis4_tree(_build_bvh(boxes), mn, mx))
+        sec_trees.append(_emit_axis4_tree(_build_bvh(boxes), sec.mn, sec.mx))
 
     # ── Top-level BVH over the sections (Codec3Axis5) ──────────────────────
     top_tree = _emit_axis5_tree(
-        _build_bvh([(i, mn, mx) for i, (_, mn, mx, _, _) in enumerate(encoded)]),
+        _build_bvh([(i, sec.mn, sec.mx) for i, sec in enumerate(encoded)]),
         dmn, dmx)
     # Which top-level node is each section's leaf?  Leaves carry the section
     # index in their data field; internal nodes have bit 15 set.
@@ -1458,7 +1649,7 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
     # count; getting this wrong truncates bitsPerKey and the engine then decodes
     # a bogus section index (verified against 2998/3000 vanilla shapes).
     n_keys = total_quads
-    last_nq = len(encoded[-1][0]) if encoded else 0
+    last_nq = len(encoded[-1].tris) if encoded else 0
     max_key = (((n_sec - 1) << 8) | ((last_nq - 1) << 1)) if last_nq else 0
     bits_per_key = (max_key + 1).bit_length()
 
@@ -1475,7 +1666,9 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
     quads_rel     = _align4(off)
     runs_rel      = quads_rel + 4 * total_quads
     verts_rel     = runs_rel + 4 * n_runs
-    simd_rel      = _align16(verts_rel + 4 * total_verts)
+    shidx_rel     = verts_rel + 4 * total_verts
+    shared_rel    = _align16(shidx_rel + 2 * total_shidx)
+    simd_rel      = _align16(shared_rel + 8 * total_shared)
     # Shape-level bitmaps, sized against OUR key space (not the source mesh's —
     # we section differently, so the key space differs).
     n_quad_slots  = (max_key + 2) // 2
@@ -1499,10 +1692,12 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
     struct.pack_into('<QII', sd, 0x50, 0, n_sec, n_sec | 0x80000000)   # sections
     struct.pack_into('<QII', sd, 0x60, 0, total_quads,
                      total_quads | 0x80000000)                         # primitives
-    struct.pack_into('<QII', sd, 0x70, 0, 0, 0x80000000)               # shidx
+    struct.pack_into('<QII', sd, 0x70, 0, total_shidx,
+                     total_shidx | 0x80000000)                         # shidx
     struct.pack_into('<QII', sd, 0x80, 0, total_verts,
                      total_verts | 0x80000000)                         # packedVertices
-    struct.pack_into('<QII', sd, 0x90, 0, 0, 0x80000000)               # sharedVertices
+    struct.pack_into('<QII', sd, 0x90, 0, total_shared,
+                     total_shared | 0x80000000)                        # sharedVertices
     struct.pack_into('<QII', sd, 0xA0, 0, n_runs, n_runs | 0x80000000)  # dataRuns
     # simdTree (+0xB0): an hkArray at +0xB8 holding two empty-AABB nodes.  The
     # count must be matched by real data — vanilla points it at 32 bytes of
@@ -1516,6 +1711,9 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
     fx.add_local(sd_rel + 0x50, sections_rel)
     fx.add_local(sd_rel + 0x60, quads_rel)
     fx.add_local(sd_rel + 0x80, verts_rel)
+    if total_shidx:
+        fx.add_local(sd_rel + 0x70, shidx_rel)
+        fx.add_local(sd_rel + 0x90, shared_rel)
     fx.add_local(sd_rel + 0xA0, runs_rel)
     fx.add_local(sd_rel + 0xB8, simd_rel)
 
@@ -1528,9 +1726,11 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
     # ── Section structs (0x60 bytes each) ──────────────────────────────────
     first_vert = 0
     first_quad = 0
-    for i, (s_tris, mn, mx, scale, packed) in enumerate(encoded):
-        nv, nt = len(packed), len(s_tris)
-        assert nv <= _CM_MAX_SECTION_VERTS and nt <= _CM_MAX_SECTION_QUADS
+    first_shidx = 0
+    for i, s in enumerate(encoded):
+        nv, nt, ns = len(s.packed), len(s.tris), len(s.shidx)
+        mn, mx = s.mn, s.mx
+        assert nv + ns <= _CM_MAX_SECTION_VERTS and nt <= _CM_MAX_SECTION_QUADS
 
         sec = bytearray(0x60)
         struct.pack_into('<QII', sec, 0x00, 0, len(sec_trees[i]),
@@ -1538,17 +1738,17 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
         fx.add_local(sections_rel + i * 0x60, sectree_offs[i])
         struct.pack_into('<ffff', sec, 0x10, mn[0], mn[1], mn[2], 0.0)  # domain min
         struct.pack_into('<ffff', sec, 0x20, mx[0], mx[1], mx[2], 0.0)  # domain max
-        struct.pack_into('<fff',  sec, 0x30, mn[0], mn[1], mn[2])       # codecParms base
-        struct.pack_into('<fff',  sec, 0x3C, *scale)                    # codecParms scale
+        struct.pack_into('<fff',  sec, 0x30, *s.base)                   # codecParms base
+        struct.pack_into('<fff',  sec, 0x3C, *s.scale)                  # codecParms scale
         struct.pack_into('<I',    sec, 0x48, first_vert)                # firstPackedVertex
-        # +0x4C packs (firstSharedVertexIndex << 8) | numPackedVertices; with no
-        # shared vertices the index is 0, so this is just the count.  Vanilla
-        # stores the count here AND at +0x58 — write both.
-        struct.pack_into('<I',    sec, 0x4C, nv)                        # sharedVertices
+        # +0x4C packs (firstSharedVertexIndex << 8) | numPackedVertices, where
+        # the index is this section's first entry in shidx.  Vanilla stores the
+        # count here AND at +0x58 — write both.
+        struct.pack_into('<I',    sec, 0x4C, (first_shidx << 8) | nv)   # sharedVertices
         struct.pack_into('<I',    sec, 0x50, (first_quad << 8) | nt)    # primitives
         struct.pack_into('<I',    sec, 0x54, (i << 8) | 1)              # dataRuns
         sec[0x58] = nv                                                  # numPackedVertices
-        sec[0x59] = 0                                                   # numSharedIndices
+        sec[0x59] = ns                                                  # numSharedIndices
         struct.pack_into('<H', sec, 0x5A, leaf_index.get(i, 0))         # leafIndex
         sec[0x5C] = 0                                                   # page
         sec[0x5D] = 0                                                   # flags (vanilla: 0)
@@ -1556,6 +1756,7 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
 
         first_vert += nv
         first_quad += nt
+        first_shidx += ns
     assert rel() == sectree_rel
 
     # ── Per-section tree nodes ─────────────────────────────────────────────
@@ -1566,20 +1767,30 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
         data.append(0)
 
     # ── Quad data: each triangle (a,b,c) is a degenerate quad [a,b,c,c] ────
-    for s_tris, _, _, _, _ in encoded:
-        for a, b, c in s_tris:
+    for s in encoded:
+        for a, b, c in s.tris:
             data.extend(bytes([a, b, c, c]))
     assert rel() == runs_rel
 
     # ── Primitive data runs: one per section, covering all of its quads ────
-    for s_tris, _, _, _, _ in encoded:
-        data.extend(struct.pack('<HBB', 0, 0, len(s_tris)))
+    for s in encoded:
+        data.extend(struct.pack('<HBB', 0, 0, len(s.tris)))
     assert rel() == verts_rel
 
     # ── Packed vertex data ─────────────────────────────────────────────────
-    for _, _, _, _, packed in encoded:
-        for pv in packed:
+    for s in encoded:
+        for pv in s.packed:
             data.extend(struct.pack('<I', pv))
+    assert rel() == shidx_rel
+
+    # ── Shared vertices: per-section shidx slices, then the u64 payload ────
+    for s in encoded:
+        for k in s.shidx:
+            data.extend(struct.pack('<H', k))
+    while rel() < shared_rel:
+        data.append(0)
+    for pv in shared_packed:
+        data.extend(struct.pack('<Q', pv))
     while rel() < simd_rel:
         data.append(0)
 
@@ -1630,7 +1841,9 @@ def _write_cm_shape(data: bytearray, fx: '_FixupBuilder',
 def _build_cm_data_section(verts: List[Vert3], tris: List[Face],
                             name_offs: Dict[str, int],
                             physics=None,
-                            transform=None) -> Tuple[bytes, '_FixupBuilder']:
+                            transform=None,
+                            share_min_sections: Optional[int] = None
+                            ) -> Tuple[bytes, '_FixupBuilder']:
     """Build the full __data__ section for a one-body compressed mesh packfile."""
     fx = _FixupBuilder()
     data = bytearray()
@@ -1640,13 +1853,16 @@ def _build_cm_data_section(verts: List[Vert3], tris: List[Face],
         body_transforms=[transform])
 
     _write_cm_shape(data, fx, name_offs, verts, tris,
-                    body_cinfo_rel, shape_entry_rel)
+                    body_cinfo_rel, shape_entry_rel,
+                    share_min_sections=share_min_sections)
 
     return bytes(data), fx
 
 
 def _build_multi_cm_data_section(cm_shapes, name_offs: Dict[str, int],
-                                 physics=None) -> Tuple[bytes, '_FixupBuilder']:
+                                 physics=None,
+                                 share_min_sections: Optional[int] = None
+                                 ) -> Tuple[bytes, '_FixupBuilder']:
     """Build the __data__ section for a packfile of N compressed-mesh bodies."""
     fx = _FixupBuilder()
     data = bytearray()
@@ -1659,7 +1875,8 @@ def _build_multi_cm_data_section(cm_shapes, name_offs: Dict[str, int],
     for i, s in enumerate(cm_shapes):
         _write_cm_shape(data, fx, name_offs, s.verts, s.faces,
                         body_cinfo_rel + i * 0x60,
-                        shape_entry_rel + i * _REF_OBJ_SIZE)
+                        shape_entry_rel + i * _REF_OBJ_SIZE,
+                        share_min_sections=share_min_sections)
 
     return bytes(data), fx
 
@@ -1671,7 +1888,8 @@ def _build_mixed_data_section(
         poly_verts: List[Vert3], poly_faces: List[Face],
         name_offs: Dict[str, int],
         physics=None, cm_body: int = 0,
-        body_transforms=None) -> Tuple[bytes, '_FixupBuilder']:
+        body_transforms=None,
+        share_min_sections: Optional[int] = None) -> Tuple[bytes, '_FixupBuilder']:
     """Build __data__ section for a two-body packfile: CM body + polytope body.
 
     cm_body picks which BODY SLOT the compressed mesh occupies.  A body's slot
@@ -1701,7 +1919,8 @@ def _build_mixed_data_section(
     # ── hknpCompressedMeshShape and its shape data ───────────────────────────
     _write_cm_shape(data, fx, name_offs, cm_verts, cm_tris,
                     body_cinfo_rel + cm_body * 0x60,
-                    shape_entry_rel + cm_body * _REF_OBJ_SIZE)
+                    shape_entry_rel + cm_body * _REF_OBJ_SIZE,
+                    share_min_sections=share_min_sections)
 
     # ── hknpConvexPolytopeShape (variable) ───────────────────────────────────
     poly_shape_rel = rel()
@@ -1852,18 +2071,24 @@ def _file_header(cn_name_off: int) -> bytes:
 # ── Public API ────────────────────────────────────────────────────────────────
 
 def pack_compressed_mesh(verts: List[Vert3], tris: List[Face],
-                         physics=None, transform=None) -> bytes:
+                         physics=None, transform=None,
+                         share_min_sections: Optional[int] = None) -> bytes:
     """Build Havok packfile bytes from a triangle mesh using hknpCompressedMeshShape.
 
     Each triangle (a, b, c) is stored as a degenerate quad [a, b, c, c].  A
-    section holds at most 255 verts and 255 quads, so larger meshes are split
+    section holds at most 255 verts and 127 quads, so larger meshes are split
     across sections, each quantized to 11-11-10 bits against its own bounding
-    box.
+    box.  Vertices on section seams are copied into each section unless
+    share_min_sections asks for them to go into the shape's sharedVertices.
 
     Args:
         verts: List of (x, y, z) tuples in Havok space.
         tris:  List of (a, b, c) triangle index tuples.
         physics: Optional PhysicsProps for mass/inertia/material.
+        share_min_sections: Share a vertex once this many sections use it;
+            0 duplicates every vertex.  Defaults to CM_SHARE_MIN_SECTIONS,
+            which is 0: sharing makes seams watertight, not files smaller.
+            CM_SHARE_SEAMS shares every seam vertex.
 
     Returns:
         Raw bytes of a valid hk_2014.1.0 packfile containing an
@@ -1874,7 +2099,8 @@ def pack_compressed_mesh(verts: List[Vert3], tris: List[Face],
     cn_name_off = name_offs['hknpPhysicsSystemData']
 
     obj_data, fx = _build_cm_data_section(verts, tris, name_offs, physics=physics,
-                                          transform=transform)
+                                          transform=transform,
+                                          share_min_sections=share_min_sections)
 
     local_tbl  = fx.build_local_table()
     global_tbl = fx.build_global_table()
@@ -1916,7 +2142,31 @@ def pack_compressed_mesh(verts: List[Vert3], tris: List[Face],
     return hdr + shdr0 + shdr1 + shdr2 + cn_data + data_section
 
 
-def pack_multi_cm(cm_shapes, physics=None) -> bytes:
+def compare_cm_packing(verts: List[Vert3], tris: List[Face],
+                       share_min_sections: int = CM_SHARE_SEAMS) -> Dict[str, int]:
+    """Compare a compressed mesh packed with and without shared vertices.
+
+    By default every seam vertex is shared, as watertight_collision exports do.
+
+    Returns a dict of byte and vertex counts: 'duplicated' and 'shared' are the
+    packfile sizes, 'packed_verts'/'shared_verts'/'shidx' describe the shared
+    layout, and 'dup_verts' is the packed vertex count of the duplicating one.
+    """
+    dup_secs, _, _, _ = _encode_cm_sections(verts, tris, 0)
+    sh_secs, shared, _, _ = _encode_cm_sections(verts, tris, share_min_sections)
+    return {
+        'duplicated': len(pack_compressed_mesh(verts, tris, share_min_sections=0)),
+        'shared': len(pack_compressed_mesh(verts, tris,
+                                           share_min_sections=share_min_sections)),
+        'dup_verts': sum(len(s.packed) for s in dup_secs),
+        'packed_verts': sum(len(s.packed) for s in sh_secs),
+        'shared_verts': len(shared),
+        'shidx': sum(len(s.shidx) for s in sh_secs),
+    }
+
+
+def pack_multi_cm(cm_shapes, physics=None,
+                  share_min_sections: Optional[int] = None) -> bytes:
     """Build Havok packfile bytes for N bodies, each an hknpCompressedMeshShape.
 
     Vanilla uses this for things like damaged architecture, where one physics
@@ -1925,11 +2175,13 @@ def pack_multi_cm(cm_shapes, physics=None) -> bytes:
     Args:
         cm_shapes: List of CollisionShape objects, all shape_type=="compressed_mesh".
         physics:   Optional PhysicsProps for mass/inertia/material.
+        share_min_sections: As for pack_compressed_mesh.
     """
     cn_data, name_offs = _build_classnames_cm()
     cn_name_off = name_offs['hknpPhysicsSystemData']
 
-    obj_data, fx = _build_multi_cm_data_section(cm_shapes, name_offs, physics=physics)
+    obj_data, fx = _build_multi_cm_data_section(cm_shapes, name_offs, physics=physics,
+                                                share_min_sections=share_min_sections)
 
     local_tbl  = fx.build_local_table()
     global_tbl = fx.build_global_table()
@@ -1972,7 +2224,8 @@ def pack_multi_cm(cm_shapes, physics=None) -> bytes:
 
 
 def pack_mixed(cm_shape, poly_shape, physics=None, cm_body: int = 0,
-               body_transforms=None) -> bytes:
+               body_transforms=None,
+               share_min_sections: Optional[int] = None) -> bytes:
     """Build Havok packfile bytes for two bodies: one CM + one convex polytope.
 
     Args:
@@ -1980,6 +2233,7 @@ def pack_mixed(cm_shape, poly_shape, physics=None, cm_body: int = 0,
         poly_shape: CollisionShape with shape_type=="polytope".
         physics:    PhysicsProps, or one per body in BODY-SLOT order.
         cm_body:    which body slot the compressed mesh takes (0 or 1).
+        share_min_sections: As for pack_compressed_mesh.
 
     Returns:
         Raw bytes of a valid hk_2014.1.0 packfile with hknpPhysicsSystemData
@@ -1992,7 +2246,8 @@ def pack_mixed(cm_shape, poly_shape, physics=None, cm_body: int = 0,
         cm_shape.verts, cm_shape.faces,
         poly_shape.verts, poly_shape.faces,
         name_offs, physics=physics, cm_body=cm_body,
-        body_transforms=body_transforms)
+        body_transforms=body_transforms,
+        share_min_sections=share_min_sections)
 
     local_tbl  = fx.build_local_table()
     global_tbl = fx.build_global_table()
@@ -2338,7 +2593,7 @@ def pack_multi_polytope(poly_shapes, physics=None) -> bytes:
     return hdr + shdr0 + shdr1 + shdr2 + cn_data + data_section
 
 
-def pack_shapes(shapes) -> bytes:
+def pack_shapes(shapes, share_min_sections: Optional[int] = None) -> bytes:
     """Pack a list of CollisionShape objects into Havok packfile bytes.
 
     Supported shape compositions (matching what the decoder can produce):
@@ -2354,6 +2609,7 @@ def pack_shapes(shapes) -> bytes:
 
     Args:
         shapes: List of CollisionShape objects (from bhk_autounpack).
+        share_min_sections: For compressed meshes, as for pack_compressed_mesh.
     Returns:
         Raw Havok packfile bytes suitable for bhkPhysicsSystem.data.
     Raises:
@@ -2365,7 +2621,8 @@ def pack_shapes(shapes) -> bytes:
         s = shapes[0]
         if s.shape_type == "compressed_mesh":
             return pack_compressed_mesh(s.verts, s.faces, physics=physics,
-                                        transform=s.transform)
+                                        transform=s.transform,
+                                        share_min_sections=share_min_sections)
         if s.shape_type == "polytope":
             return pack_convex_polytope(s.verts, s.faces, physics=physics,
                                         transform=s.transform)
@@ -2386,7 +2643,8 @@ def pack_shapes(shapes) -> bytes:
                                    physics=[s.physics for s in poly_list])
 
     if len(cm_list) == len(shapes):
-        return pack_multi_cm(cm_list, physics=[s.physics for s in cm_list])
+        return pack_multi_cm(cm_list, physics=[s.physics for s in cm_list],
+                             share_min_sections=share_min_sections)
 
     if len(cm_list) == 1 and len(poly_list) == 1 and len(shapes) == 2:
         # Keep the bodies in the order they came in: a bhkNPCollisionObject
@@ -2395,7 +2653,8 @@ def pack_shapes(shapes) -> bytes:
         return pack_mixed(cm_list[0], poly_list[0],
                           physics=[s.physics for s in shapes],
                           cm_body=shapes.index(cm_list[0]),
-                          body_transforms=[s.transform for s in shapes])
+                          body_transforms=[s.transform for s in shapes],
+                          share_min_sections=share_min_sections)
 
     types = [s.shape_type for s in shapes]
     raise NotImplementedError(
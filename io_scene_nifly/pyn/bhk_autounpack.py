@@ -19,6 +19,7 @@ Notes:
 
 Pure packfile parsing — no heuristics, no buffer scoring, no guessing.
 Uses local/virtual fixups and known hknpCompressedMeshShapeData layout.
+Vertex and quad buffers are decoded with NumPy, a whole shape at a time.
 
 hknpCompressedMeshShapeData layout (hk_2014.1.0):
   +0x10: hkArray<Section*>  (unused here)
@@ -55,13 +56,17 @@ hknpConvexPolytopeShape layout (hk_2014.1.0):
   +0x48: [u16 numFVI,      u16 fviOffset]        base = +0x48
 """
 
+import hashlib
 import struct
 import sys
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Dict, List, Optional, Tuple
 import math
 from pathlib import Path
 
+import numpy as np
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
 def u8(data: bytes, off: int) -> int:
@@ -132,6 +137,41 @@ def unpack_vertex(v: int) -> Tuple[int, int, int]:
     return (v & 0x7FF), ((v >> 11) & 0x7FF), ((v >> 22) & 0x3FF)
 
 
+def _buffer(data: bytes, buf_abs: int, count: int, dtype: str) -> np.ndarray:
+    """count elements of dtype at buf_abs, clipped to the end of data."""
+    size = np.dtype(dtype).itemsize
+    count = max(0, min(count, (len(data) - buf_abs) // size))
+    return np.frombuffer(data, dtype=dtype, count=count, offset=buf_abs if count else 0)
+
+
+def _as_tuples(arr: np.ndarray) -> list:
+    """Rows of a 2D array as tuples of Python scalars."""
+    if arr.shape[0] == 0:
+        return []
+    return list(zip(*(arr[:, k].tolist() for k in range(arr.shape[1]))))
+
+
+def _ranges(starts: np.ndarray, lens: np.ndarray) -> np.ndarray:
+    """starts[i] + arange(lens[i]) for every i, concatenated."""
+    total = int(lens.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offs = np.cumsum(lens) - lens
+    return np.repeat(starts - offs, lens) + np.arange(total)
+
+
+def _large_vertex_array(data: bytes, buf_abs: int, count: int,
+                        bb_min: Tuple[float, float, float],
+                        bb_max: Tuple[float, float, float]) -> np.ndarray:
+    """decode_large_vertices as an (n, 3) array."""
+    v = _buffer(data, buf_abs, count, '<u8')
+    q = np.stack([v & 0x1FFFFF, (v >> 21) & 0x1FFFFF, (v >> 42) & 0x3FFFFF], axis=1)
+    lo = np.array(bb_min, dtype=np.float64)
+    step = (np.array(bb_max, dtype=np.float64) - lo) / np.array(
+        [(1 << 21) - 1, (1 << 21) - 1, (1 << 22) - 1], dtype=np.float64)
+    return lo + q.astype(np.float64) * step
+
+
 def decode_large_vertices(data: bytes, buf_abs: int, count: int,
                           bb_min: Tuple[float, float, float],
                           bb_max: Tuple[float, float, float]) -> List[Vert3]:
@@ -140,22 +180,7 @@ def decode_large_vertices(data: bytes, buf_abs: int, count: int,
     Uses the object-level AABB for quantization boundaries.
     Format: x = bits[0:20], y = bits[21:41], z = bits[42:63].
     """
-    verts: List[Vert3] = []
-    sx = (bb_max[0] - bb_min[0]) / ((1 << 21) - 1)
-    sy = (bb_max[1] - bb_min[1]) / ((1 << 21) - 1)
-    sz = (bb_max[2] - bb_min[2]) / ((1 << 22) - 1)
-    for i in range(count):
-        off = buf_abs + i * 8
-        if off + 8 > len(data):
-            break
-        v = u64(data, off)
-        qx = v & 0x1FFFFF
-        qy = (v >> 21) & 0x1FFFFF
-        qz = (v >> 42) & 0x3FFFFF
-        verts.append((bb_min[0] + qx * sx,
-                      bb_min[1] + qy * sy,
-                      bb_min[2] + qz * sz))
-    return verts
+    return _as_tuples(_large_vertex_array(data, buf_abs, count, bb_min, bb_max))
 
 # ── packfile parsing ─────────────────────────────────────────────────────────
 
@@ -593,58 +618,49 @@ def hkarray_size(data: bytes, obj_abs: int, field_off: int) -> int:
 # ── mesh extraction ──────────────────────────────────────────────────────────
 
 
+def _vertex_array(data: bytes, buf_abs: int, count: int,
+                  base: Tuple[float, float, float],
+                  scale: Tuple[float, float, float]) -> np.ndarray:
+    """decode_vertices as an (n, 3) array."""
+    v = _buffer(data, buf_abs, count, '<u4')
+    q = np.stack([v & 0x7FF, (v >> 11) & 0x7FF, (v >> 22) & 0x3FF], axis=1)
+    return (np.array(base, dtype=np.float64)
+            + q.astype(np.float64) * np.array(scale, dtype=np.float64))
+
+
 def decode_vertices(data: bytes, buf_abs: int, count: int,
                     base: Tuple[float, float, float],
                     scale: Tuple[float, float, float]) -> List[Vert3]:
     """Decode count packed 11-11-10 vertices."""
-    verts: List[Vert3] = []
-    bx, by, bz = base
-    sx, sy, sz = scale
-    for i in range(count):
-        off = buf_abs + i * 4
-        if off + 4 > len(data):
-            break
-        v = u32(data, off)
-        qx, qy, qz = unpack_vertex(v)
-        verts.append((bx + qx * sx, by + qy * sy, bz + qz * sz))
-    return verts
+    return _as_tuples(_vertex_array(data, buf_abs, count, base, scale))
+
+
+def _quad_tris(data: bytes, buf_abs: int, count: int, num_local: int,
+               dtype: str) -> np.ndarray:
+    """Quads as an (n, 3) array of triangles, in quad order.
+
+    Each quad (a, b, c, d) is the triangles (a, b, c) and (a, c, d); a quad
+    with c == d is really a triangle and yields only the first.  Quads that
+    index past num_local are dropped.
+    """
+    q = _buffer(data, buf_abs, count * 4, dtype)
+    q = q[:len(q) // 4 * 4].reshape(-1, 4).astype(np.int64)
+    q = q[q.max(axis=1, initial=-1) < num_local]
+    pairs = np.stack([q[:, [0, 1, 2]], q[:, [0, 2, 3]]], axis=1)
+    keep = np.stack([np.ones(len(q), dtype=bool), q[:, 2] != q[:, 3]], axis=1)
+    return pairs[keep]
 
 
 def decode_quads_u8(data: bytes, buf_abs: int, count: int,
                     num_local: int) -> List[Tri]:
     """Decode quads with u8 indices, emit triangles."""
-    tris: List[Tri] = []
-    for i in range(count):
-        off = buf_abs + i * 4
-        if off + 4 > len(data):
-            break
-        a, b, c, d = data[off], data[off + 1], data[off + 2], data[off + 3]
-        if max(a, b, c, d) >= num_local:
-            continue
-        tris.append((a, b, c))
-        if c != d:
-            tris.append((a, c, d))
-    return tris
+    return _as_tuples(_quad_tris(data, buf_abs, count, num_local, 'u1'))
 
 
 def decode_quads_u16(data: bytes, buf_abs: int, count: int,
                      num_local: int) -> List[Tri]:
     """Decode quads with u16 indices, emit triangles."""
-    tris: List[Tri] = []
-    for i in range(count):
-        off = buf_abs + i * 8
-        if off + 8 > len(data):
-            break
-        a = u16(data, off)
-        b = u16(data, off + 2)
-        c = u16(data, off + 4)
-        d = u16(data, off + 6)
-        if max(a, b, c, d) >= num_local:
-            continue
-        tris.append((a, b, c))
-        if c != d:
-            tris.append((a, c, d))
-    return tris
+    return _as_tuples(_quad_tris(data, buf_abs, count, num_local, '<u2'))
 
 
 def detect_index_format(data: bytes, quad_abs: int, num_quads: int,
@@ -653,24 +669,88 @@ def detect_index_format(data: bytes, quad_abs: int, num_quads: int,
     if num_local > 255:
         return "u16"
 
-    # Sample quads as u8 and u16, count out-of-range indices
+    # Sample quads as u8 and u16, count out-of-range indices.  Only whole
+    # quads count, as a partial one at the end of the data never did.
     sample = min(num_quads, 256)
-    bad_u8 = 0
-    bad_u16 = 0
-    for i in range(sample):
-        off8 = quad_abs + i * 4
-        if off8 + 4 <= len(data):
-            for j in range(4):
-                if data[off8 + j] >= num_local:
-                    bad_u8 += 1
-        off16 = quad_abs + i * 8
-        if off16 + 8 <= len(data):
-            for j in range(4):
-                if u16(data, off16 + j * 2) >= num_local:
-                    bad_u16 += 1
+    as_u8 = _buffer(data, quad_abs, sample * 4, 'u1')
+    as_u16 = _buffer(data, quad_abs, sample * 4, '<u2')
+    bad_u8 = int(np.count_nonzero(as_u8[:len(as_u8) // 4 * 4] >= num_local))
+    bad_u16 = int(np.count_nonzero(as_u16[:len(as_u16) // 4 * 4] >= num_local))
     return "u16" if (bad_u16 < bad_u8) else "u8"
 
 
+def _decode_cm_sections(data: bytes, secs: List[dict],
+                        verts_abs: int, quads_abs: int,
+                        shidx_abs: Optional[int], total_shidx: int,
+                        large: Optional[np.ndarray],
+                        idx_dtype: str = 'u1') -> Tuple[np.ndarray, np.ndarray]:
+    """Decode every section of one compressed mesh in a single pass.
+
+    Each section contributes its packed vertices, then its shared ones
+    (large, the shape's decoded 21-21-22 array, or None to skip them), then
+    its quads as triangles indexing that run.  Equivalent to decode_vertices
+    and decode_quads_* section by section, without a Python loop per section:
+    a settlement piece has hundreds.  Returns (verts, tris) arrays.
+    """
+    def col(key):
+        return np.array([sec[key] for sec in secs], dtype=np.int64).reshape(-1)
+
+    num_q, num_v, num_sh = col("num_quads"), col("num_vertices"), col("num_shared")
+    keep = (num_q != 0) & ((num_v != 0) | (num_sh != 0))
+    secs = [sec for sec, k in zip(secs, keep) if k]
+    if not secs:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+    first_v, num_v = col("first_vertex"), col("num_vertices")
+    first_q, num_q = col("first_quad"), col("num_quads")
+    first_sh, num_sh = col("first_shared"), col("num_shared")
+    base = np.array([sec["base"] for sec in secs], dtype=np.float64)
+    scale = np.array([sec["scale"] for sec in secs], dtype=np.float64)
+
+    # Packed 11-11-10 vertices; reads past the end of the data come up short.
+    packed = _buffer(data, verts_abs, (len(data) - verts_abs) // 4, '<u4')
+    nloc = np.clip(np.minimum(num_v, len(packed) - first_v), 0, None)
+    v = packed[_ranges(first_v, nloc)]
+    q = np.stack([v & 0x7FF, (v >> 11) & 0x7FF, (v >> 22) & 0x3FF], axis=1)
+    local = np.repeat(base, nloc, axis=0) + q.astype(np.float64) * np.repeat(scale, nloc, axis=0)
+
+    # Shared vertices, through the shidx table when there is one.  Slots
+    # either can't fill decode as the origin.
+    nsh = np.clip(num_sh, 0, None) if large is not None else np.zeros_like(num_sh)
+    shared = np.zeros((int(nsh.sum()), 3))
+    if len(shared):
+        slot = _ranges(first_sh, nsh)
+        if shidx_abs is not None and total_shidx > 0:
+            table = _buffer(data, shidx_abs, (len(data) - shidx_abs) // 2, '<u2')
+            gi = np.full(len(slot), len(large), dtype=np.int64)
+            inside = slot < len(table)
+            gi[inside] = table[slot[inside]]
+        else:
+            gi = slot
+        ok = gi < len(large)
+        shared[ok] = large[gi[ok]]
+
+    counts = nloc + nsh
+    start = np.cumsum(counts) - counts
+    verts = np.empty((int(counts.sum()), 3))
+    verts[_ranges(start, nloc)] = local
+    verts[_ranges(start + nloc, nsh)] = shared
+
+    # Quads, each checked against its own section's vertex run, then moved
+    # to where that run sits in the shape.
+    itemsize = np.dtype(idx_dtype).itemsize
+    nquads = (len(data) - quads_abs) // (4 * itemsize)
+    quads = _buffer(data, quads_abs, nquads * 4, idx_dtype).reshape(-1, 4)
+    nq = np.clip(np.minimum(num_q, len(quads) - first_q), 0, None)
+    quads = quads[_ranges(first_q, nq)].astype(np.int64)
+    limit = np.repeat(counts, nq)
+    offset = np.repeat(start, nq)
+    valid = quads.max(axis=1, initial=-1) < limit
+    quads = quads[valid] + offset[valid, None]
+    pairs = np.stack([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]], axis=1)
+    split = np.stack([np.ones(len(quads), dtype=bool), quads[:, 2] != quads[:, 3]], axis=1)
+    return verts, pairs[split]
+
+
 # ── section struct parsing ───────────────────────────────────────────────────
 
 SECTION_STRIDE = 0x60  # known stride for hknpCompressedMeshShapeData::Section
@@ -922,6 +1002,7 @@ def extract_compound_polytopes(
         body_transforms: Dict[int, BodyTransform],
         body_order: Optional[Dict[int, int]] = None,
         extra_children: Optional[Dict[int, List[Tuple[int, 'CollisionShape']]]] = None,
+        instances: Optional[Dict[int, List[Tuple[int, int, BodyTransform]]]] = None,
 ) -> List[CollisionShape]:
     """Extract convex polytope shapes from hknpDynamicCompoundShape instances.
 
@@ -930,6 +1011,8 @@ def extract_compound_polytopes(
     cannot parse.  They are merged in and the children sorted back into instance
     order, so a compound of mixed child types comes out whole.
 
+    instances is compound_instance_map's result, if the caller already has it.
+
     Returns a list of CollisionShape objects.  Each hknpDynamicCompoundShape
     becomes a "compound" CollisionShape (no geometry) whose children are
     "polytope" CollisionShapes carrying local-space verts and their instance
@@ -1017,19 +1100,10 @@ def extract_compound_polytopes(
         if compound_shape.children:
             result.append(compound_shape)
 
-    # Collect all polytope rels that belong to a compound instance
-    compound_shape_rels: set = set()
-    for comp_rel, _ in compounds:
-        comp_abs = data_start + comp_rel
-        inst_arr_ptr = fixups.get(comp_rel + 0x60)
-        inst_count = u32(data, comp_abs + 0x60 + 8) & 0x3FFFFFFF
-        if inst_arr_ptr is not None:
-            inst_arr_abs = data_start + inst_arr_ptr
-            for i in range(inst_count):
-                inst_rel = (inst_arr_abs + i * 0x80) - data_start
-                gf = gfixups.get(inst_rel + 0x50)
-                if gf:
-                    compound_shape_rels.add(gf[1])
+    # Polytopes that belong to a compound instance aren't bodies of their own.
+    if instances is None:
+        instances = compound_instance_map(data, data_start, fixups, gfixups, objects)
+    compound_shape_rels = set(instances)
 
     standalone = [(rel, cls) for rel, cls in objects
                   if "ConvexPolytopeShape" in cls and rel not in compound_shape_rels]
@@ -1054,6 +1128,74 @@ def extract_compound_polytopes(
     return result
 
 
+# ── parse-once packfile ──────────────────────────────────────────────────────
+
+class ParsedPackfile:
+    """A bhkPhysicsSystem packfile, parsed once.
+
+    Everything the extractors read from the raw bytes -- section layout, fixup
+    maps, the object table, body order, transforms and physics properties,
+    compound instances -- is read up front.  The shapes are decoded on first
+    use.  Get these from parse_packfile(), which caches them by content, so the
+    collision objects sharing one physics system share one of these too.
+
+    Treat it as read-only: the shapes are handed to every caller.
+    """
+
+    def __init__(self, data: bytes):
+        hdrs = parse_section_headers(data)
+        if "__data__" not in hdrs or "__classnames__" not in hdrs:
+            raise RuntimeError("Missing __data__ or __classnames__ section header.")
+        data_hdr = hdrs["__data__"]
+
+        self.data = data
+        self.data_start = data_hdr.abs_start
+        self.cn_start = hdrs["__classnames__"].abs_start
+        self.fixups = parse_local_fixups(data, data_hdr)
+        self.gfixups = parse_global_fixups(data, data_hdr)
+        self.objects = parse_virtual_fixups(data, data_hdr, self.cn_start)
+        self.obj_map = {rel: cls for rel, cls in self.objects}
+
+        args = (data, self.data_start, self.fixups, self.gfixups, self.objects)
+        self.body_transforms = parse_body_transforms(*args)
+        self.body_order = parse_body_order(*args)
+        self.instances = compound_instance_map(*args)
+        self.physics_props = parse_physics_props(
+            data, self.data_start, self.fixups, self.objects)
+        self.constraints = sum(
+            u32(data, self.data_start + rel + 0x50 + 8) & 0x3FFFFFFF
+            for rel, cls in self.objects if "hknpPhysicsSystemData" in cls)
+        self._shapes: Optional[List[CollisionShape]] = None
+
+    @property
+    def shapes(self) -> List[CollisionShape]:
+        """Every body's shape, in body order (see extract_bhk_physics_system)."""
+        if self._shapes is None:
+            self._shapes = _decode_shapes(self)
+        return self._shapes
+
+
+# Parsed packfiles by content digest, most recently used last.  Content rather
+# than id(): a blob's id is reused once it's freed, and each call to
+# bhkPhysicsSystem.data hands back fresh bytes anyway.
+PACKFILE_CACHE_SIZE = 16
+_packfile_cache: "OrderedDict[bytes, ParsedPackfile]" = OrderedDict()
+
+
+def parse_packfile(data: bytes) -> ParsedPackfile:
+    """The parsed form of a packfile blob, from the cache if it's been seen."""
+    key = hashlib.blake2b(data, digest_size=16).digest()
+    pf = _packfile_cache.get(key)
+    if pf is not None:
+        _packfile_cache.move_to_end(key)
+        return pf
+    pf = ParsedPackfile(bytes(data))
+    _packfile_cache[key] = pf
+    while len(_packfile_cache) > PACKFILE_CACHE_SIZE:
+        _packfile_cache.popitem(last=False)
+    return pf
+
+
 # ── main extraction ──────────────────────────────────────────────────────────
 
 def extract_bhk_physics_system(
@@ -1067,6 +1209,9 @@ def extract_bhk_physics_system(
     each shape carries its own transform (body or instance position/rotation)
     so the caller can apply it at the object level.
 
+    The shapes come from parse_packfile's cache and are shared with every
+    other caller decoding the same blob; the list itself is the caller's.
+
     Args:
         in_path:  Path to a raw packfile .bin (optional; use raw_data instead).
         out_path: If given, writes an OBJ file at this path.
@@ -1078,96 +1223,68 @@ def extract_bhk_physics_system(
         if in_path is None:
             raise RuntimeError("in_path or raw_data must be provided")
         data = open(in_path, "rb").read()
-    use_shared = True
 
-    # ── parse packfile ──
-    hdrs = parse_section_headers(data)
-    if "__data__" not in hdrs or "__classnames__" not in hdrs:
-        raise RuntimeError("Missing __data__ or __classnames__ section header.")
+    all_shapes = list(parse_packfile(data).shapes)
 
-    data_hdr = hdrs["__data__"]
-    data_start = data_hdr.abs_start
-    cn_start = hdrs["__classnames__"].abs_start
+    if out_path is not None:
+        write_obj(out_path, all_shapes)
 
-    fixups = parse_local_fixups(data, data_hdr)
-    gfixups = parse_global_fixups(data, data_hdr)
-    objects = parse_virtual_fixups(data, data_hdr, cn_start)
+    return all_shapes
 
-    # ── parse body transforms, body order, and physics properties from PSD ──
-    body_transforms = parse_body_transforms(data, data_start, fixups, gfixups, objects)
-    body_order = parse_body_order(data, data_start, fixups, gfixups, objects)
-    physics_props = parse_physics_props(data, data_start, fixups, objects)
 
-    # ── propagate compound instance transforms to child mesh data objects ──
-    obj_map = {rel: cls for rel, cls in objects}
-    compounds = [(rel, cls) for rel, cls in objects
-                 if "DynamicCompoundShape" in cls and "Data" not in cls]
-
-    for comp_rel, comp_cls in compounds:
-        comp_abs = data_start + comp_rel
-        comp_body = body_transforms.get(comp_rel)
+def _decode_shapes(pf: ParsedPackfile) -> List[CollisionShape]:
+    """Decode every shape in a parsed packfile, sorted into body order."""
+    data = pf.data
+    data_start = pf.data_start
+    fixups, gfixups, objects = pf.fixups, pf.gfixups, pf.objects
+    obj_map = pf.obj_map
+    body_order = pf.body_order
+    physics_props = pf.physics_props
+    use_shared = True
 
-        inst_arr_ptr = fixups.get(comp_rel + 0x60)
-        inst_count = u32(data, comp_abs + 0x60 + 8) & 0x3FFFFFFF
-        if inst_arr_ptr is None or inst_count == 0:
+    # ── propagate compound instance transforms to child mesh data objects ──
+    # Copy first: the parsed packfile is shared, and these placements only
+    # matter to the decode.
+    body_transforms = dict(pf.body_transforms)
+    for child_shape_rel, owners in pf.instances.items():
+        child_shape_cls = obj_map.get(child_shape_rel, "")
+        if "CompressedMeshShape" not in child_shape_cls or "Data" in child_shape_cls:
             continue
-
-        inst_arr_abs = data_start + inst_arr_ptr
-        INST_STRIDE = 0x80
-
-        for i in range(inst_count):
-            inst_abs = inst_arr_abs + i * INST_STRIDE
-            inst_rel = inst_abs - data_start
-
-            r0 = vec4(data, inst_abs + 0x00)
-            r1 = vec4(data, inst_abs + 0x10)
-            r2 = vec4(data, inst_abs + 0x20)
-            # Havok stores columns; transpose to row-major.
-            inst_rot: Mat3 = ((r0[0], r1[0], r2[0]),
-                              (r0[1], r1[1], r2[1]),
-                              (r0[2], r1[2], r2[2]))
-
-            t = vec4(data, inst_abs + 0x30)
-            inst_trans = (t[0], t[1], t[2])
-
-            gf = gfixups.get(inst_rel + 0x50)
-            if gf is None:
-                continue
-            child_shape_rel = gf[1]
-            child_shape_cls = obj_map.get(child_shape_rel, "")
-
-            if "CompressedMeshShape" in child_shape_cls and "Data" not in child_shape_cls:
-                data_gf = gfixups.get(child_shape_rel + 0x60)
-                if data_gf is None:
-                    continue
-                child_data_rel = data_gf[1]
-
-                if comp_body is not None:
-                    comb_rot = mat3_mul(comp_body.rotation, inst_rot)
-                    tx = (comp_body.rotation[0][0] * inst_trans[0] +
-                          comp_body.rotation[0][1] * inst_trans[1] +
-                          comp_body.rotation[0][2] * inst_trans[2] + comp_body.position[0])
-                    ty = (comp_body.rotation[1][0] * inst_trans[0] +
-                          comp_body.rotation[1][1] * inst_trans[1] +
-                          comp_body.rotation[1][2] * inst_trans[2] + comp_body.position[1])
-                    tz = (comp_body.rotation[2][0] * inst_trans[0] +
-                          comp_body.rotation[2][1] * inst_trans[1] +
-                          comp_body.rotation[2][2] * inst_trans[2] + comp_body.position[2])
-                    comb_trans = (tx, ty, tz)
-                else:
-                    comb_rot = inst_rot
-                    comb_trans = inst_trans
-
-                is_identity_rot = all(
-                    abs(comb_rot[ii][jj] - (1.0 if ii == jj else 0.0)) < 1e-6
-                    for ii in range(3) for jj in range(3))
-                is_zero_trans = all(abs(c) < 1e-6 for c in comb_trans)
-
-                if not (is_identity_rot and is_zero_trans):
-                    body_transforms[child_data_rel] = BodyTransform(
-                        position=comb_trans,
-                        rotation=comb_rot,
-                    )
+        data_gf = gfixups.get(child_shape_rel + 0x60)
+        if data_gf is None:
+            continue
+        child_data_rel = data_gf[1]
+
+        for comp_rel, _, inst_xf in owners:
+            comp_body = pf.body_transforms.get(comp_rel)
+            inst_rot = inst_xf.rotation
+            inst_trans = inst_xf.position
+            if comp_body is not None:
+                comb_rot = mat3_mul(comp_body.rotation, inst_rot)
+                tx = (comp_body.rotation[0][0] * inst_trans[0] +
+                      comp_body.rotation[0][1] * inst_trans[1] +
+                      comp_body.rotation[0][2] * inst_trans[2] + comp_body.position[0])
+                ty = (comp_body.rotation[1][0] * inst_trans[0] +
+                      comp_body.rotation[1][1] * inst_trans[1] +
+                      comp_body.rotation[1][2] * inst_trans[2] + comp_body.position[1])
+                tz = (comp_body.rotation[2][0] * inst_trans[0] +
+                      comp_body.rotation[2][1] * inst_trans[1] +
+                      comp_body.rotation[2][2] * inst_trans[2] + comp_body.position[2])
+                comb_trans = (tx, ty, tz)
+            else:
+                comb_rot = inst_rot
+                comb_trans = inst_trans
+
+            is_identity_rot = all(
+                abs(comb_rot[ii][jj] - (1.0 if ii == jj else 0.0)) < 1e-6
+                for ii in range(3) for jj in range(3))
+            is_zero_trans = all(abs(c) < 1e-6 for c in comb_trans)
+
+            if not (is_identity_rot and is_zero_trans):
+                body_transforms[child_data_rel] = BodyTransform(
+                    position=comb_trans,
+                    rotation=comb_rot,
+                )
 
     all_shapes: List[CollisionShape] = []
 
@@ -1178,7 +1295,7 @@ def extract_bhk_physics_system(
     # A compressed mesh can be a compound's child rather than a body of its own.
     # The instance points at the hknpCompressedMeshShape; walk its data pointer
     # so we can recognize the ShapeData objects this loop iterates over.
-    inst_map = compound_instance_map(data, data_start, fixups, gfixups, objects)
+    inst_map = pf.instances
     cm_owner: Dict[int, List[Tuple[int, int, BodyTransform]]] = {}
     for shape_rel, cls in objects:
         if not cls.endswith("hknpCompressedMeshShape"):
@@ -1193,7 +1310,6 @@ def extract_bhk_physics_system(
 
     for shape_idx, (obj_rel, _) in enumerate(mesh_shapes):
         obj_abs = data_start + obj_rel
-        extract_bhk_physics_system._large_cache = {}
 
         mesh_body = body_transforms.get(obj_rel)
 
@@ -1219,72 +1335,19 @@ def extract_bhk_physics_system(
             continue
 
         idx_fmt = "u8"
-        quad_stride = 4
 
         secs = read_sections(data, sections_abs, sections_count,
                              total_verts, total_quads, total_shared, total_shidx)
 
-        shape_verts: List[Vert3] = []
-        shape_faces: List[Face] = []
-
-        for sec in secs:
-            first_v   = sec["first_vertex"]
-            num_v     = sec["num_vertices"]
-            num_q     = sec["num_quads"]
-            first_q   = sec["first_quad"]
-            first_sh  = sec["first_shared"]
-            num_sh    = sec["num_shared"]
-
-            if num_q == 0:
-                continue
-            if num_v == 0 and num_sh == 0:
-                continue
-
-            v_buf = verts_abs + first_v * 4
-            local_verts = decode_vertices(data, v_buf, num_v,
-                                          sec["base"], sec["scale"])
-
-            shared_verts: List[Vert3] = []
-            if use_shared and shared_abs is not None and num_sh > 0:
-                if not hasattr(extract_bhk_physics_system, '_large_cache'):
-                    extract_bhk_physics_system._large_cache = {}
-                cache_key = (shared_abs, total_shared)
-                if cache_key not in extract_bhk_physics_system._large_cache:
-                    extract_bhk_physics_system._large_cache[cache_key] = decode_large_vertices(
-                        data, shared_abs, total_shared, obj_bb_min, obj_bb_max)
-                global_large = extract_bhk_physics_system._large_cache[cache_key]
-
-                if shidx_abs is not None and total_shidx > 0:
-                    for k in range(num_sh):
-                        map_off = shidx_abs + (first_sh + k) * 2
-                        if map_off + 2 <= len(data):
-                            gi = u16(data, map_off)
-                            if gi < len(global_large):
-                                shared_verts.append(global_large[gi])
-                            else:
-                                shared_verts.append((0.0, 0.0, 0.0))
-                        else:
-                            shared_verts.append((0.0, 0.0, 0.0))
-                else:
-                    for k in range(num_sh):
-                        if first_sh + k < len(global_large):
-                            shared_verts.append(global_large[first_sh + k])
-                        else:
-                            shared_verts.append((0.0, 0.0, 0.0))
-
-            idx_limit = len(local_verts) + len(shared_verts)
-            q_buf = quads_abs + first_q * quad_stride
-
-            if idx_fmt == "u16":
-                tris = decode_quads_u16(data, q_buf, num_q, idx_limit)
-            else:
-                tris = decode_quads_u8(data, q_buf, num_q, idx_limit)
-
-            # Face indices are relative to this shape's local vertex list
-            base_idx = len(shape_verts)
-            shape_verts.extend(local_verts + shared_verts)
-            shape_faces.extend((a + base_idx, b + base_idx, c + base_idx)
-                               for a, b, c in tris)
+        large = None
+        if use_shared and shared_abs is not None:
+            large = _large_vertex_array(data, shared_abs, total_shared,
+                                        obj_bb_min, obj_bb_max)
+        verts, tris = _decode_cm_sections(
+            data, secs, verts_abs, quads_abs, shidx_abs, total_shidx, large,
+            '<u2' if idx_fmt == "u16" else 'u1')
+        shape_verts = _as_tuples(verts)
+        shape_faces = _as_tuples(tris)
 
         if shape_verts and shape_faces:
             owners = cm_owner.get(obj_rel)
@@ -1322,7 +1385,7 @@ def extract_bhk_physics_system(
     # ── extract convex polytope shapes ──
     all_shapes.extend(extract_compound_polytopes(
         data, data_start, fixups, gfixups, objects, body_transforms, body_order,
-        extra_children=compound_kids))
+        extra_children=compound_kids, instances=pf.instances))
 
     # ── extract sphere shapes ──
     sphere_objects = [(rel, cls) for rel, cls in objects
@@ -1362,9 +1425,6 @@ def extract_bhk_physics_system(
         elif physics_props:
             s.physics = physics_props[-1]
 
-    if out_path is not None:
-        write_obj(out_path, all_shapes)
-
     return all_shapes
 
 
@@ -1548,11 +1608,10 @@ def extract_havok_from_nif(in_path: str, out_path: str) -> None:
         else:
             continue
 
-        shapes = extract_bhk_physics_system(raw_data=hk)
+        # The decoded shapes are shared through the packfile cache; rename copies.
         prefix = f"phys_{phys_id}"
-        for s in shapes:
-            s.name = f"{prefix}_{s.name}"
-        all_shapes.extend(shapes)
+        all_shapes.extend(replace(s, name=f"{prefix}_{s.name}")
+                          for s in extract_bhk_physics_system(raw_data=hk))
         decoded += 1
 
     if decoded == 0 or not all_shapes:
@@ -0,0 +1,642 @@
+"""
+convex_hull.py
+--------------
+Convex hulls and approximate convex decomposition for collision export.
+
+Havok tests convex shapes far more cheaply than triangle meshes, so clutter and
+furniture collide best as one convex polytope or a handful of them.  This
+module builds those hulls from arbitrary point clouds and meshes.
+
+Public API
+----------
+    convex_hull(points, eps=None) -> (verts, faces)
+        3D quickhull.  faces are convex polygons, coplanar triangles merged,
+        wound counter-clockwise seen from outside -- the form
+        bhk_autopack.pack_convex_polytope and bhkConvexVerticesShape take.
+
+    hull_volume(verts, faces) -> float
+
+    simplify_hull(points, max_error=None, max_verts=255, convex_radius=0.0)
+        The hull with as few corners as a Hausdorff tolerance allows.
+
+    hull_distance(points, verts, faces) -> distances to a polytope
+
+    convex_decompose(verts, tris, max_pieces=8, max_hull_verts=255,
+                     min_gain=0.02) -> List[(verts, faces)]
+        Split a mesh into convex pieces, each within the vertex limit.
+
+Degenerate input never raises: duplicated points collapse, and flat input
+yields the flat polygon as two faces (one per side).  Fewer than three
+non-collinear points have no faces at all, so the result is (verts, []).
+
+Needs NumPy, which Blender always ships.
+"""
+
+from __future__ import annotations
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Vert3 = Tuple[float, float, float]
+Face = List[int]
+
+# Faces whose normals agree this closely are one polygon.
+_COPLANAR_COS = 1.0 - 1e-6
+
+# Havok's convex shapes index vertices with a byte.
+MAX_HULL_VERTS = 255
+
+
+class _HullFace:
+    """One triangle of the hull under construction."""
+    __slots__ = ('v', 'n', 'd', 'outside')
+
+    def __init__(self, v, n, d):
+        self.v = v                      # (a, b, c), CCW from outside
+        self.n = n                      # unit outward normal
+        self.d = d                      # plane offset: n . p == d on the face
+        self.outside = None             # indices of points above this face
+
+
+def _default_eps(P: np.ndarray) -> float:
+    """Distance tolerance scaled to the input, so units don't matter."""
+    scale = float(np.max(np.abs(P))) if len(P) else 0.0
+    return max(scale, 1.0) * 1e-9 * 64
+
+
+def _initial_simplex(P: np.ndarray, eps: float) -> Optional[Tuple[int, int, int, int]]:
+    """Four affinely independent points, or None if P is flat or smaller."""
+    ext = np.concatenate([np.argmin(P, axis=0), np.argmax(P, axis=0)])
+    best, a, b = -1.0, ext[0], ext[0]
+    for i in ext:
+        d = np.linalg.norm(P[ext] - P[i], axis=1)
+        j = int(np.argmax(d))
+        if d[j] > best:
+            best, a, b = d[j], int(i), int(ext[j])
+    if best <= eps:
+        return None
+
+    u = (P[b] - P[a]) / best
+    off = np.linalg.norm(np.cross(P - P[a], u), axis=1)
+    c = int(np.argmax(off))
+    if off[c] <= eps:
+        return None
+
+    n = np.cross(P[b] - P[a], P[c] - P[a])
+    n /= np.linalg.norm(n)
+    dist = (P - P[a]) @ n
+    d = int(np.argmax(np.abs(dist)))
+    if abs(dist[d]) <= eps:
+        return None
+    return a, b, c, d
+
+
+def _make_faces(P: np.ndarray, tris) -> List[_HullFace]:
+    """Hull faces for an array of (a, b, c) triangles, normals in one batch."""
+    T = np.asarray(tris, dtype=np.intp).reshape(-1, 3)
+    A = P[T[:, 0]]
+    N = np.cross(P[T[:, 1]] - A, P[T[:, 2]] - A)
+    length = np.linalg.norm(N, axis=1)
+    # A zero-area sliver gets a zero normal: a plane nothing can be above, so
+    # it takes no points.
+    N = np.divide(N, length[:, None], out=np.zeros_like(N), where=length[:, None] > 0)
+    D = np.einsum('ij,ij->i', N, A)
+    return [_HullFace(tuple(int(x) for x in t), n, float(d)) for t, n, d in zip(T, N, D)]
+
+
+def _assign(P: np.ndarray, pts: np.ndarray, faces: List[_HullFace], eps: float) -> None:
+    """Give each point to the face it lies furthest above, if any."""
+    for f in faces:
+        f.outside = np.empty(0, dtype=np.intp)
+    if len(pts) == 0 or not faces:
+        return
+    N = np.array([f.n for f in faces])
+    D = np.array([f.d for f in faces])
+    dist = P[pts] @ N.T - D
+    best = np.argmax(dist, axis=1)
+    above = dist[np.arange(len(pts)), best] > eps
+    pts, best = pts[above], best[above]
+    order = np.argsort(best, kind='stable')
+    pts, best = pts[order], best[order]
+    cuts = np.searchsorted(best, np.arange(len(faces) + 1))
+    for i, f in enumerate(faces):
+        f.outside = pts[cuts[i]:cuts[i + 1]]
+
+
+def _quickhull(P: np.ndarray, eps: float, tol: float = 0.0,
+               budget: Optional[int] = None) -> Optional[List[Tuple[int, int, int]]]:
+    """Triangles of the hull of P, indexing P, or None if P is flat.
+
+    Points are added farthest first, so stopping early gives the best hull
+    for its size: the build ends once nothing lies more than tol above any
+    face, or once the hull has budget corners.
+    """
+    simplex = _initial_simplex(P, eps)
+    if simplex is None:
+        return None
+    a, b, c, d = simplex
+    centroid = P[list(simplex)].mean(axis=0)
+
+    faces: Dict[int, _HullFace] = {}
+    edges: Dict[Tuple[int, int], int] = {}
+    next_id = 0
+
+    def add(f: _HullFace) -> int:
+        nonlocal next_id
+        fid = next_id
+        next_id += 1
+        faces[fid] = f
+        for k in range(3):
+            edges[(f.v[k], f.v[(k + 1) % 3])] = fid
+        return fid
+
+    start = _make_faces(P, [(a, b, c), (a, c, d), (a, d, b), (b, d, c)])
+    start = [_make_faces(P, [(f.v[0], f.v[2], f.v[1])])[0]
+             if f.n @ centroid - f.d > 0 else f for f in start]
+    rest = np.setdiff1d(np.arange(len(P)), np.array(simplex))
+    pending = []
+    corners = 4
+
+    def queue(new_faces):
+        for f in new_faces:
+            fid = add(f)
+            if len(f.outside):
+                dist = P[f.outside] @ f.n - f.d
+                k = int(np.argmax(dist))
+                heapq.heappush(pending, (-float(dist[k]), fid, int(f.outside[k])))
+
+    _assign(P, rest, start, eps)
+    queue(start)
+
+    while pending:
+        far, fid, eye = heapq.heappop(pending)
+        if fid not in faces:
+            continue
+        if -far <= tol or (budget is not None and corners >= budget):
+            break
+        corners += 1
+        pe = P[eye]
+
+        # Every face the eye can see, and the horizon edges around them.
+        visible = {fid}
+        stack = [fid]
+        horizon = []
+        while stack:
+            g = faces[stack.pop()]
+            for k in range(3):
+                u, v = g.v[k], g.v[(k + 1) % 3]
+                nb = edges[(v, u)]
+                if nb in visible:
+                    continue
+                h = faces[nb]
+                if pe @ h.n - h.d > eps:
+                    visible.add(nb)
+                    stack.append(nb)
+                else:
+                    horizon.append((u, v))
+
+        orphans = np.concatenate([faces[g].outside for g in visible])
+        orphans = orphans[orphans != eye]
+        for g in visible:
+            gv = faces.pop(g).v
+            for k in range(3):
+                del edges[(gv[k], gv[(k + 1) % 3])]
+
+        # Each horizon edge keeps its winding and gains the eye as apex, so the
+        # new cone is oriented like the faces it replaces.
+        cone = _make_faces(P, [(u, v, eye) for u, v in horizon])
+        _assign(P, orphans, cone, eps)
+        queue(cone)
+
+    return [f.v for f in faces.values()]
+
+
+def _flat_hull(P: np.ndarray, eps: float) -> Tuple[List[int], List[Face]]:
+    """Hull of points lying in a plane (or on a line, or at a point).
+
+    Returns (hull point indices, faces).  A flat polygon gets two faces, one
+    wound for each side, so it still reads as a closed (if thin) polytope.
+    """
+    ext = np.concatenate([np.argmin(P, axis=0), np.argmax(P, axis=0)])
+    spans = np.linalg.norm(P[ext][:, None, :] - P[ext][None, :, :], axis=2)
+    i, j = np.unravel_index(np.argmax(spans), spans.shape)
+    a, b = int(ext[i]), int(ext[j])
+    if spans[i, j] <= eps:
+        return [0], []
+    u = (P[b] - P[a]) / np.linalg.norm(P[b] - P[a])
+    perp = np.cross(P - P[a], u)
+    c = int(np.argmax(np.linalg.norm(perp, axis=1)))
+    if np.linalg.norm(perp[c]) <= eps:
+        return [a, b], []
+
+    n = np.cross(P[b] - P[a], P[c] - P[a])
+    n /= np.linalg.norm(n)
+    w = np.cross(n, u)
+    xy = np.stack([(P - P[a]) @ u, (P - P[a]) @ w], axis=1)
+
+    # Monotone chain; counter-clockwise about n.
+    order = np.lexsort((xy[:, 1], xy[:, 0]))
+
+    def cross(o, p, q):
+        return ((xy[p, 0] - xy[o, 0]) * (xy[q, 1] - xy[o, 1])
+                - (xy[p, 1] - xy[o, 1]) * (xy[q, 0] - xy[o, 0]))
+
+    def chain(idx):
+        out: List[int] = []
+        for k in idx:
+            k = int(k)
+            while len(out) >= 2 and cross(out[-2], out[-1], k) <= eps * eps:
+                out.pop()
+            out.append(k)
+        return out
+
+    lower = chain(order)
+    upper = chain(order[::-1])
+    ring = lower[:-1] + upper[:-1]
+    return ring, [list(range(len(ring))), list(range(len(ring)))[::-1]]
+
+
+def _merge_coplanar(P: np.ndarray, tris: List[Tuple[int, int, int]],
+                    eps: float) -> List[Face]:
+    """Merge adjacent coplanar hull triangles into convex polygons."""
+    N = [f.n for f in _make_faces(P, tris)]
+    edge_tri = {}
+    for ti, t in enumerate(tris):
+        for k in range(3):
+            edge_tri[(t[k], t[(k + 1) % 3])] = ti
+
+    done = [False] * len(tris)
+    polys: List[Face] = []
+    for seed in range(len(tris)):
+        if done[seed]:
+            continue
+        n0 = N[seed]
+        d0 = float(n0 @ P[tris[seed][0]])
+        group = [seed]
+        done[seed] = True
+        stack = [seed]
+        while stack:
+            t = tris[stack.pop()]
+            for k in range(3):
+                nb = edge_tri.get((t[(k + 1) % 3], t[k]))
+                if nb is None or done[nb]:
+                    continue
+                # Compare against the seed, not the neighbour, so a gently
+                # curving run of faces can't chain into one "plane".
+                if (N[nb] @ n0 > _COPLANAR_COS
+                        and all(abs(P[v] @ n0 - d0) <= eps for v in tris[nb])):
+                    done[nb] = True
+                    group.append(nb)
+                    stack.append(nb)
+
+        if len(group) == 1:
+            polys.append(list(tris[seed]))
+            continue
+        directed = {(tris[g][k], tris[g][(k + 1) % 3]) for g in group for k in range(3)}
+        nxt = {u: v for u, v in directed if (v, u) not in directed}
+        start = next(iter(nxt))
+        ring = [start]
+        while True:
+            v = nxt.get(ring[-1])
+            if v is None or v == start or len(ring) > len(nxt):
+                break
+            ring.append(v)
+        if v == start and len(ring) == len(nxt):
+            polys.append(ring)
+        else:
+            # Boundary isn't one simple loop; keep the triangles as they are.
+            polys.extend(list(tris[g]) for g in group)
+    return polys
+
+
+def convex_hull(points: Sequence[Sequence[float]],
+                eps: Optional[float] = None) -> Tuple[List[Vert3], List[Face]]:
+    """Return (verts, faces) of the convex hull of points.
+
+    verts are the hull's corner points (a subset of the input); faces are
+    convex polygons indexing verts, wound counter-clockwise seen from outside,
+    with coplanar triangles merged.  eps is the distance below which a point
+    counts as on a face; by default it scales with the input's magnitude.
+    """
+    P = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(P) == 0:
+        return [], []
+    P = np.unique(P, axis=0)
+    if eps is None:
+        eps = _default_eps(P)
+
+    tris = _quickhull(P, eps) if len(P) >= 4 else None
+    if tris is None:
+        ring, faces = _flat_hull(P, eps)
+        return [tuple(float(x) for x in P[i]) for i in ring], faces
+
+    polys = _merge_coplanar(P, tris, eps)
+    used = sorted({v for f in polys for v in f})
+    remap = {g: i for i, g in enumerate(used)}
+    return ([tuple(float(x) for x in P[g]) for g in used],
+            [[remap[v] for v in f] for f in polys])
+
+
+def _hull_size(points: np.ndarray) -> Tuple[int, float]:
+    """(corner count, volume) of the hull of points, skipping face merging."""
+    P = np.unique(points, axis=0)
+    eps = _default_eps(P)
+    tris = _quickhull(P, eps) if len(P) >= 4 else None
+    if tris is None:
+        # Flat: its corners are the outline's, which may be any number.
+        return len(_flat_hull(P, eps)[0]), 0.0
+    T = np.array(tris)
+    A, B, C = P[T[:, 0]], P[T[:, 1]], P[T[:, 2]]
+    vol = np.einsum('ij,ij->i', A, np.cross(B, C)).sum() / 6.0
+    return len(np.unique(T)), abs(float(vol))
+
+
+def hull_volume(verts: Sequence[Sequence[float]], faces: List[Face]) -> float:
+    """Volume enclosed by a closed polytope (0 for a flat or empty one)."""
+    if not faces:
+        return 0.0
+    P = np.asarray(verts, dtype=np.float64)
+    c = P.mean(axis=0)
+    vol = 0.0
+    for f in faces:
+        a = P[f[0]] - c
+        for k in range(1, len(f) - 1):
+            vol += float(np.dot(a, np.cross(P[f[k]] - c, P[f[k + 1]] - c)))
+    return abs(vol) / 6.0
+
+
+def hull_distance(points: Sequence[Sequence[float]],
+                  verts: Sequence[Sequence[float]], faces: List[Face]) -> np.ndarray:
+    """Euclidean distance from each point to a convex polytope (0 inside).
+
+    Outside the polytope the nearest point lies on its boundary: inside some
+    face, straight down the face normal, or else on an edge.
+    """
+    Q = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if not faces or len(Q) == 0:
+        return np.zeros(len(Q))
+    V = np.asarray(verts, dtype=np.float64)
+    planes = np.array([_polygon_plane(V, f) for f in faces])
+    signed = Q @ planes[:, :3].T - planes[:, 3]
+    best = np.full(len(Q), np.inf)
+
+    for fi, f in enumerate(faces):
+        n = planes[fi, :3]
+        foot = Q - signed[:, fi:fi+1] * n
+        within = np.ones(len(Q), dtype=bool)
+        for k in range(len(f)):
+            a, b = V[f[k]], V[f[(k + 1) % len(f)]]
+            within &= np.cross(b - a, foot - a) @ n >= 0.0
+        best = np.where(within, np.minimum(best, np.abs(signed[:, fi])), best)
+
+    E = np.array(sorted({tuple(sorted((f[k], f[(k + 1) % len(f)])))
+                         for f in faces for k in range(len(f))}))
+    A, B = V[E[:, 0]], V[E[:, 1]]
+    AB = B - A
+    t = np.einsum('nej,ej->ne', Q[:, None, :] - A[None], AB) / np.einsum('ej,ej->e', AB, AB)
+    t = np.clip(t, 0.0, 1.0)
+    near = A[None] + t[:, :, None] * AB[None]
+    best = np.minimum(best, np.linalg.norm(Q[:, None, :] - near, axis=2).min(axis=1))
+
+    return np.where(np.all(signed <= 0.0, axis=1), 0.0, best)
+
+
+def _polygon_plane(V: np.ndarray, f: Face) -> np.ndarray:
+    """Outward unit normal and offset (nx, ny, nz, d), n . p == d on the face."""
+    # Newell's method: robust for polygons with nearly collinear corners.
+    P = V[f]
+    n = np.cross(P, np.roll(P, -1, axis=0)).sum(axis=0)
+    n /= np.linalg.norm(n)
+    return np.array([*n, n @ P.mean(axis=0)])
+
+
+def _simplify_ring(V: np.ndarray, tol: float, max_verts: int) -> List[int]:
+    """Corners of a flat convex outline V (in order) to keep, in order.
+
+    The 2D counterpart of the budgeted quickhull: corners are added farthest
+    first, each the one furthest outside the polygon kept so far, until
+    nothing is more than tol outside it or max_verts corners are kept.  A
+    dropped corner's distance to the edge spanning it is its distance to the
+    simplified polygon, which lies inside the outline.
+    """
+    n = len(V)
+    if n <= 3 or (tol <= 0.0 and n <= max_verts):
+        return list(range(n))
+    a = int(np.argmax(np.linalg.norm(V - V[0], axis=1)))
+    b = int(np.argmax(np.linalg.norm(V - V[a], axis=1)))
+    keep = sorted({a, b})
+    idx = np.arange(n)
+    while len(keep) < max_verts:
+        K = np.array(keep)
+        # Each corner lies on the edge from the last kept corner before it.
+        gap = np.searchsorted(K, idx, side='right') - 1
+        A = V[K[gap]]
+        B = V[K[(gap + 1) % len(K)]]
+        AB = B - A
+        t = np.clip(np.einsum('ij,ij->i', V - A, AB) / np.einsum('ij,ij->i', AB, AB), 0.0, 1.0)
+        dist = np.linalg.norm(V - (A + t[:, None] * AB), axis=1)
+        dist[K] = 0.0
+        worst = int(np.argmax(dist))
+        if dist[worst] <= tol and len(keep) >= 3:
+            break
+        keep = sorted(keep + [worst])
+    return keep
+
+
+def simplify_hull(points: Sequence[Sequence[float]],
+                  max_error: Optional[float] = None,
+                  max_verts: int = MAX_HULL_VERTS,
+                  convex_radius: float = 0.0) -> Tuple[List[Vert3], List[Face]]:
+    """Convex hull of points using as few corners as the error allows.
+
+    The hull is rebuilt farthest point first, stopping once every dropped
+    corner is within max_error of it -- the Hausdorff distance between the
+    full hull and the simplified one, since the simplified hull lies inside.
+    max_verts caps the corners regardless, so the result always fits.
+
+    Havok pads every convex shape by its convex radius.  Leaving max_error
+    unset uses the radius as the tolerance: the padded simplified shape still
+    covers everything the artist modelled.
+
+    Returns (verts, faces) as convex_hull does, with freshly computed faces.
+    Faces may have more than three corners; take their planes from all of
+    them (_polygon_plane), not from the first three.
+    """
+    verts, faces = convex_hull(points)
+    tol = convex_radius if max_error is None else max_error
+    max_verts = max(max_verts, 4)
+    if not faces or (tol <= 0.0 and len(verts) <= max_verts):
+        return verts, faces
+
+    P = np.asarray(verts, dtype=np.float64)
+    tris = _quickhull(P, _default_eps(P), tol=tol, budget=max_verts)
+    if tris is None:
+        # Flat input: verts are already the outline, in order.
+        keep = _simplify_ring(P, tol, max_verts)
+        ring = list(range(len(keep)))
+        return [verts[k] for k in keep], [ring, ring[::-1]]
+    keep = sorted({v for t in tris for v in t})
+
+    # The build measures each point against its face's plane, which can
+    # understate the distance near an edge.  Add back whatever the true
+    # distance says is still too far out.
+    while len(keep) < max_verts:
+        hv, hf = convex_hull(P[keep])
+        dist = hull_distance(P, hv, hf)
+        worst = int(np.argmax(dist))
+        if dist[worst] <= tol:
+            return hv, hf
+        keep.append(worst)
+    return convex_hull(P[keep])
+
+
+def _clip(soup: np.ndarray, axis: int, pos: float) -> np.ndarray:
+    """The part of a triangle soup (k, 3, 3) with coordinate axis <= pos.
+
+    Triangles straddling the plane are cut along it: one corner inside leaves
+    a triangle, two leave a quad, returned as two triangles.  Winding is kept.
+    """
+    s = soup[:, :, axis] - pos
+    inside = s <= 0.0
+    count = inside.sum(axis=1)
+    out = [soup[count == 3]]
+
+    for n_in in (1, 2):
+        sel = count == n_in
+        if not sel.any():
+            continue
+        # Rotate each triangle so the odd corner out comes first; rotation
+        # keeps the winding.
+        odd = inside[sel] if n_in == 1 else ~inside[sel]
+        first = np.argmax(odd, axis=1)
+        order = (first[:, None] + np.arange(3)) % 3
+        tri = np.take_along_axis(soup[sel], order[:, :, None], axis=1)
+        ds = np.take_along_axis(s[sel], order, axis=1)
+        A, B, C = tri[:, 0], tri[:, 1], tri[:, 2]
+        ab = A + (B - A) * (ds[:, 0] / (ds[:, 0] - ds[:, 1]))[:, None]
+        ac = A + (C - A) * (ds[:, 0] / (ds[:, 0] - ds[:, 2]))[:, None]
+        if n_in == 1:
+            out.append(np.stack([A, ab, ac], axis=1))
+        else:
+            out.append(np.stack([B, C, ac], axis=1))
+            out.append(np.stack([B, ac, ab], axis=1))
+    return np.concatenate(out)
+
+
+def convex_decompose(verts: Sequence[Sequence[float]],
+                     tris: Sequence[Sequence[int]],
+                     max_pieces: int = 8,
+                     max_hull_verts: int = MAX_HULL_VERTS,
+                     min_gain: float = 0.02,
+                     candidates: int = 3,
+                     convex_radius: float = 0.0) -> List[Tuple[List[Vert3], List[Face]]]:
+    """Approximate a mesh by up to max_pieces convex hulls.
+
+    Hierarchical splitting: start from the hull of the whole mesh, and
+    repeatedly cut the piece whose best axis-aligned cut shrinks the total
+    hull volume the most.  Cuts clip the surface exactly, so the pieces' hulls
+    together always cover all of it.  Cutting stops when no cut saves
+    min_gain of the original hull volume -- the mesh is as convex as cutting
+    can make it -- or at max_pieces.
+
+    Havok can't store a hull with more than max_hull_verts corners.  Such a
+    piece is first simplified (simplify_hull); if that moves no point more
+    than convex_radius it is kept whole, otherwise it is cut in half whatever
+    the gain.  Once max_pieces runs out, the remaining over-limit pieces are
+    simplified to the limit regardless of the error.
+
+    Args:
+        verts:          Mesh vertex positions.
+        tris:           Triangles (only the first three indices of each are used).
+        max_pieces:     Upper bound on the number of hulls returned.
+        max_hull_verts: Vertex limit per hull (Havok: 255).
+        min_gain:       Smallest worthwhile volume saving, as a fraction of the
+                        whole mesh's hull volume.
+        candidates:     Cut positions tried per axis, spread over the piece's
+                        vertex coordinates.
+        convex_radius:  Error allowed when simplifying a piece to fit
+                        max_hull_verts rather than cutting it.
+
+    Returns:
+        A list of (verts, faces) hulls, as convex_hull returns them.  Every
+        hull has at most max_hull_verts corners.
+    """
+    P = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    T = np.asarray([t[:3] for t in tris], dtype=np.intp).reshape(-1, 3)
+    if len(T) == 0:
+        return [convex_hull(P)] if len(P) else []
+
+    def cut_at(soup, vol, axis, pos):
+        left = _clip(soup, axis, pos)
+        right = _clip(-soup, axis, -pos) * -1.0
+        # Faces lying in the cut plane belong to the left side only.
+        right = right[~np.all(right[:, :, axis] == pos, axis=1)]
+        if len(left) == 0 or len(right) == 0:
+            return None
+        ls = _hull_size(left.reshape(-1, 3))
+        rs = _hull_size(right.reshape(-1, 3))
+        return (vol - (ls[1] + rs[1]), left, right, ls, rs)
+
+    def best_cut(soup, vol):
+        """(gain, left, right, left hull size, right hull size) or None."""
+        best = None
+        pts = soup.reshape(-1, 3)
+        frac = np.linspace(0.0, 1.0, candidates + 2)[1:-1]
+        for axis in range(3):
+            # Cut through existing vertices: on a boxy mesh that finds the
+            # seams between convex parts exactly.
+            coords = np.unique(pts[:, axis])
+            for pos in np.unique(np.quantile(coords, frac, method='nearest')):
+                if not coords[0] < pos < coords[-1]:
+                    continue
+                cut = cut_at(soup, vol, axis, pos)
+                if cut is not None and (best is None or cut[0] > best[0]):
+                    best = cut
+        return best
+
+    def halve(soup, vol):
+        """Median cut across the longest axis, for pieces over the vertex limit."""
+        pts = soup.reshape(-1, 3)
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        return cut_at(soup, vol, axis, float(np.median(pts[:, axis])))
+
+    heap = []
+    counter = 0
+
+    def push(soup, size):
+        nonlocal counter
+        nverts, vol = size
+        hull = None
+        must = nverts > max_hull_verts
+        if must and convex_radius > 0.0:
+            pts = soup.reshape(-1, 3)
+            hull = simplify_hull(pts, max_verts=max_hull_verts, convex_radius=convex_radius)
+            must = float(hull_distance(pts, *hull).max()) > convex_radius
+        cut = halve(soup, vol) if must else best_cut(soup, vol)
+        gain = cut[0] / total if cut else -1.0
+        # Pieces that must be cut come first, then the biggest savings.
+        heapq.heappush(heap, (0 if must else 1, -gain, counter, soup, cut, hull))
+        counter += 1
+
+    whole = P[T]
+    size = _hull_size(P[np.unique(T)])
+    total = size[1] if size[1] > 0 else 1.0
+    push(whole, size)
+
+    done: List[Tuple[List[Vert3], List[Face]]] = []
+    while heap:
+        rank, neg_gain, _, soup, cut, hull = heapq.heappop(heap)
+        must = rank == 0
+        room = len(done) + len(heap) + 1 < max_pieces
+        if cut is None or not room or (not must and -neg_gain < min_gain):
+            if hull is None:
+                # Out of pieces: simplify to the limit, whatever the error.
+                hull = (simplify_hull(soup.reshape(-1, 3), max_verts=max_hull_verts) if must
+                        else convex_hull(soup.reshape(-1, 3)))
+            done.append(hull)
+            continue
+        _, left, right, ls, rs = cut
+        push(left, ls)
+        push(right, rs)
+    return done
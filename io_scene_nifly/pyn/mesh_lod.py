@@ -0,0 +1,345 @@
+"""
+mesh_lod.py
+-----------
+Generate levels of detail for a triangle mesh.
+
+Public API
+----------
+    decimate(verts, tris, target_tris, weights=None, groups=None, shapes=(),
+             locked=(), max_error=None) -> List[Tuple[int, int, int]]
+    lod_chain(verts, tris, ratios, weights=None, groups=None, shapes=(),
+              locked=()) -> List[List[Tuple[int, int, int]]]
+    nested_lod_levels(verts, tris, ratios, groups=None) -> List[int]
+
+decimate is quadric-error-metric (Garland-Heckbert) simplification using
+half-edge collapses: a vertex is always merged into one of its neighbors, so
+the surviving triangles index the original vertex list.  Every per-vertex
+array -- UVs, normals, skin weights, morph deltas -- stays valid unchanged,
+and the levels can share one vertex buffer.  To keep that data correct it
+never moves:
+
+    * a vertex on an open boundary, or sharing its position with another
+      vertex (a UV or normal seam: export splits vertices there);
+    * a vertex used by triangles of more than one group (partition);
+    * any vertex in locked.
+
+Collapsing between vertices with different skin weights costs extra, and
+with shapes (morph targets, as full position lists) the error is measured in
+every shape, so a level stays good when morphed.  Starfield export writes
+lod_chain's levels into a BSGeometry's LOD mesh slots.
+
+nested_lod_levels is for shapes whose LOD levels are nested prefixes of one
+triangle list (BSLODTriShape, BSMeshLODTriShape): a coarser level can only
+drop triangles, never replace them.  It keeps the largest connected pieces
+and drops the small ones -- debris, trim, leaf cards -- first.  A single
+connected mesh has nothing to drop and stays whole at every level.
+"""
+
+from __future__ import annotations
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Tri = Tuple[int, int, int]
+
+# Multiplier on the weight-change penalty (L1 weight difference times the
+# squared edge length).
+WEIGHT_PENALTY = 1.0
+
+
+def _plane_quadric(a, b, c):
+    """Area-weighted quadric of the plane through a, b, c, as 10 coefficients."""
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    nx, ny, nz = uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx
+    length = math.sqrt(nx*nx + ny*ny + nz*nz)
+    if length == 0:
+        return None
+    # Unit plane normal, weighted by the triangle's area.
+    w = length / 2
+    nx, ny, nz = nx / length, ny / length, nz / length
+    d = -(nx*a[0] + ny*a[1] + nz*a[2])
+    return [w*nx*nx, w*nx*ny, w*nx*nz, w*nx*d,
+            w*ny*ny, w*ny*nz, w*ny*d,
+            w*nz*nz, w*nz*d,
+            w*d*d]
+
+
+def _quadric_error(q, p):
+    """Evaluate quadric q at point p."""
+    x, y, z = p
+    return (q[0]*x*x + 2*q[1]*x*y + 2*q[2]*x*z + 2*q[3]*x
+            + q[4]*y*y + 2*q[5]*y*z + 2*q[6]*y
+            + q[7]*z*z + 2*q[8]*z
+            + q[9])
+
+
+def _normal(a, b, c):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    return (uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx)
+
+
+def _fixed_vertices(verts, tris, groups, locked):
+    """Vertices decimate must not remove; see the module docstring."""
+    fixed = set(locked)
+
+    # Open boundary: an undirected edge used by only one triangle.
+    edge_count: Dict[Tuple[int, int], int] = {}
+    for a, b, c in tris:
+        for e in ((a, b), (b, c), (c, a)):
+            k = (min(e), max(e))
+            edge_count[k] = edge_count.get(k, 0) + 1
+    for (a, b), n in edge_count.items():
+        if n == 1:
+            fixed.update((a, b))
+
+    # Seams: more than one vertex at a position.
+    first_at: Dict[Tuple[float, float, float], int] = {}
+    for i, p in enumerate(verts):
+        key = tuple(p)
+        if key in first_at:
+            fixed.update((i, first_at[key]))
+        else:
+            first_at[key] = i
+
+    if groups is not None:
+        group_of: Dict[int, object] = {}
+        for t, g in zip(tris, groups):
+            for v in t:
+                if group_of.setdefault(v, g) != g:
+                    fixed.add(v)
+    return fixed
+
+
+def decimate(verts: Sequence[Sequence[float]],
+             tris: Sequence[Tri],
+             target_tris: int,
+             weights: Optional[Sequence[Dict[str, float]]] = None,
+             groups: Optional[Sequence[object]] = None,
+             shapes: Sequence[Sequence[Sequence[float]]] = (),
+             locked: Sequence[int] = (),
+             max_error: Optional[float] = None) -> List[Tri]:
+    """Simplify tris down to about target_tris triangles.
+
+    Args:
+        verts:       Vertex positions.
+        tris:        Triangles indexing verts.
+        target_tris: Stop once this few triangles remain.
+        weights:     Optional per-vertex {bone: weight}.
+        groups:      Optional key per triangle (a partition id); vertices
+                     between groups never move.
+        shapes:      Morph targets, each a full list of vertex positions.
+        locked:      Vertices that must not be removed.
+        max_error:   Stop before any collapse costing more than this.
+
+    Returns:
+        The remaining triangles, indexing verts, in their original order.
+        Each keeps its winding.  Fewer than target_tris may be impossible
+        without moving a fixed vertex, in which case more are returned.
+    """
+    kept, tris = _collapse(verts, tris, target_tris, weights, groups, shapes,
+                           locked, max_error)
+    return [tris[ti] for ti in kept]
+
+
+def _collapse(verts, tris, target_tris, weights, groups, shapes, locked, max_error):
+    """Run decimate's collapses.
+
+    Returns (kept, tris): the indices of the surviving triangles, and the
+    triangle list with their new corners.
+    """
+    tris = [tuple(t) for t in tris]
+    positions = [verts] + [s for s in shapes]
+    fixed = _fixed_vertices(verts, tris, groups, locked)
+
+    nverts = len(verts)
+    quadrics = [[[0.0] * 10 for _ in range(nverts)] for _ in positions]
+    vert_tris: List[set] = [set() for _ in range(nverts)]
+    alive = [True] * len(tris)
+    for ti, (a, b, c) in enumerate(tris):
+        if a == b or b == c or a == c:
+            alive[ti] = False
+            continue
+        for v in (a, b, c):
+            vert_tris[v].add(ti)
+        for pos, qs in zip(positions, quadrics):
+            q = _plane_quadric(pos[a], pos[b], pos[c])
+            if q is None:
+                continue
+            for v in (a, b, c):
+                qv = qs[v]
+                for k in range(10):
+                    qv[k] += q[k]
+    count = sum(alive)
+
+    def neighbors(v):
+        return {x for ti in vert_tris[v] for x in tris[ti]} - {v}
+
+    def allowed(u, v):
+        """Whether collapsing u into v keeps the surface sound."""
+        # Link condition: u and v may only share the neighbors on their common
+        # triangles, or the collapse pinches the surface.
+        shared = vert_tris[u] & vert_tris[v]
+        if not shared:
+            return False
+        wing = {x for ti in shared for x in tris[ti]}
+        if not (neighbors(u) & neighbors(v)) <= wing:
+            return False
+        # No triangle may flip.
+        for ti in vert_tris[u] - shared:
+            t = tris[ti]
+            n0 = _normal(*(verts[x] for x in t))
+            n1 = _normal(*(verts[v if x == u else x] for x in t))
+            if n0[0]*n1[0] + n0[1]*n1[1] + n0[2]*n1[2] <= 0:
+                return False
+        return True
+
+    def cost(u, v):
+        """Error of collapsing u into v."""
+        err = 0.0
+        for pos, qs in zip(positions, quadrics):
+            qu, qv = qs[u], qs[v]
+            err += _quadric_error([qu[k] + qv[k] for k in range(10)], pos[v])
+        if weights is not None:
+            wu, wv = weights[u], weights[v]
+            diff = sum(abs(wu.get(k, 0.0) - wv.get(k, 0.0)) for k in set(wu) | set(wv))
+            if diff:
+                d2 = sum((verts[u][i] - verts[v][i])**2 for i in range(3))
+                err += WEIGHT_PENALTY * diff * d2
+        return err
+
+    # Candidates are ranked by cost alone and checked for soundness when
+    # they come off the heap.  A collapse only changes the quadric of the
+    # vertex kept, so a stamp per vertex marks stale entries.
+    stamp = [0] * nverts
+    heap = []
+
+    def push_around(v):
+        for x in neighbors(v):
+            if v not in fixed:
+                heapq.heappush(heap, (cost(v, x), v, x, stamp[v], stamp[x]))
+            if x not in fixed:
+                heapq.heappush(heap, (cost(x, v), x, v, stamp[x], stamp[v]))
+
+    for u in range(nverts):
+        if u not in fixed and vert_tris[u]:
+            for x in neighbors(u):
+                heap.append((cost(u, x), u, x, 0, 0))
+    heapq.heapify(heap)
+
+    while heap and count > target_tris:
+        c, u, v, su, sv = heapq.heappop(heap)
+        if su != stamp[u] or sv != stamp[v] or not allowed(u, v):
+            continue
+        if max_error is not None and c > max_error:
+            break
+        for ti in list(vert_tris[u]):
+            t = tris[ti]
+            vert_tris[u].discard(ti)
+            if v in t:
+                alive[ti] = False
+                count -= 1
+                for x in t:
+                    vert_tris[x].discard(ti)
+            else:
+                tris[ti] = tuple(v if x == u else x for x in t)
+                vert_tris[v].add(ti)
+        for qs in quadrics:
+            qu, qv = qs[u], qs[v]
+            for k in range(10):
+                qv[k] += qu[k]
+        stamp[u] += 1
+        stamp[v] += 1
+        push_around(v)
+
+    return [ti for ti in range(len(tris)) if alive[ti]], tris
+
+
+def lod_chain(verts: Sequence[Sequence[float]],
+              tris: Sequence[Tri],
+              ratios: Sequence[float],
+              weights: Optional[Sequence[Dict[str, float]]] = None,
+              groups: Optional[Sequence[object]] = None,
+              shapes: Sequence[Sequence[Sequence[float]]] = (),
+              locked: Sequence[int] = ()) -> List[List[Tri]]:
+    """Decimate to each fraction of the original triangle count in ratios.
+
+    Ratios are taken from finest to coarsest, each level decimating the one
+    before it, so every level's vertices are a subset of the previous one's.
+    The other arguments are as for decimate.  Returns one triangle list per
+    ratio, in the order given.
+    """
+    levels = {}
+    current = list(tris)
+    for r in sorted(set(ratios), reverse=True):
+        kept, moved = _collapse(verts, current, int(round(len(tris) * r)),
+                                weights, groups, shapes, locked, None)
+        current = [moved[ti] for ti in kept]
+        if groups is not None:
+            groups = [groups[ti] for ti in kept]
+        levels[r] = current
+    return [levels[r] for r in ratios]
+
+
+def nested_lod_levels(verts: Sequence[Sequence[float]],
+                      tris: Sequence[Tri],
+                      ratios: Sequence[float],
+                      groups: Optional[Sequence[object]] = None) -> List[int]:
+    """Assign each triangle a nested LOD level by dropping small pieces first.
+
+    Args:
+        verts:  Vertex positions.
+        tris:   Triangles indexing verts.
+        ratios: Fraction of triangles to keep at each coarse level, coarsest
+                first (LOD0, LOD1).  The remaining triangles are the last level.
+        groups: Optional key per triangle; pieces never span groups.
+
+    Returns:
+        The level of each triangle, 0 to len(ratios).  Level L's triangles
+        are drawn at L and every finer level.  Pieces are connected through
+        shared positions, so seams don't split them, and ranked by area; the
+        largest piece is always at level 0.
+    """
+    # Union-find over positions.
+    parent: Dict[Tuple[float, ...], Tuple[float, ...]] = {}
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    def key(v):
+        return tuple(verts[v])
+
+    for t in tris:
+        for v in t:
+            parent.setdefault(key(v), key(v))
+    for ti, t in enumerate(tris):
+        ka = find(key(t[0]))
+        for v in t[1:]:
+            kb = find(key(v))
+            if ka != kb:
+                parent[kb] = ka
+
+    pieces: Dict[Tuple[object, Tuple[float, ...]], List[int]] = {}
+    for ti, t in enumerate(tris):
+        g = groups[ti] if groups is not None else None
+        pieces.setdefault((g, find(key(t[0]))), []).append(ti)
+
+    def area(ti):
+        n = _normal(*(verts[v] for v in tris[ti]))
+        return math.sqrt(n[0]*n[0] + n[1]*n[1] + n[2]*n[2]) / 2
+
+    ranked = sorted(pieces.values(), key=lambda p: -sum(area(ti) for ti in p))
+    levels = [len(ratios)] * len(tris)
+    kept = 0
+    level = 0
+    for p in ranked:
+        while level < len(ratios) and kept and kept + len(p) > ratios[level] * len(tris):
+            level += 1
+        for ti in p:
+            levels[ti] = level
+        kept += len(p)
+    return levels
@@ -7,15 +7,56 @@ sections and MOPP data.
 
 Public API
 ----------
-    segment_mesh(verts, tris, max_verts=255, max_tris=255) -> List[List[int]]
+    segment_mesh(verts, tris, max_verts=255, max_tris=255, method="bisect")
+        -> List[List[int]]
+    segment_stats(tris, groups) -> SegmentStats
 
 Each returned sub-list is a list of face indices (indices into *tris*) whose
 unique vertex count and triangle count both fit within the requested limits.
 Every input face appears in exactly one output group.
+
+Methods
+-------
+    "bisect"  Recursive median split of face centroids along the longest axis.
+              Ignores connectivity, so it cuts straight through the mesh and
+              every vertex on a cut is stored once per group.
+    "grow"    Greedy region growing over the face adjacency graph.  A group
+              takes whichever face adds the fewest new vertices, so it fills
+              up to the limits and its boundary stays short.  Fewer groups
+              and fewer duplicated vertices.
 """
 
 from __future__ import annotations
-from typing import List, Sequence, Tuple
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SEGMENT_METHODS = ("bisect", "grow")
+
+
+@dataclass
+class SegmentStats:
+    """Summary of a segmentation, for comparing methods.
+
+    boundary_verts counts mesh vertices used by more than one group; every one
+    of those is stored once per group that uses it, and stored_verts is the
+    total vertex count across groups, duplicates included.
+    """
+    groups: int
+    stored_verts: int
+    boundary_verts: int
+
+
+def segment_stats(tris: List[Tuple[int, int, int]],
+                  groups: List[List[int]]) -> SegmentStats:
+    """Count groups, stored vertices and boundary vertices of a segmentation."""
+    uses: Dict[int, int] = {}
+    for group in groups:
+        for v in {v for fi in group for v in tris[fi]}:
+            uses[v] = uses.get(v, 0) + 1
+    return SegmentStats(groups=len(groups),
+                        stored_verts=sum(uses.values()),
+                        boundary_verts=sum(1 for k in uses.values() if k > 1))
 
 
 def segment_mesh(
@@ -23,6 +64,8 @@ def segment_mesh(
     tris: List[Tuple[int, int, int]],
     max_verts: int = 255,
     max_tris: int = 255,
+    method: str = "bisect",
+    max_extent: Optional[float] = None,
 ) -> List[List[int]]:
     """Return face-index groups; each satisfies max_verts unique verts and max_tris triangles.
 
@@ -31,11 +74,21 @@ def segment_mesh(
         tris:      List of (a, b, c) face index tuples referencing *verts*.
         max_verts: Maximum unique vertices allowed per section (default 255).
         max_tris:  Maximum triangles allowed per section (default 255).
+        method:    "bisect" (spatial median split) or "grow" (connectivity-aware
+                   region growing).  See the module docstring.
+        max_extent: "grow" only.  A group never jumps to a disconnected face
+                   that would stretch its bounding box past this on any axis.
 
     Returns:
         A list of groups; each group is a sorted list of face indices.
         Every face index 0..len(tris)-1 appears in exactly one group.
     """
+    if method == "grow":
+        return _segment_grow(verts, tris, max_verts, max_tris, max_extent)
+    if method != "bisect":
+        raise ValueError(f"Unknown segmentation method {method!r}; "
+                         f"expected one of {SEGMENT_METHODS}")
+
     result: List[List[int]] = []
 
     def _fits(face_indices: List[int]) -> bool:
@@ -91,3 +144,145 @@ def segment_mesh(
     all_faces = list(range(len(tris)))
     _recurse(all_faces)
     return result
+
+
+def _centroids(verts, tris) -> List[Tuple[float, float, float]]:
+    return [tuple((verts[a][k] + verts[b][k] + verts[c][k]) / 3.0 for k in range(3))
+            for a, b, c in tris]
+
+
+def _morton_ranks(cents) -> List[int]:
+    """Rank each face by the Z-order (Morton) code of its centroid.
+
+    Walking faces in this order visits space coherently, so seeds picked from
+    it start each new group next to the groups already built.
+    """
+    n = len(cents)
+    if n == 0:
+        return []
+    lo = [min(c[k] for c in cents) for k in range(3)]
+    hi = [max(c[k] for c in cents) for k in range(3)]
+    span = [(hi[k] - lo[k]) or 1.0 for k in range(3)]
+
+    def spread(x: int) -> int:
+        out = 0
+        for bit in range(10):
+            out |= ((x >> bit) & 1) << (3 * bit)
+        return out
+
+    codes = []
+    for c in cents:
+        q = [min(1023, int((c[k] - lo[k]) / span[k] * 1023)) for k in range(3)]
+        codes.append(spread(q[0]) | (spread(q[1]) << 1) | (spread(q[2]) << 2))
+    order = sorted(range(n), key=codes.__getitem__)
+    rank = [0] * n
+    for r, fi in enumerate(order):
+        rank[fi] = r
+    return rank
+
+
+def _segment_grow(verts, tris, max_verts: int, max_tris: int,
+                  max_extent: Optional[float] = None) -> List[List[int]]:
+    """Greedy region growing over the face adjacency graph.
+
+    Each group starts from a seed face and repeatedly takes the frontier face
+    that adds the fewest new vertices, breaking ties by distance from the seed
+    so the group grows as a compact disc rather than a ragged strip.  The
+    group closes when it holds max_tris faces or when even the cheapest
+    frontier face would break max_verts.  When the connected frontier runs
+    dry before the group is full, it jumps to the next unassigned face in
+    Morton order, so small islands share groups instead of each taking one --
+    unless that would stretch the group past max_extent.
+
+    Seeds come from the previous group's rejected frontier where possible, so
+    groups are laid down next to each other and don't strand slivers of faces
+    between them.
+    """
+    n = len(tris)
+    if n == 0:
+        return []
+
+    vert_faces: Dict[int, List[int]] = {}
+    for fi, t in enumerate(tris):
+        for v in set(t):
+            vert_faces.setdefault(v, []).append(fi)
+
+    cents = _centroids(verts, tris)
+    rank = _morton_ranks(cents)
+    sweep = sorted(range(n), key=rank.__getitem__)
+    sweep_pos = 0
+    assigned = [False] * n
+    remaining = n
+    result: List[List[int]] = []
+    next_seeds: List[int] = []
+
+    def key(fi, gverts, sc):
+        c = cents[fi]
+        d2 = (c[0] - sc[0]) ** 2 + (c[1] - sc[1]) ** 2 + (c[2] - sc[2]) ** 2
+        return (len(set(tris[fi]) - gverts), d2, rank[fi], fi)
+
+    while remaining:
+        seed = None
+        for fi in sorted(next_seeds, key=rank.__getitem__):
+            if not assigned[fi]:
+                seed = fi
+                break
+        if seed is None:
+            while assigned[sweep[sweep_pos]]:
+                sweep_pos += 1
+            seed = sweep[sweep_pos]
+
+        group: List[int] = []
+        gverts = set()
+        rejected: List[int] = []
+        # heap entries: (new_verts, squared distance from seed (float), rank, face)
+        heap: List[Tuple[int, float, int, int]] = []
+
+        sc = cents[seed]
+        heapq.heappush(heap, key(seed, gverts, sc))
+        queued = {seed}
+        while len(group) < max_tris:
+            if not heap:
+                # Frontier exhausted: continue with the next face in sweep order.
+                while sweep_pos < n and assigned[sweep[sweep_pos]]:
+                    sweep_pos += 1
+                jump = next((sweep[p] for p in range(sweep_pos, n)
+                             if not assigned[sweep[p]] and sweep[p] not in queued),
+                            None)
+                if jump is None:
+                    break
+                if max_extent is not None and group:
+                    pts = [verts[v] for v in gverts] + [verts[v] for v in tris[jump]]
+                    if any(max(p[k] for p in pts) - min(p[k] for p in pts) > max_extent
+                           for k in range(3)):
+                        break
+                heapq.heappush(heap, key(jump, gverts, sc))
+                queued.add(jump)
+            entry = heapq.heappop(heap)
+            fi = entry[3]
+            if assigned[fi]:
+                continue
+            cur = key(fi, gverts, sc)
+            if cur != entry:
+                heapq.heappush(heap, cur)
+                continue
+            if len(gverts) + cur[0] > max_verts:
+                # Every face whose count changed was re-pushed with its current
+                # key, so this is the true minimum: nothing else fits either.
+                rejected.append(fi)
+                break
+            assigned[fi] = True
+            remaining -= 1
+            group.append(fi)
+            for v in tris[fi]:
+                if v not in gverts:
+                    gverts.add(v)
+                    for nb in vert_faces[v]:
+                        if not assigned[nb]:
+                            heapq.heappush(heap, key(nb, gverts, sc))
+                            queued.add(nb)
+
+        result.append(sorted(group))
+        next_seeds = rejected + [h[3] for h in heap if not assigned[h[3]]]
+
+    return result
@@ -0,0 +1,113 @@
+"""
+morph_prune.py
+--------------
+Strip numerical noise out of shape-key morphs before they are written as TRI
+or Starfield morph.dat files.
+
+Public API
+----------
+    prune_morphs(base, morphs, epsilon=DEFAULT_EPSILON, rename=None,
+                 quantize=None, keep_empty=False) -> (pruned, PruneStats)
+
+Sculpting leaves tiny offsets all over a shape key.  Every vertex with one is
+written as a moved vertex, and the game keeps all of them in memory.
+prune_morphs drops vertex deltas no larger than epsilon, then drops keys with
+nothing left (unless the file needs every name present) and keys whose output
+name is already taken.  quantize lets a format judge a delta as it will read
+back from the file, so deltas that round to nothing in storage are dropped as
+well.
+"""
+
+from __future__ import annotations
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+log = logging.getLogger("pynifly")
+
+# Game units. Well below anything visible, well above float32 noise.
+DEFAULT_EPSILON = 1e-4
+
+
+@dataclass
+class PruneStats:
+    """What prune_morphs removed.
+
+    records_before counts every vertex a key moves at all; records_after the
+    vertex deltas kept.
+    """
+    keys_before: int = 0
+    records_before: int = 0
+    records_after: int = 0
+    empty: List[str] = field(default_factory=list)
+    duplicates: List[str] = field(default_factory=list)
+
+    @property
+    def records_saved(self) -> int:
+        return self.records_before - self.records_after
+
+    def bytes_saved(self, record_bytes: int, key_bytes: Callable[[str], int]) -> int:
+        """File bytes saved, given the size of one record and of one key's entry."""
+        dropped = self.empty + self.duplicates
+        return self.records_saved * record_bytes + sum(key_bytes(n) for n in dropped)
+
+    def report(self, label: str, record_bytes: int, key_bytes: Callable[[str], int]):
+        """Log what was pruned for the file `label`."""
+        if self.empty:
+            log.info(f"{label}: dropped {len(self.empty)} empty morph(s): "
+                     f"{', '.join(self.empty[:8])}{' ...' if len(self.empty) > 8 else ''}")
+        if self.duplicates:
+            log.warning(f"{label}: dropped {len(self.duplicates)} morph(s) duplicating "
+                        f"another's name: {', '.join(self.duplicates)}")
+        log.info(f"{label}: kept {self.records_after} of {self.records_before} morph records, "
+                 f"{self.keys_before - len(self.empty) - len(self.duplicates)} of "
+                 f"{self.keys_before} morphs; "
+                 f"{self.bytes_saved(record_bytes, key_bytes)} bytes saved")
+
+
+def prune_morphs(base, morphs: Mapping[str, object],
+                 epsilon: float = DEFAULT_EPSILON,
+                 rename: Optional[Callable[[str], str]] = None,
+                 quantize: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 keep_empty: bool = False
+                 ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], PruneStats]:
+    """Reduce morphs to the vertex deltas worth writing.
+
+    Args:
+        base:       (n, 3) base vertex positions.
+        morphs:     morph name -> (n, 3) absolute positions, 1:1 with base.
+                    Extra rows are ignored.
+        epsilon:    A vertex is kept only if some component of its delta is
+                    larger than this.
+        rename:     Optional map from morph name to the name written to the
+                    file.  When two morphs get the same name, the first wins.
+        quantize:   Optional function giving deltas as they will be stored;
+                    the epsilon test is applied to its result.
+        keep_empty: Keep morphs that move nothing, for files the game looks
+                    morphs up in by name (an expression's neutral pose).
+
+    Returns:
+        (pruned, stats): pruned maps each written name to (vertex indices,
+        (m, 3) float64 deltas), in the order of `morphs`.
+    """
+    base = np.asarray(base, dtype=np.float64).reshape(-1, 3)
+    n = len(base)
+    stats = PruneStats(keys_before=len(morphs))
+    pruned = {}
+    for name, positions in morphs.items():
+        d = np.asarray(positions, dtype=np.float64).reshape(-1, 3)[:n] - base
+        stats.records_before += int(np.count_nonzero(d.any(axis=1)))
+        out = rename(name) if rename else name
+        if out in pruned:
+            stats.duplicates.append(name)
+            continue
+        test = quantize(d) if quantize else d
+        moved = np.nonzero(np.abs(test).max(axis=1, initial=0.0) > epsilon)[0]
+        if len(moved) == 0 and not keep_empty:
+            stats.empty.append(name)
+            continue
+        stats.records_after += len(moved)
+        pruned[out] = (moved, d[moved])
+    return pruned, stats
@@ -346,6 +346,10 @@ nifly.setBSGeometryTangents.argtypes = [c_void_p, c_void_p, c_int, c_void_p, c_v
 nifly.setBSGeometryTangents.restype = c_int
 nifly.setBSGeometryColors.argtypes = [c_void_p, c_void_p, c_int, c_void_p, c_int]
 nifly.setBSGeometryColors.restype = c_int
+# Newer than the rest; a DLL built before it lacks the entry and LOD generation is skipped.
+if hasattr(nifly, 'addBSGeometryLODMesh'):
+    nifly.addBSGeometryLODMesh.argtypes = [c_void_p, c_void_p, c_int, c_void_p, c_int]
+    nifly.addBSGeometryLODMesh.restype = c_int
 nifly.getBSGeometryColors.argtypes = [c_void_p, c_void_p, c_void_p, c_int]
 nifly.getBSGeometryColors.restype = c_int
 nifly.skinBSGeometry.argtypes = [c_void_p, c_void_p, c_char_p, c_int, c_int]
@@ -12,6 +12,7 @@ import re
 import tempfile
 import shutil
 from pathlib import Path
+import numpy as np
 
 
 # No basicConfig here — a library must not configure root logging (it hijacks
@@ -304,6 +305,39 @@ def trim_blender_suffix(s):
         return s
 
 
+def sort_within_rows(rows, *keys):
+    """ Order sparse-matrix entries by row, then by keys (most significant first), ties
+    in entry order.
+        rows = row of each entry, nondecreasing
+        keys = arrays 1:1 with entries
+    Returns (order, rank): entry indices in sorted order, and each one's position within
+    its row. Rows are short (a vertex has a handful of weights), so this sorts a padded
+    row x slot table along its rows, much faster than a global lexsort. """
+    rows = np.asarray(rows)
+    n = len(rows)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    row_id = np.repeat(np.arange(len(starts)), counts)
+    slot = np.arange(n) - np.repeat(starts, counts)
+    shape = (len(starts), counts.max())
+
+    def table(values, fill):
+        t = np.full(shape, fill, dtype=np.asarray(values).dtype)
+        t[row_id, slot] = values
+        return t
+
+    index = table(np.arange(n), n)
+    pad = index == n
+    sort_keys = [index] + [table(k, 0) for k in reversed(keys)] + [pad]
+    o = np.lexsort(sort_keys, axis=1)
+    order = np.take_along_axis(index, o, axis=1)
+    real = ~np.take_along_axis(pad, o, axis=1)
+    rank = np.broadcast_to(np.arange(shape[1]), shape)
+    return order[real], rank[real]
+
+
 def uv_location(uv):
     """ Rounds UV location to eliminate floating point error """
     return (round(uv[0], 4), round(uv[1], 4))
@@ -357,10 +391,6 @@ def all_NearEqual(the_list, epsilon=0.001):
     return True
 
 
-def vert_uv_key(vert_index, uv):
-    return str(vert_index) + "_" + str(uv)
-
-
 def mesh_split_by_uv(verts, loops, norms, uvmap, weights, morphdict):
     """Split a mesh represented by parameters and split verts if necessary because it
         (1) maps to 2 UV locations or (2) has split normals.
@@ -377,33 +407,46 @@ def mesh_split_by_uv(verts, loops, norms, uvmap, weights, morphdict):
         loops = modified to reference the new verts where needed
         uvmap = not changed
         weights = extended to match verts
+        morphdict = each vertex list extended to match verts
+    Works on whole arrays: the first loop of each vert fixes its UV location, and every
+    other (vert, UV location) pair gets a new vert, numbered in order of first use.
     """
-    # Walk the loops. If the associated UV puts the vert in a new location, dup the vert
-    vert_uvs = [None] * len(verts) # found UV locations of verts
-    #vert_norms = [(0.0, 0.0, 0.0)] * len(verts) # found normals of verts
-    change_table = {} # {old_vert_index: new_vert_index}
-    for i, vert_idx in enumerate(loops):
-        this_vert_loc = uv_location(uvmap[i])
-        #this_vert_norm = norms[i]
-        if vert_uvs[vert_idx] is None:
-            # Not given this vert a location yet
-            vert_uvs[vert_idx] = this_vert_loc
-            #vert_norms[vert_idx] = this_vert_norm
-        elif vert_uvs[vert_idx] != this_vert_loc: # or not VNearEqual(this_vert_norm, vert_norms[vert_idx]):
-            # Found already at different location or with different normal
-            vert_key = vert_uv_key(vert_idx, this_vert_loc)
-            if vert_key in change_table:
-                loops[i] = change_table[vert_key]
-            else:
-                new_index = len(verts)
-                verts.append(verts[vert_idx])
-                if weights:
-                    weights.append(weights[vert_idx])
-                for vlist in morphdict.values():
-                    vlist.append(vlist[vert_idx])
-                vert_uvs.append(this_vert_loc)
-                loops[i] = new_index
-                change_table[vert_key] = new_index
+    if len(loops) == 0:
+        return
+    loop_verts = np.asarray(loops, dtype=np.int64)
+    uv = np.asarray(uvmap, dtype=np.float64).reshape(-1, 2)[:len(loop_verts)]
+
+    # Round only the distinct UVs, with uv_location, so locations match it exactly.
+    # (u, v) pairs are handled as complex numbers, which numpy sorts and compares
+    # much faster than rows.
+    raw_uvs, raw_of_loop = np.unique(uv[:, 0] + 1j * uv[:, 1], return_inverse=True)
+    rounded = [complex(*uv_location((c.real, c.imag))) for c in raw_uvs.tolist()]
+    uv_ids, id_of_raw = np.unique(np.array(rounded, dtype=np.complex128), return_inverse=True)
+    loop_uv = id_of_raw[raw_of_loop]
+
+    # A vert's first loop sets its location; loops elsewhere need a split.
+    first_vert, first_loop = np.unique(loop_verts, return_index=True)
+    vert_uv = np.full(len(verts), -1, dtype=np.int64)
+    vert_uv[first_vert] = loop_uv[first_loop]
+    split = np.flatnonzero(loop_uv != vert_uv[loop_verts])
+    if len(split) == 0:
+        return
+
+    # One new vert per distinct (vert, location), in order of first appearance.
+    keys = loop_verts[split] * len(uv_ids) + loop_uv[split]
+    _, key_first, key_of_split = np.unique(keys, return_index=True, return_inverse=True)
+    rank = np.empty(len(key_first), dtype=np.int64)
+    rank[np.argsort(key_first, kind='stable')] = np.arange(len(key_first))
+    new_index = len(verts) + rank[key_of_split]
+    sources = loop_verts[split][np.sort(key_first)].tolist()
+
+    loop_verts[split] = new_index
+    loops[:] = loop_verts.tolist()
+    verts.extend([verts[i] for i in sources])
+    if weights:
+        weights.extend([weights[i] for i in sources])
+    for vlist in morphdict.values():
+        vlist.extend([vlist[i] for i in sources])
 
 
 # ----------------------- Game-specific Skeleton Dictionaries ---------------------------
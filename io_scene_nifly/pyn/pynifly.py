@@ -8,10 +8,12 @@ import os
 from enum import Enum
 import re
 import logging
+from itertools import chain, repeat
 from ctypes import *
 from typing import ValuesView, List 
 import xml.etree.ElementTree as xml
 from pathlib import Path
+import numpy as np
 from .niflytools import *
 from .nifdefs import *
 from . import xmltools
@@ -62,6 +64,14 @@ def check_id(func, *args, **kwargs):
     return retval
 
 
+# numpy view of a VERTEX_WEIGHT_PAIR buffer
+VERTEX_WEIGHT_DTYPE = np.dtype({
+    'names': ['vertex', 'weight'],
+    'formats': [np.uint16, np.float32],
+    'offsets': [VERTEX_WEIGHT_PAIR.vertex.offset, VERTEX_WEIGHT_PAIR.weight.offset],
+    'itemsize': sizeof(VERTEX_WEIGHT_PAIR)})
+
+
 def get_weights_by_bone(weights_by_vert, used_groups):
     """Given a list of weights 1-1 with vertices, return weights organized by bone. 
         weights_by_vert = [dict[group-name: weight], ...] 1-1 with verts
@@ -69,18 +79,48 @@ def get_weights_by_bone(weights_by_vert, used_groups):
         Result contains only groups with non-zero weights, only groups that are in the 
         used-groups list, and only the 4 heaviest weights, which are normalized to add up to 1.
     """
+    return {nm: list(zip(v.tolist(), w.tolist()))
+            for nm, (v, w) in get_weight_arrays_by_bone(weights_by_vert, used_groups).items()}
+
+
+def get_weight_arrays_by_bone(weights_by_vert, used_groups, max_weights=4):
+    """Array form of get_weights_by_bone, with the same weights in the same order.
+        Result: {group_name: (vertex indices, weights), ...} as numpy arrays, ready for
+        NiShape.setShapeWeights. Each vertex keeps its max_weights heaviest weights (ties
+        go to the later name), normalized to add up to 1.
+    """
+    # Sparse vertex x group matrix, as coordinate arrays.
+    counts = [len(vw) for vw in weights_by_vert]
+    total = sum(counts)
+    used = set(used_groups)
+    names = sorted(used.intersection(chain.from_iterable(weights_by_vert)))
+    col = {nm: i for i, nm in enumerate(names)}
+    verts = np.repeat(np.arange(len(weights_by_vert)), counts)
+    cols = np.fromiter(map(col.get, chain.from_iterable(weights_by_vert), repeat(-1)),
+                       dtype=np.int64, count=total)
+    wts = np.fromiter(chain.from_iterable(vw.values() for vw in weights_by_vert),
+                      dtype=np.float64, count=total)
+    present = (cols >= 0) & (wts > 0.00005)
+    if not present.any():
+        return {}
+    verts, cols, wts = verts[present], cols[present], wts[present]
+
+    # Heaviest first within each vertex (ties to the later name), then the top
+    # max_weights of each.
+    order, rank = sort_within_rows(verts, -wts, -cols)
+    top = order[rank < max_weights]
+    verts, cols, wts = verts[top], cols[top], wts[top]
+    sums = np.bincount(verts, weights=wts)
+    wts = wts / sums[verts]
+
+    # Bones in order of first use; each bone's vertices in ascending order.
+    _, first = np.unique(cols, return_index=True)
+    by_bone = np.argsort(cols, kind='stable')
+    bounds = np.r_[0, np.cumsum(np.bincount(cols, minlength=len(names)))]
     result = {}
-    #Get weights by group
-    for vert_index, vert_weights in enumerate(weights_by_vert):
-        weight_pairs = [(w, nm) for nm, w in vert_weights.items() if w > 0.00005 and nm in used_groups]
-        weight_pairs.sort()
-        weight_pairs.reverse()
-        sum_weights = sum(vw for vw, nm in weight_pairs[0:4])
-        for wgt, nm in weight_pairs[0:4]:
-            if nm not in result:
-                result[nm] = []
-            result[nm].append((vert_index, wgt/sum_weights))
-            
+    for c in cols[np.sort(first)].tolist():
+        idx = by_bone[bounds[c]:bounds[c+1]]
+        result[names[c]] = (verts[idx], wts[idx])
     return result
 
 
@@ -803,7 +843,8 @@ class bhkCompressedMeshShape(bhkShape):
 
     @classmethod
     def Create(cls, file, verts, tris, radius=0.005, face_materials=None,
-               parent=None, target=None):
+               parent=None, target=None, segment_method="bisect",
+               strip_method="long"):
         """Create a bhkCompressedMeshShape with chunked geometry data.
 
         Segments the mesh into chunks (<=255 verts, <=255 tris each),
@@ -818,13 +859,18 @@ class bhkCompressedMeshShape(bhkShape):
             parent: Parent block (bhkMoppBvTreeShape).
             target: NiNode this collision belongs to. Defaults to file.rootNode.
                 Vanilla SE nifs set Target to the root node.
+            segment_method: How the mesh is chunked -- "bisect" or "grow"; see
+                mesh_segment.segment_mesh.  "grow" follows connectivity and
+                usually needs fewer chunks.
+            strip_method: How each chunk is stripified -- "greedy" or "long";
+                see tri_strip.  "long" leaves fewer flat triangles.
 
         Returns:
             (bhkCompressedMeshShape, output_ids)
             output_ids: List of MOPP output IDs per input triangle.
         """
         from .mesh_segment import segment_mesh
-        from .tri_strip import stripify
+        from .tri_strip import stripify_indexed, strip_stats
 
         # Build materials array from per-face materials
         # materials_list[i] = (havok_material, layer) — chunks reference by index
@@ -839,7 +885,8 @@ class bhkCompressedMeshShape(bhkShape):
         # Segment mesh into chunks — split by material first if multi-material
         if face_materials and len(unique_mats) > 1:
             # Group faces by material, then segment each material group
-            all_groups = segment_mesh(verts, tris)
+            all_groups = segment_mesh(verts, tris, method=segment_method,
+                                      max_extent=65.535)
             # Re-split any group that mixes materials
             groups = []
             for group in all_groups:
@@ -852,7 +899,8 @@ class bhkCompressedMeshShape(bhkShape):
                         if sub:
                             groups.append(sub)
         else:
-            groups = segment_mesh(verts, tris)
+            groups = segment_mesh(verts, tris, method=segment_method,
+                                  max_extent=65.535)
 
         # Vanilla Havok toolchain always uses fixed bit-field widths for
         # shape-key encoding, regardless of actual chunk sizes.  The engine
@@ -942,7 +990,12 @@ class bhkCompressedMeshShape(bhkShape):
                 quant_verts.extend([qx, qy, qz])
 
             # Build triangle strips
-            strips, leftovers = stripify(local_tris)
+            strips, strip_tris, leftover_ids = stripify_indexed(local_tris, strip_method)
+            leftovers = [local_tris[li] for li in leftover_ids]
+            stats = strip_stats(strips, leftovers)
+            log.debug(f"Collision chunk {chunk_idx}: {stats.strips} strips, "
+                      f"mean {stats.mean_length:.1f} tris, {stats.leftovers} flat, "
+                      f"{stats.bytes_saved} bytes saved")
 
             # Build indices array: strip indices first, then flat leftover indices
             indices = []
@@ -978,33 +1031,20 @@ class bhkCompressedMeshShape(bhkShape):
             # strip starting at index offset strip_start: tri_in_chunk =
             # strip_start + k.  For flat triangle k: flat_start + k*3.
             # output = ((chunk_idx+1) << bits_per_w_index) | (winding << bits_per_index) | tri_in_chunk
-            local_tri_sets = [frozenset(lt) for lt in local_tris]
+            # The stripifier says which local triangle each strip triangle is.
             idx_pos = 0  # current position in the indices array
-            for strip in strips:
-                for k in range(len(strip) - 2):
+            for strip, ids in zip(strips, strip_tris):
+                for k, li in enumerate(ids):
                     winding = k & 1
                     tri_in_chunk = idx_pos + k
                     oid = ((chunk_idx + 1) << bits_per_w_index) | (winding << bits_per_index) | tri_in_chunk
-                    if k % 2 == 0:
-                        tri_set = frozenset((strip[k], strip[k+1], strip[k+2]))
-                    else:
-                        tri_set = frozenset((strip[k], strip[k+2], strip[k+1]))
-                    for gi, fi in enumerate(face_group):
-                        if local_tri_sets[gi] == tri_set:
-                            output_ids[fi] = oid
-                            local_tri_sets[gi] = None  # prevent double-match
-                            break
+                    output_ids[face_group[li]] = oid
                 idx_pos += len(strip)
             # Flat triangles: each occupies 3 index positions
-            for li, (a, b, c) in enumerate(leftovers):
-                tri_in_chunk = idx_pos + li * 3
+            for k, li in enumerate(leftover_ids):
+                tri_in_chunk = idx_pos + k * 3
                 oid = ((chunk_idx + 1) << bits_per_w_index) | (0 << bits_per_index) | tri_in_chunk
-                leftover_set = frozenset((a, b, c))
-                for gi, fi in enumerate(face_group):
-                    if local_tri_sets[gi] == leftover_set:
-                        output_ids[fi] = oid
-                        local_tri_sets[gi] = None
-                        break
+                output_ids[face_group[li]] = oid
 
         shape = cls(file=file, id=shape_id, properties=buf, parent=parent)
         return shape, output_ids
@@ -1264,18 +1304,20 @@ class bhkPhysicsSystem(NiObject):
         nifly.setPhysicsSystemData(self.file._handle, self.id, data, len(data))
 
     @classmethod
-    def New(cls, file, data: bytes = None, shapes=None, verts=None, faces=None, parent=None):
+    def New(cls, file, data: bytes = None, shapes=None, verts=None, faces=None, parent=None,
+            share_min_sections=None):
         """Create a new bhkPhysicsSystem block in *file*.
 
         Pass one of:
           *data*   — raw Havok packfile bytes
-          *shapes* — List[CollisionShape] from bhk_autounpack; packed via pack_shapes()
+          *shapes* — List[CollisionShape] from bhk_autounpack; packed via pack_shapes(),
+                     with *share_min_sections* for compressed meshes
           *verts* + *faces* — raw geometry; packed via pack_convex_polytope()
         """
         if data is None:
             if shapes is not None:
                 from .bhk_autopack import pack_shapes
-                data = pack_shapes(shapes)
+                data = pack_shapes(shapes, share_min_sections=share_min_sections)
             else:
                 from .bhk_autopack import pack_convex_polytope
                 data = pack_convex_polytope(verts, faces)
@@ -1300,9 +1342,19 @@ class bhkPhysicsSystem(NiObject):
           faces: List[Face] — vertex index tuples (empty for compound shapes)
           convex_radius: float — Minkowski expansion radius (0.0 for mesh/compound)
           children: List[CollisionShape] — non-empty only for compound shapes
+
+        The shapes are shared with every other reader of the same packfile; see
+        packfile.
         """
-        from .bhk_autounpack import parse_bytes
-        return parse_bytes(self.data)
+        return list(self.packfile.shapes)
+
+    @property
+    def packfile(self):
+        """The packfile parsed once (bhk_autounpack.ParsedPackfile): fixups, body
+        order, transforms, physics properties and decoded shapes.  Cached by
+        content, so every collision object on this system gets the same one."""
+        from .bhk_autounpack import parse_packfile
+        return parse_packfile(self.data)
 
 
 class bhkNPCollisionObject(NiCollisionObject):
@@ -4023,7 +4075,7 @@ class NiShaderFO4(NiShader):
                                                 alt_pathlist=altpaths)
                 if fullpath:
                     try:
-                        self._materials = bgsmaterial.MaterialFile.Open(fullpath)
+                        self._materials = bgsmaterial.load_material(fullpath)
                     except Exception:
                         log.exception(
                             f"Could not read materials file '{fullpath}' "
@@ -4146,6 +4198,7 @@ class NiShape(NiNode):
         self._is_skinned = False
         self._verts = None
         self._weights = None
+        self._weight_arrays = None
         self._partitions = None
         self._partition_tris = None
         self._segment_file = ''
@@ -4419,6 +4472,14 @@ class NiShape(NiNode):
         out = [(x.vertex, x.weight) for x in buf]
         return out
 
+    def _bone_weight_array(self, bone_id):
+        """Weights for one bone position as a structured VERTEX_WEIGHT_DTYPE array."""
+        BUFSIZE = nifly.getShapeBoneWeightsCount(self.file._handle, self._handle, bone_id)
+        buf = (VERTEX_WEIGHT_PAIR * BUFSIZE)()
+        nifly.getShapeBoneWeights(self.file._handle, self._handle,
+                                          bone_id, buf, BUFSIZE)
+        return np.frombuffer(buf, dtype=VERTEX_WEIGHT_DTYPE, count=BUFSIZE)
+
     @property
     def bone_weights(self):
         """ Dictionary of bone weights
@@ -4442,6 +4503,29 @@ class NiShape(NiNode):
                              for bid, verts in by_id.items()}
         return self._weights
 
+    @property
+    def bone_weight_arrays(self):
+        """ Bone weights as dense arrays, aggregated like bone_weights.
+            returns {bone-name: (vertex-indices, weights), ...}
+
+            Vertex indices come back sorted; weights are float64 sums of the
+            float32 values stored per palette position.
+            """
+        if self._weight_arrays is None:
+            by_id = {}     # node id -> [weight arrays]
+            id_name = {}   # node id -> name (first occurrence)
+            for pos, (name, bid) in enumerate(zip(self.bone_names, self.bone_ids)):
+                id_name.setdefault(bid, name)
+                by_id.setdefault(bid, []).append(self._bone_weight_array(pos))
+            self._weight_arrays = {}
+            for bid, parts in by_id.items():
+                arr = np.concatenate(parts)
+                verts, inverse = np.unique(arr['vertex'], return_inverse=True)
+                wts = np.bincount(inverse, weights=arr['weight'].astype(np.float64),
+                                  minlength=len(verts))
+                self._weight_arrays[id_name[bid]] = (verts.astype(np.int64), wts)
+        return self._weight_arrays
+
     def get_used_bones(self):
         """
         Return bones that have non-zero weights
@@ -4557,19 +4641,27 @@ class NiShape(NiNode):
         NiNode(handle=h, file=self.file, name=bone_name)
 
         
-    def setShapeWeights(self, bone_name, vert_weights):
+    def setShapeWeights(self, bone_name, vert_weights, weights=None):
         """ Set the weights for a bone in a shape. 
+            vert_weights = [(vertex-index, weight), ...], or an array of vertex indices
+                with weights = the matching array of weights
         """
-        VERT_BUF_DEF = VERTEX_WEIGHT_PAIR * len(vert_weights)
-        vert_buf = VERT_BUF_DEF()
-        for i, vw in enumerate(vert_weights):
-            vert_buf[i].vertex = vw[0]
-            vert_buf[i].weight = vw[1]
-        xfbuf = TransformBuf()
+        if weights is None:
+            vert_weights = list(vert_weights)
+            verts = [vw[0] for vw in vert_weights]
+            weights = [vw[1] for vw in vert_weights]
+        else:
+            verts = vert_weights
+        count = len(verts)
+        vert_buf = (VERTEX_WEIGHT_PAIR * count)()
+        if count:
+            arr = np.frombuffer(vert_buf, dtype=VERTEX_WEIGHT_DTYPE)
+            arr['vertex'] = verts
+            arr['weight'] = weights
 
         nifly.setShapeBoneWeights(self.file._handle, self._handle, 
                                       bone_name.encode('utf-8'),
-                                      vert_buf, len(vert_weights))
+                                      vert_buf, count)
        
     def set_partitions(self, partitionlist, trilist):
         """ Set the partitions for a shape
@@ -4847,6 +4939,27 @@ class BSGeometry(NiShape):
             cbuf[i] = (c[0], c[1], c[2], c[3] if len(c) > 3 else 1.0)
         nifly.setBSGeometryColors(self.file._handle, self._handle, slot, cbuf, n)
 
+    @property
+    def can_add_lod_mesh(self):
+        """True if the loaded DLL can add LOD slots (older builds lack addBSGeometryLODMesh)."""
+        return hasattr(nifly, 'addBSGeometryLODMesh')
+
+    def add_lod_mesh(self, tris, from_slot=0):
+        """Add a LOD slot holding a copy of slot `from_slot` that draws only `tris`, which
+        index from_slot's vertices. The copy keeps just the vertices those tris use, with
+        their UVs, normals, colors and weights. Do this before from_slot is saved. Returns
+        the new slot, or -1 on failure."""
+        if not self.can_add_lod_mesh:
+            log.warning(f"{self.name}: this NiflyDLL cannot add LOD meshes; rebuild it to generate them")
+            return -1
+        buf = (c_uint16 * 3 * len(tris))()
+        for i, t in enumerate(tris):
+            buf[i] = (t[0], t[1], t[2])
+        slot = nifly.addBSGeometryLODMesh(
+            self.file._handle, self._handle, from_slot, buf, len(tris))
+        self._invalidate_geometry()
+        return slot
+
     def skin_bones(self, bone_names, weights_per_vertex=4):
         """Set up SF skinning: create the BSSkin::Instance + BSSkin::BoneData (identity binds)
         + SkinAttach carrying `bone_names` (in order), set the mesh's weightsPerVertex, and zero
@@ -4884,6 +4997,7 @@ class BSGeometry(NiShape):
         self._properties = None
         self._verts = self._tris = self._uvs = self._normals = self._colors = None
         self._weights = self._bone_names = self._bone_ids = self._unique_bone_names = None
+        self._weight_arrays = None
 
     @property
     def tris(self):
@@ -4915,6 +5029,17 @@ class BSGeometry(NiShape):
                              for i, name in enumerate(self.bone_names)}
         return self._weights
 
+    @property
+    def bone_weight_arrays(self):
+        """Dense form of bone_weights, one entry per bone index."""
+        if self._weight_arrays is None:
+            self._weight_arrays = {}
+            for i, name in enumerate(self.bone_names):
+                arr = self._bone_weight_array(i)
+                self._weight_arrays[name] = (arr['vertex'].astype(np.int64),
+                                             arr['weight'].astype(np.float64))
+        return self._weight_arrays
+
 
 # --- NiTriStrips --- #
 class NiTriStrips(NiShape):
@@ -16,10 +16,32 @@ The cdb is a self-describing `BSComponentDB2` reflection database:
   -> per-component data ("diffs" against parent/default), read via the reflection registry.
 A material is rebuilt by hashing its path to a resource id, finding its object, composing its
 parent chain, and following child-object references (layers -> materials -> texture sets -> files).
+
+load_cdb memory-maps the database and keeps a sidecar index next to it (`<cdb>.pynidx`) holding
+the object table, the per-object component lists and the byte offset of every component. Building
+those means scanning all ~1.4M components once; with the index a later session opens the database
+in milliseconds and reads only the pages of the materials it asks for. The index is keyed by the
+cdb's size, mtime and build version and is rebuilt whenever any of them change.
+
+Objects composed over their parent chains are memoized (LRU, bounded), since materials share
+parents, layers and texture sets. extract_all spreads a long list of materials over worker
+processes that all map the same database and index.
 """
 
+import json
+import logging
+import mmap
+import os
 import struct
 import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+log = logging.getLogger("pynifly")
 
 _DEBUG = False
 
@@ -122,6 +144,21 @@ SIG_STRT = _sig(b'STRT')
 
 EXT_MAT = _ext_uint32('mat')   # 0x0074616D
 
+# Bounds on CdbFile's memo caches, in entries. A parsed component runs to a few hundred bytes,
+# a composed object to a few KB; materials mostly share a small set of parents, layers and
+# texture sets, so these hold the shared working set of a whole-library extraction.
+COMPONENT_CACHE_SIZE = 50000
+OBJECT_CACHE_SIZE = 10000
+
+# Fixed-size records of the file index. ObjectInfo: PersistentID (file, ext, dir), DBID, parent
+# DBID, the parent's PersistentID (cdb v4) and HasData.
+_OBJECT_DTYPE = np.dtype([('file', '<u4'), ('ext', '<u4'), ('dir', '<u4'), ('dbid', '<u4'),
+                          ('parent', '<u4'), ('parent_pid', '<u4', (3,)), ('has_data', 'u1')])
+_COMPONENT_DTYPE = np.dtype([('object', '<u4'), ('index', '<u2'), ('type', '<u2')])
+_HASHMAP_ENTRY_SIZE = 20     # pair<BSResource::ID, uint64>
+_COLLISION_ENTRY_SIZE = 24   # FilePair{ID, ID}
+_EDGE_ENTRY_SIZE = 12        # src, tgt, index, type
+
 _PRIM = {
     T_INT8: ('<b', 1), T_UINT8: ('<B', 1), T_INT16: ('<h', 2), T_UINT16: ('<H', 2),
     T_INT32: ('<i', 4), T_UINT32: ('<I', 4), T_INT64: ('<q', 8), T_UINT64: ('<Q', 8),
@@ -151,6 +188,15 @@ def _fmt_res_id(pid):
     return f"res:{pid[0]:08X}:{pid[1]:08X}:{pid[2]:08X}"
 
 
+def _copy_tree(v):
+    """Copy a tree of dicts and lists; the leaves (strings, None) are immutable."""
+    if isinstance(v, dict):
+        return {k: _copy_tree(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_copy_tree(x) for x in v]
+    return v
+
+
 def _compose(lhs, rhs):
     """Deep-merge rhs into lhs (descendant overrides ancestor), matching ComposeJsons."""
     if isinstance(rhs, dict):
@@ -201,28 +247,152 @@ class _Class:
         return bool(self.flags & (1 << 2))
 
 
+# The tables search with keys of the arrays' own dtype: a Python int makes NumPy convert the
+# whole array to int64 on every call.
+
+def _last_of_runs(keys):
+    """Stable sort order of keys, keeping only the last of equal keys (dict semantics)."""
+    order = np.argsort(keys, kind='stable')
+    sk = keys[order]
+    keep = np.ones(len(sk), dtype=bool)
+    keep[:-1] = sk[1:] != sk[:-1]
+    return order[keep]
+
+
+class _ResourceTable(Mapping):
+    """(dir, file, ext) -> dbid for the .mat objects, over arrays sorted by (dir << 32 | file)."""
+    def __init__(self, res_keys, dbids):
+        self.res_keys = res_keys
+        self.dbids = dbids
+    @classmethod
+    def build(cls, objects):
+        mats = objects[objects['ext'] == EXT_MAT]
+        keys = (mats['dir'].astype(np.uint64) << np.uint64(32)) | mats['file'].astype(np.uint64)
+        order = _last_of_runs(keys)
+        return cls(keys[order], mats['dbid'][order].astype(np.uint32))
+    def __getitem__(self, pid):
+        di, f, e = pid
+        if e == EXT_MAT:
+            k = (di << 32) | f
+            i = int(self.res_keys.searchsorted(np.uint64(k)))
+            if i < len(self.res_keys) and int(self.res_keys[i]) == k:
+                return int(self.dbids[i])
+        raise KeyError(pid)
+    def __iter__(self):
+        for k in self.res_keys.tolist():
+            yield (k >> 32, k & 0xFFFFFFFF, EXT_MAT)
+    def __len__(self):
+        return len(self.res_keys)
+
+
+class _ObjectTable(Mapping):
+    """dbid -> {pid, dbid, parent, has_data}, over arrays sorted by dbid."""
+    def __init__(self, dbids, pids, parents, has_data):
+        self.dbids = dbids
+        self.pids = pids              # (n, 3) dir, file, ext
+        self.parents = parents
+        self.has_data = has_data
+    @classmethod
+    def build(cls, objects):
+        order = _last_of_runs(objects['dbid'])
+        o = objects[order]
+        pids = np.stack([o['dir'], o['file'], o['ext']], axis=1).astype(np.uint32)
+        return cls(o['dbid'].astype(np.uint32), pids, o['parent'].astype(np.uint32),
+                   o['has_data'].astype(np.uint8))
+    def _row(self, dbid):
+        i = int(self.dbids.searchsorted(np.uint32(dbid)))
+        if i < len(self.dbids) and int(self.dbids[i]) == dbid:
+            return i
+        return None
+    def __getitem__(self, dbid):
+        i = self._row(dbid)
+        if i is None:
+            raise KeyError(dbid)
+        return {'pid': tuple(self.pids[i].tolist()), 'dbid': dbid,
+                'parent': int(self.parents[i]), 'has_data': int(self.has_data[i])}
+    def parent_of(self, dbid):
+        """The parent dbid (0 for none), or None if dbid isn't an object."""
+        i = self._row(dbid)
+        return None if i is None else int(self.parents[i])
+    def __iter__(self):
+        return iter(self.dbids.tolist())
+    def __len__(self):
+        return len(self.dbids)
+
+
+class _ComponentTable(Mapping):
+    """object dbid -> [(global_index, comp_index, comp_type)] in stream order, over the
+    component list and its stable sort by object."""
+    def __init__(self, order, objects, index, ctype):
+        self.order = order            # global indices sorted by object
+        self.objects = objects        # object of each entry of order
+        self.index = index            # by global index
+        self.ctype = ctype
+    @classmethod
+    def build(cls, components):
+        order = np.argsort(components['object'], kind='stable').astype(np.uint32)
+        return cls(order, components['object'][order].astype(np.uint32),
+                   components['index'].astype(np.uint16), components['type'].astype(np.uint16))
+    def __getitem__(self, oid):
+        key = np.uint32(oid)
+        lo = int(self.objects.searchsorted(key, 'left'))
+        hi = int(self.objects.searchsorted(key, 'right'))
+        if lo == hi:
+            raise KeyError(oid)
+        gis = self.order[lo:hi].tolist()
+        return list(zip(gis, self.index[gis].tolist(), self.ctype[gis].tolist()))
+    def __iter__(self):
+        return iter(np.unique(self.objects).tolist())
+    def __len__(self):
+        return len(np.unique(self.objects))
+    @property
+    def component_count(self):
+        return len(self.order)
+
+
 class CdbFile:
-    """Parses a Starfield materialsbeta.cdb and reconstructs materials as .mat JSON dicts."""
+    """Parses a Starfield materialsbeta.cdb and reconstructs materials as .mat JSON dicts.
+
+    data is the file contents (bytes or an mmap). index, when given, is a sidecar index read by
+    _read_index for this same file; the file index is then taken from it instead of parsed."""
 
-    def __init__(self, data):
+    def __init__(self, data, index=None):
         self.d = data
         self.p = 0
         self.string_table = b''
         self.classes = []                 # list[_Class]
         self.class_by_nameref = {}        # StringRef offset -> _Class
         self.build_version = ''
-        # file index
-        self.component_types = []         # list[(idx, class_name, version, is_empty)]
-        self.objects = []                 # list[dict(pid=(d,f,e), dbid, parent, has_data)]
-        self.components = []              # list[(object_id, index, type)]
-        self.edges = []                   # list[(src, tgt, index, type)]
-        self.object_by_dbid = {}
-        self.resource_to_db = {}          # (dir,file,ext) -> dbid
-        self.component_map = {}           # dbid -> [(global_index, comp_index, comp_type)]
+        # file index, as lookup tables over compact arrays
+        self.object_by_dbid = None        # _ObjectTable: dbid -> dict(pid=(d,f,e), dbid, parent, has_data)
+        self.resource_to_db = None        # _ResourceTable: (dir,file,ext) -> dbid
+        self.component_map = None         # _ComponentTable: dbid -> [(global_index, comp_index, comp_type)]
         self._pos_map = None              # per-component stream offset (built lazily)
-        self._comp_cache = {}             # global_index -> parsed component json
+        self._comp_cache = OrderedDict()  # global_index -> parsed component json, LRU
+        self._composed_cache = OrderedDict()  # dbid -> components composed over parents, LRU
         self._id_to_path = {}             # dbid -> known .mat path (for Parent resolution)
-        self._parse_header()
+        self.path = None                  # the cdb file, when opened by load_cdb
+        self.index_path = None            # its sidecar index, when one is current on disk
+        self._stat = None                 # os.stat of the cdb, when opened by load_cdb
+        self._index_path = None           # where to save the index once _pos_map is built
+        self._index_data = None           # the mapped index file the tables point into
+        if index is None:
+            self._parse_header()
+        else:
+            self._load_index(index)
+        # Seed Parent resolution with the well-known root/template materials.
+        for rp in _ROOT_MATERIAL_PATHS:
+            dbid = self.material_dbid(rp)
+            if dbid:
+                self._id_to_path[dbid] = rp
+
+    def close(self):
+        """Release the file mappings. Nothing can be read afterwards."""
+        self.object_by_dbid = self.resource_to_db = self.component_map = None
+        self._pos_map = self._index_data = None
+        if isinstance(self.d, mmap.mmap):
+            self.d.close()
+        self.d = None
 
     # --- low-level readers ---
     def _u8(self):
@@ -247,6 +417,9 @@ class CdbFile:
         # BSResource::ID reads as file, ext, dir; stored as (dir, file, ext).
         f = self._u32(); e = self._u32(); di = self._u32()
         return (di, f, e)
+    def _records(self, dtype, n):
+        v = np.frombuffer(self.d, dtype=dtype, count=n, offset=self.p); self.p += n * dtype.itemsize
+        return v.copy()
 
     def _string_at(self, ref):
         end = self.string_table.find(b'\x00', ref)
@@ -258,7 +431,9 @@ class CdbFile:
         return self._string_at(ref)
 
     # --- header + index ---
-    def _parse_header(self):
+    def _parse_prologue(self):
+        """BETH header, string table and class registry: everything before the db chunks."""
+        self.p = 0
         sig = self._u32()
         if sig != SIG_BETH:
             raise ValueError(f"Not a cdb file (magic {sig:08X})")
@@ -290,6 +465,9 @@ class CdbFile:
         if _DEBUG:
             print(f"[dbg] after types: pos={self.p:#x} type_count={type_count} "
                   f"strtable={len(self.string_table)}")
+
+    def _parse_header(self):
+        self._parse_prologue()
         # two db chunks: CompiledDB (hash map) + DBFileIndex (objects/components/edges)
         for _ in range(2):
             self._chunk()
@@ -306,20 +484,6 @@ class CdbFile:
 
         self.component_data_start = self.p   # component "diff" blobs follow the file index
 
-        for o in self.objects:
-            self.object_by_dbid[o['dbid']] = o
-            if o['pid'][2] == EXT_MAT:
-                self.resource_to_db[o['pid']] = o['dbid']
-
-        for gi, (oid, idx, typ) in enumerate(self.components):
-            self.component_map.setdefault(oid, []).append((gi, idx, typ))
-
-        # Seed Parent resolution with the well-known root/template materials.
-        for rp in _ROOT_MATERIAL_PATHS:
-            dbid = self.material_dbid(rp)
-            if dbid:
-                self._id_to_path[dbid] = rp
-
     def _read_vector_header(self):
         """A serialized vector = Chunk(8) + List{type(u32), size(u32)}; returns count."""
         self._chunk()
@@ -327,63 +491,74 @@ class CdbFile:
         return self._u32()
 
     def _read_compiled_db(self):
+        self.build_version_pos = self.p
         self.build_version = self._str()
         self._u32()  # pad
-        # HashMap: vector<pair<BSResource::ID, uint64>>
+        # HashMap: vector<pair<BSResource::ID, uint64>> -- objects carry the same ids
         n = self._read_vector_header()
-        for _ in range(n):
-            self._res_id(); self._u64()
+        self.p += n * _HASHMAP_ENTRY_SIZE
         # Collisions: vector<FilePair{ID First, ID Second}>
         n = self._read_vector_header()
-        for _ in range(n):
-            self._res_id(); self._res_id()
+        self.p += n * _COLLISION_ENTRY_SIZE
         # Circular: vector<nullptr_t> (elements read nothing)
         self._read_vector_header()
 
     def _read_file_index(self):
         self._u8()               # Optimized (bool)
         self._u32()              # pad
-        # typeVec: vector<pair<uint16, TypeInfoPartial{version u16, isEmpty bool}>>
+        # typeVec: vector<pair<uint16, TypeInfoPartial{version u16, isEmpty bool}>>, then a
+        # User{target, casted} + class name chunk per type. Not needed for reconstruction.
         n = self._read_vector_header()
-        type_meta = []
+        self.p += n * 5
         for _ in range(n):
-            key = self._u16()
-            version = self._u16()
-            is_empty = self._u8()
-            type_meta.append((key, version, is_empty))
-        for (key, version, is_empty) in type_meta:
             self._chunk()
-            self._u32(); self._u32()   # User{target, casted}
-            class_name = self._str()
+            self._u32(); self._u32()
+            self._str()
             self._u32()                # pad
-            self.component_types.append((key, class_name, version, is_empty))
         # Objects. cdb v4 grew ObjectInfo to 33 bytes: it stores the parent's full resource
         # ID (12 bytes) after the parent DBID -- PersistentID(12) + DBID(4) + ParentDBID(4)
         # + ParentPersistentID(12) + HasData(1). (The older 21-byte layout read by
         # maximusmaxy/SFME is why that tool misaligns and runs away on a v4 cdb.)
         n = self._read_vector_header()
         if _DEBUG:
-            print(f"[dbg] file index: {len(self.component_types)} types, objects n={n} at pos={self.p:#x}")
-        for _ in range(n):
-            pid = self._res_id()
-            dbid = self._u32()
-            parent = self._u32()
-            self._res_id()            # parent's resource id (v4), not needed
-            has_data = self._u8()
-            self.objects.append({'pid': pid, 'dbid': dbid, 'parent': parent,
-                                 'has_data': has_data})
+            print(f"[dbg] file index: objects n={n} at pos={self.p:#x}")
+        objects = self._records(_OBJECT_DTYPE, n)
         # Components
         n = self._read_vector_header()
         if _DEBUG:
             print(f"[dbg] objects done pos={self.p:#x}, components n={n}")
-        for _ in range(n):
-            oid = self._u32(); idx = self._u16(); typ = self._u16()
-            self.components.append((oid, idx, typ))
+        components = self._records(_COMPONENT_DTYPE, n)
         # Edges
         n = self._read_vector_header()
-        for _ in range(n):
-            src = self._u32(); tgt = self._u32(); idx = self._u16(); typ = self._u16()
-            self.edges.append((src, tgt, idx, typ))
+        self.p += n * _EDGE_ENTRY_SIZE
+
+        self.object_by_dbid = _ObjectTable.build(objects)
+        self.resource_to_db = _ResourceTable.build(objects)
+        self.component_map = _ComponentTable.build(components)
+
+    def _load_index(self, index):
+        """Take the file index from a sidecar index instead of parsing it."""
+        self._parse_prologue()
+        self.build_version_pos = index['build_version_pos']
+        self.p = self.build_version_pos
+        self.build_version = self._str()
+        self.component_data_start = index['component_data_start']
+        a = index['arrays']
+        self.resource_to_db = _ResourceTable(a['res_keys'], a['res_dbids'])
+        self.object_by_dbid = _ObjectTable(a['obj_dbids'], a['obj_pids'], a['obj_parents'],
+                                           a['obj_has_data'])
+        self.component_map = _ComponentTable(a['comp_order'], a['comp_objects'],
+                                             a['comp_index'], a['comp_type'])
+        self._pos_map = a['pos_map']
+        self._index_data = index['data']
+
+    def _index_arrays(self):
+        r, o, c = self.resource_to_db, self.object_by_dbid, self.component_map
+        return {'res_keys': r.res_keys, 'res_dbids': r.dbids,
+                'obj_dbids': o.dbids, 'obj_pids': o.pids, 'obj_parents': o.parents,
+                'obj_has_data': o.has_data,
+                'comp_order': c.order, 'comp_objects': c.objects, 'comp_index': c.index,
+                'comp_type': c.ctype, 'pos_map': self._pos_map}
 
     # --- lookup ---
     def material_dbid(self, path):
@@ -558,26 +733,32 @@ class CdbFile:
             return
         self.p = self.component_data_start
         pm = []
-        for _ in range(len(self.components)):
+        for _ in range(self.component_map.component_count):
             pm.append(self.p)
             self._read_component(store=False)
-        self._pos_map = pm
+        self._pos_map = np.array(pm, dtype=np.uint32 if len(self.d) <= 0xFFFFFFFF else np.uint64)
+        if self._index_path and _write_index(self._index_path, self._stat, self):
+            self.index_path = self._index_path
 
     def _component_json(self, gi):
         c = self._comp_cache.get(gi)
-        if c is None:
-            self.p = self._pos_map[gi]
-            c = self._read_component(store=True)
-            self._comp_cache[gi] = c
+        if c is not None:
+            self._comp_cache.move_to_end(gi)
+            return c
+        self.p = int(self._pos_map[gi])
+        c = self._read_component(store=True)
+        self._comp_cache[gi] = c
+        while len(self._comp_cache) > COMPONENT_CACHE_SIZE:
+            self._comp_cache.popitem(last=False)
         return c
 
     # --- material reconstruction (cdb.h Manager::CreateMaterialJson) --------
     def _parent_list(self, dbid):
         out = [dbid]
-        o = self.object_by_dbid.get(dbid)
-        while o and o['parent'] != 0:
-            out.append(o['parent'])
-            o = self.object_by_dbid.get(o['parent'])
+        parent = self.object_by_dbid.parent_of(dbid)
+        while parent:
+            out.append(parent)
+            parent = self.object_by_dbid.parent_of(parent)
         return out
 
     def _indexed_component(self, components_list, db_type, index):
@@ -588,16 +769,39 @@ class CdbFile:
         components_list.append(m)
         return m
 
+    def _composed(self, dbid):
+        """dbid's components composed over its whole parent chain, with object references
+        still as dbids. Memoized: materials share parents, and the layers and texture sets they
+        reference are shared across thousands of them. The result is shared -- don't modify it."""
+        comps = self._composed_cache.get(dbid)
+        if comps is not None:
+            self._composed_cache.move_to_end(dbid)
+            return comps
+        parent = self.object_by_dbid.parent_of(dbid)
+        # An ancestor's composition is the start of each descendant's (ComposeJsons applies
+        # the chain root first), so each level only adds its own components to a copy.
+        comps = _copy_tree(self._composed(parent)) if parent else []
+        for (gi, cidx, _ctyp) in self.component_map.get(dbid, []):
+            dbval = self._component_json(gi)
+            if not dbval or 'Type' not in dbval:
+                continue
+            cval = self._indexed_component(comps, dbval['Type'], cidx)
+            _compose(cval['Data'], dbval.get('Data'))
+        self._composed_cache[dbid] = comps
+        while len(self._composed_cache) > OBJECT_CACHE_SIZE:
+            self._composed_cache.popitem(last=False)
+        return comps
+
     def _get_full_json(self, dbid, obj):
-        comps = []
-        obj['Components'] = comps
-        for anc in reversed(self._parent_list(dbid)):
-            for (gi, cidx, _ctyp) in self.component_map.get(anc, []):
-                dbval = self._component_json(gi)
-                if not dbval or 'Type' not in dbval:
-                    continue
-                cval = self._indexed_component(comps, dbval['Type'], cidx)
-                _compose(cval['Data'], dbval.get('Data'))
+        obj['Components'] = _copy_tree(self._composed(dbid))
+
+    def add_material_paths(self, paths):
+        """Make these material paths known, so any of them can be named as a Parent. Otherwise
+        only the root materials and materials already extracted are."""
+        for p in paths:
+            dbid = self.material_dbid(p)
+            if dbid:
+                self._id_to_path.setdefault(dbid, p)
 
     def _set_material_parent(self, obj, dbid):
         for parent in self._parent_list(dbid)[1:]:
@@ -664,15 +868,124 @@ _BUILTIN_NAMES = {
 }
 
 
-import json
-import os
+# ---------------------------------------------------------------------------
+# Sidecar index: magic, format, header length, a JSON header (the cdb's size/mtime/build version,
+# where things are in the cdb, and each array's dtype/shape/offset), then the raw arrays.
+# ---------------------------------------------------------------------------
+INDEX_SUFFIX = '.pynidx'
+_INDEX_MAGIC = b'PYNCDBIX'
+_INDEX_FORMAT = 1
+_INDEX_ALIGN = 16
+
 
+def _align(n):
+    return (n + _INDEX_ALIGN - 1) // _INDEX_ALIGN * _INDEX_ALIGN
 
-def load_cdb(path):
-    """Parse a materialsbeta.cdb file. The returned CdbFile can extract materials by path
-    via get_material(path) -> .mat dict (or None). Reusable across many materials."""
+
+def _index_layout(idx, data, st):
+    """(header, [(name, dtype, shape, offset, count)]) of a mapped index file, or None if it
+    isn't an index of this cdb (contents data, stat st) or doesn't hold what its header says."""
+    if idx[:8] != _INDEX_MAGIC:
+        return None
+    fmt, hlen = struct.unpack_from('<II', idx, 8)
+    if fmt != _INDEX_FORMAT:
+        return None
+    header = json.loads(idx[16:16 + hlen].decode('utf-8'))
+    if (header['cdb_size'], header['cdb_mtime_ns']) != (st.st_size, st.st_mtime_ns):
+        return None
+    pos = header['build_version_pos']
+    n = struct.unpack_from('<H', data, pos)[0]
+    if data[pos + 2:pos + 1 + n].decode('utf-8', 'replace') != header['build_version']:
+        return None
+    base = _align(16 + hlen)
+    layout = []
+    for name, (dt, shape, off) in header['arrays'].items():
+        dt = np.dtype(dt)
+        count = int(np.prod(shape))
+        if base + off + count * dt.itemsize > len(idx):
+            return None
+        layout.append((name, dt, shape, base + off, count))
+    return header, layout
+
+
+def _read_index(path, data, st):
+    """The sidecar index at path if it was built from this cdb, as the header dict plus
+    'arrays' {name: array} and 'data' (the mapping); None if missing, stale or damaged.
+    The arrays point into the mapped index file, so only the pages used are read."""
+    try:
+        with open(path, 'rb') as f:
+            idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        found = _index_layout(idx, data, st)
+    except (ValueError, KeyError, TypeError, struct.error):
+        found = None
+    if found is None:
+        idx.close()
+        return None
+    header, layout = found
+    header['arrays'] = {name: np.frombuffer(idx, dtype=dt, count=count, offset=off).reshape(shape)
+                        for name, dt, shape, off, count in layout}
+    header['data'] = idx
+    return header
+
+
+def _write_index(path, st, cdb):
+    """Save cdb's tables and component offsets as the sidecar index for the cdb stat'd as st,
+    returning whether it was written. Failing to (a read-only game folder, say) only means the
+    next session scans again."""
+    arrays = {name: np.ascontiguousarray(a) for name, a in cdb._index_arrays().items()}
+    header = {'cdb_size': st.st_size, 'cdb_mtime_ns': st.st_mtime_ns,
+              'build_version': cdb.build_version, 'build_version_pos': cdb.build_version_pos,
+              'component_data_start': cdb.component_data_start, 'arrays': {}}
+    off = 0
+    for name, a in arrays.items():
+        header['arrays'][name] = [a.dtype.str, list(a.shape), off]
+        off += _align(a.nbytes)
+    hb = json.dumps(header).encode('utf-8')
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                   prefix=os.path.basename(path) + '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_INDEX_MAGIC + struct.pack('<II', _INDEX_FORMAT, len(hb)) + hb)
+            f.write(bytes(_align(16 + len(hb)) - 16 - len(hb)))
+            for a in arrays.values():
+                f.write(a.tobytes())
+                f.write(bytes(_align(a.nbytes) - a.nbytes))
+        os.replace(tmp, path)
+    except OSError as e:
+        log.info(f"Could not write material database index '{path}': {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
+
+
+def load_cdb(path, use_index=True, index_path=None):
+    """Open a materialsbeta.cdb file. The returned CdbFile can extract materials by path
+    via get_material(path) -> .mat dict (or None). Reusable across many materials.
+
+    The file is memory-mapped. With use_index, the sidecar index at index_path (default
+    `path + INDEX_SUFFIX`) is used if it was built from this file; otherwise it is (re)written
+    once the first material has been extracted."""
     with open(path, 'rb') as f:
-        return CdbFile(f.read())
+        st = os.fstat(f.fileno())
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            data = f.read()
+    ipath = (index_path or path + INDEX_SUFFIX) if use_index else None
+    index = _read_index(ipath, data, st) if ipath else None
+    cdb = CdbFile(data, index=index)
+    cdb.path = path
+    cdb._stat = st
+    if index is not None:
+        cdb.index_path = ipath
+    else:
+        cdb._index_path = ipath
+    return cdb
 
 
 def extract_material(cdb, mat_path, out_root):
@@ -688,12 +1001,71 @@ def extract_material(cdb, mat_path, out_root):
     return out
 
 
+_worker_cdb = None   # the database each extract_all worker process opened
+
+
+def _init_worker(cdb_path, index_path, paths):
+    global _worker_cdb
+    _worker_cdb = load_cdb(cdb_path, index_path=index_path)
+    _worker_cdb.add_material_paths(paths)
+
+
+def _worker_extract(job):
+    mat_path, out_root = job
+    return extract_material(_worker_cdb, mat_path, out_root)
+
+
+def extract_all(cdb, paths, out_root, workers=None):
+    """Extract many materials, as extract_material does one, on a pool of worker processes.
+    Returns the output path (or None, if missing) of each of paths, in order. Every path is
+    made known before extracting (see add_material_paths), so what is written doesn't depend
+    on the order of paths or on which worker gets which.
+
+    Each worker maps the same cdb and the same sidecar index -- written here first if there
+    isn't a current one, to a temporary file if the cdb's folder is read-only -- so the
+    component scan happens once and the OS shares the pages between processes. workers=None
+    means one per CPU; with one worker, or a CdbFile not opened by load_cdb, it runs here."""
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    cdb.add_material_paths(paths)
+    if workers <= 1 or cdb.path is None:
+        return [extract_material(cdb, p, out_root) for p in paths]
+
+    cdb._ensure_pos_map()
+    index_path = cdb.index_path
+    tmpdir = None
+    if index_path is None:
+        tmpdir = tempfile.mkdtemp(prefix='pynifly_cdb_')
+        index_path = os.path.join(tmpdir, os.path.basename(cdb.path) + INDEX_SUFFIX)
+        if not _write_index(index_path, cdb._stat, cdb):
+            index_path = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cdb.path, index_path, paths)) as pool:
+            chunk = max(1, min(64, len(paths) // (workers * 4)))
+            return list(pool.map(_worker_extract, [(p, out_root) for p in paths],
+                                 chunksize=chunk))
+    finally:
+        if tmpdir:
+            if index_path and os.path.exists(index_path):
+                os.remove(index_path)
+            os.rmdir(tmpdir)
+
+
 def _cli(argv):
+    workers = None
+    if '--workers' in argv:
+        i = argv.index('--workers')
+        workers = int(argv[i + 1])
+        del argv[i:i + 2]
     if len(argv) < 3:
         print("Usage: python -m pyn.sf_cdb <materialsbeta.cdb> <material-path.mat | list.txt> "
-              "[out_dir]\n"
+              "[out_dir] [--workers N]\n"
               "  Extracts materials from the Starfield material database to loose .mat JSON.\n"
-              "  Give a single Materials\\...\\X.mat path, or a .txt with one path per line.")
+              "  Give a single Materials\\...\\X.mat path, or a .txt with one path per line.\n"
+              "  A list is extracted on N worker processes (default: one per CPU).")
         return 1
     cdb_path, target = argv[1], argv[2]
     out_root = argv[3] if len(argv) > 3 else os.getcwd()
@@ -707,8 +1079,7 @@ def _cli(argv):
     cdb = load_cdb(cdb_path)
     print(f"cdb v{cdb.version} (build {cdb.build_version}): {len(cdb.resource_to_db)} materials")
     ok = miss = 0
-    for p in paths:
-        out = extract_material(cdb, p, out_root)
+    for p, out in zip(paths, extract_all(cdb, paths, out_root, workers)):
         if out:
             ok += 1
             if len(paths) <= 5:
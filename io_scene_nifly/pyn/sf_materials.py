@@ -1176,8 +1176,8 @@ _cdb_cache = {}   # cdb path -> CdbFile (or False if it failed to load)
 def material_textures_from_cdb(cdb_path, mat_ref):
     """Read a material straight from Starfield's `materialsbeta.cdb` (bypassing loose `.mat`
     files) and return its normalised `{slot: path}` textures, or None if the cdb can't be read
-    or the material isn't in it. The parsed database is cached per path, so the one-time
-    component scan is paid only once across an import."""
+    or the material isn't in it. The opened database is cached per path; across sessions,
+    sf_cdb's sidecar index saves re-scanning it."""
     cdb = _cdb_cache.get(cdb_path)
     if cdb is None:
         from . import sf_cdb
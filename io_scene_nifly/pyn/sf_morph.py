@@ -8,8 +8,8 @@ data Blender models as **shape keys**. Two flavours share the identical format:
 * ``chargen`` -- creator sliders / phenotype presets (e.g. ``female_af_md1_Chin``, ``Thin``).
 * ``performance`` -- FACS action units driving expression + lip-sync (``jawOpen``, ``browLowererL``).
 
-nifly has no morph support, so this is a standalone pure-Python codec (Blender-independent, so it
-unit-tests at the pyn layer). Reference format: SesamePaste233/StarfieldMeshConverter
+nifly has no morph support, so this is a standalone Python/NumPy codec (Blender-independent, so
+it unit-tests at the pyn layer). Reference format: SesamePaste233/StarfieldMeshConverter
 (``src/MorphIO.cpp``) + Outfit Studio ``SFMorphFile``; verified byte-exact against vanilla
 2026-07-14.
 
@@ -46,6 +46,7 @@ authoring path).
 import re
 import struct
 import logging
+import numpy as np
 
 log = logging.getLogger("pynifly")
 
@@ -179,58 +180,67 @@ DEFAULT_TARGET_COLOR = 0xBDF7
 
 _HEADER = struct.Struct('<4sIII')      # magic, num_axis, num_vertices, num_shape_keys
 _U32 = struct.Struct('<I')
-_RECORD = struct.Struct('<HHHHII')     # off[0], off[1], off[2], color, normal, tangent
-_IOFFSET = struct.Struct('<IIIII')     # start, marker[0..3]
+
+# One morph_data record and one per-vertex IOffset, as laid out on disk. Packed little-endian
+# dtypes, so the record/offset tables read and write as single buffers.
+RECORD_DTYPE = np.dtype([('offset', '<u2', (3,)),     # half-float position delta
+                         ('color', '<u2'),
+                         ('normal', '<u4'),            # DEC3N
+                         ('tangent', '<u4')])          # DEC3N
+IOFFSET_DTYPE = np.dtype([('start', '<u4'),
+                          ('marker', '<u4', (4,))])
 
 
 # --- packing helpers (match SGB utils.cpp exactly) ---------------------------------------------
+# All take and return arrays, so a whole record table converts in one call.
 
 def _half_to_float(u):
-    return struct.unpack('<e', struct.pack('<H', u))[0]
+    """Raw half-float bits (uint16 array) -> float64 values."""
+    return np.asarray(u, dtype='<u2').view('<f2').astype(np.float64)
 
 
 def _float_to_half(f):
-    return struct.unpack('<H', struct.pack('<e', f))[0]
+    """Float values -> raw half-float bits (uint16 array), rounding to nearest."""
+    h = np.asarray(f, dtype=np.float64).astype('<f2')
+    if not np.isfinite(h).all():
+        raise ValueError("Morph delta too large to store as a half float")
+    return h.view('<u2')
+
+
+def half_round(deltas, scale=HAVOK_SCALE):
+    """Game-unit deltas as they read back from a morph.dat: rounded through the stored
+    half-float, metric value."""
+    d = np.asarray(deltas, dtype=np.float64) / scale
+    return d.astype('<f2').astype(np.float64) * scale
 
 
 def _dec3n_to_vec(n):
-    """Decode a DEC3N-packed uint32 to a signed (x, y, z) tuple."""
-    return (
-        (n & 1023) / 511.5 - 1.0,
-        ((n >> 10) & 1023) / 511.5 - 1.0,
-        ((n >> 20) & 1023) / 511.5 - 1.0,
-    )
+    """Decode DEC3N-packed uint32s to signed (x, y, z) rows, shape (..., 3)."""
+    n = np.asarray(n, dtype=np.uint32)[..., np.newaxis]
+    return ((n >> np.array([0, 10, 20], dtype=np.uint32)) & 1023) / 511.5 - 1.0
 
 
 def _vec_to_dec3n(v, w=1):
-    """Encode a signed (x, y, z) to a DEC3N uint32 (truncating, as SGB does)."""
-    n = int((v[0] + 1.0) * 511.5) & 1023
-    n |= (int((v[1] + 1.0) * 511.5) & 1023) << 10
-    n |= (int((v[2] + 1.0) * 511.5) & 1023) << 20
-    n |= (int(w) & 3) << 30
-    return n
-
-
-def _marker_bits(marker):
-    """(m0, m1, m2, m3) -> ascending list of set key indices."""
-    keys = []
-    for word_i, word in enumerate(marker):
-        base = word_i * 32
-        while word:
-            b = (word & -word).bit_length() - 1   # lowest set bit
-            keys.append(base + b)
-            word &= word - 1
-    return keys
-
-
-def _bits_marker(keys):
-    """Iterable of key indices -> (m0, m1, m2, m3)."""
-    marker = [0, 0, 0, 0]
-    for k in keys:
-        if k >= MAX_KEYS:
-            raise ValueError(f"Morph key index {k} exceeds the {MAX_KEYS}-key cap")
-        marker[k >> 5] |= 1 << (k & 31)
-    return tuple(marker)
+    """Encode signed (..., 3) vectors to DEC3N uint32s (truncating, as SGB does)."""
+    q = (np.trunc((np.asarray(v, dtype=np.float64) + 1.0) * 511.5).astype(np.int64) & 1023)
+    n = q[..., 0] | (q[..., 1] << 10) | (q[..., 2] << 20) | ((int(w) & 3) << 30)
+    return n.astype(np.uint32)
+
+
+def _marker_mask(markers, num_keys=MAX_KEYS):
+    """(V, 4) uint32 markers -> (V, num_keys) bool mask; column k = bit k."""
+    bits = np.ascontiguousarray(markers, dtype='<u4').view(np.uint8)
+    return np.unpackbits(bits, axis=-1, bitorder='little')[:, :num_keys].astype(bool)
+
+
+def _mask_marker(mask):
+    """(V, K) bool mask -> (V, 4) uint32 markers. K must not exceed MAX_KEYS."""
+    v, k = mask.shape
+    if k > MAX_KEYS:
+        raise ValueError(f"Morph key index {k - 1} exceeds the {MAX_KEYS}-key cap")
+    full = np.zeros((v, MAX_KEYS), dtype=bool)
+    full[:, :k] = mask
+    return np.packbits(full, axis=-1, bitorder='little').view('<u4')
 
 
 class MorphFile:
@@ -239,15 +249,16 @@ class MorphFile:
     Attributes:
         num_vertices: vertex count of the base mesh this morph applies to.
         morph_names:  shape-key names, in index order (index = marker bit position).
-        records:      raw ``(off0, off1, off2, color, normal, tangent)`` tuples, verbatim.
-        offsets:      per-vertex ``(start, (m0, m1, m2, m3))`` tuples (len == num_vertices).
+        records:      raw record table, a RECORD_DTYPE array, verbatim.
+        offsets:      per-vertex IOFFSET_DTYPE array (``start``, ``marker[4]``);
+                      len == num_vertices.
     """
 
     def __init__(self):
         self.num_vertices = 0
         self.morph_names = []
-        self.records = []
-        self.offsets = []
+        self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.offsets = np.zeros(0, dtype=IOFFSET_DTYPE)
 
     # --- reading -------------------------------------------------------------------------------
 
@@ -264,18 +275,16 @@ class MorphFile:
         p = _HEADER.size
         for _ in range(num_keys):
             (nlen,) = _U32.unpack_from(data, p); p += _U32.size
-            self.morph_names.append(data[p:p + nlen].decode('utf-8')); p += nlen
+            self.morph_names.append(bytes(data[p:p + nlen]).decode('utf-8')); p += nlen
 
         num_morph_data, num_offsets = struct.unpack_from('<II', data, p); p += 8
         if num_offsets != num_vertices:
             log.warning("morph.dat num_offsets=%d != num_vertices=%d", num_offsets, num_vertices)
 
-        for _ in range(num_morph_data):
-            self.records.append(_RECORD.unpack_from(data, p)); p += _RECORD.size
-
-        for _ in range(num_offsets):
-            start, m0, m1, m2, m3 = _IOFFSET.unpack_from(data, p); p += _IOFFSET.size
-            self.offsets.append((start, (m0, m1, m2, m3)))
+        self.records = np.frombuffer(data, dtype=RECORD_DTYPE, count=num_morph_data, offset=p)
+        p += self.records.nbytes
+        self.offsets = np.frombuffer(data, dtype=IOFFSET_DTYPE, count=num_offsets, offset=p)
+        p += self.offsets.nbytes
 
         if p != len(data):
             log.warning("morph.dat: parsed %d of %d bytes", p, len(data))
@@ -295,10 +304,8 @@ class MorphFile:
             nb = name.encode('utf-8')
             out += _U32.pack(len(nb)) + nb
         out += struct.pack('<II', len(self.records), len(self.offsets))
-        for rec in self.records:
-            out += _RECORD.pack(*rec)
-        for start, marker in self.offsets:
-            out += _IOFFSET.pack(start, *marker)
+        out += np.ascontiguousarray(self.records, dtype=RECORD_DTYPE).tobytes()
+        out += np.ascontiguousarray(self.offsets, dtype=IOFFSET_DTYPE).tobytes()
         return bytes(out)
 
     def to_file(self, path):
@@ -307,28 +314,54 @@ class MorphFile:
 
     # --- positions view (for Blender shape keys) -----------------------------------------------
 
+    def record_keys(self):
+        """Expand the marker bits to one ``(vertex, key, record)`` triple per stored delta.
+
+        Returns three int64 arrays, ordered by vertex then key -- the order the records are
+        laid out in. Each vertex's run starts at its IOffset ``start``.
+        """
+        mask = _marker_mask(self.offsets['marker'], len(self.morph_names))
+        verts, keys = np.nonzero(mask)
+        counts = np.bincount(verts, minlength=len(self.offsets))
+        starts = self.offsets['start'].astype(np.int64)
+
+        # A vertex's run ends where the next one starts.
+        ends = np.append(starts[1:], len(self.records))
+        bad = np.nonzero((ends - starts != counts) & (counts > 0))[0]
+        for v in bad:
+            log.warning("vertex %d: %d records but %d marker bits",
+                        v, ends[v] - starts[v], counts[v])
+
+        # Rank of each set bit within its vertex, added to that vertex's start.
+        first = np.cumsum(counts) - counts
+        rec = starts[verts] + np.arange(len(verts)) - first[verts]
+        if len(rec) and rec.max() >= len(self.records):
+            raise ValueError(f"morph.dat marker bits address record {rec.max()} "
+                             f"of {len(self.records)}")
+        return verts, keys, rec
+
+    def key_arrays(self, scale=HAVOK_SCALE):
+        """Return ``{morph_name: (vertex_indices, deltas)}`` in game units.
+
+        ``vertex_indices`` is an ascending int64 array of the vertices the key moves and
+        ``deltas`` the matching (n, 3) float64 position deltas. Positions only, like key_deltas.
+        """
+        verts, keys, rec = self.record_keys()
+        d = _half_to_float(self.records['offset'][rec]) * scale
+        order = np.argsort(keys, kind='stable')
+        bounds = np.searchsorted(keys[order], np.arange(len(self.morph_names) + 1))
+        return {name: (verts[order[bounds[k]:bounds[k + 1]]], d[order[bounds[k]:bounds[k + 1]]])
+                for k, name in enumerate(self.morph_names)}
+
     def key_deltas(self, scale=HAVOK_SCALE):
         """Return ``{morph_name: {vertex_index: (dx, dy, dz)}}`` in game units.
 
         Only vertices a key actually moves appear (sparse). Position deltas only -- the stored
         normal/tangent/color channels are not returned (positions-only representation).
+        key_arrays returns the same data without building per-vertex tuples.
         """
-        result = {name: {} for name in self.morph_names}
-        n = len(self.records)
-        for v, (start, marker) in enumerate(self.offsets):
-            keys = _marker_bits(marker)
-            if not keys:
-                continue
-            end = self.offsets[v + 1][0] if v + 1 < len(self.offsets) else n
-            if end - start != len(keys):
-                log.warning("vertex %d: %d records but %d marker bits", v, end - start, len(keys))
-            for i, k in enumerate(keys):
-                off0, off1, off2, _color, _nrm, _tan = self.records[start + i]
-                dx = _half_to_float(off0) * scale
-                dy = _half_to_float(off1) * scale
-                dz = _half_to_float(off2) * scale
-                result[self.morph_names[k]][v] = (dx, dy, dz)
-        return result
+        return {name: dict(zip(verts.tolist(), map(tuple, d.tolist())))
+                for name, (verts, d) in self.key_arrays(scale).items()}
 
     # --- building from positions (for Blender export) ------------------------------------------
 
@@ -339,8 +372,9 @@ class MorphFile:
         Args:
             morph_names:  shape-key names, in the desired key-index order.
             num_vertices: base-mesh vertex count.
-            deltas:       ``{morph_name: {vertex_index: (dx, dy, dz)}}`` -- sparse; only the
-                          vertices a key moves need entries.
+            deltas:       sparse per-key deltas: ``{morph_name: {vertex_index: (dx, dy, dz)}}``
+                          or ``{morph_name: (vertex_indices, (n, 3) array)}``. Only the vertices
+                          a key moves need entries; a vertex may appear once per key.
             scale:        game units -> metric divisor (default HAVOK_SCALE).
 
         Normal/tangent deltas are written neutral (zero) and colour as DEFAULT_TARGET_COLOR --
@@ -349,25 +383,72 @@ class MorphFile:
         if len(morph_names) > MAX_KEYS:
             raise ValueError(f"{len(morph_names)} morphs exceeds the {MAX_KEYS}-key cap")
 
+        keys, verts, vals = [], [], []
+        for k, name in enumerate(morph_names):
+            d = deltas.get(name)
+            if d is None or len(d) == 0:
+                continue
+            if isinstance(d, dict):
+                vi = np.fromiter(d.keys(), dtype=np.int64, count=len(d))
+                dv = np.array(list(d.values()), dtype=np.float64).reshape(-1, 3)
+            else:
+                vi = np.asarray(d[0], dtype=np.int64)
+                dv = np.asarray(d[1], dtype=np.float64).reshape(-1, 3)
+            keys.append(np.full(len(vi), k, dtype=np.int64))
+            verts.append(vi)
+            vals.append(dv)
+        if not keys:
+            keys = verts = [np.zeros(0, dtype=np.int64)]
+            vals = [np.zeros((0, 3))]
+        return cls._from_pairs(morph_names, num_vertices, np.concatenate(keys),
+                               np.concatenate(verts), np.concatenate(vals), scale)
+
+    @classmethod
+    def from_array(cls, morph_names, deltas, moved=None, scale=HAVOK_SCALE):
+        """Build a positions-only morph.dat from a dense (keys, vertices, 3) delta array.
+
+        `moved` is an optional (keys, vertices) bool mask of the deltas to store; by default
+        every non-zero delta is stored. Otherwise as from_deltas.
+        """
+        if len(morph_names) > MAX_KEYS:
+            raise ValueError(f"{len(morph_names)} morphs exceeds the {MAX_KEYS}-key cap")
+        deltas = np.asarray(deltas, dtype=np.float64)
+        if deltas.shape[0] != len(morph_names) or deltas.shape[2:] != (3,):
+            raise ValueError(f"Delta array shape {deltas.shape} does not match "
+                             f"({len(morph_names)}, vertices, 3)")
+        if moved is None:
+            moved = (deltas != 0).any(axis=2)
+        keys, verts = np.nonzero(moved)
+        return cls._from_pairs(morph_names, deltas.shape[1], keys, verts,
+                               deltas[keys, verts], scale)
+
+    @classmethod
+    def _from_pairs(cls, morph_names, num_vertices, keys, verts, deltas, scale):
+        """Build from one (key, vertex, delta) triple per stored record, in any order."""
+        if len(verts) and (verts.min() < 0 or verts.max() >= num_vertices):
+            raise ValueError(f"Morph delta vertex index out of range for {num_vertices} vertices")
+
         self = cls()
         self.num_vertices = num_vertices
         self.morph_names = list(morph_names)
 
-        color = DEFAULT_TARGET_COLOR & 0xFFFF   # raw RGB565
-        zero_n = _vec_to_dec3n((0.0, 0.0, 0.0))
-
         # Records are grouped by vertex, keys ascending within each vertex.
-        for v in range(num_vertices):
-            moved = [(k, deltas[name][v])
-                     for k, name in enumerate(morph_names)
-                     if v in deltas.get(name, ())]
-            start = len(self.records)
-            self.offsets.append((start, _bits_marker(k for k, _ in moved)))
-            for _k, (dx, dy, dz) in moved:
-                self.records.append((
-                    _float_to_half(dx / scale),
-                    _float_to_half(dy / scale),
-                    _float_to_half(dz / scale),
-                    color, zero_n, zero_n,
-                ))
+        order = np.lexsort((keys, verts))
+        keys, verts = keys[order], verts[order]
+        if np.any((keys[1:] == keys[:-1]) & (verts[1:] == verts[:-1])):
+            raise ValueError("Morph deltas list a vertex more than once for the same key")
+
+        self.records = np.zeros(len(order), dtype=RECORD_DTYPE)
+        self.records['offset'] = _float_to_half(deltas[order] / scale)
+        self.records['color'] = DEFAULT_TARGET_COLOR & 0xFFFF   # raw RGB565
+        zero_n = _vec_to_dec3n((0.0, 0.0, 0.0))
+        self.records['normal'] = zero_n
+        self.records['tangent'] = zero_n
+
+        mask = np.zeros((num_vertices, len(self.morph_names)), dtype=bool)
+        mask[verts, keys] = True
+        counts = np.bincount(verts, minlength=num_vertices)
+        self.offsets = np.zeros(num_vertices, dtype=IOFFSET_DTYPE)
+        self.offsets['start'] = np.cumsum(counts) - counts
+        self.offsets['marker'] = _mask_marker(mask)
         return self
@@ -7,11 +7,54 @@ stored as sequences of vertex indices with alternating winding.
 A strip of N indices produces N-2 triangles:
   - Even k: (indices[k], indices[k+1], indices[k+2])
   - Odd  k: (indices[k], indices[k+2], indices[k+1])  (flipped winding)
+
+Methods
+-------
+    "greedy"  Starts from the triangles with fewest neighbors and extends
+              forward only, taking the first triangle across the trailing edge.
+    "long"    SGI-style: always starts from the unused triangle with the
+              fewest unused neighbors, tries all three rotations of it, and
+              extends both ways, keeping the rotation that strips the most
+              triangles.  Ties across an edge go to the less connected
+              triangle, so fewer are stranded as leftovers.
+
+Each strip costs 2 bytes per index plus 2 for its length; a leftover costs
+6.  strip_stats reports how much a result saves over storing every triangle
+flat.
 """
 
+import heapq
+from dataclasses import dataclass
 from typing import List, Tuple, Dict, Set
 from collections import defaultdict
 
+STRIP_METHODS = ("greedy", "long")
+
+
+@dataclass
+class StripStats:
+    """Summary of a stripification.
+
+    mean_length is in triangles per strip.  bytes_saved compares the chunk
+    index data (u16 indices plus u16 strip lengths) against all-flat storage.
+    """
+    strips: int
+    mean_length: float
+    leftovers: int
+    bytes_saved: int
+
+
+def strip_stats(strips: List[List[int]],
+                leftovers: List[Tuple[int, int, int]]) -> StripStats:
+    """Count strips and leftovers and the index bytes they save."""
+    stripped = sum(len(s) - 2 for s in strips)
+    flat_bytes = 6 * (stripped + len(leftovers))
+    used_bytes = 2 * sum(len(s) for s in strips) + 2 * len(strips) + 6 * len(leftovers)
+    return StripStats(strips=len(strips),
+                      mean_length=stripped / len(strips) if strips else 0.0,
+                      leftovers=len(leftovers),
+                      bytes_saved=flat_bytes - used_bytes)
+
 
 def _same_winding(a, b, c, orig):
     """Check if triangle (a, b, c) has the same winding as orig = (x, y, z).
@@ -27,19 +70,43 @@ def _same_winding(a, b, c, orig):
 
 def stripify(
     tris: List[Tuple[int, int, int]],
+    method: str = "greedy",
 ) -> Tuple[List[List[int]], List[Tuple[int, int, int]]]:
     """Convert triangles into triangle strips plus leftover flat triangles.
 
     Args:
         tris: List of (v0, v1, v2) index triples.
+        method: "greedy" or "long"; see the module docstring.
 
     Returns:
         (strips, leftovers)
         strips: List of strips, each a list of vertex indices.
         leftovers: Triangles that could not be incorporated into strips.
     """
+    strips, _, leftover_ids = stripify_indexed(tris, method)
+    return strips, [tris[ti] for ti in leftover_ids]
+
+
+def stripify_indexed(
+    tris: List[Tuple[int, int, int]],
+    method: str = "greedy",
+) -> Tuple[List[List[int]], List[List[int]], List[int]]:
+    """Like stripify, but report which input triangles went where.
+
+    Returns:
+        (strips, strip_tris, leftover_ids)
+        strips: List of strips, each a list of vertex indices.
+        strip_tris: For each strip, the index into tris of each of its
+            triangles, in strip order.
+        leftover_ids: Indices into tris of the leftover triangles.
+    """
+    if method == "long":
+        return _stripify_long(tris)
+    if method != "greedy":
+        raise ValueError(f"Unknown strip method {method!r}; "
+                         f"expected one of {STRIP_METHODS}")
     if not tris:
-        return [], []
+        return [], [], []
 
     # Build edge→triangle adjacency.
     # An edge is a frozenset of two vertex indices.
@@ -59,6 +126,7 @@ def stripify(
 
     used = set()
     strips = []
+    strip_tris = []
 
     # Greedy strip building: start from triangles with fewest neighbors (edges of mesh)
     order = sorted(range(len(tris)), key=lambda ti: len(neighbors[ti]))
@@ -67,17 +135,19 @@ def stripify(
         if start_ti in used:
             continue
 
-        strip = _build_strip(start_ti, tris, neighbors, edge_tris, used)
+        ids = []
+        strip = _build_strip(start_ti, tris, neighbors, edge_tris, used, ids)
         if strip is not None and len(strip) >= 4:
             strips.append(strip)
+            strip_tris.append(ids)
         elif strip is not None:
             # Strip too short (single triangle) — put it back for leftovers
             used.discard(start_ti)
 
     # Collect leftover triangles
-    leftovers = [tris[ti] for ti in range(len(tris)) if ti not in used]
+    leftover_ids = [ti for ti in range(len(tris)) if ti not in used]
 
-    return strips, leftovers
+    return strips, strip_tris, leftover_ids
 
 
 def _build_strip(
@@ -86,22 +156,25 @@ def _build_strip(
     neighbors: Dict[int, Set[int]],
     edge_tris: Dict[frozenset, List[int]],
     used: Set[int],
+    ids: List[int],
 ) -> List[int]:
     """Build a single triangle strip starting from the given triangle.
 
     Returns a list of vertex indices forming the strip, or None if the
-    triangle is already used.
+    triangle is already used.  The strip's triangle indices are appended
+    to ids.
     """
     if start_ti in used:
         return None
 
     a, b, c = tris[start_ti]
     used.add(start_ti)
+    ids.append(start_ti)
 
     # The strip starts as [a, b, c] matching the original triangle winding.
     # Only extend forward — reverse+extend can create invalid triangles.
     strip = [a, b, c]
-    _extend_strip_forward(strip, tris, edge_tris, used)
+    _extend_strip_forward(strip, tris, edge_tris, used, ids)
 
     return strip
 
@@ -111,6 +184,7 @@ def _extend_strip_forward(
     tris: List[Tuple[int, int, int]],
     edge_tris: Dict[frozenset, List[int]],
     used: Set[int],
+    ids: List[int],
 ):
     """Extend a strip forward by finding adjacent unused triangles.
 
@@ -172,3 +246,110 @@ def _extend_strip_forward(
             break
 
         used.add(next_ti)
+        ids.append(next_ti)
+
+
+def _stripify_long(
+    tris: List[Tuple[int, int, int]],
+) -> Tuple[List[List[int]], List[List[int]], List[int]]:
+    """The "long" method; see the module docstring.
+
+    Works on directed edges.  Appending vertex d after trailing pair (x, y)
+    as strip triangle k decodes to (x, y, d) when k is even and (x, d, y)
+    when odd, so the next triangle is one that winds along x->y or y->x
+    respectively -- the Havok winding rule then holds by construction.
+    Prepending keeps every existing triangle's parity only two vertices at a
+    time, so a strip grows backward in pairs.
+    """
+    # Directed edge -> triangles winding along it.  Degenerate triangles
+    # can't be expressed in a strip and always end up as leftovers.
+    by_edge: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for ti, (a, b, c) in enumerate(tris):
+        if a != b and b != c and a != c:
+            by_edge[(a, b)].append(ti)
+            by_edge[(b, c)].append(ti)
+            by_edge[(c, a)].append(ti)
+
+    # Triangles that can follow each triangle in a strip: those winding the
+    # other way along one of its edges.
+    followers: List[List[int]] = []
+    for ti, (a, b, c) in enumerate(tris):
+        if a != b and b != c and a != c:
+            followers.append([tj for e in ((b, a), (c, b), (a, c))
+                              for tj in by_edge.get(e, ())])
+        else:
+            followers.append([])
+
+    used = [False] * len(tris)
+    degree = [len(f) for f in followers]
+
+    def _third(ti, x, y):
+        a, b, c = tris[ti]
+        return a if a != x and a != y else (b if b != x and b != y else c)
+
+    def _next(key, taken):
+        """The unused, least connected triangle winding along key."""
+        best = None
+        for ti in by_edge.get(key, ()):
+            if not used[ti] and ti not in taken and (best is None or degree[ti] < degree[best]):
+                best = ti
+        return best
+
+    def _grow(start_ti, rot):
+        """Strip through start_ti beginning at rotation rot, without committing."""
+        a, b, c = tris[start_ti]
+        strip = [[a, b, c], [b, c, a], [c, a, b]][rot]
+        ids = [start_ti]
+        taken = {start_ti}
+        while True:
+            x, y = strip[-2], strip[-1]
+            ti = _next((x, y) if len(strip) % 2 == 0 else (y, x), taken)
+            if ti is None:
+                break
+            strip.append(_third(ti, x, y))
+            ids.append(ti)
+            taken.add(ti)
+        head_v = []
+        head_ids = []
+        s0, s1 = strip[0], strip[1]
+        while True:
+            t1 = _next((s1, s0), taken)
+            if t1 is None:
+                break
+            v = _third(t1, s0, s1)
+            taken.add(t1)
+            t0 = _next((v, s0), taken)
+            if t0 is None:
+                taken.discard(t1)
+                break
+            u = _third(t0, v, s0)
+            taken.add(t0)
+            head_v += [v, u]
+            head_ids += [t1, t0]
+            s0, s1 = u, v
+        return head_v[::-1] + strip, head_ids[::-1] + ids
+
+    heap = [(degree[ti], ti) for ti in range(len(tris)) if followers[ti]]
+    heapq.heapify(heap)
+    strips = []
+    strip_tris = []
+    while heap:
+        d, start_ti = heapq.heappop(heap)
+        if used[start_ti] or d != degree[start_ti]:
+            continue
+        strip, ids = max((_grow(start_ti, rot) for rot in range(3)),
+                         key=lambda r: len(r[1]))
+        if len(ids) < 2:
+            continue
+        strips.append(strip)
+        strip_tris.append(ids)
+        for ti in ids:
+            used[ti] = True
+        for ti in ids:
+            for tj in followers[ti]:
+                if not used[tj]:
+                    degree[tj] -= 1
+                    heapq.heappush(heap, (degree[tj], tj))
+
+    leftover_ids = [ti for ti in range(len(tris)) if not used[ti]]
+    return strips, strip_tris, leftover_ids
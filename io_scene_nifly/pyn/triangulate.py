@@ -3,10 +3,18 @@
 Clips the ear with the smallest interior angle first, producing well-shaped
 triangles even for long skinny polygons. Works entirely in 3D — no projection
 needed, so non-planar polygons are handled correctly.
+
+Clipping is incremental: candidate ears sit in a heap keyed by angle, and
+in a planar polygon only reflex vertices can block an ear, so containment
+tests never look at convex vertices. triangulate_polygons does a whole mesh
+in one call.
 """
 
+import heapq
 import math
 
+import numpy as np
+
 
 def _sub(a, b):
     """Vector subtraction a - b."""
@@ -217,6 +225,128 @@ def _triangulate_quad(coords):
         return [(0, 1, 3), (1, 2, 3)]
 
 
+# Blender stores coordinates as float32, so "in the plane" has to allow for
+# float32 rounding, relative to the coordinates' magnitude.
+_PLANAR_TOL = 16 * float(np.finfo(np.float32).eps)
+
+
+def _is_planar(coords, normal):
+    """Check that every vertex lies in the polygon's plane, up to rounding."""
+    n_len = _length(normal)
+    if n_len == 0:
+        return False
+    o = coords[0]
+    extent = math.sqrt(max(_dist_sq(o, p) for p in coords))
+    size = max(extent, max(abs(x) for p in coords for x in p))
+    tol = _PLANAR_TOL * n_len * size
+    return all(abs(_dot(_sub(p, o), normal)) <= tol for p in coords)
+
+
+class _EarClipper:
+    """Incremental ear-clipping state for one polygon.
+
+    The remaining polygon is a doubly-linked ring (prv/nxt). Reflex vertices
+    (anything not strictly convex) are kept in a set: in a simple planar
+    polygon a vertex can only sit inside an ear if some reflex vertex does
+    too, so ear tests check just those. A non-planar polygon has no such
+    guarantee, and its ear tests check every remaining vertex.
+
+    Convex vertices wait in a heap of (angle, index); entries go stale when a
+    neighbor is clipped, and are re-checked on pop. A vertex that pops but is
+    blocked is set aside until something that could have blocked it goes away
+    (a reflex vertex turning convex, or for non-planar polygons any clip), and
+    then goes back on the heap, so ears always come off smallest angle first.
+    """
+
+    def __init__(self, coords, normal):
+        n = len(coords)
+        self.coords = coords
+        self.prv = [(i - 1) % n for i in range(n)]
+        self.nxt = [(i + 1) % n for i in range(n)]
+        self.alive = [True] * n
+        self.count = n
+        self.planar = _is_planar(coords, normal)
+        self.rebuild(normal)
+
+    def rebuild(self, normal):
+        """Classify every remaining vertex against normal and refill the heap."""
+        self.normal = normal
+        self.reflex = set()
+        self.heap = []
+        self.blocked = []
+        self.version = [0] * len(self.coords)
+        for i in range(len(self.coords)):
+            if self.alive[i]:
+                self._classify(i)
+
+    def _unblock(self):
+        """Put every blocked vertex back on the heap."""
+        for entry in self.blocked:
+            heapq.heappush(self.heap, entry)
+        self.blocked = []
+
+    def _classify(self, i):
+        """Put vertex i in the reflex set or, if convex, on the heap."""
+        p, n = self.prv[i], self.nxt[i]
+        self.version[i] += 1
+        if _is_convex(self.coords, p, i, n, self.normal):
+            if i in self.reflex:
+                self.reflex.discard(i)
+                if self.planar:
+                    self._unblock()
+            heapq.heappush(self.heap,
+                           (_angle_at(self.coords, p, i, n), i, self.version[i]))
+        else:
+            self.reflex.add(i)
+
+    def _blockers(self, p, n):
+        """Vertices that might lie inside the ear p-i-n."""
+        if self.planar:
+            for r in self.reflex:
+                if r != p and r != n:
+                    yield r
+        else:
+            r = self.nxt[n]
+            while r != p:
+                yield r
+                r = self.nxt[r]
+
+    def _is_ear(self, i):
+        """No other vertex lies inside the triangle at convex vertex i."""
+        p, n = self.prv[i], self.nxt[i]
+        a, b, c = self.coords[p], self.coords[i], self.coords[n]
+        for r in self._blockers(p, n):
+            if _point_in_triangle_3d(self.coords[r], a, b, c):
+                return False
+        return True
+
+    def clip(self):
+        """Clip the minimum-angle ear. Returns its triangle, or None if no ear is left."""
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            _, i, ver = entry
+            if not self.alive[i] or ver != self.version[i]:
+                continue
+            if not self._is_ear(i):
+                self.blocked.append(entry)
+                continue
+            p, n = self.prv[i], self.nxt[i]
+            self.alive[i] = False
+            self.count -= 1
+            self.nxt[p] = n
+            self.prv[n] = p
+            if not self.planar:
+                self._unblock()
+            self._classify(p)
+            self._classify(n)
+            return (p, i, n)
+        return None
+
+    def ring(self):
+        """Remaining vertex indices in ascending order, as the ring runs."""
+        return [i for i in range(len(self.coords)) if self.alive[i]]
+
+
 def triangulate(coords):
     """Triangulate a polygon using minimum-angle ear clipping.
 
@@ -235,83 +365,88 @@ def triangulate(coords):
         return _triangulate_quad(coords)
 
     normal = _polygon_normal(coords)
-
-    # Working list of active vertex indices
-    indices = list(range(n))
+    clipper = _EarClipper(coords, normal)
     triangles = []
-
-    while len(indices) > 3:
-        best_pos = None
-        best_angle = float('inf')
-        m = len(indices)
-
-        for pos in range(m):
-            prev_i = indices[(pos - 1) % m]
-            cur_i = indices[pos]
-            nxt_i = indices[(pos + 1) % m]
-
-            if not _is_convex(coords, prev_i, cur_i, nxt_i, normal):
-                continue
-
-            # Any other vertex inside this ear triangle?
-            is_ear = True
-            for j in range(m):
-                vi = indices[j]
-                if vi == prev_i or vi == cur_i or vi == nxt_i:
-                    continue
-                if _point_in_triangle_3d(coords[vi], coords[prev_i], coords[cur_i], coords[nxt_i]):
-                    is_ear = False
-                    break
-
-            if is_ear:
-                angle = _angle_at(coords, prev_i, cur_i, nxt_i)
-                if angle < best_angle:
-                    best_angle = angle
-                    best_pos = pos
-
-        if best_pos is None:
+    flipped = False     # Normal was reversed since the last clip
+
+    while clipper.count > 3:
+        tri = clipper.clip()
+        if tri is not None:
+            triangles.append(tri)
+            flipped = False
+            continue
+        if not flipped:
             # No ear found — the polygon normal may be flipped (inward-facing
             # face).  Reverse it and retry before falling back to fan.
             normal = (-normal[0], -normal[1], -normal[2])
-            for pos in range(m):
-                prev_i = indices[(pos - 1) % m]
-                cur_i = indices[pos]
-                nxt_i = indices[(pos + 1) % m]
-
-                if not _is_convex(coords, prev_i, cur_i, nxt_i, normal):
-                    continue
-
-                is_ear = True
-                for j in range(m):
-                    vi = indices[j]
-                    if vi == prev_i or vi == cur_i or vi == nxt_i:
-                        continue
-                    if _point_in_triangle_3d(coords[vi], coords[prev_i], coords[cur_i], coords[nxt_i]):
-                        is_ear = False
-                        break
-
-                if is_ear:
-                    angle = _angle_at(coords, prev_i, cur_i, nxt_i)
-                    if angle < best_angle:
-                        best_angle = angle
-                        best_pos = pos
-
-        if best_pos is None:
-            # Truly degenerate polygon — fall back to fan
-            for i in range(1, m - 1):
-                triangles.append((indices[0], indices[i], indices[i + 1]))
-            break
-
-        prev_i = indices[(best_pos - 1) % m]
-        cur_i = indices[best_pos]
-        nxt_i = indices[(best_pos + 1) % m]
-        triangles.append((prev_i, cur_i, nxt_i))
-        indices.pop(best_pos)
-
-    if len(indices) == 3:
-        triangles.append((indices[0], indices[1], indices[2]))
+            clipper.rebuild(normal)
+            flipped = True
+            continue
+        # Truly degenerate polygon — fall back to fan
+        indices = clipper.ring()
+        for i in range(1, len(indices) - 1):
+            triangles.append((indices[0], indices[i], indices[i + 1]))
+        break
+    else:
+        triangles.append(tuple(clipper.ring()))
 
     if len(triangles) > 1:
         _flip_edges(coords, triangles, normal)
 
     return triangles
+
+
+def triangulate_polygons(coords, loop_verts, loop_start, loop_total):
+    """Triangulate every polygon of a mesh in one call.
+
+    Args:
+        coords: (V, 3) vertex coordinates.
+        loop_verts: Vertex index of each loop.
+        loop_start: First loop of each polygon.
+        loop_total: Number of loops in each polygon.
+
+    Returns:
+        (tris, faces): tris is a (T, 3) array of loop indices, faces the
+        polygon each triangle came from. Triangles follow polygon order and
+        match triangulate() on each polygon. Polygons with fewer than 3
+        loops are skipped.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    loop_verts = np.asarray(loop_verts, dtype=np.int64)
+    loop_start = np.asarray(loop_start, dtype=np.int64)
+    loop_total = np.asarray(loop_total, dtype=np.int64)
+    npoly = len(loop_total)
+    tris = np.empty((int(np.maximum(loop_total - 2, 0).sum()), 3), dtype=np.int64)
+    faces = np.empty(len(tris), dtype=np.int64)
+    # Triangles of polygon f start at row first[f].
+    first = np.zeros(npoly, dtype=np.int64)
+    np.cumsum(np.maximum(loop_total - 2, 0)[:-1], out=first[1:])
+
+    # Triangles pass straight through.
+    f = np.flatnonzero(loop_total == 3)
+    s = loop_start[f]
+    tris[first[f]] = np.stack((s, s + 1, s + 2), axis=1)
+    faces[first[f]] = f
+
+    # Quads split on the shorter diagonal, as _triangulate_quad does.
+    f = np.flatnonzero(loop_total == 4)
+    s = loop_start[f]
+    q = coords[loop_verts[s[:, None] + np.arange(4)]]
+    d02 = ((q[:, 0] - q[:, 2]) ** 2).sum(axis=1)
+    d13 = ((q[:, 1] - q[:, 3]) ** 2).sum(axis=1)
+    short02 = (d02 <= d13)[:, None]
+    tris[first[f]] = s[:, None] + np.where(short02, (0, 1, 2), (0, 1, 3))
+    tris[first[f] + 1] = s[:, None] + np.where(short02, (0, 2, 3), (1, 2, 3))
+    faces[first[f]] = faces[first[f] + 1] = f
+
+    # Larger polygons go through the ear clipper one at a time. Convex ones
+    # have no reflex vertices, so they never pay for containment tests.
+    for f in np.flatnonzero(loop_total > 4).tolist():
+        s = int(loop_start[f])
+        n = int(loop_total[f])
+        pts = [tuple(c) for c in coords[loop_verts[s:s + n]].tolist()]
+        t = np.asarray(triangulate(pts), dtype=np.int64) + s
+        tris[first[f]:first[f] + len(t)] = t
+        faces[first[f]:first[f] + len(t)] = f
+
+    return tris, faces
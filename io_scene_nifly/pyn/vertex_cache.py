@@ -0,0 +1,148 @@
+"""
+vertex_cache.py
+---------------
+Reorder a triangle mesh for the GPU's post-transform vertex cache, then
+reorder its vertices so they are fetched in the order they are first used.
+
+Public API
+----------
+    acmr(tris, cache_size=16) -> float
+    tipsify(tris, cache_size=16) -> List[int]
+    optimize(tris, nverts, groups=None, cache_size=16)
+        -> (tri_order, vert_order)
+
+ACMR (average cache miss ratio) is vertex transforms per triangle under a
+FIFO cache: 3.0 means no reuse at all, about 0.5 is the floor for a regular
+grid.  tipsify is Sander, Nehab and Barczak's linear-time "Tipsy" ordering,
+which fans around each vertex while its neighbors are still in the cache.
+
+optimize keeps triangles inside their group: a group's triangles stay
+together and groups keep the order they first appear in, so LOD ranges and
+partitions survive.  Callers apply the two orders to their own per-triangle
+and per-vertex data.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_SIZE = 16
+
+
+def acmr(tris: Sequence[Tuple[int, int, int]],
+         cache_size: int = DEFAULT_CACHE_SIZE) -> float:
+    """Vertex cache misses per triangle for a FIFO cache of cache_size."""
+    if not tris:
+        return 0.0
+    fifo: deque = deque()
+    cached = set()
+    misses = 0
+    for t in tris:
+        for v in t:
+            if v not in cached:
+                misses += 1
+                fifo.append(v)
+                cached.add(v)
+                if len(fifo) > cache_size:
+                    cached.discard(fifo.popleft())
+    return misses / len(tris)
+
+
+def tipsify(tris: Sequence[Tuple[int, int, int]],
+            cache_size: int = DEFAULT_CACHE_SIZE) -> List[int]:
+    """Return the indices of tris in cache-friendly order.
+
+    Emits every triangle around a fanning vertex, then moves to whichever of
+    those triangles' vertices is still live and will stay in the cache longest.
+    At a dead end it backs up through recently used vertices, and only then
+    jumps to the next unfinished vertex in first-use order.
+    """
+    adjacent: Dict[int, List[int]] = {}
+    for ti, t in enumerate(tris):
+        for v in t:
+            adjacent.setdefault(v, []).append(ti)
+    if not adjacent:
+        return []
+    live = {v: len(ts) for v, ts in adjacent.items()}
+    stamp = dict.fromkeys(adjacent, 0)
+    emitted = [False] * len(tris)
+    dead_end: List[int] = []
+    cursor = iter(adjacent)     # Vertices in first-use order
+    order: List[int] = []
+
+    time = cache_size + 1
+    fan = next(cursor)
+    while fan is not None:
+        candidates: Dict[int, None] = {}
+        for ti in adjacent[fan]:
+            if emitted[ti]:
+                continue
+            emitted[ti] = True
+            order.append(ti)
+            for v in tris[ti]:
+                dead_end.append(v)
+                candidates[v] = None
+                live[v] -= 1
+                if time - stamp[v] > cache_size:
+                    stamp[v] = time
+                    time += 1
+
+        # Prefer the live candidate that will stay cached longest after its
+        # remaining triangles are emitted.
+        fan = None
+        best = -1
+        for v in candidates:
+            if live[v] > 0:
+                p = 0
+                if time - stamp[v] + 2 * live[v] <= cache_size:
+                    p = time - stamp[v]
+                if p > best:
+                    best = p
+                    fan = v
+        if fan is None:
+            while dead_end:
+                v = dead_end.pop()
+                if live[v] > 0:
+                    fan = v
+                    break
+        if fan is None:
+            for v in cursor:
+                if live[v] > 0:
+                    fan = v
+                    break
+    return order
+
+
+def optimize(tris: Sequence[Tuple[int, int, int]], nverts: int,
+             groups: Optional[Sequence[Hashable]] = None,
+             cache_size: int = DEFAULT_CACHE_SIZE) -> Tuple[List[int], List[int]]:
+    """Compute a cache-friendly triangle order and a matching vertex order.
+
+    Args:
+        tris:       (a, b, c) vertex index triples.
+        nverts:     Number of vertices; unreferenced ones go last, in order.
+        groups:     Optional key per triangle.  Triangles are only reordered
+                    among others with the same key.
+        cache_size: Vertex cache entries to optimize for.
+
+    Returns:
+        (tri_order, vert_order): the old index of each triangle and vertex,
+        in their new order.
+    """
+    if groups is None:
+        buckets = {None: list(range(len(tris)))}
+    else:
+        buckets = {}
+        for ti, key in enumerate(groups):
+            buckets.setdefault(key, []).append(ti)
+
+    tri_order: List[int] = []
+    for members in buckets.values():
+        sub = [tris[ti] for ti in members]
+        tri_order.extend(members[i] for i in tipsify(sub, cache_size))
+
+    vert_order = list(dict.fromkeys(v for ti in tri_order for v in tris[ti]))
+    if len(vert_order) < nverts:
+        seen = set(vert_order)
+        vert_order.extend(v for v in range(nverts) if v not in seen)
+    return tri_order, vert_order
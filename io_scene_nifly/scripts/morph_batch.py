@@ -0,0 +1,409 @@
+"""Batch validate, re-encode and convert morph files across a data tree.
+
+Handles FO4/Skyrim expression and chargen .tri files, BodySlide TRIP .tri
+files, BodySlide .osd files and Starfield morph.dat files. Files are processed
+in parallel, one per worker process, and every output is written to a
+temporary file and moved into place, so an interrupted run never leaves a
+half-written file behind.
+
+Usage:
+    python io_scene_nifly/scripts/morph_batch.py validate <dir|file> [...] [--nif-check]
+    python io_scene_nifly/scripts/morph_batch.py reencode <dir|file> [...] [--out DIR]
+    python io_scene_nifly/scripts/morph_batch.py convert <dir|file> [...] --to osd|trip [--out DIR]
+
+validate   reads every file completely and reports damage. OSD and morph.dat
+           files must also re-encode byte for byte. With --nif-check, each file
+           is compared against the nif beside it (same name; a chargen .tri
+           drops its chargen extension) and morphs that address vertices the
+           nif's shapes don't have are reported. --nif-check needs the DLL.
+reencode   reads and writes every file back, in place or under --out.
+convert    turns TRIP files into OSD files, or OSD files into TRIP files. OSD
+           entries are split into shapes using the nif beside the file, so OSD
+           to TRIP needs the DLL.
+
+Options:
+    -j N, --workers N   worker processes (default: one per CPU)
+    --out DIR           write outputs under DIR, mirroring the input tree
+    -v, --verbose       list every file, not just the ones with problems
+
+Exit code is 1 if any file failed.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+_pyn_parent = os.path.join(_script_dir, '..')
+# The tri and osd packages register Blender operators, so their codec modules
+# are imported on their own.
+for _p in (_pyn_parent, os.path.join(_pyn_parent, 'tri'), os.path.join(_pyn_parent, 'osd')):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import numpy as np
+from trifile import TriFile, VERSION_STRING
+from tripfile import TripFile
+from osdfile import OSDFile, OSD_MAGIC, SliderDiffs
+from pyn.sf_morph import MAGIC as MDAT_MAGIC, MorphFile
+
+TRI, TRIP, OSD, MDAT = 'tri', 'trip', 'osd', 'morph.dat'
+
+# One unit of work: the file, the directory it was found under, and what to do.
+Task = namedtuple('Task', 'path root command options')
+# What a worker reports back. status is 'ok', 'warn' or 'fail'.
+Result = namedtuple('Result', 'path kind status messages nbytes output')
+
+
+def file_kind(path):
+    """The morph format of path from its magic bytes, or None."""
+    low = path.lower()
+    if not low.endswith(('.tri', '.osd', '.dat')):
+        return None
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+    if magic == VERSION_STRING.encode('ascii'):
+        return TRI
+    if magic[:4] in (b'PIRT', b'\0IRT'):
+        return TRIP
+    if magic[:4] in OSD_MAGIC:
+        return OSD
+    if magic[:4] == MDAT_MAGIC:
+        return MDAT
+    return None
+
+
+def find_files(paths):
+    """(path, root) for every morph file under the given files and directories."""
+    for p in paths:
+        if os.path.isfile(p):
+            if file_kind(p):
+                yield p, os.path.dirname(p)
+            continue
+        for dirpath, _dirs, files in os.walk(p):
+            for fname in sorted(files):
+                fp = os.path.join(dirpath, fname)
+                if file_kind(fp):
+                    yield fp, p
+
+
+def write_atomic(path, write):
+    """Call write(tmp) with a temporary path beside path, then move it into place.
+
+    The temporary file is removed if write fails, so path is either the old
+    file or the complete new one.
+    """
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.' + os.path.basename(path) + '.',
+                               suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def output_path(task, ext=None):
+    """Where a task's output goes: beside the input, or mirrored under --out."""
+    path = task.path
+    if ext:
+        path = os.path.splitext(path)[0] + ext
+    out = task.options.get('out')
+    if out:
+        path = os.path.join(out, os.path.relpath(path, task.root))
+    return path
+
+
+# --- nif lookups -----------------------------------------------------------------------------
+
+def sibling_nif(path, kind, chargen_ext):
+    """The nif a morph file belongs to, or None if there isn't one beside it."""
+    stem = os.path.splitext(path)[0]
+    if kind == TRI and chargen_ext and stem.lower().endswith(chargen_ext.lower()):
+        stem = stem[:-len(chargen_ext)]
+    nif = stem + '.nif'
+    return nif if os.path.exists(nif) else None
+
+
+def nif_vertex_counts(nifpath):
+    """{shape name: vertex count} for a nif. Needs the DLL."""
+    from pyn.pynifly import NifFile
+    nif = NifFile(nifpath)
+    return {s.name: s.properties.vertexCount for s in nif.shapes}
+
+
+# --- per-format readers ----------------------------------------------------------------------
+
+def read_tri(path):
+    tri = TriFile.from_filepath(path)
+    if tri is None:
+        raise ValueError("not a readable TRI file")
+    return tri
+
+
+def read_trip(path):
+    trip = TripFile.from_filepath(path)
+    if not trip.is_valid:
+        raise ValueError("not a readable TRIP file")
+    return trip
+
+
+def read_osd(path):
+    osd = OSDFile.from_file(path)
+    if not osd.is_valid:
+        osd.close()
+        raise ValueError("not a readable OSD file")
+    return osd
+
+
+def read_mdat(path):
+    with open(path, 'rb') as f:
+        return MorphFile.from_bytes(f.read())
+
+
+def trip_indices(trip):
+    """{shape: highest vertex index any morph uses}."""
+    return {shape: max((i for offsets in morphs.values() for i, _ in offsets), default=-1)
+            for shape, morphs in trip.shapes.items()}
+
+
+def osd_indices(osd):
+    """{shape: highest vertex index any slider uses}, after split_entries."""
+    return {shape: max((int(d.indices.max()) for d in sliders.values() if len(d)), default=-1)
+            for shape, sliders in osd.shapes.items()}
+
+
+def check_indices(highest, counts, messages):
+    """Compare each shape's highest morph index with its vertex count in the nif."""
+    for shape, top in highest.items():
+        if shape not in counts:
+            messages.append(f"shape '{shape}' is not in the nif")
+        elif top >= counts[shape]:
+            messages.append(f"shape '{shape}' morphs vertex {top} but the nif shape has "
+                            f"{counts[shape]} vertices")
+
+
+# --- commands --------------------------------------------------------------------------------
+
+def validate(task, kind):
+    """Read a file completely; return problem messages."""
+    messages = []
+    counts = None
+    if task.options.get('nif_check'):
+        nif = sibling_nif(task.path, kind, task.options.get('chargen_ext'))
+        if nif is None:
+            messages.append("no nif beside this file to check against")
+        else:
+            counts = nif_vertex_counts(nif)
+
+    if kind == TRI:
+        tri = read_tri(task.path)
+        nverts = tri.header.vertexNum
+        if len(tri.face_array()) and int(tri.face_array().max()) >= nverts:
+            messages.append("faces use vertices past the end of the vertex list")
+        for name in tri.morphs:
+            tri.morph_array(name)
+        if counts is not None and nverts not in counts.values():
+            messages.append(f"{nverts} vertices, but no shape in the nif has that many "
+                            f"({', '.join(f'{n}: {c}' for n, c in counts.items())})")
+
+    elif kind == TRIP:
+        trip = read_trip(task.path)
+        if counts is not None:
+            check_indices(trip_indices(trip), counts, messages)
+
+    elif kind == OSD:
+        osd = read_osd(task.path)
+        try:
+            with open(task.path, 'rb') as f:
+                raw = f.read()
+            # Unsplit, entries write back in file order; grouping them by shape would
+            # reorder any file whose shapes' entries are interleaved.
+            osd.split_entries(())
+            fd, tmp = tempfile.mkstemp(suffix='.osd')
+            os.close(fd)
+            try:
+                osd.write(tmp)
+                with open(tmp, 'rb') as f:
+                    if f.read() != raw:
+                        messages.append("does not re-encode byte for byte")
+            finally:
+                os.remove(tmp)
+            if counts is not None:
+                osd.shapes = {}
+                osd.split_entries(counts)
+                check_indices(osd_indices(osd), counts, messages)
+        finally:
+            osd.close()
+
+    elif kind == MDAT:
+        with open(task.path, 'rb') as f:
+            raw = f.read()
+        m = MorphFile.from_bytes(raw)
+        if len(m.offsets) != m.num_vertices:
+            messages.append(f"{len(m.offsets)} vertex offsets for {m.num_vertices} vertices")
+        verts, keys, _rec = m.record_keys()
+        if len(verts) != len(m.records):
+            messages.append(f"marker bits address {len(verts)} of {len(m.records)} records")
+        empty = sorted(set(m.morph_names) - {m.morph_names[k] for k in np.unique(keys)})
+        if empty:
+            messages.append(f"{len(empty)} morph(s) with no vertex data: "
+                            f"{', '.join(empty[:6])}")
+        if m.to_bytes() != raw:
+            messages.append("does not re-encode byte for byte")
+    return messages, None
+
+
+def reencode(task, kind):
+    """Read a file and write it back."""
+    dest = output_path(task)
+    if kind == TRI:
+        tri = read_tri(task.path)
+        names = (set(tri.morphs) - {'Basis'}) | set(tri.modmorphs)
+        write_atomic(dest, lambda tmp: tri.write(tmp, names))
+    elif kind == TRIP:
+        trip = read_trip(task.path)
+        write_atomic(dest, trip.write)
+    elif kind == OSD:
+        osd = read_osd(task.path)
+        osd.split_entries(())
+
+        def write(tmp):
+            osd.write(tmp)
+            osd.close()     # Windows won't replace a mapped file
+        try:
+            write_atomic(dest, write)
+        finally:
+            osd.close()
+    elif kind == MDAT:
+        m = read_mdat(task.path)
+        write_atomic(dest, m.to_file)
+    return [], dest
+
+
+def convert(task, kind):
+    """TRIP -> OSD or OSD -> TRIP."""
+    to = task.options['to']
+    if kind == TRIP and to == OSD:
+        trip = read_trip(task.path)
+        osd = OSDFile()
+        for shape, morphs in trip.shapes.items():
+            sliders = osd.shapes.setdefault(shape, {})
+            for name, offsets in morphs.items():
+                idx = np.array([i for i, _ in offsets], dtype=np.int64)
+                off = np.array([o for _, o in offsets], dtype=np.float64).reshape(-1, 3)
+                sliders[name] = SliderDiffs.from_arrays(idx, off)
+        dest = output_path(task, '.osd')
+        write_atomic(dest, osd.write)
+        return [], dest
+
+    if kind == OSD and to == TRIP:
+        nif = sibling_nif(task.path, kind, None)
+        if nif is None:
+            raise ValueError("OSD to TRIP needs the nif beside the file for its shape names")
+        osd = read_osd(task.path)
+        try:
+            osd.split_entries(nif_vertex_counts(nif))
+            trip = TripFile()
+            for shape, sliders in osd.shapes.items():
+                trip.shapes[shape] = {
+                    name: [[i, tuple(o)] for i, o in
+                           zip(diffs.indices.tolist(), diffs.offsets.tolist())]
+                    for name, diffs in sliders.items()}
+        finally:
+            osd.close()
+        dest = output_path(task, '.tri')
+        if os.path.abspath(dest) == os.path.abspath(task.path):
+            raise ValueError(f"output {dest} would overwrite the input")
+        write_atomic(dest, trip.write)
+        return [], dest
+
+    return None, None
+
+
+COMMANDS = {'validate': validate, 'reencode': reencode, 'convert': convert}
+
+
+def process(task):
+    """Run one task in a worker. Never raises: failures come back as a Result."""
+    kind = None
+    nbytes = 0
+    try:
+        nbytes = os.path.getsize(task.path)
+        kind = file_kind(task.path)
+        messages, output = COMMANDS[task.command](task, kind)
+        if messages is None:
+            return Result(task.path, kind, 'skip', [], nbytes, None)
+        return Result(task.path, kind, 'warn' if messages else 'ok', messages, nbytes, output)
+    except Exception as e:
+        return Result(task.path, kind, 'fail', [f"{type(e).__name__}: {e}"], nbytes, None)
+
+
+def run(tasks, workers=None):
+    """Process tasks on a pool of worker processes, yielding Results as they finish."""
+    if workers == 1:
+        yield from map(process, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(process, tasks, chunksize=8)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('command', choices=sorted(COMMANDS))
+    ap.add_argument('paths', nargs='+', help="files or directories to process")
+    ap.add_argument('--to', choices=[OSD, TRIP], help="convert: the format to convert to")
+    ap.add_argument('--out', help="write outputs under this directory")
+    ap.add_argument('--nif-check', action='store_true',
+                    help="validate: check vertex counts against the nif beside each file")
+    ap.add_argument('--chargen-ext', default='chargen',
+                    help="extension of chargen .tri files (default: chargen)")
+    ap.add_argument('-j', '--workers', type=int, default=None,
+                    help="worker processes (default: one per CPU)")
+    ap.add_argument('-v', '--verbose', action='store_true', help="list every file")
+    args = ap.parse_args(argv)
+    if args.command == 'convert' and not args.to:
+        ap.error("convert needs --to")
+
+    options = {'out': args.out, 'nif_check': args.nif_check,
+               'chargen_ext': args.chargen_ext, 'to': args.to}
+    tasks = [Task(p, root, args.command, options) for p, root in find_files(args.paths)]
+
+    start = time.perf_counter()
+    statuses = Counter()
+    kinds = Counter()
+    nbytes = 0
+    for r in run(tasks, args.workers):
+        statuses[r.status] += 1
+        if r.status != 'skip':
+            kinds[r.kind] += 1
+            nbytes += r.nbytes
+        if r.status in ('warn', 'fail') or (args.verbose and r.status == 'ok'):
+            dest = f" -> {r.output}" if r.output and r.output != r.path else ''
+            print(f"[{r.status:4}] {r.path}{dest}")
+            for m in r.messages:
+                print(f"         {m}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    done = sum(kinds.values())
+    print(f"\n{args.command}: {done} file(s) in {elapsed:.2f}s "
+          f"({done / elapsed:.1f} files/s, {nbytes / elapsed / 2**20:.1f} MB/s)")
+    if kinds:
+        print("  " + ", ".join(f"{n} {k}" for k, n in sorted(kinds.items())))
+    print(f"  {statuses['ok']} ok, {statuses['warn']} with warnings, {statuses['fail']} failed"
+          + (f", {statuses['skip']} not applicable" if statuses['skip'] else ''))
+    return 1 if statuses['fail'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
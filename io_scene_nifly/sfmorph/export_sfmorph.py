@@ -18,50 +18,56 @@ import numpy as np
 from bpy_extras.io_utils import ExportHelper
 from .. import blender_defs as BD
 from .. import bl_info
-from ..pyn.sf_morph import (MorphFile, MAX_KEYS, is_expression_morph, morph_key_name,
-                            morph_relpath, resolve_morph_output, swap_morph_tree)
+from ..pyn.sf_morph import (MorphFile, MAX_KEYS, RECORD_DTYPE, half_round, is_expression_morph,
+                            morph_key_name, morph_relpath, resolve_morph_output, swap_morph_tree)
+from ..pyn.morph_prune import DEFAULT_EPSILON, prune_morphs
 
 log = logging.getLogger("pynifly")
 
 
-def _key_deltas(kb, base, n, scale, epsilon):
-    """Sparse per-vertex delta dict for one shape key (vs the Basis buffer `base`)."""
-    co = np.empty(n * 3, dtype=np.float32)
-    kb.data.foreach_get('co', co)
-    d = ((co - base) / scale).reshape(n, 3)
-    moved = np.nonzero(np.abs(d).max(axis=1) > epsilon)[0]
-    return {int(vi): (float(d[vi, 0]), float(d[vi, 1]), float(d[vi, 2])) for vi in moved}
+def _clean_name(name):
+    """The morph name written for shape key `name`, warning when it changes."""
+    # Write the cleaned name: the game looks morphs up by exact string, so a shape key
+    # with stray whitespace would be written as a name nothing can ever match.
+    key = morph_key_name(name)
+    if key != name:
+        log.warning(f"Morph '{name}' written as '{key}' "
+                    f"(Starfield matches morph names exactly)")
+    return key
 
 
-def _pack_groups(named_deltas, nverts):
-    """Split {key_name: {vert_index: (dx,dy,dz)}} into chargen vs performance MorphFiles by
-    is_expression_morph. `nverts` is the morph's vertex count -- for a nif export this MUST be the
-    exported .mesh's post-split count (see build_morphs_from_split), not the raw Blender count.
+def _key_bytes(name):
+    """Bytes a morph name takes in a morph.dat."""
+    return 4 + len(name.encode('utf-8'))
+
+
+def _pack_groups(base, positions, nverts, epsilon):
+    """Prune {key_name: positions} against `base` and split the result into chargen vs
+    performance MorphFiles by is_expression_morph. `nverts` is the morph's vertex count -- for a
+    nif export this MUST be the exported .mesh's post-split count (see build_morphs_from_split),
+    not the raw Blender count. Deltas that don't survive the trip through a half float, or are no
+    bigger than `epsilon`, are dropped, and so are keys left empty or repeating a written name.
     Returns {'chargen': MorphFile|None, 'performance': MorphFile|None}."""
-    groups = {'chargen': ([], {}), 'performance': ([], {})}
-    for name, d in named_deltas.items():
-        which = 'performance' if is_expression_morph(name) else 'chargen'
-        # Write the cleaned name: the game looks morphs up by exact string, so a shape key
-        # with stray whitespace would be written as a name nothing can ever match.
-        key = morph_key_name(name)
-        if key != name:
-            log.warning(f"Morph '{name}' written as '{key}' "
-                        f"(Starfield matches morph names exactly)")
-        names, deltas = groups[which]
-        names.append(key)
-        deltas[key] = d
+    pruned, stats = prune_morphs(base, positions, epsilon, rename=_clean_name,
+                                 quantize=half_round)
+    stats.report("Starfield morphs", RECORD_DTYPE.itemsize, _key_bytes)
+
+    groups = {'chargen': {}, 'performance': {}}
+    for key, d in pruned.items():
+        which = 'performance' if is_expression_morph(key) else 'chargen'
+        groups[which][key] = d
     out = {}
-    for which, (names, deltas) in groups.items():
-        if not names:
+    for which, deltas in groups.items():
+        if not deltas:
             out[which] = None
             continue
-        if len(names) > MAX_KEYS:
-            raise ValueError(f"{len(names)} {which} morphs exceeds the {MAX_KEYS}-morph cap")
-        out[which] = MorphFile.from_deltas(names, nverts, deltas)
+        if len(deltas) > MAX_KEYS:
+            raise ValueError(f"{len(deltas)} {which} morphs exceeds the {MAX_KEYS}-morph cap")
+        out[which] = MorphFile.from_deltas(list(deltas), nverts, deltas)
     return out
 
 
-def build_morphs(obj, scale=1.0, epsilon=1e-4):
+def build_morphs(obj, scale=1.0, epsilon=DEFAULT_EPSILON):
     """Split `obj`'s shape keys into performance vs chargen MorphFiles by is_expression_morph, over
     the RAW Blender vertices. Used by the standalone morph operator, where no mesh export is in play.
     A NIF export must use build_morphs_from_split instead -- its .mesh export splits verts at seams,
@@ -75,17 +81,17 @@ def build_morphs(obj, scale=1.0, epsilon=1e-4):
     if keys is None or "Basis" not in keys.key_blocks:
         raise ValueError(f"'{obj.name}' has no shape keys with a Basis to export")
 
-    basis = keys.key_blocks["Basis"]
     n = len(mesh.vertices)
-    base = np.empty(n * 3, dtype=np.float32)
-    basis.data.foreach_get('co', base)
+    positions = {}
+    for kb in keys.key_blocks:
+        co = np.empty(n * 3, dtype=np.float32)
+        kb.data.foreach_get('co', co)
+        positions[kb.name] = co.reshape(n, 3) / scale
+    base = positions.pop("Basis")
+    return _pack_groups(base, positions, n, epsilon)
 
-    named_deltas = {kb.name: _key_deltas(kb, base, n, scale, epsilon)
-                    for kb in keys.key_blocks if kb.name != "Basis"}
-    return _pack_groups(named_deltas, n)
 
-
-def build_morphs_from_split(morphdict, scale=1.0, epsilon=1e-4):
+def build_morphs_from_split(morphdict, scale=1.0, epsilon=DEFAULT_EPSILON):
     """Build chargen/performance MorphFiles from a NIF export's SPLIT `morphdict`: absolute morphed
     positions per RENDER vertex (1:1 with the exported .mesh), keyed by Blender shape-key name and
     including 'Basis'. The .mesh export duplicates a vertex wherever a UV/normal seam requires it
@@ -96,16 +102,10 @@ def build_morphs_from_split(morphdict, scale=1.0, epsilon=1e-4):
     base = morphdict.get('Basis')
     if base is None:
         raise ValueError("export morphdict has no 'Basis' to diff against")
-    b = np.asarray(base, dtype=np.float32)
-    named_deltas = {}
-    for name, positions in morphdict.items():
-        if name == 'Basis':
-            continue
-        d = (np.asarray(positions, dtype=np.float32) - b) / scale
-        moved = np.nonzero(np.abs(d).max(axis=1) > epsilon)[0]
-        named_deltas[name] = {int(vi): (float(d[vi, 0]), float(d[vi, 1]), float(d[vi, 2]))
-                              for vi in moved}
-    return _pack_groups(named_deltas, len(b))
+    b = np.asarray(base, dtype=np.float32) / scale
+    positions = {name: np.asarray(p, dtype=np.float32) / scale
+                 for name, p in morphdict.items() if name != 'Basis'}
+    return _pack_groups(b, positions, len(b), epsilon)
 
 
 def resolve_morph_paths(obj, dialog_path):
@@ -146,17 +146,21 @@ def resolve_morph_paths(obj, dialog_path):
     return resolve_morph_output(cp, seed), resolve_morph_output(pp, seed)
 
 
-def write_sf_morphs(obj, anchor_path, morphdict=None):
+def write_sf_morphs(obj, anchor_path, morphdict=None, epsilon=DEFAULT_EPSILON):
     """Build + write `obj`'s chargen/performance morph.dat files, anchored at `anchor_path` (the
     exported nif, or an explicit dialog path). Returns a list of "N which -> path" strings for
     what was written (empty if nothing).
 
     `morphdict` is the NIF export's split positions-per-render-vertex (incl 'Basis'); when given the
     morph is built 1:1 with the exported .mesh. Without it (the standalone-operator path, no mesh
-    export) the morph is built from the raw Blender shape keys."""
+    export) the morph is built from the raw Blender shape keys. Vertex deltas no bigger than
+    `epsilon` (game units) are not written."""
     if obj.data.shape_keys is None:
         return []
-    morphs = build_morphs_from_split(morphdict) if morphdict else build_morphs(obj)
+    if morphdict:
+        morphs = build_morphs_from_split(morphdict, epsilon=epsilon)
+    else:
+        morphs = build_morphs(obj, epsilon=epsilon)
     if morphs['chargen'] is None and morphs['performance'] is None:
         return []
     # Snapshot the group's stored paths before we resolve, so we only fill the ones the user
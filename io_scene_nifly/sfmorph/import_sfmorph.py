@@ -39,17 +39,14 @@ def apply_morphs(obj, morph: MorphFile, scale=1.0):
     base = np.empty(n * 3, dtype=np.float32)
     verts.foreach_get('co', base)
 
-    deltas = morph.key_deltas()
+    deltas = morph.key_arrays()
     for name in morph.morph_names:
         sk = obj.shape_key_add()
         sk.name = name
         sk.value = 0
         coords = base.copy()
-        for vi, (dx, dy, dz) in deltas[name].items():
-            i = vi * 3
-            coords[i]     += dx * scale
-            coords[i + 1] += dy * scale
-            coords[i + 2] += dz * scale
+        vi, d = deltas[name]
+        coords.reshape(n, 3)[vi] += d * scale
         sk.data.foreach_set('co', coords)
 
     obj.active_shape_key_index = 0
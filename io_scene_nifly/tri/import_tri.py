@@ -24,7 +24,8 @@ def open_tri(filepath:Path):
     """
     with open(str(filepath),'rb') as file:
         if is_tri(file):
-            tri = TriFile.from_file(file)
+            # Morphs are only indexed here and read from the file as they're used.
+            tri = TriFile.from_file(file, lazy=True)
             return tri
         elif is_trip(file):
             trip = TripFile.from_file(file)
@@ -34,6 +35,7 @@ def open_tri(filepath:Path):
 def read_morph(obj, base_verts, game_dict, game_morph_name, morph_verts, is_rel):
     """
     Read a single morph and create a shape key for it.
+    base_verts, morph_verts = absolute positions, as (n, 3) arrays or lists of triples
     """
     if game_dict and game_morph_name in game_dict.morph_dic_blender:
         morph_name = game_dict.morph_dic_blender[game_morph_name]
@@ -47,23 +49,19 @@ def read_morph(obj, base_verts, game_dict, game_morph_name, morph_verts, is_rel)
         newsk.value = 0
 
         obj.active_shape_key_index = len(mesh.shape_keys.key_blocks) - 1
-            #This is a pointer, not a copy
-        mesh_key_verts = mesh.shape_keys.key_blocks[obj.active_shape_key_index].data[0:len(morph_verts)]
-        if is_rel:
-            # We may be applying the morphs to a different shape than the one stored in 
-            # the tri file. But the morphs in the tri file are absolute locations, as are 
-            # shape key locations. So we need to calculate the offset in the tri and apply that 
-            # to our shape keys.
-            for key_vert, morph_vert, base_vert in zip(mesh_key_verts, morph_verts, base_verts):
-                key_vert.co[0] += morph_vert[0] - base_vert[0]
-                key_vert.co[1] += morph_vert[1] - base_vert[1]
-                key_vert.co[2] += morph_vert[2] - base_vert[2]
-        else:
-            # These morphs hold relative locations.
-            for key_vert, morph_vert, base_vert in zip(mesh_key_verts, morph_verts, base_verts):
-                key_vert.co[0] += morph_vert[0] - base_vert[0]
-                key_vert.co[1] += morph_vert[1] - base_vert[1]
-                key_vert.co[2] += morph_vert[2] - base_vert[2]
+
+        # We may be applying the morphs to a different shape than the one stored in 
+        # the tri file. But the morphs in the tri file are absolute locations, as are 
+        # shape key locations. So we need to calculate the offset in the tri and apply that 
+        # to our shape keys. (Mod-morphs are stored the same way.)
+        morph_verts = np.asarray(morph_verts, dtype=np.float64).reshape(-1, 3)
+        base_verts = np.asarray(base_verts, dtype=np.float64).reshape(-1, 3)
+        n = min(len(newsk.data), len(morph_verts), len(base_verts))
+        coords = np.empty(len(newsk.data) * 3, dtype=np.float32)
+        newsk.data.foreach_get('co', coords)
+        co = coords.astype(np.float64).reshape(-1, 3)
+        co[:n] += morph_verts[:n] - base_verts[:n]
+        newsk.data.foreach_set('co', co.astype(np.float32).ravel())
         
         mesh.update()
 
@@ -86,10 +84,11 @@ def create_shape_keys(obj, tri: TriFile):
         if g != "":
             dict = gameSkeletons[g]
 
-    for game_morph_name, morph_verts in sorted(tri.morphs.items()):
-        read_morph(obj, tri.vertices, dict, game_morph_name, morph_verts, True)
-    for game_morph_name, morph_verts in sorted(tri.modmorphs.items()):
-        read_morph(obj, tri.vertices, dict, game_morph_name, morph_verts, False)
+    base = tri.base_array()
+    for game_morph_name in sorted(tri.morphs):
+        read_morph(obj, base, dict, game_morph_name, tri.morph_array(game_morph_name), True)
+    for game_morph_name in sorted(tri.modmorphs):
+        read_morph(obj, base, dict, game_morph_name, tri.modmorphs[game_morph_name], False)
 
 
 def import_tri(tri:TriFile, cobj, allow_extra_verts=True):
@@ -109,15 +108,13 @@ def import_tri(tri:TriFile, cobj, allow_extra_verts=True):
         log.info(f"Verts match, loading tri into existing shape {new_object.name}")
 
     if new_object is None:
-        new_mesh = bpy.data.meshes.new(Path(tri.filepath).stem)
-        new_mesh.from_pydata(tri.vertices, [], tri.faces)
+        new_mesh, clean = BD.mesh_from_arrays(
+            Path(tri.filepath).stem, tri.base_array(), tri.face_array())
         new_object = bpy.data.objects.new(new_mesh.name, new_mesh)
 
-        for f in new_mesh.polygons:
-            f.use_smooth = True
-
-        new_mesh.update(calc_edges=True, calc_edges_loose=True)
-        new_mesh.validate(verbose=True)
+        BD.mesh_shade_smooth(new_mesh)
+        if not clean:
+            new_mesh.validate(verbose=True)
 
         if tri.import_uv:
             BD.mesh_create_uv(new_mesh, tri.uv_pos)
@@ -3,9 +3,12 @@
 """
 
 import logging
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from pathlib import Path
 from struct import (unpack, pack)
 from typing import BinaryIO
+import numpy as np
 
 # Tri File format https://facegen.com/dl/sdk/doc/manual/fileformats.html:
 # Header
@@ -46,6 +49,17 @@ FLOAT_LEN = 4
 SHORT_LEN = 2
 ROTATE_X90 = 0
 
+# Decoded morphs kept per TriFile by get_morph, most recently used last.
+MORPH_CACHE_SIZE = 16
+
+# Stands in for the base verts as the value of the 'Basis' morph.
+BASE_VERTS = object()
+
+
+def _rows(arr):
+    """ Rows of a 2D array as a list of tuples. """
+    return list(map(tuple, arr.tolist()))
+
 def is_tri(file):
     """ Peek at the file header to see if it is a TRIP file. """
     file.seek(0)
@@ -113,6 +127,78 @@ class TRIHeader:
         return s
 
 
+class MorphDeltas:
+    """ A morph as stored in the file: int16 offsets per vertex times one scale. """
+    __slots__ = ('scale', 'deltas')
+
+    def __init__(self, scale, deltas):
+        self.scale = scale      # float, the file's "base diff"
+        self.deltas = deltas    # (vertexNum, 3) int16 array
+
+
+class ModMorph:
+    """ A mod-morph as stored in the file: the base vertices it moves and their new positions. """
+    __slots__ = ('indices', 'verts')
+
+    def __init__(self, indices, verts):
+        self.indices = indices  # (n,) uint32 array of base vertex indices
+        self.verts = verts      # (n, 3) float32 array, 1:1 with indices
+
+
+class MorphRef:
+    """ Where an undecoded morph sits in the file, recorded by TriFile.index_morphs.
+
+    count is None for a difference morph; for a mod-morph it is the number of
+    vertex indices, and add_start is its first entry in the mod-vertex list.
+    """
+    __slots__ = ('offset', 'count', 'add_start')
+
+    def __init__(self, offset, count=None, add_start=0):
+        self.offset = offset
+        self.count = count
+        self.add_start = add_start
+
+
+class TriMorphs(MutableMapping):
+    """ Dictionary of morphs, name -> [(x,y,z), ...] absolute vert positions.
+
+    Morphs read from a file are kept as MorphDeltas or ModMorphs, or as
+    MorphRefs when the file was only indexed, and are turned into positions when they are looked
+    up (through the TriFile's get_morph cache). Morphs assigned by the caller
+    are stored as given.
+    """
+    def __init__(self, tri, mod=False):
+        self._tri = tri
+        self.mod = mod
+        self._data = {}
+
+    def __getitem__(self, name):
+        v = self._data[name]
+        if v is BASE_VERTS:
+            return self._tri.vertices
+        if isinstance(v, (MorphDeltas, ModMorph, MorphRef)):
+            return self._tri.cached_morph(self, name)
+        return v
+
+    def __setitem__(self, name, verts):
+        self._tri._morph_cache.pop((self.mod, name), None)
+        self._data[name] = verts
+
+    def __delitem__(self, name):
+        self._tri._morph_cache.pop((self.mod, name), None)
+        del self._data[name]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def raw(self, name):
+        """ The stored value: MorphDeltas, ModMorph, MorphRef or the positions that were assigned. """
+        return self._data[name]
+
+
 class TriFile():
     def __init__(self, filepath:str=None):
         self.type = 'TRI'
@@ -120,37 +206,167 @@ class TriFile():
         self.header = TRIHeader()
         self._vertices = None    # [(x,y,z), ...]
         self._faces = None       # [(p1, p2, p3), ...] where p# is an index into vertices
+        # Sections as read from the file; the lists above are built from them on first use.
+        self._vert_array = None
+        self._face_array = None
+        self._uv_array = None
+        self._face_uv_array = None
         self.reorder_verts = False
-        self.morphs = {}        # Dictionary of morphs. Verts are absolute values.
-        self.modmorphs = {}
-        self.uv_pos = None      # [(u,v), ...] 1:1 with vertex list
-        self.face_uvs = None    # [(i1,i2,i3), ...]  1:1 with faces list; indices into UV_pos list
+        self._morph_cache = OrderedDict()  # (mod, name) -> decoded positions
+        self._add_verts = []     # Mod-morph vertex positions, for indexed files
+        self.morphs = TriMorphs(self)  # Verts are absolute values, decoded on access.
+        self.modmorphs = TriMorphs(self, mod=True)
+        self._uv_pos = None     # [(u,v), ...] 1:1 with vertex list
+        self._face_uvs = None   # [(i1,i2,i3), ...]  1:1 with faces list; indices into UV_pos list
         self.import_uv = True   # Import UV along with verts
         self.log = logging.getLogger("pynifly")
 
 
-    def read_morph(self, file):
+    def base_array(self):
+        """ Base vertex positions as a float64 (vertexNum, 3) array. """
+        if self._vert_array is None:
+            return np.asarray(self.vertices, dtype=np.float64).reshape(-1, 3)
+        return self._vert_array.astype(np.float64)
+
+
+    def face_array(self):
+        """ Faces as an int (faceNum, 3) array. """
+        if self._face_array is None:
+            return np.asarray(self.faces, dtype=np.int64).reshape(-1, 3)
+        return self._face_array
+
+
+    def morph_array(self, name):
+        """ Absolute positions of morph `name` as a float64 (vertexNum, 3) array. """
+        v = self.morphs.raw(name)
+        if v is BASE_VERTS:
+            return self.base_array()
+        if isinstance(v, MorphRef):
+            v = self.load_morph(v)
+        if isinstance(v, MorphDeltas):
+            return self.base_array() + v.deltas * float(v.scale)
+        return np.asarray(v, dtype=np.float64).reshape(-1, 3)
+
+
+    def get_morph(self, name):
         """ 
-        Reads a single morph from a tri file
+        Return the absolute vert positions of the morph or mod-morph `name`.
 
-        * file = file object positioned at start of morph
-        * returns = (morph-name, [(x,y,z), ...]) list of absolute new vert positions
-          defined by the morph, 1:1 with the base verts
+        Decoded morphs are kept in a small LRU cache, so a file opened with
+        lazy=True only ever reads the morphs that are asked for.
         """
-        morph_index = len(self.morphs) 
+        if name in self.morphs:
+            return self.morphs[name]
+        if name in self.modmorphs:
+            return self.modmorphs[name]
+        raise KeyError(name)
+
+
+    def cached_morph(self, morphs, name):
+        """ Decoded positions for a stored morph of `morphs`, via the LRU cache. """
+        key = (morphs.mod, name)
+        verts = self._morph_cache.get(key)
+        if verts is not None:
+            self._morph_cache.move_to_end(key)
+            return verts
+        v = morphs.raw(name)
+        if isinstance(v, MorphRef):
+            v = self.load_morph(v)
+        if isinstance(v, MorphDeltas):
+            v = list(map(tuple, (self.base_array() + v.deltas * float(v.scale)).tolist()))
+        elif isinstance(v, ModMorph):
+            new_verts = self.vertices.copy()
+            for vert_index, p in zip(v.indices.tolist(), _rows(v.verts)):
+                new_verts[vert_index] = p
+            v = new_verts
+        self._morph_cache[key] = v
+        while len(self._morph_cache) > MORPH_CACHE_SIZE:
+            self._morph_cache.popitem(last=False)
+        return v
+
+
+    def load_morph(self, ref):
+        """ 
+        Read an indexed morph from the file.
+
+        * returns = MorphDeltas for a difference morph, or ModMorph for a mod-morph
+        """
+        with open(self.filepath, 'rb') as file:
+            file.seek(ref.offset)
+            if ref.count is None:
+                n = SHORT_LEN * 3 * self.header.vertexNum
+                tmp_data = file.read(FLOAT_LEN + n)
+                if len(tmp_data) < FLOAT_LEN + n:
+                    raise ValueError(f"Error reading TRI file: morph data changed in {self.filepath}")
+                baseDiff = unpack('<f', tmp_data[:FLOAT_LEN])[0]
+                return MorphDeltas(baseDiff, np.frombuffer(tmp_data, dtype='<i2', offset=FLOAT_LEN).reshape(-1, 3))
+
+            tmp_data = file.read(INT_LEN * ref.count)
+            if len(tmp_data) < INT_LEN * ref.count:
+                raise ValueError(f"Error reading TRI file: mod-morph data changed in {self.filepath}")
+        return ModMorph(np.frombuffer(tmp_data, dtype='<u4'),
+                        self._add_verts[ref.add_start:ref.add_start + ref.count])
+
+
+    def read_morph_name(self, file, label, morph_index):
+        """ Read a morph's length-prefixed name. label names the section in errors. """
         tmp_data = file.read(INT_LEN)
         if len(tmp_data) < INT_LEN:
-            self.log.error("EOF reading morph header\nError on morph number " + str(morph_index) + "\nFile appears to be corrupt")
+            self.log.error(f"EOF reading {label} header\nError on {label} number {morph_index}\nFile appears to be corrupt")
             raise ValueError("Error reading TRI file")
-        
-        data = unpack('<I', tmp_data)
-        tmp_data = file.read(data[0])
-        if len(tmp_data) < data[0]:
-            self.log.error("EOF reading morph header\nError on morph number " + str(morph_index) + "\nFile appears to be corrupt")
+        name_len = unpack('<I', tmp_data)[0]
+        tmp_data = file.read(name_len)
+        if len(tmp_data) < name_len:
+            self.log.error(f"EOF reading {label} header\nError on {label} number {morph_index}\nFile appears to be corrupt")
             raise ValueError("Error reading TRI file")
-        
-        data = unpack('<'+str(data[0]-1)+'sx', tmp_data)
-        morphSubName = data[0].decode("iso-8859-15")
+        return unpack('<'+str(name_len-1)+'sx', tmp_data)[0].decode("iso-8859-15")
+
+
+    def index_morphs(self, file):
+        """ 
+        Record each morph's name and offset without decoding it.
+
+        * file = file object positioned at the first morph
+        Fills morphs and modmorphs with MorphRefs that load_morph reads on demand.
+        """
+        pos = file.tell()
+        size = file.seek(0, 2)
+        file.seek(pos)
+
+        for i in range(self.header.morphNum):
+            name = self.read_morph_name(file, "morph", i)
+            offset = file.tell()
+            if file.seek(FLOAT_LEN + SHORT_LEN * 3 * self.header.vertexNum, 1) > size:
+                self.log.error(f"EOF reading morph data vertices\nError on morph number {i}\n  \"{name}\"\nFile appears to be corrupt")
+                raise ValueError("Error reading TRI file")
+            self.morphs[name] = MorphRef(offset)
+
+        vertsAdd_Index = 0
+        for i in range(self.header.addMorphNum):
+            name = self.read_morph_name(file, "MOD-morph", i)
+            tmp_data = file.read(INT_LEN)
+            if len(tmp_data) < INT_LEN:
+                self.log.error(f"EOF reading MOD-morph header\nError on MOD-morph number {i}\n  \"{name}\"\nFile appears to be corrupt")
+                raise ValueError("Error reading TRI file")
+            blockLength = unpack('<I', tmp_data)[0]
+            offset = file.tell()
+            if file.seek(INT_LEN * blockLength, 1) > size:
+                self.log.error(f"EOF reading MOD-morph data verticies\nError on MOD-morph number {i+1}\n  \"{name}\"\nFile appears to be corrupt")
+                raise ValueError("Error reading TRI file")
+            self.modmorphs[name] = MorphRef(offset, blockLength, vertsAdd_Index)
+            vertsAdd_Index += blockLength
+
+
+    def read_morph(self, file):
+        """ 
+        Reads a single morph from a tri file
+
+        * file = file object positioned at start of morph
+        * returns = (morph-name, MorphDeltas) with the morph's int16 offsets, 1:1
+          with the base verts
+        """
+        morph_index = len(self.morphs) 
+        morphSubName = self.read_morph_name(file, "morph", morph_index)
         #self.log.debug(f"Read morph: {morphSubName}")
         
         tmp_data = file.read(FLOAT_LEN)
@@ -166,14 +382,8 @@ class TriFile():
             self.log.error("EOF reading morph data vertices\nError on morph number " + str(morph_index) + "\n  \"" + morphSubName + "\"\nMorph has valid header, but appears to be corrupt\nFile appears to be corrupt")
             raise ValueError("Error reading TRI file")		
 
-        morph_verts = [] 
-        for lidx in range(self.header.vertexNum):
-            data = unpack('<3h', tmp_buffer[SHORT_LEN * 3 * lidx : (SHORT_LEN*3*lidx) + (SHORT_LEN*3)]  )
-            morph_verts.append((self._vertices[lidx][0] + data[0] * baseDiff,
-                                self._vertices[lidx][1] + data[1] * baseDiff,
-                                self._vertices[lidx][2] + data[2] * baseDiff) )
-
-        return morphSubName, morph_verts
+        deltas = np.frombuffer(tmp_buffer, dtype='<i2').reshape(-1, 3)
+        return morphSubName, MorphDeltas(baseDiff, deltas)
 
 
     def read_modmorph(self, file, i, vertsAdd_Index, vertsAdd_list, vertsAdd_listLength, verts_list):
@@ -181,24 +391,13 @@ class TriFile():
         Reads a single mod morph from a tri file. Mod morphs only morph some of the vertices.
 
         * file = file object positioned at start of morph
-        * returns = (morph-name, [(x,y,z), ...]) list of absolute new vert positions
-          defined by the morph, 1:1 with base verts
+        * vertsAdd_list = (addVertexNum, 3) array of mod-morph vertex positions
+        * returns = (morph-name, next vertsAdd_Index, ModMorph)
         """
         morph_index = len(self.modmorphs) 
 
         # Read the morph name
-        tmp_data = file.read(INT_LEN)
-        if len(tmp_data) < INT_LEN:
-            self.log.error("EOF reading MOD-morph header\nError on MOD-morph number " + str(morph_index) + "\nFile appears to be corrupt")
-            raise ValueError("Error reading TRI file")
-        data = unpack('<I', tmp_data)
-
-        tmp_data = file.read(data[0])
-        if len(tmp_data) < data[0]:
-            self.log.error("EOF reading MOD-morph header\nError on MOD-morph number " + str(morph_index) + "\nFile appears to be corrupt")
-            raise ValueError("Error reading TRI file")
-        data = unpack('<'+str(data[0]-1)+'sx', tmp_data)
-        morphSubName = data[0].decode("iso-8859-15")
+        morphSubName = self.read_morph_name(file, "MOD-morph", morph_index)
         self.log.debug(f"Read modmorph {morphSubName}")
 
         # Read the morph block (array of affected vertex indices)
@@ -209,32 +408,22 @@ class TriFile():
         data = unpack('<I', tmp_data)
         blockLength = data[0]
         
-        if blockLength > 0:
-            nextMorphVertIdx = 0
-            tmp_buffer = file.read(INT_LEN*blockLength)
-            if len(tmp_buffer) < INT_LEN*blockLength:
-                self.log.error("EOF reading MOD-morph data verticies\nError on MOD-morph number " + str(i+1) + "\n  \"" + morphSubName + "\"\nMorph has valid header, but appears to be corrupt\nFile appears to be corrupt")
-                raise ValueError("Error reading TRI file")	
-            
-            new_verts = self._vertices.copy()
-            for nextMorphVertIdx in range(0, blockLength):
-                data = unpack('<I', tmp_buffer[INT_LEN*nextMorphVertIdx:(INT_LEN*nextMorphVertIdx)+INT_LEN])
-                vert_index = data[0]
-
-                new_verts[vert_index] = (vertsAdd_list[vertsAdd_Index][0],
-                                         vertsAdd_list[vertsAdd_Index][1],
-                                         vertsAdd_list[vertsAdd_Index][2],)
-                vertsAdd_Index += 1
-            
-            return morphSubName, vertsAdd_Index, new_verts
-
-        return morphSubName, 0, None
+        # An empty mod-morph moves nothing and uses none of the mod vertices.
+        tmp_buffer = file.read(INT_LEN*blockLength)
+        if len(tmp_buffer) < INT_LEN*blockLength:
+            self.log.error("EOF reading MOD-morph data verticies\nError on MOD-morph number " + str(i+1) + "\n  \"" + morphSubName + "\"\nMorph has valid header, but appears to be corrupt\nFile appears to be corrupt")
+            raise ValueError("Error reading TRI file")	
+        
+        morph = ModMorph(np.frombuffer(tmp_buffer, dtype='<u4'),
+                         vertsAdd_list[vertsAdd_Index:vertsAdd_Index + blockLength])
+        return morphSubName, vertsAdd_Index + blockLength, morph
 
 
-    def read(self, file):
+    def read(self, file, lazy=False):
         """ Read the given tri file 
             file = file object
             header = TRIheader object to use for this import
+            lazy = only index the morphs; they are read from filepath when used
             returns (obj with shape keys, mesh with vertex locations)
         """
         self.log.debug(f"""
@@ -243,7 +432,6 @@ class TriFile():
             """)
 
         # load vertex data
-        verts_list = []
         tmp_buffer = file.read(FLOAT_LEN * 3 * self.header.vertexNum)
         if len(tmp_buffer) < FLOAT_LEN * 3 * self.header.vertexNum:
             self.log.error("EOF reading base model verticies - Should read " + str(self.header.vertexNum) \
@@ -251,52 +439,42 @@ class TriFile():
                 + str(len(tmp_buffer)) + "\nTRI file has valid header, but file appears to be corrupt")
             raise ValueError("Error reading TRI file")
         
-        for i in range(self.header.vertexNum):
-            data = unpack('<3f', tmp_buffer[FLOAT_LEN * 3 * i : (FLOAT_LEN*3*i) + (FLOAT_LEN*3)])
-            verts_list.append((data[0], data[1], data[2]))
-
-        self._vertices = verts_list
+        self._vert_array = np.frombuffer(tmp_buffer, dtype='<f4').reshape(-1, 3)
+        self._vertices = None
 
         # "modvertice" = morph data sets, where each set need not contain data for every vertex in the mesh
         # Downside is that the structure must specify which vertices are in each set and which vertex each 3D point refers to
-        vertsAdd_list = []
         tmp_buffer = file.read(FLOAT_LEN*3*self.header.addVertexNum)
         if len(tmp_buffer) < FLOAT_LEN*3*self.header.addVertexNum:
             # self.log.error("\n----=| Tri Import Error |=----\nEOF reading mod-morph vertices\nShould read " + str(self.header.addVertexNum) + " mod verticies with\n" + str(FLOAT_LEN*3*header.addVertexNum) + " bytes but only read " + str(len(tmp_buffer)) + "\nTRI file has valid header, but file appears to be corrupt")
             raise ValueError("Error reading TRI file: Not enough mod vertices")
         
-        for i in range(self.header.addVertexNum):
-            data = unpack('<3f', tmp_buffer[FLOAT_LEN*3*i:(FLOAT_LEN*3*i)+(FLOAT_LEN*3)])
-            vertsAdd_list.append((data[0], data[1], data[2]))
+        vertsAdd_list = np.frombuffer(tmp_buffer, dtype='<f4').reshape(-1, 3)
 
         # loading faces
-        self._faces = []
         tmp_buffer = file.read(INT_LEN*3*self.header.faceNum)
         if len(tmp_buffer) < INT_LEN*3*self.header.faceNum:
             self.log.error("\n----=| Tri Import Error |=----\nEOF reading model faces\nShould read " + str(self.header.faceNum) + " faces with\n" + str(INT_LEN*3*self.header.faceNum) + " bytes but only read " + str(len(tmp_buffer)) + "\nTRI file has valid header, but file appears to be corrupt")
             raise ValueError("Error reading TRI file")
 
-        for i in range(self.header.faceNum):
-            data = unpack('<3I', tmp_buffer[INT_LEN*3*i:(INT_LEN*3*i)+(INT_LEN*3)])
-            self.faces.append((data[0], data[1], data[2]))
+        self._face_array = np.frombuffer(tmp_buffer, dtype='<u4').reshape(-1, 3)
+        self._faces = None
 
-        numFaces = len(self._faces)
+        numFaces = len(self._face_array)
 
-        self.uv_pos = []
         tmp_buffer = file.read(FLOAT_LEN*2 * self.header.uvNum)
         if len(tmp_buffer) < FLOAT_LEN*2*self.header.uvNum:
             self.log.error("\n----=| Tri Import Error |=----\nEOF reading UV Coordinates\nShould read " + str(self.header.uvNum) + " UVs with \n" + str(FLOAT_LEN*2*self.header.uvNum) + " bytes but only read " + str(len(tmp_buffer)) + "\nTRI file has valid header, but file appears to be corrupt")
             raise ValueError("Error reading TRI file")
 
-        for i in range(self.header.uvNum):
-            data = unpack('<2f', tmp_buffer[FLOAT_LEN*2*i:(FLOAT_LEN*2*i)+(FLOAT_LEN*2)])
-            self.uv_pos.append((data[0], data[1])) # Inverting "V" to match what we get from nifs
+        self._uv_array = np.frombuffer(tmp_buffer, dtype='<f4').reshape(-1, 2)
+        self._uv_pos = None
 
-        numUV = len(self.uv_pos)
+        numUV = len(self._uv_array)
 
         #I'm assuming that tri files will always have 1 UV per vertex, but i wasn't able to conirm this for sure.. so:
-        if numUV != len(verts_list):
-            self.log.warning(f"Number of verticies differs from number of UV coordinates: {numUV} != {len(verts_list)}; importing without UV")
+        if numUV != self.header.vertexNum:
+            self.log.warning(f"Number of verticies differs from number of UV coordinates: {numUV} != {self.header.vertexNum}; importing without UV")
             self.import_uv = False
 
         # NOTE --- For future reference. UV's are placed "on a vertex" but indirectly. Each loop contains one vertex index that is supposed to be tied into
@@ -316,26 +494,29 @@ class TriFile():
 
         # face_uvs array: For each face we have 3 (u,v) locations (3 cuz faces are triangles)
         ### Not currently using this, but Blender can do it. Since nifs have 1:1 relationship between vert and UV, skipping it.
-        self.face_uvs = []
-        if self.import_uv:
-            for lidx in range(numFaces):
-                data = unpack('<3I', tmp_buffer[INT_LEN*3*lidx:(INT_LEN*3*lidx)+(INT_LEN*3)])
-                self.face_uvs.append((data[0], data[1], data[2]))
-                #self.face_uvs.append([(self.uv_pos[data[0]][0], self.uv_pos[data[0]][1]),
-                #                      (self.uv_pos[data[1]][0], self.uv_pos[data[1]][1]),
-                #                      (self.uv_pos[data[2]][0], self.uv_pos[data[2]][1]) ])
+        # The array is kept either way so write() can put it back as it was.
+        self._face_uvs = None if self.import_uv else []
+        self._face_uv_array = np.frombuffer(tmp_buffer, dtype='<u4').reshape(-1, 3)
+            #self.face_uvs.append([(self.uv_pos[data[0]][0], self.uv_pos[data[0]][1]),
+            #                      (self.uv_pos[data[1]][0], self.uv_pos[data[1]][1]),
+            #                      (self.uv_pos[data[2]][0], self.uv_pos[data[2]][1]) ])
             
-        self.morphs = {}
-        self.morphs['Basis'] = self._vertices
+        self._morph_cache.clear()
+        self.morphs = TriMorphs(self)
+        self.morphs['Basis'] = BASE_VERTS
+        self.modmorphs = TriMorphs(self, mod=True)
+
+        if lazy and self.filepath:
+            self._add_verts = vertsAdd_list
+            self.index_morphs(file)
+            return
 
         # read morph data
         if self.header.morphNum > 0:
             for i in range(self.header.morphNum):
-                name, verts = self.read_morph(file)
-                self.morphs[name] = verts
+                name, deltas = self.read_morph(file)
+                self.morphs[name] = deltas
 
-        self.modmorphs = {}
-                
         # read additional morph data
         if self.header.addMorphNum > 0:
             vertsAdd_Index = 0
@@ -348,18 +529,18 @@ class TriFile():
                     vertsAdd_Index,
                     vertsAdd_list,
                     vertsAdd_listLength,
-                    verts_list
+                    None
                     )
-                if verts:
-                    self.modmorphs[name] = verts
-                    self.log.debug(f"Read morph {name}")
+                self.modmorphs[name] = verts
+                self.log.debug(f"Read morph {name}")
 
 
     @classmethod
-    def from_file(cls, file:BinaryIO):
+    def from_file(cls, file:BinaryIO, lazy=False):
         """ 
         Read tris from the given file.
-        Returns a new TriFile with the file conents.
+        Returns a new TriFile with the file conents. With lazy=True the morphs
+        are only indexed, and get_morph reads them from the file as needed.
         """
         log = logging.getLogger("pynifly")
         log.debug(f"Reading tris from {file.name}")
@@ -381,7 +562,7 @@ class TriFile():
             #return {'CANCELLED'}
 
         try:
-            tri.read(file)
+            tri.read(file, lazy=lazy)
         except ValueError:
             log.exception("Error importing Tri File")
             return None
@@ -389,13 +570,13 @@ class TriFile():
         return tri
     
     @classmethod
-    def from_filepath(cls, filepath:Path):
+    def from_filepath(cls, filepath:Path, lazy=False):
         """ 
         Read tris from the given file path.
         Returns a new TriFile with the file conents.
         """
         with open(filepath, 'rb') as file:
-            return cls.from_file(file)
+            return cls.from_file(file, lazy=lazy)
 
 
    
@@ -403,211 +584,142 @@ class TriFile():
 
     @property
     def vertices(self):
+        if self._vertices is None and self._vert_array is not None:
+            self._vertices = _rows(self._vert_array)
         return self._vertices
 
     @vertices.setter
     def vertices(self, val):
         """ Sets the vertex list. Val is a list of triples. No copy is made """
         self._vertices = val
+        self._vert_array = None
         self.header.vertexNum = len(val)
 
 
     @property
     def faces(self):
+        if self._faces is None and self._face_array is not None:
+            self._faces = _rows(self._face_array)
         return self._faces
 
     @faces.setter
     def faces(self, val):
         """ Sets the face list. Faces must be triangles. Val is list of triples. No copy is made. """
         self._faces = val
+        self._face_array = None
         self.header.faceNum = len(val)
 
 
-    def write(self, filepath, export_morphs:set = None): # write(ob, scn, filename, filepath, reorder_verts):
+    @property
+    def uv_pos(self):
+        if self._uv_pos is None and self._uv_array is not None:
+            self._uv_pos = _rows(self._uv_array)
+        return self._uv_pos
+
+    @uv_pos.setter
+    def uv_pos(self, val):
+        self._uv_pos = val
+        self._uv_array = None
+
+
+    @property
+    def face_uvs(self):
+        if self._face_uvs is None and self._face_uv_array is not None:
+            self._face_uvs = _rows(self._face_uv_array)
+        return self._face_uvs
+
+    @face_uvs.setter
+    def face_uvs(self, val):
+        self._face_uvs = val
+        self._face_uv_array = None
+
+
+    def write(self, filepath, export_morphs:set = None):
         """ Write the TriFile to a file 
             filepath = name of file to write
             export_morphs = subset of morph names to write
         """
-       
         self.header.signature = VERSION_STRING
+        base = self.base_array()
 
-        ### NOT WORKING because I have to pass in loops ###
-        #Mapping for re-order of verts to  match a 'sequential face list' index = vertex index, value = index to remap to
-        #verts_reorder_mapping will be referenced everwhere in the script, just that only if re-rdering is selcted is the mapping not v#:v#
-        if False: # self.reorder_verts:
-            # verts_reorder_mapping = [-1] * len(self._vertices)
-            # current_v_position = 0
-            # for f_index, f in enumerate(self._faces):
-            #     #f_vert is the 1st, 2nd, or 3rd index of the face
-            #     for f_vert, loop_index in enumerate(f.loop_indices):
-            #         if f_vert > 2:
-            #             self.write_error(f"Error exporting tris from {ob.name}: Mesh has faces with more than 3 verts")
-            #             raise ValueError("Error creating tri file")
-
-            #         vert_idx = mesh.loops[loop_index].vertex_index
-            #         #if this vertex has not already been remapped, remap it
-            #         if verts_reorder_mapping[vert_idx] == -1:
-            #             verts_reorder_mapping[vert_idx] = current_v_position
-            #             current_v_position = current_v_position + 1
-            pass
-        else:
-            verts_reorder_mapping = range(len(self._vertices)) # [v_idx for v_idx, v in enumerate(verts)]
-
-        #Not a good idea to pack long strings repeatedly
-        modHeaderArrayToPack = []
-        modVerticeArrayToPack = []
-        morphKeysArrayToPack = []
-        morphKeysDiffValuesArrayToPack = []
-
-        modHeaderPacked		= b''	#string to collect the header data
-        modVerticePacked	= b''	#string to collect the vertice data
-        morphKeysPacked		= b''	#string to collect the morph key data to write
-
-        morphNameList =[] #Holds a list of previously processed morph names to check for duplicates
-        fullMorphNameList =[] #Only full morph names
-        modMorphNameList =[] #Only mod-morph names
-        
-        morphlist = set(self.morphs.keys())
-        if export_morphs is not None:
-            morphlist = morphlist.intersection(export_morphs)
+        # Morphs go out in the order they were read or added.
+        morphlist = [m for m in self.morphs if export_morphs is None or m in export_morphs]
 
+        # The TRI format saves the offset data in a 'normalized' form: int16 offsets
+        # from the base, scaled so the largest difference maps to 0x7fff (the max
+        # signed 16-bit int). The factor to undo that is written with the morph.
+        # Morphs read from a file go back with their own scale and offsets, so
+        # reading and writing a file doesn't lose precision each time.
         self.header.morphNum = len(morphlist)
+        morphKeysPacked = []
         for morphName in morphlist:
-            #self.log.debug(f"..exporting morph {morphName}")
-            verts_diff = [[]] * len(self.vertices)		#list to save vertices to
-            max_diff = 0
-            fullMorphNameList.append(morphName)
-
-            #The TRI format saves the offset data in a 'normalized' form.  The largets
-            #difference is used as a factor to apply to all the offset values So, the
-            #largest difference needs to be found self.log.debug(f"Writing shape verts
-            #for {morphName} value is {type(self.morphs[morphName])}")
-            shape_verts = self.morphs[morphName]
-            vert_idx = 0
-
-            for nv, bv in zip(shape_verts, self.vertices):
-                data = (nv[0] - bv[0], nv[1] - bv[1], nv[2] - bv[2])
-                max_diff = max(abs(data[0]), abs(data[1]), abs(data[2]), max_diff)
-                verts_diff[verts_reorder_mapping[vert_idx]] = data
-                vert_idx = vert_idx + 1
-
-            #7fff=max signed integer value for 16 bits = 32767.  I guess, dunno why it was like
-            #this, but I like hex.  Frogs everywhere.
-            diff_base = max_diff / 0x7fff
-                
-            #If the diff is 0, then the morph and the base are identical.  That's fine,
-            #but the normalization factor shouldn't be 0!  Another way to do this would
-            #be to just set all the diff values to 0 in the loop below.  They should,
-            #indeed, all be 0 since v[0-2] will all be 0 since the difference calculated
-            #above was all exactly 0 or below precision of float.  This effectively adds
-            #a built-in floor to the amount of offset the export will allow, but I don't
-            #think rendering programs will genreally allow that level of precision
-            #anyway, heh
+            morphKeysPacked.append(pack('<I'+ str(len(morphName)) +'sx', len(morphName)+1, morphName.encode("utf-8")))
+            v = self.morphs.raw(morphName)
+            if isinstance(v, MorphRef):
+                v = self.load_morph(v)
+            if isinstance(v, MorphDeltas) and len(v.deltas) == len(base):
+                morphKeysPacked.append(pack('<f', v.scale))
+                morphKeysPacked.append(v.deltas.astype('<i2').tobytes())
+                continue
+
+            verts_diff = self.morph_array(morphName)[:len(base)] - base
+            diff_base = np.abs(verts_diff).max(initial=0.0) / 0x7fff
+
+            # If the diff is 0, then the morph and the base are identical. That's
+            # fine, but the normalization factor shouldn't be 0. The offsets all
+            # come out 0 anyway.
             if diff_base == 0: 
                 diff_base = 1
-            
-            morphKeysDiffValuesArrayToPack.append( float(diff_base) )
 
-            for i in range(len(verts_diff)):
-                verts_diff[i] = (int(verts_diff[i][0]/diff_base), 
-                                 int(verts_diff[i][1]/diff_base),
-                                 int(verts_diff[i][2]/diff_base))
+            morphKeysPacked.append(pack('<f', diff_base))
+            # astype truncates toward zero, like int()
+            morphKeysPacked.append((verts_diff / diff_base).astype('<i2').tobytes())
 
-            morphKeysArrayToPack.append( verts_diff.copy() )
+        morphlist = [m for m in self.modmorphs if export_morphs is None or m in export_morphs]
 
-        morphlist = set(self.modmorphs.keys())
-        if export_morphs is not None:
-            morphlist = morphlist.intersection(export_morphs)
-
-        self.header.addMorphNum = 0
+        # Mod-morphs list the base vertices they move (modHeaderPacked) and, 1:1 with
+        # that, the new positions (modVerticePacked).
+        self.header.addMorphNum = len(morphlist)
         self.header.addVertexNum = 0
+        modHeaderPacked = []
+        modVerticePacked = []
         for morphName in morphlist:
-            self.header.addMorphNum += 1
-            morphNameList.append(morphName)
-            modMorphNameList.append(morphName)
-            verticeCount 	= 0	 #keeps track of the number of vertices
-            verticeAdded	= 0	 #keeps track of the number of vertices which were actually added to the additional vertex list
-            
-            shape_verts = self.modmorphs[morphName]
-            for nv, mv in zip(shape_verts, self.vertices):
-                div = abs(nv[0] - mv[0]) + abs(nv[1] - mv[1]) + abs(nv[2] - mv[2]) / 3
-                if div > 0.00033:		#filter out the vertices which are too similiar to the base mesh
-                    data = [nv[0], nv[1], nv[2], verts_reorder_mapping[verticeCount]]
-                    verts_diff[verts_reorder_mapping[verticeCount]] = data.copy()
-                    self.header.addVertexNum += 1
-                    verticeAdded += 1
-                verticeCount += 1
-
-            modHeaderArrayToPack.append( [] )
-            modVerticeArrayToPack.append( [] )
-
-            modHeaderArrayToPack[self.header.addMorphNum-1].append( int(verticeAdded) )
-
-            # modHeaderPacked is the list of vertex indices referencing the base model
-            # array.  The index into this list is the same as the index into the list of
-            # actual mod vertices (modVerticePacked).  It indicates to which vertex in the
-            # base model the offset given in the modVerticePacked applies
-            for v in verts_diff:
-                if v != []:
-                    modHeaderArrayToPack[self.header.addMorphNum-1].append( int(v[3]) )
-                    modVerticeArrayToPack[self.header.addMorphNum-1].append( [float(v[0]), float(v[1]), float(v[2])] )
-
-
-        #Pack Morph
-        for morphNum, diffValue in enumerate(morphKeysDiffValuesArrayToPack):
-            morphKeysPacked += pack('<I'+ str(len(fullMorphNameList[morphNum])) +'sx', len(fullMorphNameList[morphNum])+1, fullMorphNameList[morphNum].encode("utf-8") )
-            morphKeysPacked += pack('<f', diffValue)
-            morphKeysPacked += pack('<' + str(len(morphKeysArrayToPack[morphNum])*3) + 'h', *[k for j in morphKeysArrayToPack[morphNum] for k in j] )
-
-        #Pack Mod-Morph
-        for morphNum, headerArray in enumerate(modHeaderArrayToPack):
-            modHeaderPacked += pack('<I'+ str(len(modMorphNameList[morphNum])) +'sx', len(modMorphNameList[morphNum])+1, modMorphNameList[morphNum].encode("utf-8") )
-            modHeaderPacked += pack('<I', headerArray[0] )
-            modHeaderPacked += pack('<' + str( len(headerArray)-1 ) + 'I', *headerArray[1:]  )
-            modVerticePacked += pack('<' + str(len(modVerticeArrayToPack[morphNum])*3) + 'f', *[k for j in modVerticeArrayToPack[morphNum] for k in j] )
-
-
-        # anon says: I think I understand what the original script was doing, but not
-        # entirely.  As far as I know, the uv should just be in the same order as the
-        # vertices, vertex 1 has uv at index 1, and so forth.  The data will be
-        # constructed the same way here.  There will always be numuv = num verts..  I
-        # hope.
-        uvDataPacked = b''
-        uv_face_mapping = [(0,0,0) for f in self._faces]
-        #uv_gather = [(0.0, 0.0) for v in self._vertices]
-        for f_index, f in enumerate(self._faces):
-            v0 = verts_reorder_mapping[f[0]]
-            v1 = verts_reorder_mapping[f[1]]
-            v2 = verts_reorder_mapping[f[2]]
-            uv_face_mapping[f_index] = (v0, v1, v2)
-
-        for uv in self.uv_pos:
-            uvDataPacked += pack('<2f', float(uv[0]), 1.0-uv[1])
-
-        self.header.uvNum = len(self.uv_pos)
-
-        # vertex packing
-        vertexDataPacked = b''
-        verts_to_pack = [[]] * len(self._vertices)
-        
-        # Reorder verts per our mapping
-        for i, v in enumerate(self._vertices):
-            verts_to_pack[verts_reorder_mapping[i]] = (v[0], v[1], v[2])
-
-        # Pack them in the new order
-        for vco in verts_to_pack:
-            tmp_data = pack('<3f', vco[0], vco[1], vco[2])
-            vertexDataPacked += tmp_data
-    
-        # face packing
-        faceDataPacked = b''
-        for f in self.faces:
-            faceDataPacked += pack('<3I', 
-                verts_reorder_mapping[f[0]], verts_reorder_mapping[f[1]], verts_reorder_mapping[f[2]])
+            v = self.modmorphs.raw(morphName)
+            if isinstance(v, MorphRef):
+                v = self.load_morph(v)
+            if isinstance(v, ModMorph):
+                moved, moved_verts = v.indices, v.verts
+            else:
+                shape_verts = np.asarray(v, dtype=np.float64).reshape(-1, 3)[:len(base)]
+                div = np.abs(shape_verts - base[:len(shape_verts)])
+                #filter out the vertices which are too similiar to the base mesh
+                moved = np.flatnonzero(div[:, 0] + div[:, 1] + div[:, 2] / 3 > 0.00033)
+                moved_verts = shape_verts[moved]
+            self.header.addVertexNum += len(moved)
+
+            modHeaderPacked.append(pack('<I'+ str(len(morphName)) +'sx', len(morphName)+1, morphName.encode("utf-8")))
+            modHeaderPacked.append(pack('<I', len(moved)))
+            modHeaderPacked.append(moved.astype('<u4').tobytes())
+            modVerticePacked.append(moved_verts.astype('<f4').tobytes())
+
+        # anon says: As far as I know, the uv should just be in the same order as the
+        # vertices, vertex 1 has uv at index 1, and so forth. There will always be
+        # numuv = num verts.. I hope. So the face UV indices are the face's vertices.
+        # UVs and face UVs read from a file are already in the file's form and go
+        # back as they are.
+        if self._uv_array is not None:
+            self.header.uvNum = len(self._uv_array)
+            uvDataPacked = self._uv_array.astype('<f4').tobytes()
+        else:
+            uvs = np.asarray(self.uv_pos, dtype=np.float64).reshape(-1, 2)
+            self.header.uvNum = len(uvs)
+            uvDataPacked = np.column_stack((uvs[:, 0], 1.0 - uvs[:, 1])).astype('<f4').tobytes()
 
-        faceNumDataPacked = b''
-        for uv in uv_face_mapping:
-            faceNumDataPacked +=  pack('<3I', uv[0], uv[1], uv[2])
+        vertexDataPacked = base.astype('<f4').tobytes()
+        faceDataPacked = self.face_array().astype('<u4').tobytes()
+        faceUVDataPacked = faceDataPacked
+        if self._face_uv_array is not None:
+            faceUVDataPacked = self._face_uv_array.astype('<u4').tobytes()
 
         # start writing...
         try:
@@ -615,13 +727,13 @@ class TriFile():
         except:
             self.log.error(f"Error opening '{filepath}' as output file")
             raise
-        file.write(self.header.write()
-                        + vertexDataPacked
-                        + modVerticePacked
-                        + faceDataPacked
-                        + uvDataPacked
-                        + faceNumDataPacked
-                        + morphKeysPacked
-                        + modHeaderPacked)
-        file.close()
+        with file:
+            file.write(self.header.write()
+                       + vertexDataPacked
+                       + b''.join(modVerticePacked)
+                       + faceDataPacked
+                       + uvDataPacked
+                       + faceUVDataPacked
+                       + b''.join(morphKeysPacked)
+                       + b''.join(modHeaderPacked))
 
@@ -160,7 +160,8 @@ class TripFile:
                     #self.log.debug(f"....Writing morph {name}")
                     self._write_count_str(file, name)
             
-                    scalefactor = 0x7fff / self._calc_max_offset(offslist) 
+                    maxoffset = self._calc_max_offset(offslist)
+                    scalefactor = 0x7fff / maxoffset if maxoffset > 0 else 1
                     if scalefactor < 0.0001: scalefactor = 1
 
                     file.write(pack('<1f', 1/scalefactor))
@@ -136,6 +136,42 @@ class ExportSettings:
     # skip morph/tri export.
     write_tris: bool = True
 
+    # Leave vertex deltas no bigger than this (game units) out of exported morphs, and
+    # drop morphs left with nothing to move. Sculpting leaves tiny offsets all over a
+    # shape key, and every vertex carrying one costs memory in game.
+    morph_epsilon: float = 1e-4
+
+    # Rebuild convex collision hulls (bhkConvexVerticesShape, FO4 polytopes) with as
+    # few vertices as the shape's convex radius allows, capped at Havok's 255. Off by
+    # default so imported hulls round-trip vertex for vertex.
+    simplify_collision: bool = False
+
+    # Store FO4 compressed-mesh collision vertices that sit on a section seam once,
+    # shared by every section using them, so both sides of the seam decode to the
+    # same point. Seams come out watertight but files get bigger, not smaller, so
+    # off by default.
+    watertight_collision: bool = False
+
+    # Reorder each shape's triangles for the GPU's post-transform vertex cache, and
+    # its vertices to match. Off by default: anything that addresses vertices by
+    # index from outside the nif (BodySlide sliders, hand-made .tri files) expects
+    # Blender's order.
+    optimize_vertex_cache: bool = False
+
+    # Fill in the LOD levels of BSLODTriShape and BSMeshLODTriShape shapes that have
+    # no LOD0/LOD1 vertex groups by leaving small disconnected pieces out of the
+    # coarse levels. The levels are nested, so nothing is simplified: a single
+    # connected mesh is drawn whole at every level. lod_ratios is the fraction of
+    # triangles kept at LOD0 and LOD1, coarsest first; the rest are LOD2.
+    drop_lod_pieces: bool = False
+    lod_ratios: str = "0.25, 0.5"
+
+    # Starfield: write QEM-decimated copies of each shape into its BSGeometry's LOD
+    # mesh slots 1-3, one per lod_ratios entry, finest first. Skin weights, UV seams
+    # and morph shapes are kept intact (see mesh_lod.decimate). Shapes whose LOD
+    # slots are authored by hand are left alone.
+    decimate_lods: bool = False
+
 
 # Custom properties that store import/export settings on objects.
 PYN_BLENDER_XF_PROP = "PYN_BLENDER_XF"
@@ -3,7 +3,7 @@ CollisionReport.py
 ------------------
 Walk a directory tree and report NIF files that contain collision data.
 
-For bhkNPCollisionObject (FO4 native physics), uses bhkPhysicsSystem.geometry
+For bhkNPCollisionObject (FO4 native physics), uses bhkPhysicsSystem.packfile
 to decode CollisionShapes and reports each shape's type, name, vertex count,
 and face count.
 
@@ -86,7 +86,9 @@ def _report_node(filename: str, node_name: str, node, seen_ps_ids: set) -> list:
         seen_ps_ids.add(ps_id)
 
         try:
-            shapes = ps.geometry
+            # Parsed once and cached by content, so a system shared across
+            # nifs is decoded once per run.
+            shapes = ps.packfile.shapes
         except Exception as exc:
             lines.append(f"{filename}\t{node_name}\t{ctype}\tERROR decoding geometry: {exc}")
             return lines
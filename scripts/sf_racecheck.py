@@ -150,8 +150,8 @@ def check_morphs(rep, data, mrph, declared_names, head_verts):
             rep.fail('morphs', f"{label}: morph.dat could not be read: {e}", f)
             continue
 
-        deltas = m.key_deltas()
-        empty = [n for n in m.morph_names if not deltas[n]]
+        deltas = m.key_arrays()
+        empty = [n for n in m.morph_names if not len(deltas[n][0])]
 
         # THE check. A declared-but-empty key makes the whole head invisible, silently.
         if empty:
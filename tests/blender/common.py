@@ -461,6 +461,17 @@ def UNITTEST_CUBE_INFO3():
     assert BD.VNearEqual(testrot, r.to_euler()[0:3]), f"Have correct rotation: {r}"
 
 
+def UNITTEST_MESH_FROM_ARRAYS_CLEAN():
+    """mesh_from_arrays only calls a mesh clean when validate() would change nothing."""
+    verts = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]
+    mesh, clean = BD.mesh_from_arrays("clean", verts, [(0, 1, 2), (0, 2, 3)])
+    assert clean, "Two distinct triangles are clean"
+    for label, tris in (("repeated corner", [(0, 1, 2), (0, 0, 3)]),
+                        ("duplicate face", [(0, 1, 2), (2, 0, 1)])):
+        mesh, clean = BD.mesh_from_arrays(label, verts, tris)
+        assert not clean, f"Mesh with a {label} needs validating"
+
+
 def LOAD_RIG():
     """Load an animation rig for play. Has to be invoked explicitly."""
     skelfile = TTB.test_file(r"tests\Skyrim\skeleton_vanilla.nif")
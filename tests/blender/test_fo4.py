@@ -923,6 +923,33 @@ def TEST_TREE():
                      "LOD2 triangles reference the same vertices after round-trip")
 
 
+@TT.category('FO4')
+def TEST_TREE_GENERATE_LODS():
+    """Can generate LOD levels for a LOD shape without LOD groups"""
+    testfile = TTB.test_file(r"tests\FO4\meshes\TreeMaplePreWar01Orange.nif")
+    outfile = TTB.test_file(r"tests/Out/TEST_TREE_GENERATE_LODS.nif", output=True)
+
+    bpy.ops.import_scene.pynifly(filepath=testfile)
+    root = next(obj for obj in bpy.data.objects if 'pynRoot' in obj)
+    tree = next(obj for obj in bpy.data.objects if obj.name.startswith("Tree") and obj.type == 'MESH')
+    for name in BD.LOD_GROUP_NAMES:
+        tree.vertex_groups.remove(tree.vertex_groups[name])
+    tree.modifiers.remove(tree.modifiers["LOD"])
+
+    BD.ObjectSelect([tree, root], active=True)
+    bpy.ops.export_scene.pynifly(filepath=outfile, intuit_defaults=False,
+                                 drop_lod_pieces=True, lod_ratios="0.5, 0.8")
+
+    TTB.stage_materials_for(outfile)
+    treecheck = pyn.NifFile(outfile).shapes[0]
+    sizes = [treecheck.properties.lodSize0, treecheck.properties.lodSize1,
+             treecheck.properties.lodSize2]
+    assert TT.is_eq(sum(sizes), len(treecheck.tris), "LOD sizes cover every triangle")
+    assert TT.is_gt(sizes[0], 0, "LOD0 has triangles")
+    assert TT.is_lt(sizes[0], len(treecheck.tris), "LOD0 drops some triangles")
+    assert TT.is_lt(sizes[0] + sizes[1], 0.8 * len(treecheck.tris) + 1, "LOD1 within its ratio")
+
+
 @TT.category('FO4', 'CONNECTPOINT')
 def TEST_CONNECT_POINT():
     """Connect points import/export correctly"""
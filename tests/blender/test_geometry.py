@@ -571,3 +571,60 @@ def TEST_VANILLA_TREEASPEN_ROUNDTRIP():
     tn = nif.read_node(id=0)
     assert tn.blockname == 'BSTreeNode', "Root BSTreeNode preserved"
     assert TT.is_eq(tn.bones1, ['TrunkBone'], "BSTreeNode Bones1 preserved")
+
+
+@TT.category('SKYRIMSE')
+def TEST_OPTIMIZE_VERTEX_CACHE():
+    """Vertex cache optimization reorders a shape without changing it."""
+    from io_scene_nifly.pyn.vertex_cache import acmr
+
+    testfile = TTB.test_file(r"tests\SkyrimSE\Suzanne.nif")
+    out_plain = TTB.test_file(r"tests\out\TEST_OPTIMIZE_VERTEX_CACHE_plain.nif")
+    out_opt = TTB.test_file(r"tests\out\TEST_OPTIMIZE_VERTEX_CACHE_opt.nif")
+
+    bpy.ops.import_scene.pynifly(filepath=testfile)
+    obj = bpy.context.object
+    BD.ObjectSelect([obj], active=True)
+    bpy.ops.export_scene.pynifly(filepath=out_plain, target_game='SKYRIMSE',
+                                 intuit_defaults=False)
+    BD.ObjectSelect([obj], active=True)
+    bpy.ops.export_scene.pynifly(filepath=out_opt, target_game='SKYRIMSE',
+                                 optimize_vertex_cache=True, intuit_defaults=False)
+
+    plain = pyn.NifFile(out_plain).shapes[0]
+    opt = pyn.NifFile(out_opt).shapes[0]
+    assert len(opt.verts) == len(plain.verts), "Same vertex count"
+
+    def corners(shape):
+        """Each triangle as a rotation-normalized tuple of (position, uv) corners."""
+        result = []
+        for t in shape.tris:
+            c = [(tuple(round(x, 4) for x in shape.verts[i]),
+                  tuple(round(x, 4) for x in shape.uvs[i])) for i in t]
+            k = c.index(min(c))
+            result.append(tuple(c[k:] + c[:k]))
+        return sorted(result)
+
+    assert corners(opt) == corners(plain), "Same triangles, same winding, same UVs"
+    assert acmr(opt.tris) < acmr(plain.tris), \
+        f"Cache misses went down: {acmr(plain.tris):.3f} -> {acmr(opt.tris):.3f}"
+
+
+@TT.category('SKYRIMSE')
+def TEST_IMPORT_MESH_ARRAYS():
+    """Shapes are built in bulk: same triangles, smooth shaded, unit custom normals."""
+    testfile = TTB.test_file(r"tests\SkyrimSE\Suzanne.nif")
+    shape = pyn.NifFile(testfile).shapes[0]
+
+    bpy.ops.import_scene.pynifly(filepath=testfile)
+    obj = bpy.context.object
+    mesh = obj.data
+
+    assert TT.is_eq(len(mesh.vertices), len(shape.verts), "Vertex count")
+    assert TT.is_eq(len(mesh.polygons), len(shape.tris), "Face count")
+    assert TT.is_eq([tuple(p.vertices) for p in mesh.polygons], [tuple(t) for t in shape.tris],
+                    "Faces in nif order")
+    assert all(p.use_smooth for p in mesh.polygons), "Smooth shaded"
+    assert TT.is_equiv(mesh.vertices[10].co, shape.verts[10], "Vertex location")
+    n = mesh.corner_normals[0].vector if hasattr(mesh, "corner_normals") else mesh.loops[0].normal
+    assert TT.is_equiv(n.length, 1.0, "Custom normals are unit length")
@@ -254,6 +254,32 @@ def TEST_OSD_IMPORT():
         f"Has a Biceps slider, got: {slider_names[:5]}..."
 
 
+@TT.category('SKYRIM', 'OSD')
+def TEST_OSD_READ_WRITE():
+    """OSD diffs decode on demand, split by shape name, and write back unchanged."""
+    from io_scene_nifly.osd.osdfile import OSDFile
+    osdfile = TTB.test_file(r"tests\SkyrimSE\Bodyslide\BD HIMBO Bandit 3.osd")
+    outfile = TTB.test_file(r"tests\Out\TEST_OSD_READ_WRITE.osd")
+
+    osd = OSDFile.from_file(osdfile)
+    assert osd.is_valid, "Read OSD file"
+    TT.assert_eq(len(osd.entries), 113, "Entry count")
+
+    # Longest matching shape name wins.
+    osd.split_entries(["Cuirass", "Cuirass.00", "Boots"])
+    TT.assert_eq(list(osd.shapes.keys()), ["Cuirass.00"], "Shapes split from entries")
+    biceps = osd.shapes["Cuirass.00"]["ArmsBiceps"]
+    assert TT.is_gt(len(biceps), 0, "Biceps slider has diffs")
+    TT.assert_eq(len(biceps.indices), len(biceps.offsets), "Diff arrays are parallel")
+    vi, offset = biceps[0]
+    TT.assert_eq(vi, int(biceps.indices[0]), "Diff pairs match the arrays")
+
+    osd.write(outfile)
+    osd.close()
+    with open(osdfile, 'rb') as f1, open(outfile, 'rb') as f2:
+        TT.assert_eq(f1.read(), f2.read(), "File written back unchanged")
+
+
 @TT.category('FONV')
 @TT.expect_errors(("Could not find image shader node",))
 def TEST_FONV():
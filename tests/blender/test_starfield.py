@@ -1540,3 +1540,41 @@ def TEST_SF_MORPH_PANEL_SURFACES():
     bpy.ops.export_scene.pynifly(filepath=outnif2, target_game="SF")
     assert body.pyn_sf_morph.chargen_path == r"meshes\morphs\Custom\chargen\morph.dat", \
         f"export didn't stomp the user's explicit path: {body.pyn_sf_morph.chargen_path!r}"
+
+
+@TT.category('STARFIELD', 'GEOMETRY')
+def TEST_SF_GENERATE_LODS():
+    """Export with decimate_lods fills the shape's LOD mesh slots with simplified meshes.
+
+    Each slot gets its own .mesh file, named after the LOD0 mesh, holding fewer triangles
+    than the slot before it.
+    """
+    testfile = TTB.test_file(r"tests\SF\meshes\malehead.nif")
+    outfile = TTB.test_file(r"tests\Out\TEST_SF_GENERATE_LODS\meshes\malehead.nif")
+    os.makedirs(os.path.dirname(outfile), exist_ok=True)
+
+    bpy.ops.import_scene.pynifly(filepath=testfile)
+    head = [o for o in bpy.context.scene.objects if o.type == 'MESH'][0]
+    ntris = len(head.data.polygons)
+
+    BD.ObjectSelect(list(bpy.context.scene.objects))
+    bpy.context.view_layer.objects.active = head
+    bpy.ops.export_scene.pynifly(filepath=outfile, target_game="SF",
+                                 decimate_lods=True, lod_ratios='0.5,0.25')
+
+    from io_scene_nifly.nif.sf_geometry import resolve_mesh_output_path
+    shape = pyn.NifFile(outfile).shapes[0]
+    assert shape.mesh_count >= 3, f"Two LOD slots written after LOD0: {shape.mesh_count}"
+    prev = ntris
+    for slot in range(3):
+        mp = shape.mesh_path(slot)
+        meshpath = resolve_mesh_output_path(outfile, mp)
+        assert os.path.isfile(meshpath), f"LOD{slot} .mesh written: {meshpath}"
+        with open(meshpath, 'rb') as f:
+            assert shape.load_mesh(f.read(), slot), f"LOD{slot} .mesh loads"
+        if slot == 0:
+            assert TT.is_eq(len(shape.tris), ntris, "LOD0 keeps every triangle")
+        else:
+            assert len(shape.tris) < prev, \
+                f"LOD{slot} is simpler than the level before it: {len(shape.tris)} >= {prev}"
+        prev = len(shape.tris)
@@ -572,3 +572,46 @@ def TEST_FACEBONE_EXPORT2():
 
     outniffb = pyn.NifFile(outfile_fb)
     assert len(outniffb.shapes) >= 1, f"Have shapes in facebones export file: {outniffb.shapes}"
+
+
+@TT.category('SKYRIMSE', 'TRI')
+def TEST_TRI_LAZY_MORPHS():
+    """Tri morphs are held as int16 deltas and decoded to positions on lookup"""
+    from io_scene_nifly.tri.trifile import MorphDeltas
+    trifile = TTB.test_file(r"tests/SkyrimSE/CitrusFemHeadChargen.tri")
+    tri = TriFile.from_filepath(trifile)
+
+    TT.assert_eq(len(tri.morphs), 53, "Morph count (with Basis)")
+    TT.assert_eq(tri.morphs['Basis'], tri.vertices, "Basis is the base verts")
+    for name in tri.morphs:
+        if name == 'Basis':
+            continue
+        raw = tri.morphs.raw(name)
+        assert isinstance(raw, MorphDeltas), f"{name} stored as deltas"
+        TT.assert_eq(raw.deltas.shape, (len(tri.vertices), 3), f"{name} delta shape")
+        verts = tri.morphs[name]
+        TT.assert_eq(len(verts), len(tri.vertices), f"{name} decodes to one position per vert")
+        i = len(verts) // 2
+        TT.assert_equiv(verts[i], [b + d * raw.scale for b, d in zip(tri.vertices[i], raw.deltas[i])],
+                        f"{name} position is base + delta * scale")
+
+
+@TT.category('SKYRIMSE', 'TRI')
+def TEST_TRI_GET_MORPH():
+    """A lazily opened tri reads only the morphs asked for, through an LRU cache"""
+    from io_scene_nifly.tri import trifile
+    testtri = TTB.test_file(r"tests/SkyrimSE/CitrusFemHeadChargen.tri")
+    full = TriFile.from_filepath(testtri)
+    tri = TriFile.from_filepath(testtri, lazy=True)
+
+    TT.assert_eq(sorted(tri.morphs), sorted(full.morphs), "Indexed morph names")
+    assert isinstance(tri.morphs.raw('BrowIn'), trifile.MorphRef), "Morph is only indexed"
+    TT.assert_eq(len(tri._morph_cache), 0, "Nothing decoded on open")
+
+    brow = tri.get_morph('BrowIn')
+    TT.assert_eq(brow, full.morphs['BrowIn'], "Lazy morph matches full read")
+    assert tri.get_morph('BrowIn') is brow, "Second lookup comes from the cache"
+
+    for name in tri.morphs:
+        tri.get_morph(name)
+    TT.assert_eq(len(tri._morph_cache), trifile.MORPH_CACHE_SIZE, "Cache is bounded")
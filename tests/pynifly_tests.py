@@ -905,6 +905,174 @@ def TEST_SF_MORPH_ROUNDTRIP():
     assert maxerr < 0.01, f"positions-only round-trip max error: {maxerr} game units"
 
 
+def TEST_SF_MORPH_ARRAYS():
+    """Starfield: the array view and the dense builder agree with the dict-based API.
+
+    key_arrays returns each key's moved vertices and deltas as arrays; from_array builds from a
+    dense (keys, vertices, 3) delta array. Both must describe the same morph as key_deltas /
+    from_deltas, down to the bytes written.
+    """
+    import numpy as np
+    from pyn.sf_morph import MorphFile
+
+    m = MorphFile.from_file(r"tests\SF\morphs\female_chargen_body_morph.dat")
+    deltas = m.key_deltas()
+    arrays = m.key_arrays()
+    for name in m.morph_names:
+        verts, d = arrays[name]
+        assert TT.is_eq(verts.tolist(), list(deltas[name]), f"{name}: same moved vertices")
+        assert np.array_equal(d, np.array(list(deltas[name].values()))), f"{name}: same deltas"
+
+    dense = np.zeros((len(m.morph_names), m.num_vertices, 3))
+    moved = np.zeros(dense.shape[:2], dtype=bool)
+    for k, name in enumerate(m.morph_names):
+        verts, d = arrays[name]
+        dense[k, verts] = d
+        moved[k, verts] = True
+    expected = MorphFile.from_deltas(m.morph_names, m.num_vertices, deltas).to_bytes()
+    assert MorphFile.from_deltas(m.morph_names, m.num_vertices, arrays).to_bytes() == expected, \
+        "Sparse array input builds the same file as dict input"
+    assert MorphFile.from_array(m.morph_names, dense, moved).to_bytes() == expected, \
+        "Dense array input builds the same file as dict input"
+
+
+def TEST_MORPH_PRUNE():
+    """Morph export drops sculpting noise, empty morphs and duplicate names.
+
+    prune_morphs is the stage shared by the .tri and Starfield morph.dat exporters. Noise is
+    added to a vanilla morph.dat's deltas; pruning must recover exactly the original records,
+    judged through the half float they are stored as.
+    """
+    import numpy as np
+    from pyn.sf_morph import MorphFile, half_round, morph_key_name
+    from pyn.morph_prune import prune_morphs
+
+    m = MorphFile.from_file(r"tests\SF\morphs\female_chargen_body_morph.dat")
+    arrays = m.key_arrays()
+    rng = np.random.default_rng(0)
+    base = rng.uniform(-50, 50, (m.num_vertices, 3))
+    morphs = {}
+    for name, (verts, d) in arrays.items():
+        pos = base + rng.uniform(-1e-5, 1e-5, base.shape)
+        pos[verts] = base[verts] + d
+        morphs[name] = pos
+    morphs['Thin.001'] = morphs['Thin']
+    morphs['Empty'] = base + rng.uniform(-1e-5, 1e-5, base.shape)
+
+    pruned, stats = prune_morphs(base, morphs, 1e-4, rename=morph_key_name, quantize=half_round)
+    TT.assert_eq(list(pruned), m.morph_names, "Morphs kept")
+    TT.assert_eq(stats.empty, ['Empty'], "Empty morphs dropped")
+    TT.assert_eq(stats.duplicates, ['Thin.001'], "Duplicate names dropped")
+    TT.assert_eq(stats.records_before, (len(m.morph_names) + 2) * m.num_vertices,
+                 "Noise moves every vertex")
+    TT.assert_eq(stats.records_after, len(m.records), "Records kept")
+    TT.assert_eq(stats.bytes_saved(16, lambda n: 4 + len(n)),
+                 stats.records_saved * 16 + 4 + len('Empty') + 4 + len('Thin.001'), "Bytes saved")
+
+    rebuilt = MorphFile.from_deltas(list(pruned), m.num_vertices, pruned)
+    TT.assert_eq(len(rebuilt.records), len(m.records), "Rebuilt record count")
+    assert np.array_equal(rebuilt.offsets['marker'], m.offsets['marker']), \
+        "Rebuilt morph moves the same vertices"
+
+    kept, stats = prune_morphs(base, {'Neutral': base}, keep_empty=True)
+    TT.assert_eq(len(kept['Neutral'][0]), 0, "keep_empty keeps a still morph")
+    TT.assert_eq(stats.empty, [], "Nothing reported dropped")
+
+
+def TEST_MORPH_BATCH():
+    """The morph batch CLI converts TRIP to OSD and re-encodes morph.dat losslessly.
+
+    Work goes through the same process() the worker pool runs, so each output is written
+    through a temporary file and moved into place.
+    """
+    import numpy as np
+    from scripts.morph_batch import Task, process, TRI, OSD, TRIP, MDAT
+    # morph_batch puts the codec modules on the path; their packages need Blender.
+    from tripfile import TripFile
+    from osdfile import OSDFile, SliderDiffs
+
+    root = r"tests\Out\TEST_MORPH_BATCH"
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    trip_path = os.path.join(root, "HIMBO.tri")
+    shutil.copy(r"tests\SkyrimSE\HIMBO.tri", trip_path)
+    tri_path = os.path.join(root, "eyeschild.tri")
+    shutil.copy(r"tests\Skyrim\eyeschild.tri", tri_path)
+    mdat_path = os.path.join(root, "morph.dat")
+    shutil.copy(r"tests\SF\morphs\female_chargen_body_morph.dat", mdat_path)
+
+    r = process(Task(trip_path, root, 'convert', {'to': OSD}))
+    TT.assert_eq(r.status, 'ok', "TRIP converted")
+    TT.assert_eq(r.kind, TRIP, "Input recognized as TRIP")
+    TT.assert_eq(r.output, os.path.join(root, "HIMBO.osd"), "OSD written beside the TRIP")
+    trip = TripFile.from_filepath(trip_path)
+    osd = OSDFile.from_file(r.output)
+    osd.split_entries(list(trip.shapes))
+    for shape, morphs in trip.shapes.items():
+        for name, offsets in morphs.items():
+            diffs = osd.shapes[shape][name]
+            TT.assert_eq(diffs.indices.tolist(), [i for i, _ in offsets], f"{name} vertices")
+            assert np.allclose(diffs.offsets, [o for _, o in offsets], atol=1e-6), \
+                f"{name} offsets"
+    osd.close()
+
+    osd_path = r.output
+    r = process(Task(osd_path, root, 'validate', {}))
+    TT.assert_eq(r.status, 'ok', "Converted OSD validates")
+
+    # Checked against its nif, an OSD whose shapes' entries are interleaved still
+    # re-encodes byte for byte.
+    mixed_path = os.path.join(root, "interleaved.osd")
+    shutil.copy(r"tests\Skyrim\test.nif", os.path.join(root, "interleaved.nif"))
+    shapes = [s.name for s in NifFile(os.path.join(root, "interleaved.nif")).shapes]
+    diffs = SliderDiffs.from_arrays([0, 1], [(0.5, 0, 0), (0, 0.5, 0)])
+    mixed = OSDFile()
+    mixed.shapes = {shapes[0] + "Big": {'': diffs}, shapes[1] + "Big": {'': diffs},
+                    shapes[0] + "Small": {'': diffs}}
+    mixed.write(mixed_path)
+    r = process(Task(mixed_path, root, 'validate', {'nif_check': True}))
+    TT.assert_eq((r.status, r.messages), ('ok', []), "Interleaved OSD validates against its nif")
+
+    # The mapping is released when the with block ends, or when a damaged file
+    # raises, so the file can be replaced or deleted straight away.
+    with OSDFile.from_file(osd_path) as osd:
+        TT.assert_true(osd.is_valid, "OSD opens as a context manager")
+    TT.assert_eq(osd._data, None, "Mapping closed on leaving the with block")
+    truncated = os.path.join(root, "truncated.osd")
+    with open(osd_path, 'rb') as f, open(truncated, 'wb') as out:
+        out.write(f.read()[:-5])
+    osd = OSDFile()
+    try:
+        with open(truncated, 'rb') as f:
+            osd.read(f)
+        assert False, "Truncated OSD raises"
+    except ValueError:
+        pass
+    TT.assert_eq(osd._data, None, "Mapping closed when reading fails")
+    os.remove(truncated)
+
+    raw = open(mdat_path, 'rb').read()
+    r = process(Task(mdat_path, root, 'reencode', {'out': os.path.join(root, "out")}))
+    TT.assert_eq(r.kind, MDAT, "Input recognized as morph.dat")
+    assert open(r.output, 'rb').read() == raw, "morph.dat re-encodes byte for byte"
+    TT.assert_eq([f for f in os.listdir(root) if f.endswith('.tmp')], [],
+                 "No temporary files left behind")
+
+    r = process(Task(mdat_path, root, 'convert', {'to': TRIP}))
+    TT.assert_eq(r.status, 'skip', "morph.dat has no TRIP conversion")
+
+    # TRI morphs and mod-morphs go back with their stored offsets and scale, so
+    # re-encoding in place, again and again, leaves the file as it was.
+    raw = open(tri_path, 'rb').read()
+    r = process(Task(tri_path, root, 'reencode', {'out': os.path.join(root, "out")}))
+    TT.assert_eq(r.kind, TRI, "Input recognized as TRI")
+    assert open(r.output, 'rb').read() == raw, "TRI re-encodes byte for byte"
+    for _ in range(2):
+        r = process(Task(tri_path, root, 'reencode', {}))
+        TT.assert_eq(r.status, 'ok', "TRI re-encoded in place")
+    assert open(tri_path, 'rb').read() == raw, "TRI unchanged by re-encoding in place"
+
+
 def TEST_SF_MORPH_CLASSIFY():
     """Starfield: shape-key names classify as performance (expression) vs chargen morphs.
 
@@ -2050,6 +2218,71 @@ def TEST_SF_CDB_READ():
 
     TT.assert_eq(sf_cdb.extract_material(cdb, r"Materials\Nope\x.mat", outdir), None,
                  "extracting an unknown material returns nothing")
+
+
+def TEST_SF_CDB_INDEX():
+    """The sidecar index reproduces a fresh parse of the material database.
+
+    Opening the cdb with a current index skips the file index and the component scan, so
+    everything it stores has to match what parsing produces.
+    """
+    from pyn import sf_cdb
+
+    cdb_path = os.path.join(TT.SF_ASSETS, 'materials', 'materialsbeta.cdb')
+    assert os.path.exists(cdb_path), f"Starfield material DB not found at {cdb_path}"
+    mat_path = r"Materials\Actors\Human\Faces\male_default.mat"
+
+    parsed = sf_cdb.load_cdb(cdb_path, use_index=False)
+    expected = parsed.get_material(mat_path)
+
+    # Builds the index if there isn't a current one.
+    sf_cdb.load_cdb(cdb_path).get_material(mat_path)
+    TT.assert_true(os.path.exists(cdb_path + sf_cdb.INDEX_SUFFIX), "index written")
+
+    cdb = sf_cdb.load_cdb(cdb_path)
+    TT.assert_true(cdb._index_data is not None, "index used")
+    TT.assert_eq(cdb.build_version, parsed.build_version, "build version")
+    TT.assert_eq(len(cdb.resource_to_db), len(parsed.resource_to_db), "material count")
+    TT.assert_eq(cdb.material_dbid(mat_path), 13399, "male_default dbid")
+    TT.assert_eq(cdb.object_by_dbid.get(13399), parsed.object_by_dbid.get(13399),
+                 "male_default object")
+    TT.assert_eq(cdb._pos_map[-1], parsed._pos_map[-1], "offset of the last component")
+    TT.assert_eq(cdb.get_material(mat_path), expected, "male_default reconstructed the same")
+    cdb.close()
+
+
+def TEST_SF_CDB_EXTRACT_ALL():
+    """Bulk extraction on worker processes writes what extracting one at a time does.
+
+    Composed objects are memoized and shared between materials, so also check that a caller
+    changing one returned material doesn't change the next.
+    """
+    import json
+    import tempfile
+    from pyn import sf_cdb
+
+    cdb_path = os.path.join(TT.SF_ASSETS, 'materials', 'materialsbeta.cdb')
+    assert os.path.exists(cdb_path), f"Starfield material DB not found at {cdb_path}"
+    mat_paths = [r"Materials\Actors\Human\Faces\male_default.mat",
+                 r"Materials\Actors\Human\Eyelashes\male_eyelash.mat",
+                 r"Materials\Nonexistent\nope.mat"]
+
+    cdb = sf_cdb.load_cdb(cdb_path)
+    first = cdb.get_material(mat_paths[0])
+    first['Objects'][0]['Components'].clear()
+    TT.assert_eq(len(cdb.get_material(mat_paths[0])['Objects']), 34,
+                 "male_default object count after modifying an earlier result")
+
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as pool_dir:
+        serial = sf_cdb.extract_all(cdb, mat_paths, serial_dir, workers=1)
+        pooled = sf_cdb.extract_all(sf_cdb.load_cdb(cdb_path), mat_paths, pool_dir, workers=2)
+        TT.assert_eq(pooled[2], None, "unknown material not extracted")
+        for s, p in zip(serial[:2], pooled[:2]):
+            with open(p, encoding='utf-8') as fp, open(s, encoding='utf-8') as fs:
+                TT.assert_eq(json.load(fp), json.load(fs),
+                             f"pooled extraction matches serial for {os.path.basename(s)}")
+
+
 def TEST_READ_WRITE():
     """Basic load-and-store for Skyrim--Can read the armor nif and spit out armor and body separately"""
     testfile = "tests/Skyrim/test.nif"
@@ -4115,6 +4348,28 @@ def TEST_SKIN_BONE_XF():
     #Throw in an unrelated test for whether the UV got inverted
     assert VNearEqual(head.uvs[0], headcheck.uvs[0]), f"UV 0 same in both: [{head.uvs[0]}, {headcheck.uvs[0]}]"
 
+def TEST_WEIGHT_ARRAYS_BY_BONE():
+    """Array weights-by-bone keeps the top 4 weights per vertex, normalized"""
+    weights = [{'A': 0.5, 'B': 0.5},
+               {'A': 0.1, 'B': 0.2, 'C': 0.3, 'D': 0.4, 'E': 0.5, 'SBP_32': 1.0},
+               {'C': 0.00001},
+               {'E': 0.25, 'D': 0.25, 'C': 0.25, 'B': 0.25, 'A': 0.25}]
+    wba = get_weight_arrays_by_bone(weights, ['A', 'B', 'C', 'D', 'E'])
+
+    assert TT.is_eq(list(wba.keys()), ['B', 'A', 'E', 'D', 'C'], "Bones in order of first use")
+    verts, wts = wba['A']
+    assert TT.is_eq(verts.tolist(), [0], "Lightest and tied-last weights dropped")
+    assert TT.is_equiv(wts.tolist(), [0.5], "Weight normalized")
+    verts, wts = wba['E']
+    assert TT.is_eq(verts.tolist(), [1, 3], "Heaviest weights kept")
+    assert TT.is_equiv(wts.tolist(), [0.5/1.4, 0.25], "Weights normalized over the top 4")
+    assert 'SBP_32' not in wba, "Only requested groups"
+    assert all(2 not in v.tolist() for v, w in wba.values()), "Tiny weights dropped"
+
+    wbb = get_weights_by_bone(weights, ['A', 'B', 'C', 'D', 'E'])
+    assert TT.is_eq(wbb['E'], list(zip(*(a.tolist() for a in wba['E']))), "List form matches")
+
+
 def TEST_WEIGHTS_BY_BONE():
     """Weights-by-bone helper works correctly"""
     nif = NifFile(r"tests\SkyrimSE\meshes\Anna.nif")
@@ -4743,6 +4998,13 @@ def TEST_TREE_BONE_AGGREGATION():
         verts = [v for v, w in pairs]
         assert len(verts) == len(set(verts)), f"{nm} has each vertex once"
 
+    # The dense arrays carry the same aggregated weights.
+    bwa = sh.bone_weight_arrays
+    assert set(bwa) == set(bw), f"Same bones in bone_weight_arrays: {list(bwa)}"
+    for nm, (verts, wts) in bwa.items():
+        assert dict(zip(verts.tolist(), wts.tolist())) == dict(bw[nm]), \
+            f"{nm} arrays match bone_weights"
+
 
 @test_category('SKYRIM', 'TREE')
 def TEST_NISWITCHNODE():
@@ -5860,6 +6122,272 @@ def TEST_FO4_MULTI_CM_BODIES():
         assert TT.is_lt(centroid_shift, step, "Round-trip preserves the centroid")
 
 
+def _cm_test_grid(n):
+    """A gently rolling n x n terrain grid -- big enough to need many sections."""
+    verts = [(x * 0.1, y * 0.1, 0.05 * math.sin(x * 0.3) * math.cos(y * 0.2))
+             for y in range(n) for x in range(n)]
+    tris = []
+    for y in range(n - 1):
+        for x in range(n - 1):
+            a = y * n + x
+            tris += [(a, a + 1, a + n + 1), (a, a + n + 1, a + n)]
+    return verts, tris
+
+
+@test_category("FO4", "PHYSICS")
+def TEST_FO4_CM_SHARED_VERTICES():
+    """Compressed-mesh sections can reference vertices through shidx.
+
+    Vanilla stores a vertex used by several sections once, in sharedVertices,
+    and has each section point at it.  Sharing is opt-in: it makes seams
+    watertight but never shrinks a grid, whose vertices touch at most four
+    sections.  A threshold of 2 (CM_SHARE_SEAMS, what watertight_collision
+    exports use) exercises the path on every seam vertex.
+    """
+    from pyn.bhk_autopack import (pack_compressed_mesh, pack_shapes, compare_cm_packing,
+                                  CM_SHARE_SEAMS)
+    from pyn.bhk_autounpack import parse_bytes, CollisionShape
+
+    verts, tris = _cm_test_grid(60)
+    src = CollisionShape(shape_type="compressed_mesh", name="grid", transform=None,
+                         verts=verts, faces=tris, convex_radius=0.0, children=[])
+
+    packed = pack_compressed_mesh(verts, tris, share_min_sections=2)
+    assert TT.is_eq(_cm_tree_problems(packed), [], "Shared-vertex CM has a valid BVH")
+    out = parse_bytes(packed)
+    assert TT.is_eq(len(out[0].faces), len(tris), "Round-trip preserves triangle count")
+    max_offset, area_ratio, centroid_shift = _compare_collision_geometry(src, out[0])
+    step = _quantization_step(src)
+    assert TT.is_lt(max_offset, step, "Round-trip moves no vertex past one quantization step")
+    assert TT.is_equiv(area_ratio, 1.0, "Round-trip preserves total triangle area", e=0.01)
+
+    # The comparison shares seams unless told otherwise.
+    sizes = compare_cm_packing(verts, tris)
+    assert TT.is_gt(sizes['shared_verts'], 0, "Seam vertices went into sharedVertices")
+    assert TT.is_lt(sizes['packed_verts'], sizes['dup_verts'],
+                    "Sharing packs fewer per-section vertices")
+    assert TT.is_gt(sizes['shared'], sizes['duplicated'],
+                    "Sharing every seam vertex costs bytes")
+    assert TT.is_eq(sizes['shared'], len(packed), "Comparison packs what pack_compressed_mesh does")
+
+    # Packing shares nothing unless asked, and pack_shapes passes the request on.
+    assert TT.is_eq(len(pack_compressed_mesh(verts, tris)), sizes['duplicated'],
+                    "Sharing is off by default")
+    assert TT.is_eq(pack_shapes([src], share_min_sections=CM_SHARE_SEAMS), packed,
+                    "pack_shapes shares seams on request")
+
+
+@test_category("PHYSICS")
+def TEST_SEGMENT_MESH_GROW():
+    """Region-growing segmentation honours the limits with fewer sections.
+
+    Bisection halves the face count at each step, so a mesh a little over a
+    power of two of the limit wastes nearly half its sections, and every cut
+    runs straight through the mesh.  Growing regions over the face adjacency
+    fills each section to the limit along connectivity.
+    """
+    from pyn.mesh_segment import segment_mesh, segment_stats
+    from pyn.bhk_autopack import _split_cm_sections
+
+    verts, tris = _cm_test_grid(100)
+    for max_tris in (255, 127):
+        bisect = segment_mesh(verts, tris, 255, max_tris, method="bisect")
+        grow = segment_mesh(verts, tris, 255, max_tris, method="grow")
+        assert TT.is_eq(sorted(fi for g in grow for fi in g), list(range(len(tris))),
+                        "Every face lands in exactly one group")
+        for g in grow:
+            assert TT.is_le(len(g), max_tris, "Group fits the triangle limit")
+            assert TT.is_le(len({v for fi in g for v in tris[fi]}), 255,
+                            "Group fits the vertex limit")
+        b, g = segment_stats(tris, bisect), segment_stats(tris, grow)
+        assert TT.is_lt(g.groups, b.groups, f"Fewer groups at {max_tris} tris")
+        assert TT.is_lt(g.stored_verts, b.stored_verts,
+                        f"Fewer duplicated vertices at {max_tris} tris")
+
+    # The compressed-mesh packer takes the same option.
+    secs = _split_cm_sections(verts, tris, method="grow")
+    assert TT.is_eq(sum(len(t) for _, t in secs), len(tris), "Sections hold every triangle")
+    assert TT.is_lt(len(secs), len(_split_cm_sections(verts, tris, method="bisect")),
+                    "Packer needs fewer sections when growing regions")
+
+
+@test_category("PHYSICS")
+def TEST_CONVEX_HULL():
+    """convex_hull returns packable polytopes, including for degenerate input."""
+    from pyn.convex_hull import convex_hull, hull_volume
+    from pyn.bhk_autopack import pack_convex_polytope
+    from pyn.bhk_autounpack import parse_bytes
+
+    # Cube corners (each three times over) plus a lattice of interior points.
+    cube = [(x, y, z) for x in (0, 2) for y in (0, 2) for z in (0, 2)]
+    inner = [(x/4, y/4, z/4) for x in range(1, 8) for y in range(1, 8) for z in range(1, 8)]
+    verts, faces = convex_hull(cube * 3 + inner)
+    assert TT.is_eq(len(verts), 8, "Hull keeps only the corners")
+    assert TT.is_eq(sorted(len(f) for f in faces), [4] * 6, "Coplanar triangles merge into quads")
+    assert TT.is_equiv(hull_volume(verts, faces), 8.0, "Hull volume")
+
+    # Every face must be wound CCW from outside: its normal points away
+    # from the centre.
+    for f in faces:
+        a, b, c = (verts[i] for i in f[:3])
+        n = [(b[1]-a[1])*(c[2]-a[2]) - (b[2]-a[2])*(c[1]-a[1]),
+             (b[2]-a[2])*(c[0]-a[0]) - (b[0]-a[0])*(c[2]-a[2]),
+             (b[0]-a[0])*(c[1]-a[1]) - (b[1]-a[1])*(c[0]-a[0])]
+        assert TT.is_gt(sum(n[k] * (a[k] - 1) for k in range(3)), 0, "Face faces outward")
+
+    data = pack_convex_polytope(verts, faces)
+    assert TT.is_eq(len(parse_bytes(data)[0].verts), 8, "Hull packs and parses")
+
+    # Flat input gives a two-sided polygon; collinear input has no faces.
+    verts, faces = convex_hull([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (.5, .5, 0)])
+    assert TT.is_eq(len(verts), 4, "Flat hull drops the interior point")
+    assert TT.is_eq(faces, [[0, 1, 2, 3], [3, 2, 1, 0]], "Flat hull is two-sided")
+    verts, faces = convex_hull([(0, 0, 0), (1, 1, 1), (2, 2, 2)])
+    assert TT.is_eq((len(verts), faces), (2, []), "Collinear hull is its end points")
+
+
+@test_category("PHYSICS")
+def TEST_CONVEX_DECOMPOSITION():
+    """convex_decompose splits a concave mesh into convex pieces."""
+    import numpy as np
+    from pyn.convex_hull import (convex_decompose, convex_hull, hull_distance, hull_volume,
+                                 MAX_HULL_VERTS)
+    from pyn.bhk_autopack import pack_convex_polytope
+
+    def box(x1, y1, z1, base):
+        verts = [(x, y, z) for x in (0, x1) for y in (0, y1) for z in (0, z1)]
+        quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+        return verts, [(base+a, base+b, base+c) for q in quads
+                       for a, b, c in ((q[0], q[1], q[2]), (q[0], q[2], q[3]))]
+
+    # An L: two overlapping bars.  Its hull is 11.5; the L itself is 7.
+    v1, t1 = box(4, 1, 1, 0)
+    v2, t2 = box(1, 4, 1, 8)
+    pieces = convex_decompose(v1 + v2, t1 + t2)
+    assert TT.is_eq(len(pieces), 2, "L splits in two")
+    assert TT.is_equiv(sum(hull_volume(*p) for p in pieces), 7.0, "Pieces fit the L exactly")
+    for verts, faces in pieces:
+        assert TT.is_gt(len(pack_convex_polytope(verts, faces)), 0, "Piece packs")
+
+    # A convex mesh stays whole.
+    assert TT.is_eq(len(convex_decompose(v1, t1)), 1, "Box stays in one piece")
+
+    # Pieces over the vertex limit are cut until they fit.
+    verts, tris = _cm_test_grid(20)
+    bowl = [(x, y, (x - 0.95)**2 + (y - 0.95)**2) for x, y, _ in verts]
+    pieces = convex_decompose(bowl, tris, max_pieces=16, max_hull_verts=128, min_gain=1.0)
+    assert TT.is_gt(len(pieces), 1, "Bowl needed cutting")
+    for verts, faces in pieces:
+        assert TT.is_le(len(verts), 128, "Piece fits the vertex limit")
+    pieces = convex_decompose(bowl, tris, max_pieces=2, max_hull_verts=128)
+    assert TT.is_le(len(pieces), 2, "Piece limit holds")
+    for verts, faces in pieces:
+        assert TT.is_le(len(verts), 128, "Out of pieces, hulls are simplified to fit")
+
+    # A flat piece's corners are its outline's, and count against the limit too.
+    fan = [(0, 0, 0)] + [(math.cos(2 * math.pi * i / 300), math.sin(2 * math.pi * i / 300), 0)
+                         for i in range(300)]
+    ftris = [(0, i, i % 300 + 1) for i in range(1, 301)]
+    pieces = convex_decompose(fan, ftris, max_hull_verts=64)
+    assert TT.is_gt(len(pieces), 1, "Flat fan needed cutting")
+    for verts, faces in pieces:
+        assert TT.is_le(len(verts), 64, "Flat piece fits the vertex limit")
+    pieces = convex_decompose(fan, ftris, max_hull_verts=64, convex_radius=0.05)
+    assert TT.is_eq(len(pieces), 1, "Flat fan simplified within the radius stays whole")
+    assert TT.is_le(len(pieces[0][0]), 64, "Simplified flat fan fits the vertex limit")
+    pieces = convex_decompose(fan, ftris, max_pieces=1, max_hull_verts=64)
+    assert TT.is_le(len(pieces[0][0]), 64, "Out of pieces, a flat hull is simplified to fit")
+
+    # A dense convex mesh is simplified to fit, not cut to pieces.
+    k = np.arange(3010) + 0.5
+    phi = np.arccos(1 - 2 * k / 3010)
+    theta = np.pi * (1 + 5**0.5) * k
+    sphere = np.stack([np.cos(theta) * np.sin(phi),
+                       np.sin(theta) * np.sin(phi), np.cos(phi)], axis=1)
+    hv, hf = convex_hull(sphere)
+    assert TT.is_eq(len(hv), 3010, "Sphere is dense")
+    stris = [(f[0], f[i], f[i+1]) for f in hf for i in range(1, len(f) - 1)]
+    pieces = convex_decompose(hv, stris, max_pieces=8)
+    assert TT.is_le(len(pieces), 8, "Sphere within the piece limit")
+    for verts, faces in pieces:
+        assert TT.is_le(len(verts), MAX_HULL_VERTS, "Sphere piece fits the vertex limit")
+    pieces = convex_decompose(hv, stris, max_pieces=8, convex_radius=0.05)
+    assert TT.is_eq(len(pieces), 1, "Sphere simplified within the radius stays whole")
+    assert TT.is_le(hull_distance(hv, *pieces[0]).max(), 0.05, "Simplified sphere within the radius")
+
+
+@test_category("PHYSICS")
+def TEST_CONVEX_HULL_SIMPLIFY():
+    """simplify_hull trades vertices for a bounded error."""
+    from pyn.convex_hull import convex_hull, simplify_hull, hull_distance
+    from pyn.bhk_autopack import pack_convex_polytope, POLYTOPE_CONVEX_RADIUS
+
+    # A finely tessellated sphere: 40 x 20 lat/long plus the poles.
+    pts = [(0, 0, 1), (0, 0, -1)]
+    for i in range(1, 20):
+        lat = math.pi * i / 20
+        for j in range(40):
+            lon = 2 * math.pi * j / 40
+            pts.append((math.sin(lat) * math.cos(lon), math.sin(lat) * math.sin(lon), math.cos(lat)))
+    full, _ = convex_hull(pts)
+    assert TT.is_eq(len(full), len(pts), "Every sphere point is a corner")
+
+    # Exact simplification keeps everything but can't exceed Havok's limit.
+    verts, faces = simplify_hull(pts, max_error=0)
+    assert TT.is_eq(len(verts), 255, "Capped at the vertex limit")
+
+    last = len(pts)
+    for tol in (0.02, 0.05, 0.1):
+        verts, faces = simplify_hull(pts, max_error=tol)
+        err = hull_distance(pts, verts, faces).max()
+        assert TT.is_le(err, tol, f"Error within {tol}")
+        assert TT.is_lt(len(verts), last, f"Fewer verts at {tol}")
+        last = len(verts)
+    assert TT.is_gt(len(pack_convex_polytope(verts, faces)), 0, "Simplified hull packs")
+
+    verts, faces = simplify_hull(pts, max_verts=30)
+    assert TT.is_eq(len(verts), 30, "Vertex budget honoured")
+
+    # By default the convex radius is the tolerance: a box with its corners
+    # chamfered by less than the radius goes back to a plain box.
+    c = 0.005
+    box = [(sx * (1 - c * ax), sy * (1 - c * ay), sz * (1 - c * az))
+           for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)
+           for ax, ay, az in ((1, 0, 0), (0, 1, 0), (0, 0, 1))]
+    assert TT.is_eq(len(convex_hull(box)[0]), 24, "Chamfered box has 24 corners")
+    verts, faces = simplify_hull(box, convex_radius=POLYTOPE_CONVEX_RADIUS)
+    assert TT.is_eq(len(verts), 8, "Chamfers within the radius are dropped")
+    verts, faces = simplify_hull(box)
+    assert TT.is_eq(len(verts), 24, "No radius, no tolerance")
+
+    # Flat pieces (a plane, a thin plank) simplify their outline the same way
+    # and come back as a flat hull with two faces.
+    circle = [(math.cos(2 * math.pi * i / 50), math.sin(2 * math.pi * i / 50), 0)
+              for i in range(50)]
+    verts, faces = simplify_hull(circle)
+    assert TT.is_eq(len(verts), 50, "Flat hull unchanged with no tolerance")
+    for tol in (0.01, 0.05):
+        verts, faces = simplify_hull(circle, max_error=tol)
+        assert TT.is_lt(len(verts), 50, f"Flat hull loses corners at {tol}")
+        assert TT.is_le(hull_distance(circle, verts, faces).max(), tol, f"Flat error within {tol}")
+        assert TT.is_eq(len(faces), 2, f"Flat hull has two faces at {tol}")
+    ring = [(math.cos(2 * math.pi * i / 300), 0.5, math.sin(2 * math.pi * i / 300))
+            for i in range(300)]
+    verts, faces = simplify_hull(ring, max_verts=10)
+    assert TT.is_eq(len(verts), 10, "Flat vertex budget honoured")
+    assert TT.is_eq(sorted(faces[0]), list(range(10)), "Flat hull uses every corner")
+    assert TT.is_eq(faces[1], faces[0][::-1], "Flat hull faces both ways")
+    assert TT.is_lt(hull_distance(ring, verts, faces).max(), 0.06, "Budgeted flat hull is close")
+
+    # Merged faces can start with three nearly collinear corners; the plane
+    # has to come from the whole polygon, not from those three.
+    from pyn.bhk_autopack import _face_plane
+    quad = [(0, 0, 1), (1, 0, 1), (2, 1e-6, 1.0001), (2, 2, 1), (0, 2, 1)]
+    nx, ny, nz, d = _face_plane(quad, [0, 1, 2, 3, 4])
+    assert TT.is_gt(nz, 0.9999, "Plane normal uses every corner")
+    assert TT.is_equiv(d, -1.0, "Plane offset", e=1e-3)
+
+
 @test_category("FO4", "PHYSICS")
 def TEST_FO4_PHYSICS_PACK_BOX():
     """bhk_autopack.pack_convex_polytope round-trips a synthetic unit box."""
@@ -5894,6 +6422,67 @@ def TEST_FO4_PHYSICS_PACK_BOX():
     assert TT.is_lt(max_err, 1e-5, f"Box round-trip: max vertex error {max_err:.2e}")
 
 
+@test_category("FO4", "PHYSICS")
+def TEST_FO4_CM_BUFFER_DECODE():
+    """The vectorized buffer decoders match the packed formats bit for bit."""
+    import struct
+    from pyn.bhk_autounpack import (decode_vertices, decode_large_vertices,
+                                    decode_quads_u8, decode_quads_u16, detect_index_format)
+
+    packed = [0, 0x7FF, 0x7FF << 11, 0x3FF << 22, 0xFFFFFFFF, 0x12345678]
+    data = b'\xAA' * 3 + struct.pack(f'<{len(packed)}I', *packed)
+    verts = decode_vertices(data, 3, len(packed), (1.0, 2.0, 3.0), (0.5, 0.25, 0.125))
+    expect = [(1.0 + (v & 0x7FF) * 0.5, 2.0 + ((v >> 11) & 0x7FF) * 0.25,
+               3.0 + ((v >> 22) & 0x3FF) * 0.125) for v in packed]
+    assert TT.is_eq(verts, expect, "11-11-10 vertices")
+    assert TT.is_eq(len(decode_vertices(data, 3, 99, (0, 0, 0), (1, 1, 1))), len(packed),
+                    "Reads stop at the end of the data")
+
+    big = [0, (1 << 64) - 1, (5 << 42) | (7 << 21) | 9]
+    large = decode_large_vertices(struct.pack('<3Q', *big), 0, 3, (0, 0, 0), (1, 2, 3))
+    assert TT.is_eq(large[1], (1.0, 2.0, 3.0), "Large vertex at the box maximum")
+    assert TT.is_eq(large[2], (9 / ((1 << 21) - 1), 14 / ((1 << 21) - 1), 15 / ((1 << 22) - 1)),
+                    "21-21-22 large vertex")
+
+    # A quad, a degenerate quad (c == d), and one indexing past the section.
+    quads = [(0, 1, 2, 3), (4, 5, 6, 6), (0, 1, 2, 9)]
+    tris = [(0, 1, 2), (0, 2, 3), (4, 5, 6)]
+    data8 = bytes(i for q in quads for i in q)
+    assert TT.is_eq(decode_quads_u8(data8, 0, 3, 7), tris, "u8 quads split into triangles")
+    data16 = struct.pack('<12H', *(i for q in quads for i in q))
+    assert TT.is_eq(decode_quads_u16(data16, 0, 3, 7), tris, "u16 quads split into triangles")
+    assert TT.is_eq(detect_index_format(data8, 0, 3, 7), "u8", "u8 detected")
+    wide = struct.pack('<8H', 0, 1, 2, 3, 0x0102, 0x0203, 0x0304, 0x0405)
+    assert TT.is_eq(detect_index_format(wide, 0, 2, 0x0406), "u16", "Large sections use u16")
+    assert TT.is_eq(detect_index_format(wide, 0, 2, 5), "u8", "Byte-sized indices read as u8")
+
+
+@test_category("FO4", "PHYSICS")
+def TEST_FO4_PACKFILE_CACHE():
+    """A physics-system packfile is parsed once however many times it's read."""
+    from pyn.bhk_autopack import pack_convex_polytope
+    from pyn.bhk_autounpack import parse_packfile, parse_bytes
+
+    box = [(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    data = pack_convex_polytope(box, faces)
+
+    pf = parse_packfile(data)
+    assert TT.is_eq(sorted(set(pf.body_order.values())), [0], "One body, parsed up front")
+    assert parse_packfile(bytes(bytearray(data))) is pf, \
+        "Same content, different bytes object: same parse"
+    assert pf.shapes is pf.shapes, "Shapes decoded once"
+    assert TT.is_eq(pf.constraints, 0, "No constraints")
+
+    shapes = parse_bytes(data)
+    assert shapes[0] is pf.shapes[0], "parse_bytes shares the decoded shapes"
+    shapes.clear()
+    assert TT.is_eq(len(parse_bytes(data)), 1, "Callers get their own list")
+
+    other = pack_convex_polytope([(x * 2, y, z) for x, y, z in box], faces)
+    assert parse_packfile(other) is not pf, "Different content, different parse"
+
+
 @test_category("FO4", "PHYSICS")
 def TEST_FO4_MULTI_POLYTOPE_ROUNDTRIP():
     """pack_multi_polytope round-trips the two polytopes from DrumMag compound."""
@@ -6106,6 +6695,247 @@ def TEST_TRIANGULATE():
     assert TT.is_eq(triangulate([(0,0,0), (1,0,0)]), [], "2 verts returns empty")
 
 
+def TEST_MESH_SPLIT_BY_UV():
+    """Verts used at more than one UV location are split, in order of first use."""
+    # Two triangles sharing the edge 1-2. Vert 2 is on a seam, vert 1 only
+    # differs by rounding error, vert 3 appears at two new locations.
+    verts = [(0,0,0), (1,0,0), (0,1,0), (1,1,0)]
+    loops = [0, 1, 2,  2, 1, 3,  3, 2, 0]
+    uvs = [(0, 0), (0.5, 0), (0, 0.5),
+           (0.9, 0.5), (0.50000001, 0), (1, 1),
+           (0.2, 0.2), (0.9, 0.5), (0, 0)]
+    weights = [{'a': 1.0}, {'b': 1.0}, {'c': 1.0}, {'d': 1.0}]
+    morphs = {'m': [(0,0,1), (1,0,1), (0,1,1), (1,1,1)]}
+
+    mesh_split_by_uv(verts, loops, None, uvs, weights, morphs)
+
+    assert TT.is_eq(loops, [0, 1, 2,  4, 1, 3,  5, 4, 0], "Loops use the split verts")
+    assert TT.is_eq(verts[4:], [(0,1,0), (1,1,0)], "New verts copy their originals")
+    assert TT.is_eq(weights[4:], [{'c': 1.0}, {'d': 1.0}], "Weights extended")
+    assert TT.is_eq(morphs['m'][4:], [(0,1,1), (1,1,1)], "Morphs extended")
+
+
+def TEST_MESH_LOD():
+    """QEM decimation keeps fixed vertices; nested levels drop small pieces first."""
+    from pyn.mesh_lod import decimate, lod_chain, nested_lod_levels
+
+    # A bumpy 20x20 grid with a UV seam down the middle: column 10 is split into
+    # two vertices at the same positions.  The seam doesn't make it two pieces.
+    n = 20
+    verts = [(x, y, 0.1 * ((x * 7 + y * 3) % 5)) for y in range(n+1) for x in range(n+1)]
+    seam = {}
+    for y in range(n+1):
+        seam[y*(n+1) + 10] = len(verts)
+        verts.append(verts[y*(n+1) + 10])
+    tris = []
+    for y in range(n):
+        for x in range(n):
+            a = y*(n+1) + x
+            q = [a, a+1, a+n+2, a+n+1]
+            if x >= 10:
+                q = [seam.get(v, v) for v in q]
+            tris += [(q[0], q[1], q[2]), (q[0], q[2], q[3])]
+    groups = [0 if i < len(tris) // 2 else 1 for i in range(len(tris))]
+
+    out = decimate(verts, tris, len(tris) // 4, groups=groups)
+    used = {v for t in out for v in t}
+    assert TT.is_lt(len(out), len(tris) // 2, "Decimated well below the original")
+    assert set(seam) | set(seam.values()) <= used, "Seam vertices are kept"
+    border = {v for v in range((n+1)**2) if v % (n+1) in (0, n) or v // (n+1) in (0, n)}
+    assert border <= used, "Boundary vertices are kept"
+    assert used <= set(range(len(verts))), "Only original vertices are used"
+    assert all(len(set(t)) == 3 for t in out), "No degenerate triangles"
+
+    fine, coarse = lod_chain(verts, tris, [0.5, 0.25])
+    assert TT.is_lt(len(coarse), len(fine), "Coarser level has fewer triangles")
+    assert {v for t in coarse for v in t} <= {v for t in fine for v in t}, \
+        "Coarser level uses a subset of the finer level's vertices"
+
+    # Skin weights and morphs make collapses dearer: a weight gradient across
+    # the grid, or a morph that bulges its middle, leaves more of it at the
+    # same error bound.
+    plain = decimate(verts, tris, 0, max_error=0.01)
+    weights = [{'A': 1.0 - v[1] / n, 'B': v[1] / n} for v in verts]
+    assert TT.is_gt(len(decimate(verts, tris, 0, weights=weights, max_error=0.01)),
+                    len(plain), "Weight changes hold detail")
+    bulge = [(x, y, z + 3 * math.exp(-((x - 10)**2 + (y - 10)**2) / 8)) for x, y, z in verts]
+    assert TT.is_gt(len(decimate(verts, tris, 0, shapes=[bulge], max_error=0.01)),
+                    len(plain), "Morphs hold detail")
+
+    # A big quad, a medium one, and a small one. The seam doesn't split the big quad.
+    pieces = [(0, 1, 2), (12, 2, 3), (4, 5, 6), (4, 6, 7), (8, 9, 10), (8, 10, 11)]
+    pverts = [(0,0,0), (10,0,0), (10,10,0), (0,10,0),
+              (20,0,0), (24,0,0), (24,4,0), (20,4,0),
+              (30,0,0), (31,0,0), (31,1,0), (30,1,0),
+              (0,0,0)]
+    levels = nested_lod_levels(pverts, pieces, [0.3, 0.7])
+    assert TT.is_eq(levels, [0, 0, 1, 1, 2, 2], "Pieces are dropped smallest first")
+    # Nested levels only drop pieces: one connected mesh stays whole.
+    assert TT.is_eq(set(nested_lod_levels(verts, tris, [0.3, 0.7])), {0},
+                    "Connected mesh has nothing to drop")
+
+
+def TEST_VERTEX_CACHE():
+    """Tipsify ordering cuts vertex cache misses and keeps groups together."""
+    import random
+    from pyn.vertex_cache import acmr, optimize
+
+    n = 30
+    tris = []
+    for y in range(n):
+        for x in range(n):
+            a = y*(n+1) + x
+            tris += [(a, a+1, a+n+2), (a, a+n+2, a+n+1)]
+    random.seed(34)
+    random.shuffle(tris)
+    nverts = (n+1)**2 + 1   # One vertex no triangle uses
+
+    tri_order, vert_order = optimize(tris, nverts)
+    assert TT.is_eq(sorted(tri_order), list(range(len(tris))), "Every triangle once")
+    assert TT.is_eq(sorted(vert_order), list(range(nverts)), "Every vertex once")
+    assert TT.is_eq(vert_order[-1], nverts-1, "Unused vertex goes last")
+    new_index = {old: new for new, old in enumerate(vert_order)}
+    new_tris = [tuple(new_index[v] for v in tris[t]) for t in tri_order]
+    assert TT.is_eq(new_tris[0][0], 0, "Vertices are numbered in order of first use")
+    assert TT.is_lt(acmr(new_tris), 0.8, "Optimized grid reuses the cache")
+    assert TT.is_gt(acmr(tris), 2.5, "Shuffled grid barely does")
+
+    groups = [(t[0] % 3, 0) for t in tris]
+    tri_order, _ = optimize(tris, nverts, groups)
+    seen = [groups[t] for t in tri_order]
+    assert TT.is_eq(seen, sorted(seen, key=list(dict.fromkeys(groups)).index),
+                    "Groups stay contiguous, in first-appearance order")
+
+
+def TEST_TRIANGULATE_POLYGONS():
+    """Batch triangulation matches triangulate() polygon by polygon."""
+    import math as _math
+    from pyn.triangulate import triangulate, triangulate_polygons
+
+    # A 64-point star: concave, so the ear clipper has real reflex vertices.
+    star = [((100 if i % 2 else 40) * _math.cos(2*_math.pi*i/64),
+             (100 if i % 2 else 40) * _math.sin(2*_math.pi*i/64), 0) for i in range(64)]
+    polys = [
+        [(0,0,0), (100,0,0), (0,100,0)],
+        [(0,0,0), (100,0,0), (100,100,0), (0,100,0)],
+        [(0,0,0), (100,0,0), (300,100,0), (0,100,0)],   # Short diagonal is 1-3
+        [(0,0,0), (1,0,0)],                             # Degenerate, skipped
+        [(0,0,0), (200,0,0), (200,100,0), (100,100,0), (100,200,0), (0,200,0)],
+        star,
+    ]
+    coords = [c for p in polys for c in p]
+    loop_total = [len(p) for p in polys]
+    loop_start = [sum(loop_total[:i]) for i in range(len(polys))]
+    # Loops walk the vertices backwards, so loop and vertex indices differ.
+    coords.reverse()
+    loop_verts = list(range(len(coords)-1, -1, -1))
+
+    tris, faces = triangulate_polygons(coords, loop_verts, loop_start, loop_total)
+    expect = [tuple(loop_start[f] + i for i in t)
+              for f, p in enumerate(polys) for t in triangulate(p)]
+    assert TT.is_eq([tuple(t) for t in tris.tolist()], expect, "Same triangles as triangulate()")
+    assert TT.is_eq(faces.tolist(), [f for f, p in enumerate(polys) for t in triangulate(p)],
+                    "Triangles map back to their polygons")
+    assert TT.is_eq(list(expect[1]), [3, 4, 5], "Square splits on 0-2")
+    assert TT.is_eq(list(expect[3]), [7, 8, 10], "Kite splits on its short diagonal")
+
+    # The star's triangles exactly tile it.
+    def area(a, b, c):
+        return ((b[0]-a[0])*(c[1]-a[1]) - (b[1]-a[1])*(c[0]-a[0])) / 2
+    star_tris = triangulate(star)
+    assert TT.is_eq(len(star_tris), 62, "Star produces n-2 tris")
+    assert TT.is_equiv(sum(area(*(star[i] for i in t)) for t in star_tris),
+                       sum(area((0,0,0), star[i], star[(i+1) % 64]) for i in range(64)),
+                       "Star tris cover the star")
+    assert TT.is_eq(min(area(*(star[i] for i in t)) for t in star_tris) > 0, True,
+                    "Star tris all wind the same way")
+
+
+def TEST_TRIANGULATE_MIN_ANGLE_ORDER():
+    """The incremental ear clipper matches a full rescan on random simple polygons."""
+    import random
+    import numpy as np
+    from pyn import triangulate as T
+
+    def rescan(coords):
+        # Reference: every round, test every ear against every other vertex
+        # and clip the one with the smallest angle.
+        normal = T._polygon_normal(coords)
+        ring = list(range(len(coords)))
+        tris = []
+        while len(ring) > 3:
+            best = None
+            for attempt in range(2):
+                if attempt:
+                    # No ear: try the polygon the other way up.
+                    normal = tuple(-x for x in normal)
+                for k, i in enumerate(ring):
+                    p, n = ring[k-1], ring[(k+1) % len(ring)]
+                    if not T._is_convex(coords, p, i, n, normal):
+                        continue
+                    if any(T._point_in_triangle_3d(coords[r], coords[p], coords[i], coords[n])
+                           for r in ring if r not in (p, i, n)):
+                        continue
+                    angle = T._angle_at(coords, p, i, n)
+                    if best is None or angle < best[0]:
+                        best = (angle, k)
+                if best is not None:
+                    break
+            if best is None:
+                tris.extend((ring[0], ring[j], ring[j+1]) for j in range(1, len(ring) - 1))
+                ring = []
+                break
+            k = best[1]
+            tris.append((ring[k-1], ring[k], ring[(k+1) % len(ring)]))
+            ring.pop(k)
+        if ring:
+            tris.append(tuple(ring))
+        return T._flip_edges(coords, tris, normal)
+
+    def crosses(a, b, c, d):
+        def side(o, p, q):
+            return (p[0]-o[0])*(q[1]-o[1]) - (p[1]-o[1])*(q[0]-o[0])
+        return (side(a, b, c) * side(a, b, d) < 0) and (side(c, d, a) * side(c, d, b) < 0)
+
+    def simple_polygon(rng, n, bumpiness):
+        # Random points, untangled by reversing runs until no edges cross.
+        pts = [(rng.random(), rng.random()) for _ in range(n)]
+        order = list(range(n))
+        tangled = True
+        while tangled:
+            tangled = False
+            for i in range(n - 2):
+                for j in range(i + 2, n - (i == 0)):
+                    if crosses(pts[order[i]], pts[order[i+1]], pts[order[j]], pts[order[(j+1) % n]]):
+                        order[i+1:j+1] = reversed(order[i+1:j+1])
+                        tangled = True
+        return [(*pts[k], rng.uniform(-bumpiness, bumpiness)) for k in order]
+
+    rng = random.Random(3)
+    for bumpiness in (0, 0.05, 0.3):
+        for _ in range(100):
+            poly = simple_polygon(rng, rng.randint(5, 24), bumpiness)
+            assert TT.is_eq(T.triangulate(poly), rescan(poly),
+                            f"Same triangles as a full rescan, bumpiness {bumpiness}")
+
+    # Polygons from Blender are float32 and rarely axis-aligned.  Rounding
+    # must not make them count as non-planar, or every ear test falls back to
+    # scanning the whole polygon.
+    rot = np.array([[0.36, 0.48, -0.8], [-0.8, 0.6, 0.0], [0.48, 0.64, 0.6]])
+    for n, radius in ((200, lambda i: 1.0), (64, lambda i: 1.0 if i % 2 else 0.4)):
+        flat = np.array([(radius(i) * math.cos(2*math.pi*i/n),
+                          radius(i) * math.sin(2*math.pi*i/n), 0.0) for i in range(n)])
+        for offset in (0.0, 500.0):
+            poly = [tuple(float(x) for x in p)
+                    for p in ((flat + offset) @ rot.T).astype(np.float32)]
+            clipper = T._EarClipper(poly, T._polygon_normal(poly))
+            assert TT.is_eq(clipper.planar, True,
+                            f"Rotated float32 {n}-gon at {offset} is planar")
+            if n == 64:
+                assert TT.is_eq(T.triangulate(poly), rescan(poly),
+                                f"Rotated float32 star at {offset} matches a full rescan")
+
+
 @test_category("FO4", "PHYSICS")
 def TEST_FO4_GEARDOOR_KEYSUPPORT():
     """VltGearDoor01: per-body collision placement in multi-body physics system.
@@ -6296,6 +7126,45 @@ def TEST_TRI_STRIP_BASIC():
     assert TT.is_gt(len(strips[0]), 3, "Strip has at least 4 verts (2 tris)")
 
 
+def TEST_TRI_STRIP_LONG():
+    """The "long" strip method keeps winding and beats greedy on a grid."""
+    from pyn.tri_strip import stripify, stripify_indexed, strip_stats
+
+    # 12x12 quad grid, diagonals alternating so greedy strips break up.
+    n = 12
+    tris = []
+    for y in range(n):
+        for x in range(n):
+            a = y*(n+1) + x
+            b, c, d = a + 1, a + n + 1, a + n + 2
+            tris += [(a, b, d), (a, d, c)] if (x + y) % 2 else [(a, b, c), (b, d, c)]
+
+    def cyclic(t):
+        i = t.index(min(t))
+        return t[i:] + t[:i]
+
+    results = {}
+    for method in ("greedy", "long"):
+        strips, strip_tris, leftover_ids = stripify_indexed(tris, method)
+        for strip, ids in zip(strips, strip_tris):
+            for k, ti in enumerate(ids):
+                t = strip[k:k+3] if k % 2 == 0 else [strip[k], strip[k+2], strip[k+1]]
+                assert TT.is_eq(cyclic(tuple(t)), cyclic(tris[ti]),
+                                f"{method} strip triangle keeps its winding")
+        used = sorted([ti for ids in strip_tris for ti in ids] + leftover_ids)
+        assert TT.is_eq(used, list(range(len(tris))), f"{method} uses every triangle once")
+        results[method] = strip_stats(strips, [tris[ti] for ti in leftover_ids])
+
+    assert TT.is_lt(results["long"].leftovers, results["greedy"].leftovers,
+                    "Long strips leave fewer flat triangles")
+    assert TT.is_gt(results["long"].bytes_saved, results["greedy"].bytes_saved,
+                    "Long strips save more index data")
+    assert TT.is_gt(results["long"].mean_length, 2, "Long strips are longer than a quad")
+
+    # A single triangle can't be a strip.
+    assert TT.is_eq(stripify([(0, 1, 2)], "long"), ([], [(0, 1, 2)]), "Lone triangle is flat")
+
+
 @test_category("SKYRIM", "MOPP")
 def TEST_SKYRIM_LE_MOPP_IMPORT():
     """Import a Skyrim LE MOPP collision (bhkPackedNiTriStripsShape)."""